@@ -0,0 +1,399 @@
+"""
+Optional compact, array-backed snapshot of a TileIslandBuilder's islands.
+
+The builder itself keeps mutable TileIsland objects (python sets of tiles, ordered border sets, parent / child links) because
+update_tile_islands patches them in place every turn. Consumers that only READ islands (flow graph construction, lookahead
+copies, etc) can instead use TileIslandBuilder.get_compact_islands, a snapshot cached until the next island update, which is
+a handful of numpy arrays:
+ - island index per tile_index (int32, -1 for no island),
+ - every island's tiles_by_army as a range of a single tile_index permutation array,
+ - border adjacency and child islands as CSR arrays of island indexes,
+ - per-island scalars (team, army, tile counts, full_island index).
+
+CompactTileIsland views expose the read side of the TileIsland API and only materialize Tile lists / sets when they are
+first asked for. Cloning a snapshot just copies the arrays.
+"""
+from __future__ import annotations
+
+import itertools
+import typing
+
+import logbook
+import numpy as np
+
+from base.client.map import MapBase, Tile
+
+if typing.TYPE_CHECKING:
+    from Algorithms.TileIslandBuilder import TileIsland, TileIslandBuilder
+
+
+class CompactTileIsland(object):
+    """
+    Read only, lazily materialized view of one island in a CompactTileIslands snapshot.
+    Hashes and compares equal to the TileIsland it was built from (both go by unique_id).
+    """
+    __slots__ = ('_owner', 'index', '_tiles_by_army', '_tile_set', '_cities', '_border_islands', '_child_islands')
+
+    def __init__(self, owner: CompactTileIslands, index: int):
+        self._owner: CompactTileIslands = owner
+        self.index: int = index
+        """The dense island index within the owning snapshot's arrays."""
+        self._tiles_by_army: typing.List[Tile] | None = None
+        self._tile_set: typing.Set[Tile] | None = None
+        self._cities: typing.List[Tile] | None = None
+        self._border_islands: typing.List[CompactTileIsland] | None = None
+        self._child_islands: typing.List[CompactTileIsland] | None = None
+
+    @property
+    def unique_id(self) -> int:
+        return int(self._owner.unique_ids[self.index])
+
+    @property
+    def name(self) -> str | None:
+        return self._owner.names[self.index]
+
+    @property
+    def team(self) -> int:
+        return int(self._owner.teams[self.index])
+
+    @property
+    def tile_count(self) -> int:
+        return int(self._owner.tile_counts[self.index])
+
+    @property
+    def sum_army(self) -> int:
+        return int(self._owner.sum_armies[self.index])
+
+    @property
+    def tile_count_all_adjacent_friendly(self) -> int:
+        return int(self._owner.tile_counts_all_adjacent_friendly[self.index])
+
+    @property
+    def sum_army_all_adjacent_friendly(self) -> int:
+        return int(self._owner.sum_armies_all_adjacent_friendly[self.index])
+
+    @property
+    def tiles_by_army(self) -> typing.List[Tile]:
+        """Sorted from largest army to smallest army (as of when the snapshot was taken)."""
+        if self._tiles_by_army is None:
+            tilesByIndex = self._owner.map.tiles_by_index
+            self._tiles_by_army = [tilesByIndex[tileIndex] for tileIndex in self._owner.get_tile_indexes(self.index).tolist()]
+        return self._tiles_by_army
+
+    @property
+    def tile_set(self) -> typing.Set[Tile]:
+        if self._tile_set is None:
+            self._tile_set = set(self.tiles_by_army)
+        return self._tile_set
+
+    @property
+    def cities(self) -> typing.List[Tile]:
+        if self._cities is None:
+            self._cities = [t for t in self.tiles_by_army if t.isCity]
+        return self._cities
+
+    @property
+    def border_islands(self) -> typing.List[CompactTileIsland]:
+        """Leaf islands that border this island, in the builders border_islands order."""
+        if self._border_islands is None:
+            owner = self._owner
+            self._border_islands = [owner.get_island(borderIndex) for borderIndex in owner.get_border_island_indexes(self.index).tolist()]
+        return self._border_islands
+
+    @property
+    def child_islands(self) -> typing.List[CompactTileIsland] | None:
+        owner = self._owner
+        if not owner.has_children[self.index]:
+            return None
+        if self._child_islands is None:
+            self._child_islands = [owner.get_island(childIndex) for childIndex in owner.child_indexes[owner.child_offsets[self.index]:owner.child_offsets[self.index + 1]].tolist()]
+        return self._child_islands
+
+    @property
+    def full_island(self) -> CompactTileIsland | None:
+        fullIndex = int(self._owner.full_island_indexes[self.index])
+        if fullIndex < 0:
+            return None
+        return self._owner.get_island(fullIndex)
+
+    def __str__(self) -> str:
+        sampleTile = None
+        if self.tile_count > 0:
+            sampleTile = str(self._owner.map.tiles_by_index[int(self._owner.get_tile_indexes(self.index)[0])])
+        return f'{{t{self.team} {self.unique_id}/{self.name}: {self.tile_count}t {self.sum_army}a ({sampleTile})}}'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __lt__(self, other: CompactTileIsland | TileIsland | None):
+        return self.sum_army < other.sum_army
+
+    def __gt__(self, other: CompactTileIsland | TileIsland | None):
+        return self.sum_army > other.sum_army
+
+    def __hash__(self) -> int:
+        return self.unique_id
+
+    def __eq__(self, other: CompactTileIsland | TileIsland):
+        if other is None:
+            return False
+        return self.unique_id == other.unique_id
+
+
+class CompactTileIslands(object):
+    """
+    Array backed snapshot of a TileIslandBuilder's leaf islands (and the full islands they were broken out of).
+    Leaf islands come first in builder.all_tile_islands order, so indexes [0, leaf_count) are the leaves.
+    Use CompactTileIslands.from_builder to build one.
+    """
+
+    def __init__(
+            self,
+            map: MapBase,
+            leafCount: int,
+            uniqueIds: np.ndarray,
+            names: typing.List[str | None],
+            teams: np.ndarray,
+            tileCounts: np.ndarray,
+            sumArmies: np.ndarray,
+            tileCountsAllAdjacentFriendly: np.ndarray,
+            sumArmiesAllAdjacentFriendly: np.ndarray,
+            fullIslandIndexes: np.ndarray,
+            tileOffsets: np.ndarray,
+            tilePermutation: np.ndarray,
+            borderOffsets: np.ndarray,
+            borderIndexes: np.ndarray,
+            hasChildren: np.ndarray,
+            childOffsets: np.ndarray,
+            childIndexes: np.ndarray,
+            islandIndexByTileIndex: np.ndarray,
+    ):
+        self.map: MapBase = map
+        self.leaf_count: int = leafCount
+        self.unique_ids: np.ndarray = uniqueIds
+        """int64 TileIsland.unique_id per island index."""
+        self.names: typing.List[str | None] = names
+        self.teams: np.ndarray = teams
+        self.tile_counts: np.ndarray = tileCounts
+        self.sum_armies: np.ndarray = sumArmies
+        self.tile_counts_all_adjacent_friendly: np.ndarray = tileCountsAllAdjacentFriendly
+        self.sum_armies_all_adjacent_friendly: np.ndarray = sumArmiesAllAdjacentFriendly
+        self.full_island_indexes: np.ndarray = fullIslandIndexes
+        """int32 island index of each island's full_island, -1 if it has none."""
+        self.tile_offsets: np.ndarray = tileOffsets
+        """island i's tiles_by_army are tile_permutation[tile_offsets[i]:tile_offsets[i + 1]]."""
+        self.tile_permutation: np.ndarray = tilePermutation
+        self.border_offsets: np.ndarray = borderOffsets
+        """CSR row offsets into border_indexes, island i's border islands are border_indexes[border_offsets[i]:border_offsets[i + 1]]."""
+        self.border_indexes: np.ndarray = borderIndexes
+        self.has_children: np.ndarray = hasChildren
+        """Whether each island's child_islands is not None (an empty child list is still distinct from None)."""
+        self.child_offsets: np.ndarray = childOffsets
+        self.child_indexes: np.ndarray = childIndexes
+        self.island_index_by_tile_index: np.ndarray = islandIndexByTileIndex
+        """int32 leaf island index for every tile_index, -1 for tiles that are not on any island. The compact tile_island_lookup."""
+
+        self._views: typing.List[CompactTileIsland | None] = [None] * len(uniqueIds)
+        self._index_by_unique_id: typing.Dict[int, int] | None = None
+
+    @staticmethod
+    def from_builder(builder: TileIslandBuilder) -> CompactTileIslands:
+        leafIslands: typing.List[TileIsland] = list(builder.all_tile_islands)
+        islands: typing.List[TileIsland] = leafIslands.copy()
+        indexByUniqueId: typing.Dict[int, int] = {island.unique_id: i for i, island in enumerate(islands)}
+        for island in leafIslands:
+            fullIsland = island.full_island
+            if fullIsland is not None and fullIsland.unique_id not in indexByUniqueId:
+                indexByUniqueId[fullIsland.unique_id] = len(islands)
+                islands.append(fullIsland)
+
+        islandCount = len(islands)
+        leafCount = len(leafIslands)
+
+        uniqueIds = np.fromiter((island.unique_id for island in islands), dtype=np.int64, count=islandCount)
+        teams = np.fromiter((island.team for island in islands), dtype=np.int32, count=islandCount)
+        tileCounts = np.fromiter((island.tile_count for island in islands), dtype=np.int32, count=islandCount)
+        sumArmies = np.fromiter((island.sum_army for island in islands), dtype=np.int64, count=islandCount)
+        tileCountsAllAdjacentFriendly = np.fromiter((island.tile_count_all_adjacent_friendly for island in islands), dtype=np.int32, count=islandCount)
+        sumArmiesAllAdjacentFriendly = np.fromiter((island.sum_army_all_adjacent_friendly for island in islands), dtype=np.int64, count=islandCount)
+        fullIslandIndexes = np.fromiter(
+            (-1 if island.full_island is None else indexByUniqueId.get(island.full_island.unique_id, -1) for island in islands),
+            dtype=np.int32,
+            count=islandCount)
+
+        # full islands that lost a leaf during update_tile_islands only have their tile_set trimmed, so tile_set wins when the two disagree.
+        tileLists = [
+            island.tiles_by_army if len(island.tiles_by_army) == len(island.tile_set) else sorted(island.tile_set, key=lambda t: (-t.army, t.tile_index))
+            for island in islands
+        ]
+        tileOffsets = np.zeros(islandCount + 1, dtype=np.int32)
+        np.cumsum(np.fromiter((len(tiles) for tiles in tileLists), dtype=np.int32, count=islandCount), out=tileOffsets[1:])
+        tilePermutation = np.fromiter(
+            (tile.tile_index for tiles in tileLists for tile in tiles),
+            dtype=np.int32,
+            count=int(tileOffsets[-1]))
+
+        # borders and children should always be leaves (or the full islands collected above). Anything else is a builder bug
+        # that debug_verify_all_islands would flag too, so it is reported here rather than silently dropped from the CSR rows.
+        unknownIslandRefs: typing.List[str] = []
+        borderRows: typing.List[typing.List[int]] = []
+        childRows: typing.List[typing.List[int]] = []
+        for island in islands:
+            borderRow = []
+            for borderIsland in island.border_islands:
+                borderIndex = indexByUniqueId.get(borderIsland.unique_id, None)
+                if borderIndex is None:
+                    unknownIslandRefs.append(f'{island} border {borderIsland}')
+                else:
+                    borderRow.append(borderIndex)
+            borderRows.append(borderRow)
+
+            childRow = []
+            if island.child_islands is not None:
+                for childIsland in island.child_islands:
+                    childIndex = indexByUniqueId.get(childIsland.unique_id, None)
+                    if childIndex is None:
+                        unknownIslandRefs.append(f'{island} child {childIsland}')
+                    else:
+                        childRow.append(childIndex)
+            childRows.append(childRow)
+
+        if unknownIslandRefs:
+            msg = f'CompactTileIslands.from_builder: {len(unknownIslandRefs)} border / child islands are not in the builders islands: {" | ".join(unknownIslandRefs)}'
+            if builder.use_debug_asserts:
+                raise AssertionError(msg)
+            logbook.error(msg)
+
+        borderOffsets, borderIndexes = CompactTileIslands._build_csr(borderRows)
+
+        hasChildren = np.fromiter((island.child_islands is not None for island in islands), dtype=np.bool_, count=islandCount)
+        childOffsets, childIndexes = CompactTileIslands._build_csr(childRows)
+
+        islandIndexByTileIndex = np.full(len(builder.map.tiles_by_index), -1, dtype=np.int32)
+        leafTileEnd = int(tileOffsets[leafCount])
+        islandIndexByTileIndex[tilePermutation[:leafTileEnd]] = np.repeat(np.arange(leafCount, dtype=np.int32), np.diff(tileOffsets[:leafCount + 1]))
+
+        compact = CompactTileIslands(
+            builder.map,
+            leafCount,
+            uniqueIds,
+            [island.name for island in islands],
+            teams,
+            tileCounts,
+            sumArmies,
+            tileCountsAllAdjacentFriendly,
+            sumArmiesAllAdjacentFriendly,
+            fullIslandIndexes,
+            tileOffsets,
+            tilePermutation,
+            borderOffsets,
+            borderIndexes,
+            hasChildren,
+            childOffsets,
+            childIndexes,
+            islandIndexByTileIndex,
+        )
+        compact._index_by_unique_id = indexByUniqueId
+        return compact
+
+    @staticmethod
+    def _build_csr(rows: typing.List[typing.List[int]]) -> typing.Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(rows) + 1, dtype=np.int32)
+        np.cumsum(np.fromiter((len(row) for row in rows), dtype=np.int32, count=len(rows)), out=offsets[1:])
+        indexes = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int32, count=int(offsets[-1]))
+        return offsets, indexes
+
+    def clone(self) -> CompactTileIslands:
+        """Copies every array. Views are not copied, the clone re-materializes them lazily as they are asked for."""
+        copy = CompactTileIslands(
+            self.map,
+            self.leaf_count,
+            self.unique_ids.copy(),
+            self.names.copy(),
+            self.teams.copy(),
+            self.tile_counts.copy(),
+            self.sum_armies.copy(),
+            self.tile_counts_all_adjacent_friendly.copy(),
+            self.sum_armies_all_adjacent_friendly.copy(),
+            self.full_island_indexes.copy(),
+            self.tile_offsets.copy(),
+            self.tile_permutation.copy(),
+            self.border_offsets.copy(),
+            self.border_indexes.copy(),
+            self.has_children.copy(),
+            self.child_offsets.copy(),
+            self.child_indexes.copy(),
+            self.island_index_by_tile_index.copy(),
+        )
+        copy._index_by_unique_id = self._index_by_unique_id
+        return copy
+
+    @property
+    def island_count(self) -> int:
+        """Leaf plus full islands."""
+        return len(self.unique_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the backing arrays."""
+        return sum(arr.nbytes for arr in (
+            self.unique_ids,
+            self.teams,
+            self.tile_counts,
+            self.sum_armies,
+            self.tile_counts_all_adjacent_friendly,
+            self.sum_armies_all_adjacent_friendly,
+            self.full_island_indexes,
+            self.tile_offsets,
+            self.tile_permutation,
+            self.border_offsets,
+            self.border_indexes,
+            self.has_children,
+            self.child_offsets,
+            self.child_indexes,
+            self.island_index_by_tile_index,
+        ))
+
+    @property
+    def all_tile_islands(self) -> typing.List[CompactTileIsland]:
+        """The leaf islands, in the builders all_tile_islands order."""
+        return [self.get_island(i) for i in range(self.leaf_count)]
+
+    def get_tile_indexes(self, islandIndex: int) -> np.ndarray:
+        """The tile_index of each of the islands tiles_by_army, as a view into tile_permutation."""
+        return self.tile_permutation[self.tile_offsets[islandIndex]:self.tile_offsets[islandIndex + 1]]
+
+    def sum_tile_values_by_island(self, valuesByTileIndex: typing.Sequence[int] | np.ndarray) -> np.ndarray:
+        """
+        Sums valuesByTileIndex (anything indexed by tile_index, like a MapMatrix[int].raw) over each islands tiles in one
+        vectorized pass. Returns an int64 array indexed by island index.
+        """
+        values = np.asarray(valuesByTileIndex, dtype=np.int64)[self.tile_permutation]
+        cumulative = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(values, out=cumulative[1:])
+        return cumulative[self.tile_offsets[1:]] - cumulative[self.tile_offsets[:-1]]
+
+    def get_border_island_indexes(self, islandIndex: int) -> np.ndarray:
+        return self.border_indexes[self.border_offsets[islandIndex]:self.border_offsets[islandIndex + 1]]
+
+    def get_island(self, islandIndex: int) -> CompactTileIsland:
+        view = self._views[islandIndex]
+        if view is None:
+            view = CompactTileIsland(self, islandIndex)
+            self._views[islandIndex] = view
+        return view
+
+    def get_island_for_tile(self, tile: Tile) -> CompactTileIsland | None:
+        """The compact equivalent of builder.tile_island_lookup.raw[tile.tile_index]."""
+        islandIndex = int(self.island_index_by_tile_index[tile.tile_index])
+        if islandIndex < 0:
+            return None
+        return self.get_island(islandIndex)
+
+    def get_island_by_unique_id(self, uniqueId: int) -> CompactTileIsland | None:
+        if self._index_by_unique_id is None:
+            self._index_by_unique_id = {uid: i for i, uid in enumerate(self.unique_ids.tolist())}
+        islandIndex = self._index_by_unique_id.get(uniqueId, None)
+        if islandIndex is None:
+            return None
+        return self.get_island(islandIndex)
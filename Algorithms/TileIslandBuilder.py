@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import bisect
 import itertools
+import operator
 import random
 import time
 import typing
@@ -8,10 +10,12 @@ from collections import deque
 from enum import Enum
 
 import logbook
+import numpy as np
 
 import Algorithms
 import DebugHelper
 import SearchUtils
+from Algorithms.CompactTileIslands import CompactTileIslands
 from ArmyAnalyzer import ArmyAnalyzer
 from Interfaces import MapMatrixInterface
 from MapMatrix import MapMatrix, MapMatrixSet
@@ -41,6 +45,13 @@ class OrderedTileIslandSet(object):
         self._lookup.add(island)
         self._items.append(island)
 
+    def insert_sorted(self, island: TileIsland, sortKeys: typing.Dict[int, int]):
+        """Adds the island at its sortKeys position. The set must already be sorted by sortKeys."""
+        if island in self._lookup:
+            return
+        self._lookup.add(island)
+        _insert_sorted_island(self._items, island, sortKeys)
+
     def sort(self):
         self._items.sort(key=lambda i: i.tiles_by_army[0].tile_index)
 
@@ -50,6 +61,13 @@ class OrderedTileIslandSet(object):
         self._lookup.remove(island)
         self._items.remove(island)
 
+    def discard_sorted(self, island: TileIsland, sortKeys: typing.Dict[int, int]):
+        """discard, but finds the island by bisecting on its sortKeys entry instead of scanning. The set must already be sorted by sortKeys."""
+        if island not in self._lookup:
+            return
+        self._lookup.remove(island)
+        _remove_sorted_island(self._items, island, sortKeys)
+
     def clear(self):
         self._lookup.clear()
         self._items.clear()
@@ -251,8 +269,25 @@ class TileIslandBuilder(object):
         self._team_stats_by_player: typing.List[TeamStats] = []
         self._team_stats_by_team_id: typing.List[TeamStats] = []
         # Cache previous turn values for reliable delta detection (tile.delta may be stale/reset)
-        self._prev_turn_army: MapMatrixInterface[int] = MapMatrix(self.map, 0)
-        self._prev_turn_player: MapMatrixInterface[int] = MapMatrix(self.map, -2)
+        self._prev_turn_army: np.ndarray = np.zeros(len(self.map.tiles_by_index), dtype=np.int64)
+        self._prev_turn_player: np.ndarray = np.full(len(self.map.tiles_by_index), -2, dtype=np.int64)
+        self._prev_turn_obstacle: np.ndarray = np.zeros(len(self.map.tiles_by_index), dtype=np.bool_)
+        self._prev_turn_pathable_tiles: typing.Set[Tile] = set()
+        """The army / _player / isObstacle of every tile (indexed by tile_index) and the pathable_tiles as of the last build or update, which update_tile_islands diffs against to find the tiles it needs to look at."""
+        self._last_update_tile_indexes: typing.Set[int] = set()
+        """The candidate and rebuilt tiles of the last update. The next update re-checks these even if they did not change again, in case the islands around them were left not matching them."""
+        self._needs_full_candidate_scan: bool = True
+        """After a full (re)build, the next update checks every tile against its island. After that, only tiles that changed (or were touched by the last update) can stop matching their island."""
+        self._island_sort_keys: typing.Dict[int, int] = {}
+        """The sort key (tiles_by_army[0].tile_index) of every registered island, by unique_id. The island collections are kept in this order, so updates insert and remove islands by bisecting instead of re-sorting everything."""
+        self._needs_full_solo_violation_scan: bool = True
+        """After a full (re)build, the next update checks every island for force_territory_borders violations. After that, only islands touching changed tiles can newly violate it."""
+        self._island_generation_by_team_id: typing.List[int] = [0 for _ in range(max(self.teams) + 2)]
+        """Bumped whenever an island is registered to or removed from a team. Island tile sets (and tile_count_all_adjacent_friendly) only change by going through one of those."""
+        self._large_island_distance_inputs_by_team_id: typing.List[typing.Tuple | None] = [None for _ in range(max(self.teams) + 2)]
+        """Everything the last _build_large_island_distances_for_team for each team was computed from, so updates that only moved army around can skip the distance map rebuild."""
+        self._compact_islands: CompactTileIslands | None = None
+        """The get_compact_islands snapshot of the current islands, dropped whenever the islands are rebuilt or updated."""
         self.reset_for_rebuild()
         " -------------------------- ANYTHING YOU ADD TO THIS SECTION NEEDS TO BE COVERED IN reset_for_rebuild ---------------"
 
@@ -264,14 +299,67 @@ class TileIslandBuilder(object):
         self.log_debug: bool = DebugHelper.IS_DEBUG_OR_UNIT_TEST_MODE
         self.use_debug_asserts: bool = True
 
-    def _sort_island_collections(self):
-        self.all_tile_islands.sort()
-        for islands in self.tile_islands_by_player:
-            islands.sort(key=lambda i: i.tiles_by_army[0].tile_index)
-        for islands in self.tile_islands_by_team_id:
-            islands.sort(key=lambda i: i.tiles_by_army[0].tile_index)
-        for island in self.all_tile_islands:
+        self.last_update_candidate_tile_count: int = 0
+        """How many tiles the last update_tile_islands ran the per tile update logic for."""
+        self.last_update_impacted_tile_count: int = 0
+        """How many tiles the last update_tile_islands tore down and rebuilt islands for."""
+        self.last_update_resorted_island_count: int = 0
+        """How many islands the last update_tile_islands moved in the sorted island collections or re-sorted the border_islands of."""
+        self.large_island_distance_build_count: int = 0
+        """How many times _build_large_island_distances_for_team actually rebuilt a distance map, rather than skipping it as unchanged."""
+
+    def get_last_update_counters(self) -> typing.Dict[str, int]:
+        """The last_update_* counts, for perf event counters."""
+        return {
+            'candidateTiles': self.last_update_candidate_tile_count,
+            'impactedTiles': self.last_update_impacted_tile_count,
+            'resortedIslands': self.last_update_resorted_island_count,
+            'largeIslandDistanceBuilds': self.large_island_distance_build_count,
+        }
+
+    def _sort_island_collections(self, changedBorderIslands: typing.Set[TileIsland] | None = None, refreshedIslands: typing.Iterable[TileIsland] | None = None):
+        """
+        Sorts the island collections and border_islands lists by their tiles_by_army[0].tile_index.
+        If changedBorderIslands (the islands whose border_islands were appended to since the last sort) is provided, the island
+        collections are assumed to already be in _island_sort_keys order (islands registered / removed since then were bisected
+        in and out), so only the refreshedIslands (whose tiles_by_army were re-sorted in place) whose sort key changed get moved.
+        Their neighbors and the changedBorderIslands get their border_islands re-sorted; every other border list is still in sorted order.
+        """
+        if changedBorderIslands is None:
+            self.all_tile_islands.sort()
+            for islands in self.tile_islands_by_player:
+                islands.sort(key=lambda i: i.tiles_by_army[0].tile_index)
+            for islands in self.tile_islands_by_team_id:
+                islands.sort(key=lambda i: i.tiles_by_army[0].tile_index)
+            sortKeys = {island.unique_id: island.tiles_by_army[0].tile_index for island in self.all_tile_islands}
+            for island in self.all_tile_islands:
+                island.border_islands.sort()
+            self._island_sort_keys = sortKeys
+            return
+
+        sortKeys = self._island_sort_keys
+        toSort = set(changedBorderIslands)
+        movedCount = 0
+        for island in refreshedIslands or ():
+            priorKey = sortKeys.get(island.unique_id, None)
+            if priorKey is None or priorKey == island.tiles_by_army[0].tile_index:
+                continue
+            teamIslands = self.tile_islands_by_team_id[island.team]
+            playerIslandLists = [self.tile_islands_by_player[teammate] for teammate in self._team_stats_by_team_id[island.team].teamPlayers]
+            self.all_tile_islands.discard_sorted(island, sortKeys)
+            _remove_sorted_island(teamIslands, island, sortKeys)
+            for playerIslands in playerIslandLists:
+                _remove_sorted_island(playerIslands, island, sortKeys)
+            sortKeys[island.unique_id] = island.tiles_by_army[0].tile_index
+            self.all_tile_islands.insert_sorted(island, sortKeys)
+            _insert_sorted_island(teamIslands, island, sortKeys)
+            for playerIslands in playerIslandLists:
+                _insert_sorted_island(playerIslands, island, sortKeys)
+            toSort.update(island.border_islands)
+            movedCount += 1
+        for island in toSort:
             island.border_islands.sort()
+        self.last_update_resorted_island_count = movedCount + len(toSort)
 
     def reset_for_rebuild(self):
         self.tile_island_lookup = MapMatrix(self.map, None)
@@ -285,8 +373,26 @@ class TileIslandBuilder(object):
         self._team_stats_by_player = []
         self._team_stats_by_team_id = []
         self.borders_by_island = {}
-        self._prev_turn_army = MapMatrix(self.map, 0)
-        self._prev_turn_player = MapMatrix(self.map, -2)
+        self._prev_turn_army = np.zeros(len(self.map.tiles_by_index), dtype=np.int64)
+        self._prev_turn_player = np.full(len(self.map.tiles_by_index), -2, dtype=np.int64)
+        self._prev_turn_obstacle = np.zeros(len(self.map.tiles_by_index), dtype=np.bool_)
+        self._prev_turn_pathable_tiles = set()
+        self._last_update_tile_indexes = set()
+        self._needs_full_candidate_scan = True
+        self._island_sort_keys = {}
+        self._needs_full_solo_violation_scan = True
+        self._island_generation_by_team_id = [0 for _ in range(max(self.teams) + 2)]
+        self._large_island_distance_inputs_by_team_id = [None for _ in range(max(self.teams) + 2)]
+        self._compact_islands = None
+
+    def get_compact_islands(self) -> CompactTileIslands:
+        """
+        A CompactTileIslands snapshot of the current islands, built on first use and shared until the next
+        recalculate_tile_islands / update_tile_islands. Read only, clone it before modifying it.
+        """
+        if self._compact_islands is None:
+            self._compact_islands = CompactTileIslands.from_builder(self)
+        return self._compact_islands
 
     def recalculate_tile_islands(self, enemyGeneralExpectedLocation: Tile | None, mode: IslandBuildMode = IslandBuildMode.GroupByArmy):
         start = time.perf_counter()
@@ -383,15 +489,14 @@ class TileIslandBuilder(object):
             self.debug_verify_all_islands(context='recalculate_tile_islands', mode=mode)
 
         # Initialize cache so first update_tile_islands has valid prev values
-        for tile in self.map.tiles_by_index:
-            self._prev_turn_army.raw[tile.tile_index] = tile.army
-            self._prev_turn_player.raw[tile.tile_index] = tile.player
+        self._snapshot_tile_state()
 
         complete = time.perf_counter() - start
         logbook.info(f'islands all built in {complete:.5f}s')
 
     def update_tile_islands(self, enemyGeneralExpectedLocation: Tile | None, mode: IslandBuildMode = IslandBuildMode.GroupByArmy):
         start = time.perf_counter()
+        self._compact_islands = None
         shouldLogDebugUpdate = DebugHelper.IS_DEBUG_OR_UNIT_TEST_MODE
         if shouldLogDebugUpdate:
             logbook.info(f'update_tile_islands starting (turn={self.map.turn})')
@@ -410,18 +515,21 @@ class TileIslandBuilder(object):
         # Tiles whose army delta is fully handled by an intra/inter-island army move update
         # (no teardown required — just sum_army already patched in-place).
         armyMoveHandledTiles: typing.Set[Tile] = set()
-        # Islands whose army changed but whose shape is unchanged (updated in-place).
-        # They need a border refresh but no teardown.
-        armyOnlyRefreshIslands: typing.Set[TileIsland] = set()
 
-        for tile in self.map.tiles_by_index:
-            # Use cached values for reliable delta detection (tile.delta may be stale/reset)
-            previousPlayer = self._prev_turn_player.raw[tile.tile_index]
-            previousArmy = self._prev_turn_army.raw[tile.tile_index]
+        # Use cached values for reliable delta detection (tile.delta may be stale/reset)
+        prevTurnArmy = self._prev_turn_army
+        prevTurnPlayer = self._prev_turn_player
+        candidateTiles = self._get_update_candidate_tiles()
+        self._last_update_tile_indexes = {tile.tile_index for tile in candidateTiles}
+        self.last_update_candidate_tile_count = len(candidateTiles)
+        self.last_update_impacted_tile_count = 0
+        self.last_update_resorted_island_count = 0
+        refreshedIslands: typing.Set[TileIsland] = set()
+        for tile in candidateTiles:
+            previousPlayer = int(prevTurnPlayer[tile.tile_index])
+            previousArmy = int(prevTurnArmy[tile.tile_index])
             ownerChanged = previousPlayer != tile.player
             armyChanged = previousArmy != tile.army
-            self._prev_turn_player.raw[tile.tile_index] = tile.player
-            self._prev_turn_army.raw[tile.tile_index] = tile.army
             if not ownerChanged and not armyChanged:
                 # Fast path: nothing changed per our cached values
                 existingIsland = self.tile_island_lookup.raw[tile.tile_index]
@@ -470,6 +578,7 @@ class TileIslandBuilder(object):
                                     armyMoveHandledTiles.add(pairedTile)
                                     oldArmy = existingIsland.sum_army
                                     existingIsland.refresh_cached_tile_metadata()
+                                    refreshedIslands.add(existingIsland)
                                     if shouldLogDebugUpdate and oldArmy != existingIsland.sum_army:
                                         logbook.info(f'INTRA sum_army update tile={tile} paired={pairedTile} island={existingIsland} old={oldArmy} new={existingIsland.sum_army} tiles={[(str(t), t.army) for t in existingIsland.tile_set]}')
                                     existingIsland.sum_army_all_adjacent_friendly = max(existingIsland.sum_army_all_adjacent_friendly, existingIsland.sum_army)
@@ -490,6 +599,8 @@ class TileIslandBuilder(object):
                                     oldPairedArmy = pairedIsland.sum_army
                                     existingIsland.refresh_cached_tile_metadata()
                                     pairedIsland.refresh_cached_tile_metadata()
+                                    refreshedIslands.add(existingIsland)
+                                    refreshedIslands.add(pairedIsland)
                                     if shouldLogDebugUpdate:
                                         logbook.info(f'INTER sum_army update tile={tile} paired={pairedTile} existIsland={existingIsland} old={oldExistArmy} new={existingIsland.sum_army} | pairedIsland={pairedIsland} old={oldPairedArmy} new={pairedIsland.sum_army}')
                                     existingIsland.sum_army_all_adjacent_friendly = max(existingIsland.sum_army_all_adjacent_friendly, existingIsland.sum_army)
@@ -565,6 +676,7 @@ class TileIslandBuilder(object):
                         # Shape is unchanged — patch army stats in-place and record for border refresh.
                         oldArmy = existingIsland.sum_army
                         existingIsland.refresh_cached_tile_metadata()
+                        refreshedIslands.add(existingIsland)
                         if shouldLogDebugUpdate:
                             logbook.info(f'INPLACE sum_army update tile={tile} island={existingIsland} old={oldArmy} new={existingIsland.sum_army}')
                         existingIsland.sum_army_all_adjacent_friendly = existingIsland.sum_army
@@ -575,7 +687,6 @@ class TileIslandBuilder(object):
                             fullIsland.sum_army_all_adjacent_friendly = newFullArmy
                             for child in (fullIsland.child_islands or []):
                                 child.sum_army_all_adjacent_friendly = newFullArmy
-                        armyOnlyRefreshIslands.add(existingIsland)
             else:
                 # Tile had no island (was outside reachable_tiles at recalculate time, e.g. undiscovered
                 # pocket tile). It still needs to be rebuilt — track it separately so it is included in
@@ -592,7 +703,11 @@ class TileIslandBuilder(object):
                 )
             )
 
-        forceBorderSoloViolations = self._collect_force_border_solo_violating_leaf_islands()
+        if self._needs_full_solo_violation_scan:
+            forceBorderSoloViolations = self._collect_force_border_solo_violating_leaf_islands()
+            self._needs_full_solo_violation_scan = False
+        else:
+            forceBorderSoloViolations = self._collect_force_border_solo_violating_leaf_islands(candidateTiles)
         if forceBorderSoloViolations:
             impactedLeafIslands.update(forceBorderSoloViolations)
             for island in forceBorderSoloViolations:
@@ -618,6 +733,7 @@ class TileIslandBuilder(object):
                     affectedTeams.add(self.teams[tile.player])
 
         if len(changedTiles) == 0 and len(impactedLeafIslands) == 0 and len(noIslandChangedTiles) == 0:
+            self._sort_island_collections(set(), refreshedIslands)
             if self.use_debug_asserts:
                 self.debug_verify_all_islands(context='update_tile_islands:no_changes', mode=mode)
             return
@@ -663,8 +779,11 @@ class TileIslandBuilder(object):
         for island in impactedLeafIslands:
             impactedTiles.update(island.tile_set)
         impactedTiles.update(noIslandChangedTiles)
+        self._last_update_tile_indexes.update(tile.tile_index for tile in impactedTiles)
+        self.last_update_impacted_tile_count = len(impactedTiles)
 
         if len(impactedTiles) == 0:
+            self._sort_island_collections(set(), refreshedIslands)
             if self.use_debug_asserts:
                 dbgStart = time.perf_counter()
                 self.debug_verify_all_islands(context='update_tile_islands:no_impacted_tiles', mode=mode)
@@ -758,6 +877,9 @@ class TileIslandBuilder(object):
                 if not adj.isObstacle:
                     refreshTiles.add(adj)
         for tile in changedTiles:
+            if tile not in impactedTiles:
+                # army-only change patched in place; the island shapes around it did not change, so neither did any borders.
+                continue
             refreshTiles.add(tile)
             for adj in tile.movable:
                 if not adj.isObstacle:
@@ -779,9 +901,6 @@ class TileIslandBuilder(object):
             island = self.tile_island_lookup.raw[tile.tile_index]
             if island is not None and island not in impactedLeafIslands and island.child_islands is None:
                 refreshIslands.add(island)
-        # Islands that were updated in-place (army-only, no shape change) also need border refresh
-        # in case any of their neighbours were rebuilt this turn.
-        refreshIslands.update(isl for isl in armyOnlyRefreshIslands if isl not in impactedLeafIslands and isl.child_islands is None)
 
         for island in refreshIslands:
             self.borders_by_island.pop(island.unique_id, None)
@@ -796,6 +915,7 @@ class TileIslandBuilder(object):
         # its own _build_island_borders before we added the back-ref).
         # Guard: only add the back-ref when real tile-pair adjacency is confirmed, to avoid
         # propagating phantom refs caused by stale tile_island_lookup entries.
+        changedBorderIslands: typing.Set[TileIsland] = set(refreshIslands)
         for island in refreshIslands:
             for neighbor in island.border_islands:
                 confirmed = any(
@@ -809,12 +929,13 @@ class TileIslandBuilder(object):
                 )
                 if confirmed:
                     neighbor.border_islands.add(island)
+                    changedBorderIslands.add(neighbor)
 
-        self._sort_island_collections()
+        self._sort_island_collections(changedBorderIslands, refreshedIslands)
 
         for team in affectedTeams:
             if team >= 0:
-                self._build_large_island_distances_for_team(team)
+                self._build_large_island_distances_for_team(team, skipIfInputsUnchanged=True)
 
         if shouldLogDebugUpdate:
             nullIslandNonObstTiles = [
@@ -851,10 +972,63 @@ class TileIslandBuilder(object):
             dbgEnd2 = time.perf_counter()
             logbook.info(f'update_tile_islands debug_verify_all_islands: {dbgEnd2 - dbgStart:.4f}s')
 
-        # Update cached values for next turn's delta detection
-        for tile in self.map.tiles_by_index:
-            self._prev_turn_army.raw[tile.tile_index] = tile.army
-            self._prev_turn_player.raw[tile.tile_index] = tile.player
+    def _snapshot_tile_state(self) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Records every tiles army / _player / isObstacle (and the pathable_tiles) as the values the next update diffs against.
+        Returns the previous snapshot's army, player and obstacle arrays.
+        """
+        tilesByIndex = self.map.tiles_by_index
+        prior = (self._prev_turn_army, self._prev_turn_player, self._prev_turn_obstacle)
+        # army and friends are plain slots read through attrgetter, so gathering them never runs per tile python code.
+        self._prev_turn_army = np.fromiter(map(_get_tile_army, tilesByIndex), dtype=np.int64, count=len(tilesByIndex))
+        self._prev_turn_player = np.fromiter(map(_get_tile_player, tilesByIndex), dtype=np.int64, count=len(tilesByIndex))
+        self._prev_turn_obstacle = np.fromiter(map(_get_tile_is_obstacle, tilesByIndex), dtype=np.bool_, count=len(tilesByIndex))
+        self._prev_turn_pathable_tiles = set(self.map.pathable_tiles)
+        return prior
+
+    def _get_update_candidate_tiles(self) -> typing.List[Tile]:
+        """
+        The tiles (in tile_index order) that update_tile_islands has to look at: those whose army or owner differs from the
+        previous update's cached values, plus unchanged tiles whose island no longer fits them (now an obstacle, a team mismatch,
+        or a pathable tile with no island). Every other tile is skipped without entering the per tile update logic.
+
+        Tile army / owner writes are not journaled anywhere (fog predictions and tests assign them directly), so this diffs a
+        snapshot of every tile against the last one. That gather and compare is vectorized; only the tiles that differ (plus the
+        pathable_tiles changes and the tiles the last update touched) get the island checks in python.
+        Also records the new snapshot, so call it exactly once per update.
+        """
+        pathableTiles = self.map.pathable_tiles
+        pathableChanged = pathableTiles.symmetric_difference(self._prev_turn_pathable_tiles)
+        prevTurnArmy, prevTurnPlayer, prevTurnObstacle = self._snapshot_tile_state()
+        teams = self.teams
+        tilesByIndex = self.map.tiles_by_index
+        lookup = self.tile_island_lookup.raw
+
+        if self._needs_full_candidate_scan:
+            self._needs_full_candidate_scan = False
+            checkIndexes = range(len(tilesByIndex))
+        else:
+            changed = (self._prev_turn_army != prevTurnArmy) | (self._prev_turn_player != prevTurnPlayer) | (self._prev_turn_obstacle != prevTurnObstacle)
+            indexSet = set(np.flatnonzero(changed).tolist())
+            indexSet.update(tile.tile_index for tile in pathableChanged)
+            indexSet.update(self._last_update_tile_indexes)
+            checkIndexes = sorted(indexSet)
+
+        candidates = []
+        for tileIndex in checkIndexes:
+            tile = tilesByIndex[tileIndex]
+            island = lookup[tileIndex]
+            previousPlayer = int(prevTurnPlayer[tileIndex])
+            if (
+                tile.army != int(prevTurnArmy[tileIndex])
+                or tile._player != previousPlayer
+                or (
+                    (not tile.isObstacle and tile in pathableTiles) if island is None
+                    else (tile.isObstacle or (island.team if island.full_island is None else island.full_island.team) != teams[previousPlayer])
+                )
+            ):
+                candidates.append(tile)
+        return candidates
 
     def _get_leaf_islands_for_island(self, island: TileIsland) -> typing.List[TileIsland]:
         # Just return the single island that changed - the island splitting/merging
@@ -862,11 +1036,26 @@ class TileIslandBuilder(object):
         # just aggregate containers and don't affect actual island topology.
         return [island]
 
-    def _collect_force_border_solo_violating_leaf_islands(self) -> typing.Set[TileIsland]:
+    def _collect_force_border_solo_violating_leaf_islands(self, nearTiles: typing.Iterable[Tile] | None = None) -> typing.Set[TileIsland]:
+        """
+        Multi tile leaf islands containing a tile that must_tile_be_solo. If nearTiles is provided, only the islands of those
+        tiles and their movable neighbors are checked (must_tile_be_solo only depends on the tile's own army and its neighbors).
+        """
         violatingIslands: typing.Set[TileIsland] = set()
         if not self.force_territory_borders_to_single_tile_islands:
             return violatingIslands
-        for island in self.all_tile_islands:
+        islands = self.all_tile_islands
+        if nearTiles is not None:
+            islands = set()
+            for tile in nearTiles:
+                island = self.tile_island_lookup.raw[tile.tile_index]
+                if island is not None:
+                    islands.add(island)
+                for adj in tile.movable:
+                    island = self.tile_island_lookup.raw[adj.tile_index]
+                    if island is not None:
+                        islands.add(island)
+        for island in islands:
             if island.child_islands is not None or island.tile_count <= 1:
                 continue
             for tile in island.tile_set:
@@ -1257,18 +1446,29 @@ class TileIslandBuilder(object):
         logbook.info(f'debug_verify_all_islands ({context}) passed with no problems found.')
 
     def _remove_leaf_island(self, island: TileIsland):
-        self.all_tile_islands.discard(island)
+        sortKeys = self._island_sort_keys
+        if island.unique_id in sortKeys:
+            self.all_tile_islands.discard_sorted(island, sortKeys)
+            _remove_sorted_island(self.tile_islands_by_team_id[island.team], island, sortKeys)
+            stats = self._team_stats_by_team_id[island.team]
+            for teammate in stats.teamPlayers:
+                _remove_sorted_island(self.tile_islands_by_player[teammate], island, sortKeys)
+            del sortKeys[island.unique_id]
+            self._island_generation_by_team_id[island.team] += 1
+        elif island in self.all_tile_islands:
+            self.all_tile_islands.discard(island)
 
-        teamIslands = self.tile_islands_by_team_id[island.team]
+            teamIslands = self.tile_islands_by_team_id[island.team]
 
-        if island in teamIslands:
-            teamIslands.remove(island)
+            if island in teamIslands:
+                teamIslands.remove(island)
 
-        stats = self._team_stats_by_team_id[island.team]
-        for teammate in stats.teamPlayers:
-            playerIslands = self.tile_islands_by_player[teammate]
-            if island in playerIslands:
-                playerIslands.remove(island)
+            stats = self._team_stats_by_team_id[island.team]
+            for teammate in stats.teamPlayers:
+                playerIslands = self.tile_islands_by_player[teammate]
+                if island in playerIslands:
+                    playerIslands.remove(island)
+            self._island_generation_by_team_id[island.team] += 1
 
         self.tile_islands_by_unique_id.pop(island.unique_id, None)
         island.border_islands.clear()
@@ -1295,11 +1495,14 @@ class TileIslandBuilder(object):
     def _register_leaf_island(self, island: TileIsland):
         if island.name is None or island.name == '':
             raise AssertionError(f'leaf_island {island.unique_id} has no name')
-        self.all_tile_islands.add(island)
-        self.tile_islands_by_team_id[island.team].append(island)
+        sortKeys = self._island_sort_keys
+        sortKeys[island.unique_id] = island.tiles_by_army[0].tile_index
+        self.all_tile_islands.insert_sorted(island, sortKeys)
+        _insert_sorted_island(self.tile_islands_by_team_id[island.team], island, sortKeys)
         stats = self._team_stats_by_team_id[island.team]
         for teammate in stats.teamPlayers:
-            self.tile_islands_by_player[teammate].append(island)
+            _insert_sorted_island(self.tile_islands_by_player[teammate], island, sortKeys)
+        self._island_generation_by_team_id[island.team] += 1
         self.tile_islands_by_unique_id[island.unique_id] = island
         for tile in island.tile_set:
             self.tile_island_lookup.raw[tile.tile_index] = island
@@ -1807,15 +2010,30 @@ class TileIslandBuilder(object):
         else:
             return [island]
 
-    def _build_large_island_distances_for_team(self, team: int):
+    def _build_large_island_distances_for_team(self, team: int, skipIfInputsUnchanged: bool = False):
+        """
+        @param team:
+        @param skipIfInputsUnchanged: if True, does nothing when no island was registered to or removed from the team and the player tile counts are the same as the last time this team was built.
+            Island tile sets never change without going through one of those, so the existing distance map is still exact in that case.
+        """
         targetTeam = self.map.team_ids_by_player_index[team]
 
+        islandsByTeam = self.tile_islands_by_team_id[team]
+
+        inputs = (
+            self.map.players[self.map.player_index].tileCount,
+            tuple((pIndx, len(self.map.players[pIndx].tiles) > 0, self.map.players[pIndx].tileCount) for pIndx in self.map.get_team_stats_by_team_id(team).livingPlayers if pIndx >= 0),
+            self._island_generation_by_team_id[team],
+        )
+        if skipIfInputsUnchanged and inputs == self._large_island_distance_inputs_by_team_id[team]:
+            return
+        self._large_island_distance_inputs_by_team_id[team] = inputs
+        self.large_island_distance_build_count += 1
+
         tileMinimum = min(12, max(1, self.map.players[self.map.player_index].tileCount // 3))
 
         largeIslands = []
 
-        islandsByTeam = self.tile_islands_by_team_id[team]
-
         if len(islandsByTeam) == 0:
             logbook.info(f'NO TILE ISLANDS FOR LARGE ISLANDS (targetTeam {targetTeam})')
             self.large_tile_island_distances_by_team_id[team] = None
@@ -2044,9 +2262,7 @@ class TileIslandBuilder(object):
             island.sum_army_all_adjacent_friendly = island.full_island.sum_army
 
         # Initialize cache so first update_tile_islands has valid prev values
-        for tile in self.map.tiles_by_index:
-            self._prev_turn_army.raw[tile.tile_index] = tile.army
-            self._prev_turn_player.raw[tile.tile_index] = tile.player
+        self._snapshot_tile_state()
 
         # if self.use_debug_asserts:
         #     self.debug_verify_all_islands(context='rebuild_islands_from_ids')
@@ -2148,6 +2364,24 @@ class NamedSet(object):
         self.set: typing.Set[Tile] = tileSet
 
 
+def _insert_sorted_island(islands: typing.List[TileIsland], island: TileIsland, sortKeys: typing.Dict[int, int]):
+    bisect.insort(islands, island, key=lambda i: sortKeys[i.unique_id])
+
+
+def _remove_sorted_island(islands: typing.List[TileIsland], island: TileIsland, sortKeys: typing.Dict[int, int]):
+    """Sort keys are the islands first tiles_by_army tile, so no two leaf islands share one and bisecting lands exactly on the island."""
+    idx = bisect.bisect_left(islands, sortKeys[island.unique_id], key=lambda i: sortKeys[i.unique_id])
+    if idx < len(islands) and islands[idx] is island:
+        del islands[idx]
+    elif island in islands:
+        islands.remove(island)
+
+
+_get_tile_army = operator.attrgetter('army')
+_get_tile_player = operator.attrgetter('_player')
+_get_tile_is_obstacle = operator.attrgetter('isObstacle')
+
+
 def _tile_sort_key(tile: Tile) -> typing.Tuple[int, int]:
     return tile.x, tile.y
 
@@ -1,4 +1,5 @@
 from .TileIslandBuilder import TileIslandBuilder, TileIsland
+from .CompactTileIslands import CompactTileIslands, CompactTileIsland
 from .MapSpanningUtils import TileGraph, TileNode  # , get_map_as_graph_from_tiles, get_map_as_graph
 from .FastDisjointSet import FastDisjointSet
 # from .KruskalsSpanningGather import gath_set_quick
@@ -65,7 +65,7 @@ class ArmyAnalyzer:
     TimeSpentInInit: float = 0.0
     NumAnalysisBuilt: int = 0
 
-    def __init__(self, map: MapBase, armyA: Tile | Army, armyB: Tile | Army, bypassRetraverseThreshold: int = -1, bypassRetraverseThresholdPathTiles: typing.Iterable[Tile] | None = None, maxDist: int = 100):
+    def __init__(self, map: MapBase, armyA: Tile | Army, armyB: Tile | Army, bypassRetraverseThreshold: int = -1, bypassRetraverseThresholdPathTiles: typing.Iterable[Tile] | None = None, maxDist: int = 100, deferScan: bool = False):
         """
 
         @param map:
@@ -73,6 +73,7 @@ class ArmyAnalyzer:
         @param armyB:
         @param bypassRetraverseThreshold: if set to a positive integer, will bypass including tiles where army at tile B would retraverse this many of its own friendly tiles with no adjacent A team tiles.
         @param bypassRetraverseThresholdPathTiles: if included, these tiles will be excluded from the retraverse limitation
+        @param deferScan: if True, only the distance maps are built, and the caller must run scan or scan_in_slices before using the analysis.
         """
         startTime = time.perf_counter()
         self.map: MapBase = map
@@ -133,7 +134,8 @@ class ArmyAnalyzer:
 
         ArmyAnalyzer.TimeSpentInInit += time.perf_counter() - startTime
 
-        self.scan(maxDist)
+        if not deferScan:
+            self.scan(maxDist)
 
         ArmyAnalyzer.NumAnalysisBuilt += 1
 
@@ -171,11 +173,32 @@ class ArmyAnalyzer:
         self.build_intercept_chokes()
         ArmyAnalyzer.TimeSpentBuildingInterceptChokes += time.perf_counter() - start
 
+    def scan_in_slices(self, maxDist: int = 100, tilesPerSlice: int = 250) -> typing.Generator[None, None, None]:
+        """
+        The same scan, as a generator that yields after every tilesPerSlice pathway seed tiles and before the intercept chokes, so idle
+        time work can stop between slices. The map must not change until the generator is exhausted.
+        """
+        yield from self._build_chokes_and_pathways_in_slices(maxDist, tilesPerSlice)
+        yield
+        self.build_intercept_chokes()
+
     # This is heavily optimized at this point.
     def build_chokes_and_pathways(self, maxDist: int = 100):
+        for _ in self._build_chokes_and_pathways_in_slices(maxDist, tilesPerSlice=0):
+            pass
+
+    def _build_chokes_and_pathways_in_slices(self, maxDist: int, tilesPerSlice: int) -> typing.Generator[None, None, None]:
+        """Yields after every tilesPerSlice seed tiles, never if tilesPerSlice is 0."""
         maxDistOffset = self.bMap.raw[self.tileA.tile_index] + maxDist
         chokeCounterMap = {}
+        sliceTilesLeft = tilesPerSlice
         for tile in itertools.chain.from_iterable([self.map.pathable_tiles, [self.tileA]]):
+            if tilesPerSlice:
+                sliceTilesLeft -= 1
+                if sliceTilesLeft == 0:
+                    sliceTilesLeft = tilesPerSlice
+                    yield
+
             # build the pathway
             if self.pathWayLookupMatrix.raw[tile.tile_index]:
                 continue
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 import random
 
 import logbook
@@ -10,19 +11,25 @@ import nashpy
 import numpy
 
 import DebugHelper
+import MctsRootParallel
 import SearchUtils
 from ArmyAnalyzer import ArmyAnalyzer
 from ArmyTracker import Army
 from BoardAnalyzer import BoardAnalyzer
 from Interfaces import MapMatrixInterface
 from Models import Move, MoveBase
-from Engine.ArmyEngineModels import ArmySimState, ArmySimResult, SimTile, ArmySimEvaluationParams
+from Engine.ArmyEngineModels import ArmySimState, ArmySimResult, SimTile, ArmySimEvaluationParams, ArmySimUndoLog, ArmySimZobristKeys
 from MctsLudii import MctsDUCT, Game, Context, MctsEngineSummary
 from Path import Path
 from PerformanceTelemetry import PerformanceTelemetry
 from base.client.map import MapBase, Tile
 from MapMatrix import MapMatrix
 
+
+class _BruteForceTimeout(Exception):
+    pass
+
+
 class ArmyEngine(object):
     def __init__(
             self,
@@ -142,10 +149,51 @@ class ArmyEngine(object):
         self.to_turn: int = 0
         """The turn to simulate up to."""
 
+        self.brute_force_pruning: bool = True
+        """
+        If True, brute force scans alpha-beta prune the serialized max-min (friendly picks the move with the best worst case
+        enemy response) that get_comparison_based_expected_result_state evaluates below the root. Gives the same result as the
+        full payoff matrices; the root payoffs are always fully evaluated for the nash solvers.
+        """
+
+        self.brute_force_iterative_deepening: bool = False
+        """
+        If True, brute force scans search 1, 2, ... up to turns deep, trying the previous depths best moves first at each
+        position, and return the deepest search that completed within time_limit instead of cutting the end turn mid search.
+        """
+
+        self.brute_force_depth_reached: int = 0
+        """How many turns deep the last brute force scan fully searched."""
+
+        self.brute_force_timed_out: bool = False
+        """Whether the last iterative deepening brute force scan stopped deepening because it ran out of time_limit (rather than reaching the requested depth)."""
+
+        self._brute_force_best_moves: typing.Dict[int, typing.Tuple[MoveBase | None, MoveBase | None]] | None = None
+        """Zobrist hash -> the best (friendly, enemy) moves found there by the previous iterative deepening depth."""
+
+        self._brute_force_zobrist_keys: ArmySimZobristKeys | None = None
+
         if DebugHelper.IS_DEBUGGING:
             self.iteration_limit = 150
             self.time_limit = 10000000000.0
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the move filters are lambdas, which cant be pickled (for MctsRootParallel workers); they are rebuilt from the force_ matrices.
+        state['_friendly_move_filter'] = None
+        state['_enemy_move_filter'] = None
+        return state
+
+    def _build_move_filters(self):
+        if self.force_friendly_towards is not None:
+            self._friendly_move_filter = lambda source, dest, board: self.force_friendly_towards[source] <= self.force_friendly_towards[dest]
+        if self.force_enemy_towards is not None:
+            self._enemy_move_filter = lambda source, dest, board: self.force_enemy_towards[source] <= self.force_enemy_towards[dest]
+        if self.force_friendly_towards_or_parallel_to is not None:
+            self._friendly_move_filter = lambda source, dest, board: self.force_friendly_towards_or_parallel_to[source] < self.force_friendly_towards_or_parallel_to[dest]
+        if self.force_enemy_towards_or_parallel_to is not None:
+            self._enemy_move_filter = lambda source, dest, board: self.force_enemy_towards_or_parallel_to[source] < self.force_enemy_towards_or_parallel_to[dest]
+
     def scan(
         self,
         turns: int,
@@ -168,14 +216,7 @@ class ArmyEngine(object):
         if logEvals:
             self.log_everything = True
 
-        if self.force_friendly_towards is not None:
-            self._friendly_move_filter = lambda source, dest, board: self.force_friendly_towards[source] <= self.force_friendly_towards[dest]
-        if self.force_enemy_towards is not None:
-            self._enemy_move_filter = lambda source, dest, board: self.force_enemy_towards[source] <= self.force_enemy_towards[dest]
-        if self.force_friendly_towards_or_parallel_to is not None:
-            self._friendly_move_filter = lambda source, dest, board: self.force_friendly_towards_or_parallel_to[source] < self.force_friendly_towards_or_parallel_to[dest]
-        if self.force_enemy_towards_or_parallel_to is not None:
-            self._enemy_move_filter = lambda source, dest, board: self.force_enemy_towards_or_parallel_to[source] < self.force_enemy_towards_or_parallel_to[dest]
+        self._build_move_filters()
 
         baseBoardState = self.get_base_board_state()
 
@@ -188,7 +229,7 @@ class ArmyEngine(object):
             result = self.execute_scan_brute_force(baseBoardState, turns, noThrow=noThrow)
 
             duration = time.perf_counter() - start
-            logbook.info(f'brute force army scrim depth {turns} complete in {duration:.3f} after iter {self.iterations} (nash {self.time_in_nash:.3f} - {self.nash_eq_iterations} eq itr, {self.time_in_nash_eq:.3f} in eq)')
+            logbook.info(f'brute force army scrim depth {self.brute_force_depth_reached}/{turns} complete in {duration:.3f} after iter {self.iterations} (nash {self.time_in_nash:.3f} - {self.nash_eq_iterations} eq itr, {self.time_in_nash_eq:.3f} in eq)')
         else:
             if self.mcts_runner is None:
                 self.mcts_runner = MctsDUCT()
@@ -202,12 +243,16 @@ class ArmyEngine(object):
     def simulate_recursive_brute_force(
             self,
             boardState: ArmySimState,
-            currentTurn: int
+            currentTurn: int,
+            alpha: float = -math.inf,
+            beta: float = math.inf,
     ) -> ArmySimState:
         """
 
         @param currentTurn: the current turn (in the sim, or starting turn that the current map is at)
         @param boardState: the state of the board at this position
+        @param alpha: (pruning only) values at or below this are not needed exactly, the caller already has a move at least this good.
+        @param beta: (pruning only) values at or above this are not needed exactly, the caller already has a response at least this good.
         @return: a tuple of (the min-maxed best sim state down the tree,
         with the list of moves (and their actual board states) up the tree,
         the depth evaluated)
@@ -219,7 +264,10 @@ class ArmyEngine(object):
         if self.iterations & 511 == 0:
             duration = time.perf_counter() - self.start_time
 
-            if duration > self.time_limit:
+            if duration > self.time_limit and self._brute_force_best_moves is not None:
+                if self.brute_force_depth_reached > 0:
+                    raise _BruteForceTimeout()
+            elif duration > self.time_limit:
                 oldTurn = self.to_turn
                 self.to_turn -= 1
                 if boardState.depth > 7:
@@ -248,6 +296,9 @@ class ArmyEngine(object):
 
         enMoves: typing.List[MoveBase | None] = boardState.generate_enemy_moves()
 
+        if self.brute_force_pruning and boardState.depth >= 1:
+            return self._get_pruned_max_min_result_state(boardState, nextTurn, frMoves, enMoves, alpha, beta)
+
         # payoffs: typing.List[typing.List[None | ArmySimState]] = [[None for e in enMoves] for f in frMoves]
 
         # nashPayoffs: typing.List[typing.List[int]] = [[0 for e in enMoves] for f in frMoves]
@@ -312,6 +363,86 @@ class ArmyEngine(object):
 
         return self.get_comparison_based_expected_result_state(boardState.depth, frEqMoves, enEqMoves, payoffs)
 
+    def _get_pruned_max_min_result_state(
+            self,
+            boardState: ArmySimState,
+            nextTurn: int,
+            frMoves: typing.List[MoveBase | None],
+            enMoves: typing.List[MoveBase | None],
+            alpha: float,
+            beta: float,
+    ) -> ArmySimState:
+        """
+        The same max-min as get_comparison_based_expected_result_state (first friendly move with the strictly best worst case,
+        and the first enemy response achieving it), without evaluating payoffs that can't change it. Fail soft; the returned state
+        is only exact when its value lands strictly between alpha and beta.
+        """
+        frOrder = list(range(len(frMoves)))
+        enOrder = list(range(len(enMoves)))
+        boardHash = 0
+        if self._brute_force_best_moves is not None:
+            boardHash = boardState.get_zobrist_hash(self._brute_force_zobrist_keys)
+            prevBest = self._brute_force_best_moves.get(boardHash, None)
+            if prevBest is not None:
+                self._move_to_front(frOrder, frMoves, prevBest[0])
+                self._move_to_front(enOrder, enMoves, prevBest[1])
+
+        logPayoffs = self.log_everything or boardState.depth < self.log_payoff_depth
+        payoffs: typing.List[typing.List[None | ArmySimState]] | None = None
+        if logPayoffs:
+            payoffs = [[None] * len(enMoves) for f in frMoves]
+
+        bestState: ArmySimState | None = None
+        bestValue = -math.inf
+        bestFrIdx = 0
+        bestEnIdx = 0
+        for frIdx in frOrder:
+            frMove = frMoves[frIdx]
+            lowerBound = max(alpha, bestValue)
+            worstState: ArmySimState | None = None
+            worstValue = math.inf
+            worstEnIdx = 0
+            for enIdx in enOrder:
+                nextBoardState = self.get_next_board_state(nextTurn, boardState, frMove, enMoves[enIdx])
+                nextResult = self.simulate_recursive_brute_force(nextBoardState, nextTurn, lowerBound, min(beta, worstValue))
+                if payoffs is not None:
+                    payoffs[frIdx][enIdx] = nextResult
+
+                value = nextResult.calculate_value_int()
+                if worstState is None or value < worstValue:
+                    worstState = nextResult
+                    worstValue = value
+                    worstEnIdx = enIdx
+                    if worstValue <= lowerBound:
+                        # the enemy can hold this move to no better than one we already have.
+                        break
+
+            if bestState is None or worstValue > bestValue:
+                bestState = worstState
+                bestValue = worstValue
+                bestFrIdx = frIdx
+                bestEnIdx = worstEnIdx
+                if bestValue >= beta:
+                    # the enemy already has a response elsewhere that holds us below this.
+                    break
+
+        if self._brute_force_best_moves is not None:
+            self._brute_force_best_moves[boardHash] = (frMoves[bestFrIdx], enMoves[bestEnIdx])
+
+        if logPayoffs:
+            self.render_payoffs(boardState, frMoves, enMoves, payoffs)
+
+        return bestState
+
+    @staticmethod
+    def _move_to_front(order: typing.List[int], moves: typing.List[MoveBase | None], move: MoveBase | None):
+        for i, moveIdx in enumerate(order):
+            if moves[moveIdx] == move:
+                if i > 0:
+                    del order[i]
+                    order.insert(0, moveIdx)
+                return
+
     def get_next_board_state(
             self,
             turn: int,
@@ -331,6 +462,23 @@ class ArmyEngine(object):
         nextBoardState.friendly_move = frMove
         nextBoardState.enemy_move = enMove
 
+        zobristTileIdxs = None
+        if nextBoardState.zobrist_keys is not None:
+            if nextBoardState.turn == self.next_cycle_turn or (frMove is not None and frMove.dest.isGeneral) or (enMove is not None and enMove.dest.isGeneral):
+                # army bonus turns and general captures change arbitrary sim tiles, get_zobrist_hash rebuilds from scratch.
+                nextBoardState.zobrist_keys = None
+            else:
+                zobristTileIdxs = set()
+                if frMove is not None:
+                    zobristTileIdxs.add(frMove.source.tile_index)
+                    zobristTileIdxs.add(frMove.dest.tile_index)
+                if enMove is not None:
+                    zobristTileIdxs.add(enMove.source.tile_index)
+                    zobristTileIdxs.add(enMove.dest.tile_index)
+                if nextBoardState.turn & 1 == 0:
+                    zobristTileIdxs.update([t.tile_index for t in nextBoardState.incrementing])
+                nextBoardState.xor_zobrist_tiles(zobristTileIdxs)
+
         with perfTelemetry.monitor_telemetry('next board execution'):
             if MapBase.player_had_priority_over_other(self.friendly_player, self.enemy_player, nextBoardState.turn):
                 self.execute(nextBoardState, frMove, self.friendly_player, self.enemy_player)
@@ -361,6 +509,7 @@ class ArmyEngine(object):
         if nextBoardState.turn == self.next_cycle_turn:  # TODO this can only go 50 moves deep for now, after that we stop incrementing army bonuses.
             with perfTelemetry.monitor_telemetry('next board army bonus'):
                 nextBoardState.controlled_city_turn_differential += nextBoardState.city_differential - self.base_city_differential
+                undoLog = nextBoardState.undo_log
                 for tileIdx, simTile in nextBoardState.sim_tiles.items():
                     tile = simTile.source_tile
                     if simTile.player >= 0:
@@ -369,6 +518,8 @@ class ArmyEngine(object):
                         if tile.isCity or tile.isGeneral:
                             newSimTile.army += 1
 
+                        if undoLog is not None:
+                            undoLog.sim_tile_journal += (tileIdx, simTile)
                         nextBoardState.sim_tiles[tileIdx] = newSimTile
                         if newSimTile.player == self.friendly_player:
                             st = nextBoardState.friendly_living_armies.pop(tileIdx, None)
@@ -383,10 +534,13 @@ class ArmyEngine(object):
             with perfTelemetry.monitor_telemetry('next board city bonus'):
                 nextBoardState.controlled_city_turn_differential += nextBoardState.city_differential - self.base_city_differential
 
+                undoLog = nextBoardState.undo_log
                 for tile in nextBoardState.incrementing:
                     simTile = nextBoardState.sim_tiles[tile.tile_index]
                     newSimTile = SimTile(simTile.source_tile, simTile.army + 1, simTile.player)
 
+                    if undoLog is not None:
+                        undoLog.sim_tile_journal += (tile.tile_index, simTile)
                     nextBoardState.sim_tiles[tile.tile_index] = newSimTile
                     if newSimTile.player == self.friendly_player:
                         st = nextBoardState.friendly_living_armies.pop(tile.tile_index, None)
@@ -398,8 +552,30 @@ class ArmyEngine(object):
                             nextBoardState.enemy_living_armies[tile.tile_index] = newSimTile
         nextBoardState.friendly_living_armies_l = list(nextBoardState.friendly_living_armies.keys())
         nextBoardState.enemy_living_armies_l = list(nextBoardState.enemy_living_armies.keys())
+        if zobristTileIdxs is not None:
+            nextBoardState.xor_zobrist_tiles(zobristTileIdxs)
         return nextBoardState
 
+    def make_moves(
+            self,
+            boardState: ArmySimState,
+            frMove: MoveBase | None,
+            enMove: MoveBase | None,
+            undoLog: ArmySimUndoLog,
+            perfTelemetry: PerformanceTelemetry = PerformanceTelemetry(),
+    ):
+        """
+        Same as get_next_board_state(noClone=True), applying the moves onto boardState in place. undoLog must be the log
+        boardState.begin_undo_log() opened; the engine journals every sim tile it replaces into it so unmake_moves can put
+        boardState back exactly. Lets rollouts play on a shared board instead of cloning it.
+        """
+        undoLog.plies += 1
+        self.get_next_board_state(boardState.turn + 1, boardState, frMove, enMove, noClone=True, perfTelemetry=perfTelemetry)
+
+    def unmake_moves(self, boardState: ArmySimState, undoLog: ArmySimUndoLog):
+        """Reverts every make_moves made with undoLog, in one step."""
+        boardState.unmake_undo_log(undoLog)
+
     def execute(self, nextBoardState: ArmySimState, move: MoveBase | None, movingPlayer: int, otherPlayer: int):
         if move is None:
             return
@@ -423,7 +599,9 @@ class ArmyEngine(object):
             # TODO, do we need to clear any armies here or anything weird?
             return
 
-        dest = nextBoardState.sim_tiles.get(destTile.tile_index)
+        undoLog = nextBoardState.undo_log
+        prevDest = nextBoardState.sim_tiles.get(destTile.tile_index)
+        dest = prevDest
         if not dest:
             dest = SimTile(destTile)
             if destTile.isCity or destTile.isGeneral:
@@ -431,8 +609,12 @@ class ArmyEngine(object):
                     # dest.army += (nextBoardState.depth + ((nextBoardState.turn - 1) & 1)) // 2
                     dest.army += (nextBoardState.depth - ((nextBoardState.turn - 1) & 1)) // 2
                     nextBoardState.incrementing.add(destTile)
+                    if undoLog is not None:
+                        undoLog.incrementing_added.append(destTile)
                 elif destTile.army < movingArmy:
                     nextBoardState.incrementing.add(destTile)
+                    if undoLog is not None:
+                        undoLog.incrementing_added.append(destTile)
 
         if not self.is_on_same_team(movingPlayer, dest.player):
             resultArmy = dest.army - movingArmy
@@ -459,6 +641,8 @@ class ArmyEngine(object):
             if resultDest.source_tile.isGeneral:
                 resultDest.player = resultDest.source_tile.player
 
+        if undoLog is not None:
+            undoLog.sim_tile_journal += (sourceTile.tile_index, source, destTile.tile_index, prevDest)
         nextBoardState.sim_tiles[source.source_tile.tile_index] = SimTile(source.source_tile, source.army - movingArmy, movingPlayer)
         nextBoardState.sim_tiles[dest.source_tile.tile_index] = resultDest
 
@@ -950,25 +1134,62 @@ class ArmyEngine(object):
         self.time_in_nash_eq += time.perf_counter() - nashEqStart
         return frEqMoves, enEqMoves
 
+    def simulate_iterative_deepening_brute_force(self, baseBoardState: ArmySimState, turns: int) -> ArmySimState:
+        """
+        Brute forces 1, 2, ... turns deep, each depth trying the best moves the previous depth found at each position first.
+        Returns the result of the deepest search that completed; once time_limit has passed, the search in progress is abandoned
+        (checked every 512 iterations, so the limit can be overshot by that much work). Depth 1 always completes.
+        """
+        self.start_time = time.perf_counter()
+        self.brute_force_depth_reached = 0
+        self.brute_force_timed_out = False
+        self._brute_force_best_moves = {}
+        if self._brute_force_zobrist_keys is None or len(self._brute_force_zobrist_keys.tile_keys) != len(self.map.tiles_by_index):
+            self._brute_force_zobrist_keys = ArmySimZobristKeys(len(self.map.tiles_by_index))
+
+        finalState: ArmySimState | None = None
+        try:
+            for depth in range(1, turns + 1):
+                self.to_turn = self.map.turn + depth
+                try:
+                    finalState = self.simulate_recursive_brute_force(baseBoardState, self.map.turn)
+                except _BruteForceTimeout:
+                    logbook.info(f'brute force iterative deepening ran out of time {time.perf_counter() - self.start_time:.3f}/{self.time_limit:.3f} at depth {depth}, using depth {self.brute_force_depth_reached}')
+                    self.brute_force_timed_out = True
+                    break
+                self.brute_force_depth_reached = depth
+                if depth < turns and time.perf_counter() - self.start_time > self.time_limit:
+                    self.brute_force_timed_out = True
+                    break
+        finally:
+            self._brute_force_best_moves = None
+
+        return finalState
+
     def execute_scan_brute_force(
             self,
             baseBoardState: ArmySimState,
             turns: int,
             noThrow: bool = False
     ) -> ArmySimResult:
-        # we gradually cut off the recursive search depth so the time limit is more a time suggestion, unlike mcts. Back the initial cutoff off slightly.
-        self._time_limit_dec = max(self.time_limit * 0.09, 0.004)
-        self.time_limit = min(self.time_limit, self.time_limit * 0.6 + 0.007)
-
         multiFriendly = len(self.friendly_armies) > 1
         multiEnemy = len(self.enemy_armies) > 1
-        self.to_turn = self.map.turn + turns
-        self.start_time = time.perf_counter()
         ogDiff = baseBoardState.initial_differential
 
-        final_state: ArmySimState = self.simulate_recursive_brute_force(
-            baseBoardState,
-            self.map.turn)
+        if self.brute_force_iterative_deepening:
+            final_state = self.simulate_iterative_deepening_brute_force(baseBoardState, turns)
+        else:
+            # we gradually cut off the recursive search depth so the time limit is more a time suggestion, unlike mcts. Back the initial cutoff off slightly.
+            self._time_limit_dec = max(self.time_limit * 0.09, 0.004)
+            self.time_limit = min(self.time_limit, self.time_limit * 0.6 + 0.007)
+
+            self.to_turn = self.map.turn + turns
+            self.start_time = time.perf_counter()
+
+            final_state: ArmySimState = self.simulate_recursive_brute_force(
+                baseBoardState,
+                self.map.turn)
+            self.brute_force_depth_reached = self.to_turn - self.map.turn
         result = ArmySimResult(final_state)
         result.best_result_state_depth = final_state.depth
 
@@ -1013,15 +1234,7 @@ class ArmyEngine(object):
 
         return result
 
-    def execute_scan_MCTS(
-            self,
-            baseBoardState: ArmySimState,
-            turns: int,
-            noThrow: bool = False
-    ) -> typing.Tuple[ArmySimResult, MctsEngineSummary]:
-        # multiFriendly = len(self.friendly_armies) > 1
-        # multiEnemy = len(self.enemy_armies) > 1
-        self.mcts_runner.reset()
+    def create_mcts_context(self, baseBoardState: ArmySimState) -> Context:
         teams = self.map.team_ids_by_player_index
         game: Game = Game(
             player=self.friendly_player,
@@ -1033,8 +1246,26 @@ class ArmyEngine(object):
             performanceTelemetry=self.mcts_runner.performance_telemetry)
         ctx: Context = Context()
         ctx.set_initial_board_state(self, baseBoardState, game, self.map.turn)
+        return ctx
+
+    def execute_scan_MCTS(
+            self,
+            baseBoardState: ArmySimState,
+            turns: int,
+            noThrow: bool = False
+    ) -> typing.Tuple[ArmySimResult, MctsEngineSummary]:
+        # multiFriendly = len(self.friendly_armies) > 1
+        # multiEnemy = len(self.enemy_armies) > 1
+        self.mcts_runner.reset()
+
+        rootStatsProvider = None
+        if self.mcts_runner.root_parallel_workers > 0:
+            # kicked off before our own search, so the workers search alongside it.
+            rootStatsProvider = MctsRootParallel.start_root_searches(self, baseBoardState, self.mcts_runner.root_parallel_workers, self.time_limit, self.iteration_limit)
+
+        ctx = self.create_mcts_context(baseBoardState)
 
-        mctsSummary = self.mcts_runner.select_action(game, ctx, self.time_limit, self.iteration_limit, forcedPreExpansions=self.forced_pre_expansions)
+        mctsSummary = self.mcts_runner.select_action(ctx.game, ctx, self.time_limit, self.iteration_limit, forcedPreExpansions=self.forced_pre_expansions, rootStatsProvider=rootStatsProvider)
         result = ArmySimResult(mctsSummary.best_result_state)
         result.expected_best_moves = [(bm.playerMoves[0], bm.playerMoves[1]) for bm in mctsSummary.best_moves]
 
@@ -1044,7 +1275,7 @@ class ArmyEngine(object):
         decompressedExpectedScore = self.mcts_runner.decompress_player_utility(mctsSummary.expected_score)
         decompressedExpandedExpectedScore = self.mcts_runner.decompress_player_utility(mctsSummary.expanded_expected_score)
 
-        logbook.info(f'MCTS e{decompressedExpectedScore/10:.1f}({mctsSummary.expected_score:.4f}) : ee{decompressedExpandedExpectedScore/10:.1f}({mctsSummary.expanded_expected_score:.4f}) iter {mctsSummary.iterations}, nodesExplored {mctsSummary.nodes_explored}, rollouts {mctsSummary.trials_performed}, backprops {mctsSummary.backprop_iter}, rolloutExpansions {mctsSummary.rollout_expansions}, biasedRolloutExpansions {mctsSummary.biased_rollout_expansions}')
+        logbook.info(f'MCTS e{decompressedExpectedScore/10:.1f}({mctsSummary.expected_score:.4f}) : ee{decompressedExpandedExpectedScore/10:.1f}({mctsSummary.expanded_expected_score:.4f}) iter {mctsSummary.iterations} {mctsSummary.worker_iterations} (converged @{mctsSummary.iterations_to_convergence}, {mctsSummary.transposition_hits} transpositions), nodesExplored {mctsSummary.nodes_explored}, rollouts {mctsSummary.trials_performed}, backprops {mctsSummary.backprop_iter}, rolloutExpansions {mctsSummary.rollout_expansions}, biasedRolloutExpansions {mctsSummary.biased_rollout_expansions}')
 
         if self.honor_mcts_expected_score:
             result.net_economy_differential = decompressedExpectedScore / 10
@@ -1056,10 +1287,13 @@ class ArmyEngine(object):
     def execute_player_capture(self, nextBoardState: ArmySimState, player: int, byPlayer: int, friendly: bool):
         # todo should we include ALL of the players tiles in the sim tiles as captured...? Maybe???
         econDelta = 0
+        undoLog = nextBoardState.undo_log
         for simTile in list(nextBoardState.sim_tiles.values()):
             if simTile.source_tile.isGeneral or simTile.player != player:
                 continue
             armyGained = simTile.army - simTile.army // 2
+            if undoLog is not None:
+                undoLog.sim_tile_journal += (simTile.source_tile.tile_index, simTile)
             nextBoardState.sim_tiles[simTile.source_tile.tile_index] = SimTile(simTile.source_tile, armyGained, byPlayer)
             econDelta += armyGained
             econDelta += 1  # for the tile itselves econ.
@@ -26,6 +26,13 @@ from base.client.map import Tile, TILE_OBSTACLE, TileDelta, Player, MODIFIER_TOR
 if typing.TYPE_CHECKING:
     from Strategy.OpponentTracker import OpponentTracker
 
+_FOG_SOURCE_PRIORITY_KEY = SearchUtils.build_priority_key_packer(5)
+"""distWeighted, dist, negArmy, turnsNeg, citiesConverted of the find_fog_source priorities, used when SearchUtils.USE_PACKED_PRIORITY_KEYS."""
+_FLANK_PATH_PRIORITY_KEY = SearchUtils.build_priority_key_packer(2)
+"""The (dist, 0) expected flank path priorities."""
+_LEADING_DIST_PRIORITY_KEY = SearchUtils.build_priority_key_packer(1)
+"""For the priorities whose only leading int field is dist, followed by floats."""
+
 
 class PlayerAggressionTracker(object):
     def __init__(self, index):
@@ -1099,6 +1106,9 @@ class ArmyTracker(object):
                 revert.tile.army = revert.army
                 revert.tile.player = revert.player
                 revert.tile.isTempFogPrediction = revert.isTempFogPrediction
+        if army.fogTileReverts:
+            # armies get scrapped mid move too, generation keyed caches (the turn search cache) must not serve searches over the pre-revert fog.
+            self.map.bump_generation()
         army.fogTileReverts = {}
 
     def resolve_entangled_armies(self, army):
@@ -1593,6 +1603,7 @@ class ArmyTracker(object):
             noNeutralCities=not allowVisionlessObstaclesAndCities,
             noNeutralUndiscoveredObstacles=not allowVisionlessObstaclesAndCities,
             priorityFunc=prioFunc,
+            priorityKeyFunc=_FOG_SOURCE_PRIORITY_KEY if SearchUtils.USE_PACKED_PRIORITY_KEYS else None,
             skipFunc=fogSkipFunc,
             searchingPlayer=armyPlayer,
             logResultValues=True,
@@ -2683,6 +2694,7 @@ class ArmyTracker(object):
             # goalFunc=lambda tile, armyAmt, dist: armyAmt + tile.army > 0 and tile in player_targets,  # + tile.army so that we find paths that reach tiles regardless of killing them.
             valueFunc=valueFunc,
             priorityFunc=prioFunc,
+            priorityKeyFunc=_FLANK_PATH_PRIORITY_KEY if SearchUtils.USE_PACKED_PRIORITY_KEYS else None,
             skipTiles=skip,
             maxTime=1.0,
             maxDepth=30,
@@ -3701,7 +3713,13 @@ class ArmyTracker(object):
             #     movingAwayFromUs = self.map.get_distance_between(self.general, tile) > self.map.get_distance_between(self.general, fromTile)
             #     movingAwayOrParallelToEn = self.map.get_distance_between(self.general, tile) > self.map.get_distance_between(self.general, fromTile)
 
-        results = SearchUtils.breadth_first_dynamic_max_per_tile_global_visited(self.map, startTiles, valueFunc=valFunc, priorityFunc=prioFunc, skipFunc=skipFuncDynamic)
+        results = SearchUtils.breadth_first_dynamic_max_per_tile_global_visited(
+            self.map,
+            startTiles,
+            valueFunc=valFunc,
+            priorityFunc=prioFunc,
+            skipFunc=skipFuncDynamic,
+            priorityKeyFunc=_LEADING_DIST_PRIORITY_KEY if SearchUtils.USE_PACKED_PRIORITY_KEYS else None)
 
         logbook.info(f'BISECTOR FOUND {len(results)} BISECT PATHS...?')
 
@@ -4713,6 +4731,7 @@ class ArmyTracker(object):
             maxDepth=maxTurns,
             valueFunc=valueFunc,
             priorityFunc=prioFunc,
+            priorityKeyFunc=_LEADING_DIST_PRIORITY_KEY if SearchUtils.USE_PACKED_PRIORITY_KEYS else None,
             searchingPlayer=enTile.player,
             noNeutralCities=True,
             skipTiles=skipTiles,
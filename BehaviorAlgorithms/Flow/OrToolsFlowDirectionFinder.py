@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import atexit
 import dataclasses
 import io
 import os
@@ -30,6 +31,8 @@ DEMAND_SATURATION_FROM_GENERAL_ONLY = False
 DEBUG_OR_TOOLS_FAKE_NODE_ESCAPE_ARCS = True
 DEBUG_OR_TOOLS_FAKE_NODE_ESCAPE_COST = 1000000
 _ORTOOLS_SIDECAR_ENV_VAR = 'GENERALS_BOT_ORTOOLS_SIDECAR_PYTHON'
+_SIDECAR_SHARED_MEMORY_MIN_ARCS = 1024
+_SIDECAR_SHARED_MEMORY_MIN_NODES = 256
 
 
 class OrToolsSidecarError(Exception):
@@ -104,6 +107,19 @@ def _build_solve_result_or_raise(
     return OrToolsSolveResult(flows=[int(value) for value in flows], optimal_cost=int(optimal_cost))
 
 
+def _get_sidecar_shared_memory_views(buffer, arc_capacity: int, node_capacity: int) -> typing.Tuple[np.ndarray, ...]:
+    """
+    Same layout as OrToolsMinCostFlowSidecar.get_shared_memory_views (which can't be imported here without OR-Tools): int64
+    start_nodes, end_nodes, capacities, unit_costs and flows (arc_capacity each), then node_supplies (node_capacity).
+    """
+    views = []
+    offset = 0
+    for count in (arc_capacity, arc_capacity, arc_capacity, arc_capacity, arc_capacity, node_capacity):
+        views.append(np.ndarray((count,), dtype=np.int64, buffer=buffer, offset=offset))
+        offset += count * 8
+    return tuple(views)
+
+
 class OrToolsSidecarClient(object):
     _instance: OrToolsSidecarClient | None = None
 
@@ -111,6 +127,15 @@ class OrToolsSidecarClient(object):
         self._process: subprocess.Popen[bytes] | None = None
         self._repo_root = pathlib.Path(__file__).resolve().parents[2]
         self._sidecar_script = self._repo_root / 'BehaviorAlgorithms' / 'Flow' / 'OrToolsMinCostFlowSidecar.py'
+        self.use_shared_memory: bool = False
+        """
+        If True, solve writes the graph arrays into a preallocated shared memory block that the sidecar solves from and writes
+        the flows back into, so only a small header gets pickled over the pipe instead of every array as a list.
+        """
+        self._shared_memory = None
+        self._shared_memory_views: typing.Tuple[np.ndarray, ...] = ()
+        self._shared_memory_arc_capacity: int = 0
+        self._shared_memory_node_capacity: int = 0
 
     @classmethod
     def get_instance(cls) -> OrToolsSidecarClient:
@@ -120,6 +145,9 @@ class OrToolsSidecarClient(object):
 
     def solve(self, graph_data: OrToolsGraphData) -> OrToolsSolveResult:
         self._ensure_process_started()
+        if self.use_shared_memory and self._ensure_shared_memory(len(graph_data.start_nodes), len(graph_data.node_supplies)):
+            return self._solve_shared_memory(graph_data)
+
         request = {
             'command': 'solve',
             'start_nodes': graph_data.start_nodes.tolist(),
@@ -129,12 +157,7 @@ class OrToolsSidecarClient(object):
             'node_supplies': graph_data.node_supplies.tolist(),
         }
         self._write_message(request)
-        response = self._read_message()
-        if response is None:
-            raise OrToolsSidecarError('OR-Tools sidecar exited before sending a response')
-        error = response.get('error')
-        if error:
-            raise OrToolsSidecarError(error)
+        response = self._read_response()
         # The sidecar wire format is a dict (a serialization boundary); decode it into the
         # same typed result/exception contract as the in-process client so compute_flow is
         # agnostic to which backend ran.
@@ -145,6 +168,76 @@ class OrToolsSidecarClient(object):
             response['optimal_cost'],
         )
 
+    def _solve_shared_memory(self, graph_data: OrToolsGraphData) -> OrToolsSolveResult:
+        arc_count = len(graph_data.start_nodes)
+        node_count = len(graph_data.node_supplies)
+        start_nodes, end_nodes, capacities, unit_costs, flows, node_supplies = self._shared_memory_views
+        start_nodes[:arc_count] = graph_data.start_nodes
+        end_nodes[:arc_count] = graph_data.end_nodes
+        capacities[:arc_count] = graph_data.capacities
+        unit_costs[:arc_count] = graph_data.unit_costs
+        node_supplies[:node_count] = graph_data.node_supplies
+        self._write_message({
+            'command': 'solve_shared_memory',
+            'shm_name': self._shared_memory.name,
+            'arc_capacity': self._shared_memory_arc_capacity,
+            'node_capacity': self._shared_memory_node_capacity,
+            'arc_count': arc_count,
+            'node_count': node_count,
+        })
+        response = self._read_response()
+        status = int(response['status'])
+        optimal_status = int(response['optimal_status'])
+        return _build_solve_result_or_raise(
+            status,
+            optimal_status,
+            flows[:arc_count].tolist() if status == optimal_status else [],
+            response['optimal_cost'],
+        )
+
+    def _ensure_shared_memory(self, arc_count: int, node_count: int) -> bool:
+        """(Re)allocates the shared memory block if it can't fit the graph. Turns use_shared_memory off and returns False if shared memory is unavailable."""
+        if arc_count <= self._shared_memory_arc_capacity and node_count <= self._shared_memory_node_capacity:
+            return True
+
+        arc_capacity = max(arc_count, 2 * self._shared_memory_arc_capacity, _SIDECAR_SHARED_MEMORY_MIN_ARCS)
+        node_capacity = max(node_count, 2 * self._shared_memory_node_capacity, _SIDECAR_SHARED_MEMORY_MIN_NODES)
+        first_block = self._shared_memory is None
+        self._release_shared_memory()
+        try:
+            from multiprocessing import shared_memory
+            self._shared_memory = shared_memory.SharedMemory(create=True, size=(5 * arc_capacity + node_capacity) * 8)
+        except (ImportError, OSError) as ex:
+            logbook.warning(f'OR-Tools sidecar shared memory is unavailable, falling back to pickling the graph: {type(ex).__name__}: {ex}')
+            self.use_shared_memory = False
+            return False
+
+        if first_block:
+            atexit.register(self._release_shared_memory)
+        self._shared_memory_views = _get_sidecar_shared_memory_views(self._shared_memory.buf, arc_capacity, node_capacity)
+        self._shared_memory_arc_capacity = arc_capacity
+        self._shared_memory_node_capacity = node_capacity
+        return True
+
+    def _release_shared_memory(self) -> None:
+        # the views export the buffer, so have to go before it can be closed.
+        self._shared_memory_views = ()
+        self._shared_memory_arc_capacity = 0
+        self._shared_memory_node_capacity = 0
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+            self._shared_memory.unlink()
+            self._shared_memory = None
+
+    def _read_response(self) -> dict:
+        response = self._read_message()
+        if response is None:
+            raise OrToolsSidecarError('OR-Tools sidecar exited before sending a response')
+        error = response.get('error')
+        if error:
+            raise OrToolsSidecarError(error)
+        return response
+
     def _ensure_process_started(self) -> None:
         if self._process is not None and self._process.poll() is None:
             return
@@ -372,6 +465,16 @@ class DirectOrToolsGraphBuilder(object):
 
     def __init__(self):
         self.log_debug: bool = False
+        self.run_feasibility_diagnostics: bool = True
+        """
+        If True, the build also runs the FLOW_FEASIBILITY_BUG diagnostics (weak component net supply check and the
+        max-flow min-cut check). They only log, never change the graph.
+        """
+        self.run_max_flow_feasibility_diagnostic: bool = True
+        """
+        If False, the diagnostics skip the max-flow min-cut check. It is most of the build time, while the weak component
+        check is a linear union find and still catches the unbalanced / disconnected graph bugs.
+        """
 
     def _format_island_tiles(self, island: 'TileIsland') -> str:
         return '|'.join(str(t) for t in island.tiles_by_army[:8])
@@ -428,6 +531,43 @@ class DirectOrToolsGraphBuilder(object):
             return True
         return destination_island.unique_id not in allowed_destinations
 
+    def _get_border_flow_destinations(
+        self,
+        island: 'TileIsland',
+        islands: 'TileIslandBuilder',
+        excluded_island_ids: typing.Set[int],
+        threat_blocking_tiles: typing.Dict['Tile', typing.Any] | None,
+        flow_path_constraints: FlowPathIslandConstraints,
+    ) -> typing.List['TileIsland']:
+        """The border islands of island that get a border arc out of it, in border_islands order."""
+        destinations: typing.List['TileIsland'] = []
+        for movable_island in island.border_islands:
+            # Never create an edge into an unreachable neighbour island.
+            if movable_island.unique_id in excluded_island_ids:
+                continue
+            if self._is_border_edge_blocked_by_threat_blocking_tiles(island, movable_island, threat_blocking_tiles):
+                logbook.warning(
+                    f'FLOW_THREAT_BLOCKED_BORDER_EDGE removedDirectedArc=-{island.unique_id}->{movable_island.unique_id} '
+                    f'sourceIsland={island.unique_id}(tile={island.tiles_by_army[0]},team={island.team},'
+                    f'army={island.sum_army},tiles={island.tile_count}) '
+                    f'destinationIsland={movable_island.unique_id}(tile={movable_island.tiles_by_army[0]},'
+                    f'team={movable_island.team},army={movable_island.sum_army},tiles={movable_island.tile_count})'
+                )
+                continue
+            # UnitTests/FlowExpansionSubtests/test_FlowExpansion_ExternalOptions.py
+            # ExternalOptionsTests.test_constrained_flow_paths_limit_only_outgoing_edges_from_path_islands:
+            # path-constrained islands must only emit flow along island transitions explicitly present
+            # in the supplied Path objects, while other islands may still emit edges into them.
+            if self._is_border_edge_blocked_by_flow_path_constraints(island, movable_island, flow_path_constraints):
+                if self.log_debug:
+                    logbook.info(
+                        f'FLOW_PATH_CONSTRAINT_BLOCKED_BORDER_EDGE removedDirectedArc=-{island.unique_id}->{movable_island.unique_id} '
+                        f'sourceIsland={island.unique_id} destinationIsland={movable_island.unique_id}'
+                    )
+                continue
+            destinations.append(movable_island)
+        return destinations
+
     def build(
         self,
         islands: 'TileIslandBuilder',
@@ -475,11 +615,22 @@ class DirectOrToolsGraphBuilder(object):
                 f'sampleTiles=[{", ".join(str(t) for t in excluded_sample_tiles)}]'
             )
 
+        override_army_by_island_id: typing.Dict[int, int] | None = None
+        if army_override_matrix is not None:
+            compact_islands = islands.get_compact_islands()
+            leaf_count = compact_islands.leaf_count
+            override_army_by_island_id = dict(zip(
+                compact_islands.unique_ids[:leaf_count].tolist(),
+                compact_islands.sum_tile_values_by_island(army_override_matrix.raw)[:leaf_count].tolist()))
+
         def _get_island_army_sum(island: 'TileIsland') -> int:
-            if army_override_matrix is None:
+            if override_army_by_island_id is None:
                 army_sum = island.sum_army
             else:
-                army_sum = sum(army_override_matrix.raw[tile.tile_index] for tile in island.tile_set)
+                army_sum = override_army_by_island_id.get(island.unique_id)
+                if army_sum is None:
+                    # not in the compact snapshot (an island registered since it was built, or a non leaf island), sum its tiles directly.
+                    army_sum = sum(army_override_matrix.raw[tile.tile_index] for tile in island.tile_set)
             if island.team == team and negativeTiles is not None:
                 if army_override_matrix is None:
                     army_sum -= sum(tile.army for tile in island.tile_set if tile in negativeTiles)
@@ -627,30 +778,7 @@ class DirectOrToolsGraphBuilder(object):
                     continue
                 role = island_roles[island.unique_id]
 
-                for movable_island in island.border_islands:
-                    # Never create an edge into an unreachable neighbour island.
-                    if movable_island.unique_id in excluded_island_ids:
-                        continue
-                    if self._is_border_edge_blocked_by_threat_blocking_tiles(island, movable_island, threat_blocking_tiles):
-                        logbook.warning(
-                            f'FLOW_THREAT_BLOCKED_BORDER_EDGE removedDirectedArc=-{island.unique_id}->{movable_island.unique_id} '
-                            f'sourceIsland={island.unique_id}(tile={island.tiles_by_army[0]},team={island.team},'
-                            f'army={island.sum_army},tiles={island.tile_count}) '
-                            f'destinationIsland={movable_island.unique_id}(tile={movable_island.tiles_by_army[0]},'
-                            f'team={movable_island.team},army={movable_island.sum_army},tiles={movable_island.tile_count})'
-                        )
-                        continue
-                    # UnitTests/FlowExpansionSubtests/test_FlowExpansion_ExternalOptions.py
-                    # ExternalOptionsTests.test_constrained_flow_paths_limit_only_outgoing_edges_from_path_islands:
-                    # path-constrained islands must only emit flow along island transitions explicitly present
-                    # in the supplied Path objects, while other islands may still emit edges into them.
-                    if self._is_border_edge_blocked_by_flow_path_constraints(island, movable_island, flow_path_constraints):
-                        if self.log_debug:
-                            logbook.info(
-                                f'FLOW_PATH_CONSTRAINT_BLOCKED_BORDER_EDGE removedDirectedArc=-{island.unique_id}->{movable_island.unique_id} '
-                                f'sourceIsland={island.unique_id} destinationIsland={movable_island.unique_id}'
-                            )
-                        continue
+                for movable_island in self._get_border_flow_destinations(island, islands, excluded_island_ids, threat_blocking_tiles, flow_path_constraints):
                     # Edge: output port → neighbour input port (weight=1, capacity=100000)
                     src = -island.unique_id
                     dst = movable_island.unique_id
@@ -1132,53 +1260,8 @@ class DirectOrToolsGraphBuilder(object):
         # min-cost-flow will be INFEASIBLE. This block recomputes weak components over the FULL
         # arc set and logs any component whose net supply is non-zero so the root cause is visible.
         with perf_timer.begin_move_event('OrTools build phase3.6 feasibility verification'):
-            full_parent: typing.Dict[int, int] = {}
-
-            def _full_find(node_id: int) -> int:
-                root = node_id
-                while full_parent.get(root, root) != root:
-                    root = full_parent.get(root, root)
-                while full_parent.get(node_id, node_id) != root:
-                    nxt = full_parent.get(node_id, node_id)
-                    full_parent[node_id] = root
-                    node_id = nxt
-                return root
-
-            def _full_union(node_a: int, node_b: int) -> None:
-                root_a = _full_find(node_a)
-                root_b = _full_find(node_b)
-                if root_a != root_b:
-                    full_parent[root_b] = root_a
-
-            for arc_idx in range(len(arc_starts)):
-                _full_union(arc_starts[arc_idx], arc_ends[arc_idx])
-
-            full_comp_members: typing.Dict[int, typing.List[int]] = defaultdict(list)
-            for node_id in all_node_ids:
-                full_comp_members[_full_find(node_id)].append(node_id)
-
-            global_net_supply = sum(node_supply_map.get(node_id, 0) for node_id in all_node_ids)
-            if global_net_supply != 0:
-                logbook.error(
-                    f'FLOW_FEASIBILITY_BUG global net supply != 0 (globalNetSupply={global_net_supply}). '
-                    f'The min-cost-flow graph is UNBALANCED and will be INFEASIBLE -- this is a graph-setup bug.'
-                )
-            for comp_root, member_nodes in full_comp_members.items():
-                net_supply = sum(node_supply_map.get(node_id, 0) for node_id in member_nodes)
-                if net_supply == 0:
-                    continue
-                supply_islands = []
-                for node_id in member_nodes:
-                    supply = node_supply_map.get(node_id, 0)
-                    if node_id > 0 and supply != 0 and node_id in islands.tile_islands_by_unique_id:
-                        isl = islands.tile_islands_by_unique_id[node_id]
-                        supply_islands.append(f'{node_id}(t{isl.team},{isl.tiles_by_army[0]},or_supply={supply})')
-                logbook.error(
-                    f'FLOW_FEASIBILITY_BUG weak component with non-zero net supply remains after repair: '
-                    f'root={comp_root} nodeCount={len(member_nodes)} netSupply={net_supply} '
-                    f'containsMainFakeNode={fake_node in member_nodes} '
-                    f'supplyIslands=[{", ".join(supply_islands[:48])}]'
-                )
+            if self.run_feasibility_diagnostics:
+                self._log_weak_components_with_net_supply(islands, arc_starts, arc_ends, all_node_ids, node_supply_map, fake_node)
 
             # DIRECTED reachability check. A balanced, weakly-connected min-cost-flow is still
             # INFEASIBLE if some sink (supply<0) cannot be reached from ANY source (supply>0) along
@@ -1376,106 +1459,8 @@ class DirectOrToolsGraphBuilder(object):
             # ->, cap=demand). If maxflow < total supply the graph is INFEASIBLE; we then log the min-cut
             # (super-source side) so the exact saturated bottleneck arcs/islands are visible. This is the
             # final verification that the connectivity/overflow/directed repairs above did their job.
-            if global_net_supply == 0:
-                super_source = -987654321
-                super_sink = -987654322
-                residual: typing.Dict[int, typing.Dict[int, int]] = defaultdict(dict)
-
-                def _add_residual_arc(u: int, v: int, cap: int) -> None:
-                    residual[u][v] = residual[u].get(v, 0) + cap
-                    if u not in residual[v]:
-                        residual[v][u] = residual[v].get(u, 0)
-
-                def _bfs_augment() -> int:
-                    parent: typing.Dict[int, int] = {super_source: super_source}
-                    queue: typing.Deque[int] = deque((super_source,))
-                    while queue:
-                        node = queue.popleft()
-                        if node == super_sink:
-                            break
-                        for neighbour, cap in residual[node].items():
-                            if cap > 0 and neighbour not in parent:
-                                parent[neighbour] = node
-                                queue.append(neighbour)
-                    if super_sink not in parent:
-                        return 0
-                    bottleneck = None
-                    cursor = super_sink
-                    while cursor != super_source:
-                        prev = parent[cursor]
-                        edge_cap = residual[prev][cursor]
-                        bottleneck = edge_cap if bottleneck is None else min(bottleneck, edge_cap)
-                        cursor = prev
-                    cursor = super_sink
-                    while cursor != super_source:
-                        prev = parent[cursor]
-                        residual[prev][cursor] -= bottleneck
-                        residual[cursor][prev] = residual[cursor].get(prev, 0) + bottleneck
-                        cursor = prev
-                    return bottleneck
-
-                # Timed separately: the max-flow augmenting BFS loop is the most expensive part of the
-                # feasibility verification and runs on every flow graph build, so monitor its cost.
-                with perf_timer.begin_move_event('OrTools build phase3.6 max-flow feasibility BFS loop'):
-                    for arc_idx in range(len(arc_starts)):
-                        _add_residual_arc(arc_starts[arc_idx], arc_ends[arc_idx], int(arc_caps[arc_idx]))
-                    total_required_flow = 0
-                    for node_id in all_node_ids:
-                        supply = node_supply_map.get(node_id, 0)
-                        if supply > 0:
-                            _add_residual_arc(super_source, node_id, supply)
-                            total_required_flow += supply
-                        elif supply < 0:
-                            _add_residual_arc(node_id, super_sink, -supply)
-
-                    max_flow_value = 0
-                    augment = _bfs_augment()
-                    while augment > 0:
-                        max_flow_value += augment
-                        augment = _bfs_augment()
-
-                if max_flow_value < total_required_flow:
-                    # Min cut = nodes still reachable from super_source in the residual graph.
-                    cut_reached: typing.Set[int] = set()
-                    cut_queue: typing.Deque[int] = deque((super_source,))
-                    cut_reached.add(super_source)
-                    while cut_queue:
-                        node = cut_queue.popleft()
-                        for neighbour, cap in residual[node].items():
-                            if cap > 0 and neighbour not in cut_reached:
-                                cut_reached.add(neighbour)
-                                cut_queue.append(neighbour)
-                    saturated_cut_arcs = []
-                    for arc_idx in range(len(arc_starts)):
-                        u = arc_starts[arc_idx]
-                        v = arc_ends[arc_idx]
-                        if u in cut_reached and v not in cut_reached:
-                            u_desc = u
-                            v_desc = v
-                            if abs(u) in islands.tile_islands_by_unique_id:
-                                u_isl = islands.tile_islands_by_unique_id[abs(u)]
-                                u_desc = f'{u}(t{u_isl.team},{u_isl.tiles_by_army[0]})'
-                            if abs(v) in islands.tile_islands_by_unique_id:
-                                v_isl = islands.tile_islands_by_unique_id[abs(v)]
-                                v_desc = f'{v}(t{v_isl.team},{v_isl.tiles_by_army[0]})'
-                            saturated_cut_arcs.append(f'{u_desc}->{v_desc}:cap{int(arc_caps[arc_idx])}')
-                    cut_source_nodes = []
-                    for node_id in cut_reached:
-                        supply = node_supply_map.get(node_id, 0)
-                        if supply <= 0:
-                            continue
-                        node_desc = str(node_id)
-                        if node_id in islands.tile_islands_by_unique_id:
-                            isl = islands.tile_islands_by_unique_id[node_id]
-                            node_desc = f'{node_id}(t{isl.team},{isl.tiles_by_army[0]},supply={supply})'
-                        cut_source_nodes.append(node_desc)
-                    logbook.error(
-                        f'FLOW_FEASIBILITY_BUG capacity cut cannot carry required supply: maxFlow={max_flow_value} '
-                        f'requiredFlow={total_required_flow} deficit={total_required_flow - max_flow_value} '
-                        f'cutSourceSideNodeCount={len(cut_reached)} mainFakeInCut={fake_node in cut_reached} '
-                        f'cutSources=[{", ".join(cut_source_nodes[:48])}] '
-                        f'saturatedCutArcs=[{", ".join(saturated_cut_arcs[:48])}]'
-                    )
+            if self.run_feasibility_diagnostics and self.run_max_flow_feasibility_diagnostic:
+                self._log_max_flow_feasibility_cut(islands, arc_starts, arc_ends, arc_caps, all_node_ids, node_supply_map, fake_node, perf_timer)
 
         # ----------------------------------------------------------------
         # Phase 4: build sorted node index arrays (mirrors NxToOrToolsConverter)
@@ -1580,6 +1565,180 @@ class DirectOrToolsGraphBuilder(object):
             )
         return result
 
+    def _log_weak_components_with_net_supply(
+        self,
+        islands: 'TileIslandBuilder',
+        arc_starts: typing.List[int],
+        arc_ends: typing.List[int],
+        all_node_ids: typing.Set[int],
+        node_supply_map: typing.Dict[int, int],
+        fake_node: int,
+    ):
+        """Logs FLOW_FEASIBILITY_BUG for an unbalanced graph, and for every weakly connected component with non-zero net supply."""
+        full_parent: typing.Dict[int, int] = {}
+
+        def _full_find(node_id: int) -> int:
+            root = node_id
+            while full_parent.get(root, root) != root:
+                root = full_parent.get(root, root)
+            while full_parent.get(node_id, node_id) != root:
+                nxt = full_parent.get(node_id, node_id)
+                full_parent[node_id] = root
+                node_id = nxt
+            return root
+
+        def _full_union(node_a: int, node_b: int) -> None:
+            root_a = _full_find(node_a)
+            root_b = _full_find(node_b)
+            if root_a != root_b:
+                full_parent[root_b] = root_a
+
+        for arc_idx in range(len(arc_starts)):
+            _full_union(arc_starts[arc_idx], arc_ends[arc_idx])
+
+        full_comp_members: typing.Dict[int, typing.List[int]] = defaultdict(list)
+        for node_id in all_node_ids:
+            full_comp_members[_full_find(node_id)].append(node_id)
+
+        global_net_supply = sum(node_supply_map.get(node_id, 0) for node_id in all_node_ids)
+        if global_net_supply != 0:
+            logbook.error(
+                f'FLOW_FEASIBILITY_BUG global net supply != 0 (globalNetSupply={global_net_supply}). '
+                f'The min-cost-flow graph is UNBALANCED and will be INFEASIBLE -- this is a graph-setup bug.'
+            )
+        for comp_root, member_nodes in full_comp_members.items():
+            net_supply = sum(node_supply_map.get(node_id, 0) for node_id in member_nodes)
+            if net_supply == 0:
+                continue
+            supply_islands = []
+            for node_id in member_nodes:
+                supply = node_supply_map.get(node_id, 0)
+                if node_id > 0 and supply != 0 and node_id in islands.tile_islands_by_unique_id:
+                    isl = islands.tile_islands_by_unique_id[node_id]
+                    supply_islands.append(f'{node_id}(t{isl.team},{isl.tiles_by_army[0]},or_supply={supply})')
+            logbook.error(
+                f'FLOW_FEASIBILITY_BUG weak component with non-zero net supply remains after repair: '
+                f'root={comp_root} nodeCount={len(member_nodes)} netSupply={net_supply} '
+                f'containsMainFakeNode={fake_node in member_nodes} '
+                f'supplyIslands=[{", ".join(supply_islands[:48])}]'
+            )
+
+    def _log_max_flow_feasibility_cut(
+        self,
+        islands: 'TileIslandBuilder',
+        arc_starts: typing.List[int],
+        arc_ends: typing.List[int],
+        arc_caps: typing.List[int],
+        all_node_ids: typing.Set[int],
+        node_supply_map: typing.Dict[int, int],
+        fake_node: int,
+        perf_timer: 'PerformanceTimer',
+    ):
+        """Logs FLOW_FEASIBILITY_BUG with the saturated min cut if a balanced graph cannot carry all of its supply."""
+        if sum(node_supply_map.get(node_id, 0) for node_id in all_node_ids) != 0:
+            # already logged as unbalanced.
+            return
+
+        super_source = -987654321
+        super_sink = -987654322
+        residual: typing.Dict[int, typing.Dict[int, int]] = defaultdict(dict)
+
+        def _add_residual_arc(u: int, v: int, cap: int) -> None:
+            residual[u][v] = residual[u].get(v, 0) + cap
+            if u not in residual[v]:
+                residual[v][u] = residual[v].get(u, 0)
+
+        def _bfs_augment() -> int:
+            parent: typing.Dict[int, int] = {super_source: super_source}
+            queue: typing.Deque[int] = deque((super_source,))
+            while queue:
+                node = queue.popleft()
+                if node == super_sink:
+                    break
+                for neighbour, cap in residual[node].items():
+                    if cap > 0 and neighbour not in parent:
+                        parent[neighbour] = node
+                        queue.append(neighbour)
+            if super_sink not in parent:
+                return 0
+            bottleneck = None
+            cursor = super_sink
+            while cursor != super_source:
+                prev = parent[cursor]
+                edge_cap = residual[prev][cursor]
+                bottleneck = edge_cap if bottleneck is None else min(bottleneck, edge_cap)
+                cursor = prev
+            cursor = super_sink
+            while cursor != super_source:
+                prev = parent[cursor]
+                residual[prev][cursor] -= bottleneck
+                residual[cursor][prev] = residual[cursor].get(prev, 0) + bottleneck
+                cursor = prev
+            return bottleneck
+
+        # Timed separately: the max-flow augmenting BFS loop is the most expensive part of the
+        # feasibility verification and runs on every flow graph build, so monitor its cost.
+        with perf_timer.begin_move_event('OrTools build phase3.6 max-flow feasibility BFS loop'):
+            for arc_idx in range(len(arc_starts)):
+                _add_residual_arc(arc_starts[arc_idx], arc_ends[arc_idx], int(arc_caps[arc_idx]))
+            total_required_flow = 0
+            for node_id in all_node_ids:
+                supply = node_supply_map.get(node_id, 0)
+                if supply > 0:
+                    _add_residual_arc(super_source, node_id, supply)
+                    total_required_flow += supply
+                elif supply < 0:
+                    _add_residual_arc(node_id, super_sink, -supply)
+
+            max_flow_value = 0
+            augment = _bfs_augment()
+            while augment > 0:
+                max_flow_value += augment
+                augment = _bfs_augment()
+
+        if max_flow_value < total_required_flow:
+            # Min cut = nodes still reachable from super_source in the residual graph.
+            cut_reached: typing.Set[int] = set()
+            cut_queue: typing.Deque[int] = deque((super_source,))
+            cut_reached.add(super_source)
+            while cut_queue:
+                node = cut_queue.popleft()
+                for neighbour, cap in residual[node].items():
+                    if cap > 0 and neighbour not in cut_reached:
+                        cut_reached.add(neighbour)
+                        cut_queue.append(neighbour)
+            saturated_cut_arcs = []
+            for arc_idx in range(len(arc_starts)):
+                u = arc_starts[arc_idx]
+                v = arc_ends[arc_idx]
+                if u in cut_reached and v not in cut_reached:
+                    u_desc = u
+                    v_desc = v
+                    if abs(u) in islands.tile_islands_by_unique_id:
+                        u_isl = islands.tile_islands_by_unique_id[abs(u)]
+                        u_desc = f'{u}(t{u_isl.team},{u_isl.tiles_by_army[0]})'
+                    if abs(v) in islands.tile_islands_by_unique_id:
+                        v_isl = islands.tile_islands_by_unique_id[abs(v)]
+                        v_desc = f'{v}(t{v_isl.team},{v_isl.tiles_by_army[0]})'
+                    saturated_cut_arcs.append(f'{u_desc}->{v_desc}:cap{int(arc_caps[arc_idx])}')
+            cut_source_nodes = []
+            for node_id in cut_reached:
+                supply = node_supply_map.get(node_id, 0)
+                if supply <= 0:
+                    continue
+                node_desc = str(node_id)
+                if node_id in islands.tile_islands_by_unique_id:
+                    isl = islands.tile_islands_by_unique_id[node_id]
+                    node_desc = f'{node_id}(t{isl.team},{isl.tiles_by_army[0]},supply={supply})'
+                cut_source_nodes.append(node_desc)
+            logbook.error(
+                f'FLOW_FEASIBILITY_BUG capacity cut cannot carry required supply: maxFlow={max_flow_value} '
+                f'requiredFlow={total_required_flow} deficit={total_required_flow - max_flow_value} '
+                f'cutSourceSideNodeCount={len(cut_reached)} mainFakeInCut={fake_node in cut_reached} '
+                f'cutSources=[{", ".join(cut_source_nodes[:48])}] '
+                f'saturatedCutArcs=[{", ".join(saturated_cut_arcs[:48])}]'
+            )
+
     def _is_border_edge_blocked_by_threat_blocking_tiles(
         self,
         source_island: 'TileIsland',
@@ -1970,6 +2129,11 @@ class OrToolsFlowDirectionFinder(FlowDirectionFinderABC):
         self.ortools_graph_data_no_neut: OrToolsGraphData | None = None
         self._last_built_graphs_turn: int = -1
 
+        self.run_feasibility_diagnostics: bool = True
+        """Whether graph builds also run the FLOW_FEASIBILITY_BUG diagnostics, see DirectOrToolsGraphBuilder.run_feasibility_diagnostics."""
+        self.run_max_flow_feasibility_diagnostic: bool = True
+        """See DirectOrToolsGraphBuilder.run_max_flow_feasibility_diagnostic."""
+
     def _get_nx_finder(self) -> NetworkXFlowDirectionFinder:
         """Return (and lazily construct) the inner NX finder."""
         if self._nx_finder is None:
@@ -2036,6 +2200,8 @@ class OrToolsFlowDirectionFinder(FlowDirectionFinderABC):
 
         builder = DirectOrToolsGraphBuilder()
         builder.log_debug = self.log_debug
+        builder.run_feasibility_diagnostics = self.run_feasibility_diagnostics
+        builder.run_max_flow_feasibility_diagnostic = self.run_max_flow_feasibility_diagnostic
         return builder.build(
             islands,
             self._intergeneral_analysis,
@@ -2129,13 +2295,15 @@ class OrToolsFlowDirectionFinder(FlowDirectionFinderABC):
         with self.perf_timer.begin_move_event('OrTools alloc+populate tile MapMatrix lookups'):
             no_neut_flow_node_lookup = MapMatrix(self.map, None)
             inc_neut_flow_node_lookup = MapMatrix(self.map, None)
-            for flow_node in no_neut_graph_lookup.values():
-                for t in flow_node.island.tile_set:
-                    no_neut_flow_node_lookup.raw[t.tile_index] = flow_node
+            # every leaf island got a flow node above, so this is just the compact tile -> island index lookup mapped onto them.
+            compact_islands = islands.get_compact_islands()
+            island_index_by_tile_index = compact_islands.island_index_by_tile_index.tolist()
+            leaf_island_ids = compact_islands.unique_ids[:compact_islands.leaf_count].tolist()
+            no_neut_nodes_by_index = [no_neut_graph_lookup[island_id] for island_id in leaf_island_ids]
+            no_neut_flow_node_lookup.raw = [no_neut_nodes_by_index[i] if i >= 0 else None for i in island_index_by_tile_index]
             if includeNeutralDemand:
-                for flow_node in with_neut_graph_lookup.values():
-                    for t in flow_node.island.tile_set:
-                        inc_neut_flow_node_lookup.raw[t.tile_index] = flow_node
+                inc_neut_nodes_by_index = [with_neut_graph_lookup[island_id] for island_id in leaf_island_ids]
+                inc_neut_flow_node_lookup.raw = [inc_neut_nodes_by_index[i] if i >= 0 else None for i in island_index_by_tile_index]
 
         with self.perf_timer.begin_move_event('OrTools IslandMaxFlowGraph ctor'):
             if self.log_debug:
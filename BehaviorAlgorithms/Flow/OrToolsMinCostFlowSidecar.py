@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import pickle
 import struct
 import sys
@@ -40,16 +41,21 @@ def _write_message(stream, obj) -> None:
     stream.flush()
 
 
-def _solve(payload: dict) -> dict:
+def _solve_arrays(start_nodes, end_nodes, capacities, unit_costs, node_supplies):
     smcf = min_cost_flow.SimpleMinCostFlow()
-    start_nodes = np.asarray(payload['start_nodes'], dtype=np.int64)
-    end_nodes = np.asarray(payload['end_nodes'], dtype=np.int64)
-    capacities = np.asarray(payload['capacities'], dtype=np.int64)
-    unit_costs = np.asarray(payload['unit_costs'], dtype=np.int64)
-    node_supplies = np.asarray(payload['node_supplies'], dtype=np.int64)
     all_arcs = smcf.add_arcs_with_capacity_and_unit_cost(start_nodes, end_nodes, capacities, unit_costs)
     smcf.set_nodes_supplies(np.arange(len(node_supplies), dtype=np.int64), node_supplies)
     status = int(smcf.solve())
+    return smcf, all_arcs, status
+
+
+def _solve(payload: dict) -> dict:
+    smcf, all_arcs, status = _solve_arrays(
+        np.asarray(payload['start_nodes'], dtype=np.int64),
+        np.asarray(payload['end_nodes'], dtype=np.int64),
+        np.asarray(payload['capacities'], dtype=np.int64),
+        np.asarray(payload['unit_costs'], dtype=np.int64),
+        np.asarray(payload['node_supplies'], dtype=np.int64))
     result = {
         'status': status,
         'optimal_status': int(smcf.OPTIMAL),
@@ -62,22 +68,104 @@ def _solve(payload: dict) -> dict:
     return result
 
 
+def get_shared_memory_views(buffer, arc_capacity: int, node_capacity: int) -> tuple[np.ndarray, ...]:
+    """
+    The int64 arrays laid out back to back in a shared memory block: start_nodes, end_nodes, capacities, unit_costs and flows
+    (arc_capacity each), then node_supplies (node_capacity). OrToolsSidecarClient lays its block out the same way.
+    """
+    views = []
+    offset = 0
+    for count in (arc_capacity, arc_capacity, arc_capacity, arc_capacity, arc_capacity, node_capacity):
+        views.append(np.ndarray((count,), dtype=np.int64, buffer=buffer, offset=offset))
+        offset += count * 8
+    return tuple(views)
+
+
+class _AttachedSharedMemory(object):
+    """The clients shared memory block, kept attached across solves until the client swaps in a bigger one."""
+
+    def __init__(self):
+        self.name: str | None = None
+        self.shared_memory = None
+        self.views: tuple[np.ndarray, ...] = ()
+
+    def get_views(self, name: str, arc_capacity: int, node_capacity: int) -> tuple[np.ndarray, ...]:
+        if name != self.name:
+            self.close()
+            self.shared_memory = _attach_shared_memory(name)
+            self.name = name
+            self.views = get_shared_memory_views(self.shared_memory.buf, arc_capacity, node_capacity)
+        return self.views
+
+    def close(self):
+        # the views export the buffer, so have to go before it can be closed.
+        self.views = ()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+        self.shared_memory = None
+        self.name = None
+
+
+def _attach_shared_memory(name: str):
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # before 3.13 attaching also registers the block with this processes resource tracker, which would then unlink the
+    # clients block out from under it when the sidecar exits.
+    attached = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(attached._name, 'shared_memory')
+    return attached
+
+
+def _solve_shared_memory(request: dict, attached: _AttachedSharedMemory) -> dict:
+    """Solves the graph the client wrote into its shared memory block, writing the flows back into the block in place."""
+    start_nodes, end_nodes, capacities, unit_costs, flows, node_supplies = attached.get_views(
+        request['shm_name'], request['arc_capacity'], request['node_capacity'])
+    arc_count = request['arc_count']
+    smcf, all_arcs, status = _solve_arrays(
+        start_nodes[:arc_count],
+        end_nodes[:arc_count],
+        capacities[:arc_count],
+        unit_costs[:arc_count],
+        node_supplies[:request['node_count']])
+    result = {
+        'status': status,
+        'optimal_status': int(smcf.OPTIMAL),
+        'optimal_cost': None,
+    }
+    if status == int(smcf.OPTIMAL):
+        flows[:arc_count] = smcf.flows(all_arcs)
+        result['optimal_cost'] = int(smcf.optimal_cost())
+    return result
+
+
 def main() -> int:
     stdin = sys.stdin.buffer
     stdout = sys.stdout.buffer
+    attached = _AttachedSharedMemory()
     while True:
         request = _read_message(stdin)
         if request is None:
+            attached.close()
             return 0
         command = request.get('command')
         if command == 'shutdown':
+            attached.close()
             _write_message(stdout, {'ok': True})
             return 0
-        if command != 'solve':
+        if command not in ('solve', 'solve_shared_memory'):
             _write_message(stdout, {'error': f'Unknown command {command!r}'})
             continue
         try:
-            response = _solve(request)
+            if command == 'solve':
+                response = _solve(request)
+            else:
+                response = _solve_shared_memory(request, attached)
         except Exception as ex:
             _write_message(stdout, {'error': f'{type(ex).__name__}: {ex}'})
             continue
@@ -16,6 +16,7 @@ from Gather.GatherCaptureGroupKnapsacker import (
     GroupedKnapsackPreGroupInput,
     GroupedKnapsackPreGroupItem,
     GroupedKnapsackResult,
+    GroupedKnapsackWarmStartSolver,
     format_pre_group_input_for_test,
     solve_grouped_knapsack_pre_group_input,
     solve_grouped_knapsack_input,
@@ -224,6 +225,15 @@ class ArmyFlowExpanderV2:
         self.debug_render_capture_count_threshold: int = 10000
         """If there are more captures in any given plan option than this, then the option will be rendered inline as generated in a new debug viewer window."""
         self.use_debug_asserts: bool = DebugHelper.IS_DEBUGGING
+        self.use_warm_started_grouped_knapsack: bool = False
+        """If True, the grouped knapsack re-prunes only the option overlap components that changed since the previous solve (same results, see GroupedKnapsackWarmStartSolver)."""
+        self.run_flow_feasibility_diagnostics: bool = True
+        """If True, OR-Tools flow graph builds also run the FLOW_FEASIBILITY_BUG diagnostics. They only log."""
+        self.run_flow_max_flow_feasibility_diagnostic: bool = DebugHelper.IS_DEBUG_OR_UNIT_TEST_MODE
+        """
+        If True, the diagnostics also run the max-flow min-cut check, which is most of the graph build time. Off outside of
+        debug / unit tests; the cheap weak component check still runs and logs unbalanced or disconnected graphs.
+        """
 
         # Internal state
         self.flow_graph: IslandMaxFlowGraph | None = None
@@ -232,6 +242,7 @@ class ArmyFlowExpanderV2:
         self._networkx_finder: NetworkXFlowDirectionFinder | None = None  # Will be initialized when needed
         self._pymax_finder: PyMaxFlowDirectionFinder | None = None  # Will be initialized when needed
         self._ortools_finder: OrToolsFlowDirectionFinder | None = None  # Will be initialized when needed
+        self._grouped_knapsack_warm_solver: GroupedKnapsackWarmStartSolver | None = None  # Will be initialized when needed
         self.use_backpressure_from_enemy_general: bool = False
         self.live_render_invalid_flow_config = None
         self._target_crossable_cache: set[int] = set()  # Cache for target-crossable islands
@@ -566,6 +577,8 @@ class ArmyFlowExpanderV2:
                 self.live_render_invalid_flow_config,
             )
         self._ortools_finder.army_override_matrix = self.army_override_matrix
+        self._ortools_finder.run_feasibility_diagnostics = self.run_flow_feasibility_diagnostics
+        self._ortools_finder.run_max_flow_feasibility_diagnostic = self.run_flow_max_flow_feasibility_diagnostic
         if self._ortools_finder.threat_blocking_tiles is not self.threat_blocking_tiles:
             self._ortools_finder.threat_blocking_tiles = self.threat_blocking_tiles
             self._ortools_finder.invalidate_cache()
@@ -1676,10 +1689,11 @@ class ArmyFlowExpanderV2:
         """
         lookup_tables = []
 
-        logbook.warning(
-            f"FE_PHASE2_DIAG_ENTRY log_debug={self.log_debug} borderPairCount={len(border_pairs)} "
-            f"pairs={[self._diag_border_pair_anchor(pair) + ':diag' + str(self._is_diag_border_pair(pair)) for pair in border_pairs]}"
-        )
+        if self.log_debug:
+            logbook.warning(
+                f"FE_PHASE2_DIAG_ENTRY borderPairCount={len(border_pairs)} "
+                f"pairs={[self._diag_border_pair_anchor(pair) + ':diag' + str(self._is_diag_border_pair(pair)) for pair in border_pairs]}"
+            )
 
         # Single O(V+E) precompute of all per-island trunk gather/capture potentials, shared across
         # every border pair below (replaces the old per-border-pair BFS/DFS reachability computation).
@@ -2878,7 +2892,12 @@ class ArmyFlowExpanderV2:
             item_descriptions=item_descriptions,
             max_iterations=32,
         )
-        grouped_result = solve_grouped_knapsack_input(grouped_input, noLog=not self.log_debug, perfTimer=self.perf_timer)
+        if self.use_warm_started_grouped_knapsack:
+            if self._grouped_knapsack_warm_solver is None:
+                self._grouped_knapsack_warm_solver = GroupedKnapsackWarmStartSolver()
+            grouped_result = self._grouped_knapsack_warm_solver.solve(grouped_input, noLog=not self.log_debug, perfTimer=self.perf_timer)
+        else:
+            grouped_result = solve_grouped_knapsack_input(grouped_input, noLog=not self.log_debug, perfTimer=self.perf_timer)
         chosen_items = [items[index] for index in grouped_result.chosen_indices]
         max_value = grouped_result.max_value
 
@@ -5,6 +5,7 @@ import traceback
 import typing
 from unittest import mock
 
+import MctsRootParallel
 import SearchUtils
 from ArmyEngine import ArmyEngine, ArmySimResult
 from ArmyTracker import Army
@@ -1328,4 +1329,190 @@ dur 0.3073, iter   109, nodesExplored   109, rollouts   109,
             f'AVG:\ndur {outer_avg_duration:.4f}, iter {str(outer_avg_iterations).rjust(5)}, nodesExplored {str(outer_avg_nodes_explored).rjust(5)}, rollouts {str(outer_avg_trials_performed).rjust(5)}, \n                      backprops {str(outer_avg_backprop_iter).rjust(5)}, rolloutExpansions {str(outer_avg_rollout_expansions).rjust(5)}, biasedRolloutExpansions {str(outer_avg_biased_rollout_expansions).rjust(5)}')
 
         logbook.info("Perf metrics:")
-        logbook.info(str(sharedTelemetry))
\ No newline at end of file
+        logbook.info(str(sharedTelemetry))
+
+    def test_benchmark_mcts__undo_log_rollouts_vs_cloned_rollouts(self):
+        # Rollouts per second with MctsDUCT.use_undo_log_rollouts off (one board clone per rollout, then in-place moves) vs on
+        # (moves recorded into an ArmySimUndoLog on the nodes board and unmade after the rollout).
+        self.begin_capturing_logging()
+        trialsPerParamSet = 8
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+
+        for rolloutDepth in [5, 15, 50, 100]:
+            rolloutsPerSecond = {}
+            for useUndoLog in [False, True]:
+                with self.subTest(rolloutDepth=rolloutDepth, useUndoLog=useUndoLog):
+                    rollouts = 0
+                    plies = 0
+                    duration = 0.0
+                    for i in range(trialsPerParamSet):
+                        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+                        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+                        boardAnalysis = BoardAnalyzer(map, general)
+                        boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+                        mcts = MctsDUCT()
+                        mcts.use_undo_log_rollouts = useUndoLog
+                        mcts.rollout_depth = rolloutDepth
+                        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=0.3, mctsRunner=mcts)
+                        armyEngine.friendly_has_kill_threat = True
+                        armyEngine.enemy_has_kill_threat = True
+                        random.seed(i)
+                        armyEngine.scan(6, mcts=True)
+
+                        summary = mcts.last_summary
+                        rollouts += summary.trials_performed
+                        plies += summary.rollout_expansions
+                        duration += summary.duration
+
+                    self.assertGreater(rollouts, 0)
+                    rolloutsPerSecond[useUndoLog] = rollouts / duration
+                    logbook.info(f'depth {rolloutDepth} undoLog {useUndoLog}: {rollouts / duration:.0f} rollouts/s, {plies / duration:.0f} rollout moves/s')
+
+            logbook.info(f'depth {rolloutDepth}: undo log / clone rollouts per second ratio {rolloutsPerSecond[True] / rolloutsPerSecond[False]:.2f}')
+
+    def test_benchmark_mcts__root_parallel_workers(self):
+        # Total root iterations per scan with MctsDUCT.root_parallel_workers extra searches merged in. Only meaningful with at
+        # least workers + 1 free cores; the pool is warmed up first so worker spawn / import time isn't counted.
+        self.begin_capturing_logging()
+        trialsPerParamSet = 8
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+
+        for workers in [0, 1, 3, 7]:
+            with self.subTest(workers=workers):
+                if workers > 0:
+                    MctsRootParallel.get_pool(workers)
+                    time.sleep(5.0)
+
+                iterations = 0
+                duration = 0.0
+                workerIterations = []
+                for i in range(trialsPerParamSet):
+                    map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+                    aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+                    boardAnalysis = BoardAnalyzer(map, general)
+                    boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+                    mcts = MctsDUCT()
+                    mcts.root_parallel_workers = workers
+                    armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=0.3, mctsRunner=mcts)
+                    armyEngine.friendly_has_kill_threat = True
+                    armyEngine.enemy_has_kill_threat = True
+                    random.seed(i)
+                    start = time.perf_counter()
+                    armyEngine.scan(6, mcts=True)
+                    duration += time.perf_counter() - start
+
+                    summary = mcts.last_summary
+                    self.assertEqual(summary.iterations, sum(summary.worker_iterations))
+                    iterations += summary.iterations
+                    workerIterations.append(summary.worker_iterations)
+
+                logbook.info(f'{workers} root parallel workers: {iterations / trialsPerParamSet:.0f} root iterations per scan, {duration / trialsPerParamSet:.3f}s per scan, per worker {workerIterations}')
+
+        MctsRootParallel.shutdown_pool()
+
+    def test_benchmark_mcts__transposition_table(self):
+        # Iterations, iterations to convergence and transposition hits per scan with MctsDUCT.use_transposition_table off / on.
+        self.begin_capturing_logging()
+        trialsPerParamSet = 8
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+
+        for useTranspositionTable in [False, True]:
+            with self.subTest(useTranspositionTable=useTranspositionTable):
+                iterations = 0
+                iterationsToConvergence = 0
+                hits = 0
+                for i in range(trialsPerParamSet):
+                    map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+                    aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+                    boardAnalysis = BoardAnalyzer(map, general)
+                    boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+                    mcts = MctsDUCT()
+                    mcts.use_transposition_table = useTranspositionTable
+                    armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=0.3, mctsRunner=mcts)
+                    armyEngine.friendly_has_kill_threat = True
+                    armyEngine.enemy_has_kill_threat = True
+                    random.seed(i)
+                    armyEngine.scan(6, mcts=True)
+
+                    summary = mcts.last_summary
+                    iterations += summary.iterations
+                    iterationsToConvergence += summary.iterations_to_convergence
+                    hits += summary.transposition_hits
+
+                logbook.info(f'transposition table {useTranspositionTable}: {iterations / trialsPerParamSet:.0f} iterations per scan, converged @{iterationsToConvergence / trialsPerParamSet:.0f}, {hits / trialsPerParamSet:.0f} transposition hits')
+
+    def test_benchmark_mcts__batch_rollouts(self):
+        # Rollouts per second with MctsDUCT.rollout_batch_size 0 (one scalar Game.playout per iteration) vs numpy batches of
+        # rollout_batch_size random rollouts per iteration.
+        self.begin_capturing_logging()
+        trialsPerParamSet = 8
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+
+        for rolloutDepth in [15, 100]:
+            rolloutsPerSecond = {}
+            for batchSize in [0, 32, 128, 256]:
+                with self.subTest(rolloutDepth=rolloutDepth, batchSize=batchSize):
+                    rollouts = 0
+                    iterations = 0
+                    duration = 0.0
+                    for i in range(trialsPerParamSet):
+                        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+                        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+                        boardAnalysis = BoardAnalyzer(map, general)
+                        boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+                        mcts = MctsDUCT()
+                        mcts.rollout_batch_size = batchSize
+                        mcts.rollout_depth = rolloutDepth
+                        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=0.3, mctsRunner=mcts)
+                        armyEngine.friendly_has_kill_threat = True
+                        armyEngine.enemy_has_kill_threat = True
+                        random.seed(i)
+                        armyEngine.scan(6, mcts=True)
+
+                        summary = mcts.last_summary
+                        rollouts += summary.trials_performed
+                        iterations += summary.iterations
+                        duration += summary.duration
+
+                    self.assertGreater(rollouts, 0)
+                    rolloutsPerSecond[batchSize] = rollouts / duration
+                    logbook.info(f'depth {rolloutDepth} batch {batchSize}: {rollouts / duration:.0f} rollouts/s, {iterations / trialsPerParamSet:.0f} iterations per scan')
+
+            for batchSize in [32, 128, 256]:
+                logbook.info(f'depth {rolloutDepth}: batch {batchSize} / scalar rollouts per second ratio {rolloutsPerSecond[batchSize] / rolloutsPerSecond[0]:.2f}')
+
+    def test_benchmark_brute_force__pruning_and_iterative_deepening(self):
+        # Depth reached and iterations per brute force scan within the same time limit, with the full payoff matrices, with
+        # ArmyEngine.brute_force_pruning, and with brute_force_iterative_deepening on top.
+        self.begin_capturing_logging()
+        trialsPerParamSet = 5
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+
+        for timeCap in [0.05, 0.1, 0.3]:
+            for pruning, iterativeDeepening in [(False, False), (True, False), (True, True)]:
+                with self.subTest(timeCap=timeCap, pruning=pruning, iterativeDeepening=iterativeDeepening):
+                    depthReached = 0
+                    iterations = 0
+                    duration = 0.0
+                    for i in range(trialsPerParamSet):
+                        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+                        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+                        boardAnalysis = BoardAnalyzer(map, general)
+                        boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+                        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=timeCap)
+                        armyEngine.friendly_has_kill_threat = True
+                        armyEngine.enemy_has_kill_threat = True
+                        armyEngine.brute_force_pruning = pruning
+                        armyEngine.brute_force_iterative_deepening = iterativeDeepening
+                        start = time.perf_counter()
+                        armyEngine.scan(10, noThrow=True)
+                        duration += time.perf_counter() - start
+                        depthReached += armyEngine.brute_force_depth_reached
+                        iterations += armyEngine.iterations
+
+                    logbook.info(f'timeCap {timeCap} pruning {pruning} deepening {iterativeDeepening}: depth {depthReached / trialsPerParamSet:.1f}, {iterations / trialsPerParamSet:.0f} iterations, {duration / trialsPerParamSet:.3f}s per scan')
@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+
+from Algorithms import CompactTileIslands, TileIslandBuilder
+from BoardAnalyzer import BoardAnalyzer
+from Tests.TestBase import TestBase
+from base.client.map import MapBase
+
+
+class CompactTileIslandsBenchmarkTests(TestBase):
+    def __init__(self, methodName: str = ...):
+        MapBase.DO_NOT_RANDOMIZE = True
+        super().__init__(methodName)
+
+    def clone_builder_islands(self, builder: TileIslandBuilder):
+        """What copying the builders island state for a lookahead / flow graph build costs today: every island plus the tile lookup."""
+        clones = {island.unique_id: island.clone(copyId=True) for island in builder.all_tile_islands}
+        lookup = builder.tile_island_lookup.copy()
+        return clones, lookup
+
+    def test_benchmark_compact_tile_islands_memory_and_clone_time(self):
+        mapFiles = [
+            ('GameContinuationEntries/should_defend_2v2_ally___FRAa_4Nfr---2--189.txtmap', 189),
+            ('GameContinuationEntries/should_find_kill_in_ffa_position___eW64nZ8rZ---2--69.txtmap', 69),
+            ('GameContinuationEntries/shouldnt_create_broken_islands_after_captures___9GHWHfzuU---1--745.txtmap', 745),
+            ('GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap', 880),
+        ]
+        clones = 200
+        for mapFile, turn in mapFiles:
+            map, general, enemyGeneral = self.load_map_and_generals(mapFile, turn, fill_out_tiles=True)
+            analysis = BoardAnalyzer(map, general)
+            analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+
+            tracemalloc.start()
+            builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+            builder.use_debug_asserts = False
+            builder.log_debug = False
+            before = tracemalloc.take_snapshot()
+            builder.recalculate_tile_islands(enemyGeneral)
+            builderBytes = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, 'filename') if s.size_diff > 0)
+
+            before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            compact = CompactTileIslands.from_builder(builder)
+            snapshotDuration = time.perf_counter() - start
+            compactBytes = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, 'filename') if s.size_diff > 0)
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            for _ in range(clones):
+                self.clone_builder_islands(builder)
+            islandCloneDuration = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(clones):
+                compact.clone()
+            compactCloneDuration = time.perf_counter() - start
+
+            print(
+                f'{mapFile[24:80]:56s} {len(map.tiles_by_index)} tiles {compact.leaf_count} islands: '
+                f'builder {builderBytes / 1024:7.1f}KB, compact {compactBytes / 1024:6.1f}KB ({compact.nbytes / 1024:5.1f}KB arrays, snapshot {snapshotDuration * 1000:.2f}ms), '
+                f'clone {islandCloneDuration * 1000000 / clones:7.1f}us vs compact {compactCloneDuration * 1000000 / clones:6.1f}us')
+            self.assertLess(compactBytes, builderBytes)
+            self.assertLess(compactCloneDuration, islandCloneDuration)
@@ -8,6 +8,8 @@ import collections
 
 import multiprocessing
 
+import KnapsackUtils
+
 
 def brute(worker, data_list, processes=8):
     """
@@ -93,6 +95,9 @@ VERSIONS = {
     # "cython": "from KnapsackUtilsCython import solve_multiple_choice_knapsack",
     # "cpp_loop": "from KnapsackUtilsPy import solve_multiple_choice_knapsack",
     "cpp_full": "from KnapsackUtils import solve_multiple_choice_knapsack as solve_multiple_choice_knapsack",
+    "cpp_low_memory": "from KnapsackUtils import solve_multiple_choice_knapsack_low_memory as solve_multiple_choice_knapsack",
+    # "cpp_fptas_10": "import functools; from KnapsackUtils import solve_multiple_choice_knapsack_low_memory; solve_multiple_choice_knapsack = functools.partial(solve_multiple_choice_knapsack_low_memory, approximationEpsilon=0.1)",
+    # "pure_py_low_memory": "from KnapsackUtilsPy import solve_multiple_choice_knapsack_low_memory_purepy as solve_multiple_choice_knapsack",
     # "cpp_noinit": "from KnapsackUtils import solve_multiple_choice_knapsack as solve_multiple_choice_knapsack",
     # "pure_py": "from KnapsackUtilsPy import solve_multiple_choice_knapsack_purepy as solve_multiple_choice_knapsack",
 }    
@@ -167,8 +172,56 @@ def plot_runtime():
     ax.get_figure().savefig('fig.png')
 
 
+def get_large_args(items_len, groups_len, capacity, max_value):
+    args = get_args(items_len, groups_len)
+    args['capacity'] = capacity
+    args['values'] = [random.randrange(max_value) for _ in args['items']]
+    return args
+
+
+def compare_large_inputs():
+    """
+    The gather / expansion sized inputs the low memory solver is for: hundreds of items at 100+ capacity, where the full
+    (items + 1) * (capacity + 1) table stops fitting in cache. The FPTAS rows only win once capacity is large compared to
+    groups / epsilon, and show how far below optimal they land.
+    """
+    versions = {
+        "full": lambda a: KnapsackUtils.solve_multiple_choice_knapsack(**a),
+        "low_memory": lambda a: KnapsackUtils.solve_multiple_choice_knapsack_low_memory(**a),
+        "fptas_10": lambda a: KnapsackUtils.solve_multiple_choice_knapsack_low_memory(**a, approximationEpsilon=0.1),
+        "fptas_30": lambda a: KnapsackUtils.solve_multiple_choice_knapsack_low_memory(**a, approximationEpsilon=0.3),
+    }
+
+    pandas.set_option('display.max_columns', None)
+    pandas.set_option('display.width', 1000)
+    rows = []
+    for items_len, groups_len, capacity, max_value in [
+        (200, 50, 75, 150),
+        (400, 20, 100, 150),
+        (600, 150, 200, 150),
+        (1000, 300, 400, 150),
+        (400, 100, 2000, 150),
+        (400, 40, 5000, 100000),
+        (1000, 60, 20000, 100000),
+    ]:
+        a = get_large_args(items_len, groups_len, capacity, max_value)
+        row = {"len(items)": items_len, "group count": groups_len, "capacity": capacity, "max value": max_value}
+        optimal = None
+        for version, solve in versions.items():
+            start = time.perf_counter()
+            value, chosen = solve(a)
+            row[version] = time.perf_counter() - start
+            if optimal is None:
+                optimal = value
+            row[f'{version} value'] = value / max(1, optimal)
+        rows.append(row)
+
+    print(pandas.DataFrame(rows))
+
+
 def main():
     # plot_runtime()
+    # compare_large_inputs()
     compare_versions()
 
 # run as python -m Benchmarks.test_Knapsack_Benchmark
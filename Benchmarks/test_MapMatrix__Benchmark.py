@@ -11,7 +11,7 @@ import logbook
 import SearchUtils
 from DistanceMapperImpl import DistanceMapperImpl
 from Interfaces import MapMatrixInterface
-from MapMatrix import MapMatrix, MapMatrixSet  #, MapMatrixSetWithLength, MapMatrixSetWithLengthAndTiles
+from MapMatrix import MapMatrix, MapMatrixSet, IntMapMatrix  #, MapMatrixSetWithLength, MapMatrixSetWithLengthAndTiles
 from Tests.TestBase import TestBase
 from ViewInfo import PathColorer
 from base.client.tile import Tile
@@ -1596,6 +1596,85 @@ class MapMatrixBenchmarkTests(TestBase):
 
                     self.assertLess(mapMatrixTotalDur, dictTotalDuration, f'mapMatrix stopped being faster at iterations {iterations}')
 
+    def test_benchmark_numeric_mapmatrix__bulk_ops__should_be_faster_than_list_mapmatrix(self):
+        for mapSize in [
+            'small',
+            'large'
+        ]:
+            if mapSize == 'large':
+                mapFile = 'GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap'
+            else:
+                mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+
+            map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136)
+            self.begin_capturing_logging()
+
+            listMatrices = [MapMatrix(map, 0) for _ in range(3)]
+            for i, matrix in enumerate(listMatrices):
+                for tile in map.get_all_tiles():
+                    matrix.raw[tile.tile_index] = (tile.tile_index * (i + 3)) % 17 - 5
+            numpyMatrices = [IntMapMatrix.from_matrix(m) for m in listMatrices]
+
+            ops = {
+                'copy': lambda cls, matrices: matrices[0].copy(),
+                'get_summed': lambda cls, matrices: cls.get_summed(matrices),
+                'add_to_matrix': lambda cls, matrices: cls.add_to_matrix(matrices[0], matrices[1]),
+                'subtract_from_matrix': lambda cls, matrices: cls.subtract_from_matrix(matrices[0], matrices[1]),
+                'negate_in_place': lambda cls, matrices: matrices[2].negate_in_place(),
+                'get_min_normalized_via_sum': lambda cls, matrices: cls.get_min_normalized_via_sum(matrices[1], normalizedMinimum=1),
+                'threshold': lambda cls, matrices: [t for t in map.get_all_tiles() if matrices[1].raw[t.tile_index] >= 3] if cls is MapMatrix else matrices[1].get_tiles_at_or_above(3),
+            }
+
+            for opName, op in ops.items():
+                with self.subTest(mapSize=mapSize, op=opName):
+                    listDuration = timeit(lambda: op(MapMatrix, listMatrices), number=2000)
+                    numpyDuration = timeit(lambda: op(IntMapMatrix, numpyMatrices), number=2000)
+
+                    logbook.info(f'{mapSize} {opName}: MapMatrix {listDuration:.4f} vs IntMapMatrix {numpyDuration:.4f} (ratio {listDuration / numpyDuration:.2f}x)')
+                    if opName != 'copy':
+                        # list.copy() is a memcpy too, the two are close.
+                        self.assertLess(numpyDuration, listDuration, f'IntMapMatrix should win bulk {opName}')
+
+    def test_benchmark_numeric_mapmatrix__per_element_access__list_mapmatrix_wins_raw_access(self):
+        for mapSize in [
+            'small',
+            'large'
+        ]:
+            with self.subTest(mapSize=mapSize):
+                if mapSize == 'large':
+                    mapFile = 'GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap'
+                else:
+                    mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136)
+                self.begin_capturing_logging()
+                tiles = list(map.get_all_tiles())
+
+                listMatrix = MapMatrix(map, 1)
+                numpyMatrix = IntMapMatrix(map, 1)
+
+                def access_raw(matrix):
+                    raw = matrix.raw
+                    val = 0
+                    for tile in tiles:
+                        raw[tile.tile_index] = val
+                        val += raw[tile.tile_index]
+
+                def access_getitem(matrix):
+                    val = 0
+                    for tile in tiles:
+                        val += matrix[tile]
+
+                listRawDuration = timeit(lambda: access_raw(listMatrix), number=500)
+                numpyRawDuration = timeit(lambda: access_raw(numpyMatrix), number=500)
+                listGetDuration = timeit(lambda: access_getitem(listMatrix), number=500)
+                numpyGetDuration = timeit(lambda: access_getitem(numpyMatrix), number=500)
+
+                logbook.info(f'{mapSize} .raw[idx] access: MapMatrix {listRawDuration:.4f} vs IntMapMatrix {numpyRawDuration:.4f}')
+                logbook.info(f'{mapSize} [tile] access: MapMatrix {listGetDuration:.4f} vs IntMapMatrix {numpyGetDuration:.4f}')
+
+                self.assertLess(listRawDuration, numpyRawDuration, 'list backed raw access should beat numpy scalar boxing')
+
     def test_benchmark_empty_sets(self):
         self.begin_capturing_logging()
         for numChecks in [20, 50, 100, 500]:
@@ -0,0 +1,100 @@
+import random
+import time
+
+from Algorithms import TileIslandBuilder
+from Behavior.ArmyInterceptor import ThreatBlockInfo
+from BehaviorAlgorithms.Flow.OrToolsFlowDirectionFinder import DirectOrToolsGraphBuilder
+from BoardAnalyzer import BoardAnalyzer
+from PerformanceTimer import PerformanceTimer
+from Tests.TestBase import TestBase
+from base.client.map import MapBase
+
+
+class OrToolsFlowGraphBuildBenchmarkTests(TestBase):
+    def __init__(self, methodName: str = ...):
+        MapBase.DO_NOT_RANDOMIZE = True
+        super().__init__(methodName)
+
+    def test_benchmark_flow_graph_build__feasibility_diagnostics(self):
+        """
+        Per turn no_neut + inc_neut graph build time on FlowExpansion unit test maps, over turns of army growth plus a capture every other turn:
+        a full build with all of the feasibility diagnostics, with only the weak component check, and without them. Like the bot, every turn
+        hands in a new threat blocking dict, blocking a few friendly tiles on the enemy border.
+        """
+        mapFiles = [
+            ('GameContinuationEntries/a_more_open_normal_map___VY49QNB72---1--250.txtmap', 250),
+            ('GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap', 250),
+            ('GameContinuationEntries/shouldnt_take_300ms_to_build_flow_expand___6vYE_GTas---1--139.txtmap', 139),
+            ('GameContinuationEntries/should_not_fail_to_find_flow_expansion_routes__what_the_fuck___fHjzkD6XM---0--484.txtmap', 484),
+        ]
+        turns = 30
+        for mapFile, turn in mapFiles:
+            map, general, enemyGeneral = self.load_map_and_generals(mapFile, turn, fill_out_tiles=True)
+            analysis = BoardAnalyzer(map, general)
+            analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+            builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+            builder.recalculate_tile_islands(enemyGeneral)
+            for tile in map.tiles_by_index:
+                tile.delta.oldArmy = tile.army
+                tile.delta.oldOwner = tile.player
+                tile.delta.newOwner = tile.player
+
+            team = map.team_ids_by_player_index[general.player]
+            targetTeam = map.team_ids_by_player_index[enemyGeneral.player]
+            perfTimer = PerformanceTimer()
+            rand = random.Random(5)
+            diagnosedDuration = 0.0
+            weakOnlyDuration = 0.0
+            fullDuration = 0.0
+            with perfTimer.begin_move(map.turn):
+                for i in range(turns):
+                    if i > 0:
+                        map.turn += 1
+                        for tile in map.players[general.player].tiles:
+                            if tile.isGeneral or tile.isCity:
+                                tile.army += 1
+                                tile.delta.oldArmy = tile.army - 1
+                        if i % 2 == 0:
+                            captures = [
+                                adj
+                                for tile in map.players[general.player].tiles if tile.army > 2
+                                for adj in tile.movable if adj.player == -1 and not adj.isObstacle and not adj.isCity and adj in map.reachable_tiles
+                            ]
+                            if captures:
+                                captured = rand.choice(captures)
+                                captured.delta.oldOwner = captured.player
+                                captured.delta.newOwner = general.player
+                                captured.delta.oldArmy = captured.army
+                                captured.player = general.player
+                                captured.tile = general.player
+                                captured.army = 1
+                        builder.update_tile_islands(enemyGeneral)
+
+                    threatBlockingTiles = {}
+                    for tile in map.players[general.player].tiles:
+                        enemyAdj = [adj for adj in tile.movable if adj.player == enemyGeneral.player]
+                        if enemyAdj and len(threatBlockingTiles) < 8:
+                            threatBlockingTiles[tile] = ThreatBlockInfo(tile, 2)
+                            threatBlockingTiles[tile].add_blocked_destination(enemyAdj[0])
+
+                    for useNeutralFlow in (False, True):
+                        args = (builder, analysis.intergeneral_analysis, map, team, targetTeam, general, enemyGeneral, False, useNeutralFlow, None, None, threatBlockingTiles, None, perfTimer)
+                        start = time.perf_counter()
+                        DirectOrToolsGraphBuilder().build(*args)
+                        diagnosedDuration += time.perf_counter() - start
+                        weakOnlyBuilder = DirectOrToolsGraphBuilder()
+                        weakOnlyBuilder.run_max_flow_feasibility_diagnostic = False
+                        start = time.perf_counter()
+                        weakOnlyBuilder.build(*args)
+                        weakOnlyDuration += time.perf_counter() - start
+                        fullBuilder = DirectOrToolsGraphBuilder()
+                        fullBuilder.run_feasibility_diagnostics = False
+                        start = time.perf_counter()
+                        fullBuilder.build(*args)
+                        fullDuration += time.perf_counter() - start
+
+            print(
+                f'{mapFile[24:80]:56s} {len(builder.all_tile_islands)} islands: full with diagnostics {diagnosedDuration * 1000 / turns:6.2f}ms/turn, '
+                f'weak component check only {weakOnlyDuration * 1000 / turns:6.2f}ms/turn, without {fullDuration * 1000 / turns:6.2f}ms/turn')
+            self.assertLess(fullDuration, diagnosedDuration)
+            self.assertLess(weakOnlyDuration, diagnosedDuration)
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+import numpy as np
+
+from BehaviorAlgorithms.Flow.OrToolsFlowDirectionFinder import InProcOrToolsClient, OrToolsGraphData, OrToolsSidecarClient
+from Tests.TestBase import TestBase
+
+
+class OrToolsSidecarBenchmarkTests(TestBase):
+    def build_grid_flow_graph(self, width: int, height: int, seed: int) -> OrToolsGraphData:
+        """Bidirectional grid of islands, with a few big supplies in the top left draining into demands in the bottom right."""
+        rand = random.Random(seed)
+        nodeCount = width * height
+        startNodes = []
+        endNodes = []
+        capacities = []
+        unitCosts = []
+        for y in range(height):
+            for x in range(width):
+                node = y * width + x
+                for adjX, adjY in ((x + 1, y), (x, y + 1)):
+                    if adjX >= width or adjY >= height:
+                        continue
+                    adj = adjY * width + adjX
+                    for fromNode, toNode in ((node, adj), (adj, node)):
+                        startNodes.append(fromNode)
+                        endNodes.append(toNode)
+                        capacities.append(rand.randint(50, 400))
+                        unitCosts.append(rand.randint(1, 20))
+
+        supplies = [0] * nodeCount
+        for i in range(8):
+            supplies[i * width + i] += 100
+            supplies[nodeCount - 1 - i * width - i] -= 100
+
+        nodeIds = np.arange(nodeCount, dtype=np.int64)
+        return OrToolsGraphData(
+            start_nodes=np.array(startNodes, dtype=np.int64),
+            end_nodes=np.array(endNodes, dtype=np.int64),
+            capacities=np.array(capacities, dtype=np.int64),
+            unit_costs=np.array(unitCosts, dtype=np.int64),
+            node_ids=nodeIds,
+            node_supplies=np.array(supplies, dtype=np.int64),
+            node_to_idx={i: i for i in range(nodeCount)},
+            idx_to_node={i: i for i in range(nodeCount)},
+            demand_lookup={},
+            neutral_sinks=set(),
+            fake_nodes=set(),
+            cumulative_demand=800)
+
+    def test_benchmark_sidecar_transports_per_solve_latency(self):
+        inProc = InProcOrToolsClient()
+        pickled = OrToolsSidecarClient()
+        sharedMemory = OrToolsSidecarClient()
+        sharedMemory.use_shared_memory = True
+        clients = [('inproc', inProc), ('sidecar pickle', pickled), ('sidecar shared memory', sharedMemory)]
+
+        for width, height in [(8, 8), (20, 20), (45, 45)]:
+            graphs = [self.build_grid_flow_graph(width, height, seed) for seed in range(5)]
+            expected = [inProc.solve(graph) for graph in graphs]
+            for name, client in clients:
+                # warm up the sidecar process / shared memory block.
+                client.solve(graphs[0])
+                durations = []
+                for i in range(100):
+                    graph = graphs[i % len(graphs)]
+                    start = time.perf_counter()
+                    result = client.solve(graph)
+                    durations.append(time.perf_counter() - start)
+                    self.assertEqual(expected[i % len(graphs)].optimal_cost, result.optimal_cost)
+                    self.assertEqual(expected[i % len(graphs)].flows, result.flows)
+
+                print(
+                    f'{width}x{height} ({len(graphs[0].start_nodes)} arcs) {name:22s}: '
+                    f'median {statistics.median(durations) * 1000:7.3f}ms, mean {statistics.mean(durations) * 1000:7.3f}ms')
+
+        pickled._release_shared_memory()
+        sharedMemory._release_shared_memory()
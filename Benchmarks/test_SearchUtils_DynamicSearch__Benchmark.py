@@ -348,6 +348,88 @@ for i in range(0, {numChecks}):
                 # report the result
                 logbook.info(f'{numChecks}: while myDeque.qsize() != 0: {result:.4f} seconds')
 
+    def test_benchmark_dynamic_max_variants__nodes_per_second(self):
+        """
+        Nodes generated (priorityFunc calls) per second, best of 5, 30 random start tiles on the large map.
+        Before: priority queue put/get method calls on the list-copying variants, heapq. attribute lookups and Tile.__eq__ for the parent check.
+        After: direct heappush/heappop on the queue list, identity parent check.
+
+        breadth_first_dynamic_max                                  before  653,415/s  after  692,364/s
+        breadth_first_dynamic_max_per_tile                         before  610,286/s  after  655,515/s
+        breadth_first_dynamic_max (list copying, depth 9)          before  328,287/s  after  334,964/s
+        breadth_first_dynamic_max_per_tile_per_distance (depth 9)  before  306,125/s  after  318,463/s
+
+        The opt in packed priority keys (build_priority_key_packer(7), one run of this benchmark). The heaps stay small, tuple
+        compares mostly stop at dist already, so the pack call per push costs more than the int compares save:
+
+        breadth_first_dynamic_max                                  tuples  662,670/s  packed  515,853/s
+        breadth_first_dynamic_max_per_tile                         tuples  675,879/s  packed  462,410/s
+        breadth_first_dynamic_max (list copying, depth 9)          tuples  299,090/s  packed  282,964/s
+        breadth_first_dynamic_max_per_tile_per_distance (depth 9)  tuples  285,050/s  packed  249,322/s
+        """
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+        searchingPlayer = general.player
+        numPrioCalls = 0
+
+        def prioFunc(nextTile: Tile, prioObj):
+            nonlocal numPrioCalls
+            numPrioCalls += 1
+            dist, negCityCount, negEnemyTileCount, negArmySum, sumX, sumY, goalIncrement = prioObj
+            dist += 1
+            if nextTile.isCity:
+                negCityCount -= 1
+            if nextTile.player != searchingPlayer and nextTile.player != -1:
+                negEnemyTileCount -= 1
+            if nextTile.player == searchingPlayer:
+                negArmySum -= nextTile.army
+            else:
+                negArmySum += nextTile.army
+            negArmySum += 1 - goalIncrement
+            return dist, negCityCount, negEnemyTileCount, negArmySum, sumX + nextTile.x, sumY + nextTile.y, goalIncrement
+
+        def valueFunc(tile: Tile, prioObj):
+            if prioObj[0] == 0:
+                return None
+            return 0 - prioObj[3] / prioObj[0], 0 - prioObj[2]
+
+        startTiles = random.Random(1).sample(list(map.pathable_tiles), 30)
+
+        # every field of the benchmark priority is an int (goalIncrement stays 0), so the whole tuple packs.
+        packer = SearchUtils.build_priority_key_packer(7)
+
+        variants = [
+            ('breadth_first_dynamic_max', SearchUtils.breadth_first_dynamic_max, {}),
+            ('breadth_first_dynamic_max packed keys', SearchUtils.breadth_first_dynamic_max, dict(priorityKeyFunc=packer)),
+            ('breadth_first_dynamic_max_per_tile', SearchUtils.breadth_first_dynamic_max_per_tile, {}),
+            ('breadth_first_dynamic_max_per_tile packed keys', SearchUtils.breadth_first_dynamic_max_per_tile, dict(priorityKeyFunc=packer)),
+            ('breadth_first_dynamic_max (list copying, depth 9)', SearchUtils.breadth_first_dynamic_max, dict(useGlobalVisitedSet=False, maxDepth=9)),
+            ('breadth_first_dynamic_max (list copying, depth 9) packed keys', SearchUtils.breadth_first_dynamic_max, dict(useGlobalVisitedSet=False, maxDepth=9, priorityKeyFunc=packer)),
+            ('breadth_first_dynamic_max_per_tile_per_distance (depth 9)', SearchUtils.breadth_first_dynamic_max_per_tile_per_distance, dict(useGlobalVisitedSet=False, maxDepth=9)),
+            ('breadth_first_dynamic_max_per_tile_per_distance (depth 9) packed keys', SearchUtils.breadth_first_dynamic_max_per_tile_per_distance, dict(useGlobalVisitedSet=False, maxDepth=9, priorityKeyFunc=packer)),
+        ]
+
+        self.begin_capturing_logging()
+        for name, searchFunc, kwargs in variants:
+            bestTime = 1000.0
+            for run in range(5):
+                numPrioCalls = 0
+                duration = 0.0
+                for startTile in startTiles:
+                    start = time.perf_counter()
+                    searchFunc(
+                        map,
+                        {startTile: ((0, 0, 0, 1 - startTile.army, startTile.x, startTile.y, 0), 0)},
+                        valueFunc=valueFunc,
+                        priorityFunc=prioFunc,
+                        maxTime=100,
+                        noLog=True,
+                        **kwargs)
+                    duration += time.perf_counter() - start
+                bestTime = min(bestTime, duration)
+
+            logbook.info(f'{name}: {bestTime:.4f}s, {numPrioCalls} nodes, {numPrioCalls / bestTime:,.0f} nodes/s')
+
     # def test_benchmark_dynamic_algo_times_via_dynamic_search(self):
     #     debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and True
     #     mapFile = 'GameContinuationEntries/should_not_do_infinite_intercepts_costing_tons_of_time___qg3nAW1cN---1--708.txtmap'
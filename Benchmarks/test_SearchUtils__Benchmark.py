@@ -8,6 +8,7 @@ import heap_class
 import logbook
 
 import SearchUtils
+from DistanceMapperDenseImpl import DistanceMapperDenseImpl
 from DistanceMapperImpl import DistanceMapperImpl
 from Tests.TestBase import TestBase
 from ViewInfo import PathColorer
@@ -111,6 +112,74 @@ class SearchUtilsBenchmarkTests(TestBase):
 
         self.run_shortest_path_algo_comparison(map, ranges)
 
+    def test_benchmark_distance_mapper_lazy_vs_dense(self):
+        mapFiles = [
+            ('GameContinuationEntries/should_kill_point_blank_army_lul___ffrBNaR9l---0--133.txtmap', 133),
+            ('GameContinuationEntries/random_large_gather_test___reOqoXEp2---g--864.txtmap', 864),
+            ('GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap', 2),
+        ]
+        self.begin_capturing_logging()
+        for mapFile, turn in mapFiles:
+            with self.subTest(mapFile=mapFile):
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, turn, fill_out_tiles=False)
+                allTiles = list(map.get_all_tiles())
+                points = list(map.pathable_tiles)
+                random.shuffle(points)
+                points = points[0:110]
+                numRecalcs = 5
+
+                start = time.perf_counter()
+                lazyMapper = DistanceMapperImpl(map)
+                for i in range(numRecalcs):
+                    lazyMapper.recalculate()
+                    for tile in allTiles:
+                        lazyMapper.get_tile_dist_matrix(tile)
+                lazyBuildTime = (time.perf_counter() - start) / numRecalcs
+
+                start = time.perf_counter()
+                denseMapper = DistanceMapperDenseImpl(map)
+                for i in range(numRecalcs):
+                    denseMapper.recalculate()
+                denseBuildTime = (time.perf_counter() - start) / (numRecalcs + 1)
+
+                iters = 0
+                start = time.perf_counter()
+                for pointA in points:
+                    for pointB in points:
+                        lazyMapper.get_distance_between(pointA, pointB)
+                        iters += 1
+                lazyLookupTime = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for pointA in points:
+                    for pointB in points:
+                        denseMapper.get_distance_between(pointA, pointB)
+                denseLookupTime = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for pointA in points:
+                    row = lazyMapper.get_tile_dist_matrix(pointA).raw
+                    for pointB in points:
+                        _ = row[pointB.tile_index]
+                lazyRowTime = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for pointA in points:
+                    row = denseMapper.get_tile_dist_matrix(pointA).raw
+                    for pointB in points:
+                        _ = row[pointB.tile_index]
+                denseRowTime = time.perf_counter() - start
+
+                for pointA in points:
+                    for pointB in points:
+                        self.assertEqual(lazyMapper.get_distance_between(pointA, pointB), denseMapper.get_distance_between(pointA, pointB))
+
+                logbook.info(
+                    f'{map.cols}x{map.rows} ({len(allTiles)} tiles), {iters} lookups:\r\n'
+                    f'   all rows build: lazy {lazyBuildTime:.5f} vs dense {denseBuildTime:.5f}\r\n'
+                    f'   get_distance_between: lazy {lazyLookupTime:.5f} vs dense {denseLookupTime:.5f}\r\n'
+                    f'   get_tile_dist_matrix().raw[idx]: lazy {lazyRowTime:.5f} vs dense {denseRowTime:.5f}')
+
     def run_shortest_path_algo_comparison(self, map, ranges, skipFloyd: bool = True):
         points = list(map.pathable_tiles)
         random.shuffle(points)
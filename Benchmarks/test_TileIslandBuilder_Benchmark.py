@@ -0,0 +1,70 @@
+import time
+
+from Sim.GameSimulator import GameSimulatorHost
+from Tests.TestBase import TestBase
+from base.client.map import MapBase
+
+
+class TileIslandBuilderBenchmarkTests(TestBase):
+    def __init__(self, methodName: str = ...):
+        MapBase.DO_NOT_RANDOMIZE = True
+        super().__init__(methodName)
+
+    def test_benchmark_update_tile_islands_over_recorded_games(self):
+        """
+        Plays the recorded games the TileIslandBuilder unit tests use forward and reads the bots own 'TileIsland update'
+        perf events (and their counters) back out, so the per turn island update cost is tracked over real turns instead of
+        the synthetic army increments of test_update_tile_islands__should_be_fast.
+        """
+        mapFiles = [
+            ('GameContinuationEntries/should_not_rebuild_neutral_islands_in_between_normal_turns___qzA-rHHcb---1--52.txtmap', 52),
+            ('GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap', 136),
+            ('GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap', 250),
+            ('GameContinuationEntries/shouldnt_create_broken_islands_after_captures___9GHWHfzuU---1--745.txtmap', 745),
+            ('GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap', 880),
+        ]
+        turns = 30
+        for mapFile, turn in mapFiles:
+            with self.subTest(mapFile=mapFile):
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, turn, fill_out_tiles=True)
+
+                simHost = GameSimulatorHost(map, player_with_viewer=general.player, allAfkExceptMapPlayer=True, botInitOnly=True)
+                simHost.reveal_player_general(playerToReveal=general.player, playerToRevealTo=enemyGeneral.player)
+                simHost.reveal_player_general(playerToReveal=enemyGeneral.player, playerToRevealTo=general.player)
+                bot = simHost.get_bot(general.player)
+                playerMap = simHost.get_player_map(general.player)
+                bot.tileIslandBuilder.use_debug_asserts = False
+                bot.tileIslandBuilder.log_debug = False
+
+                simHost.run_sim(run_real_time=False, turn_time=0.2, turns=turns)
+
+                moves = [m for m in bot.perf_timer.move_history if m is not None]
+                moves.append(bot.perf_timer.current_move)
+                updateEvents = [e for move in moves for e in move.event_list if e.event_name == 'TileIsland update']
+                self.assertGreater(len(updateEvents), turns // 2)
+
+                builder = bot.tileIslandBuilder
+                start = time.perf_counter()
+                builder.recalculate_tile_islands(bot.targetPlayerExpectedGeneralLocation)
+                recalcDuration = time.perf_counter() - start
+
+                tileCount = len(playerMap.tiles_by_index)
+                updateDurations = [e.get_duration() for e in updateEvents]
+                candidateCounts = [e.counters['candidateTiles'] for e in updateEvents]
+                impactedCounts = [e.counters['impactedTiles'] for e in updateEvents]
+                resortedCounts = [e.counters['resortedIslands'] for e in updateEvents]
+                distanceBuilds = updateEvents[-1].counters['largeIslandDistanceBuilds'] - updateEvents[0].counters['largeIslandDistanceBuilds']
+
+                print(
+                    f'{mapFile[24:80]:56s} {tileCount} tiles {len(builder.all_tile_islands)} islands, {len(updateEvents)} updates: '
+                    f'avg {sum(updateDurations) * 1000 / len(updateDurations):6.2f}ms max {max(updateDurations) * 1000:6.2f}ms vs recalc {recalcDuration * 1000:6.2f}ms, '
+                    f'candidate tiles avg {sum(candidateCounts) / len(candidateCounts):5.1f} max {max(candidateCounts)}, '
+                    f'impacted tiles avg {sum(impactedCounts) / len(impactedCounts):5.1f} max {max(impactedCounts)}, '
+                    f'resorted islands avg {sum(resortedCounts) / len(resortedCounts):5.1f}, {distanceBuilds} large island distance builds')
+
+                self.assertLess(sum(updateDurations) / len(updateDurations), recalcDuration)
+                # a turn changes the moved army, the ticking generals / cities and whatever fog predictions moved. Single turns that
+                # reveal a lot of fog can touch hundreds of tiles, but on average the update has to stay a small fraction of the map.
+                self.assertLess(sum(candidateCounts) / len(candidateCounts), tileCount // 10)
+                self.assertLess(sum(impactedCounts) / len(impactedCounts), tileCount // 10)
+                self.assertLess(distanceBuilds, len(updateEvents))
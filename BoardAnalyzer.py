@@ -358,8 +358,14 @@ class BoardAnalyzer:
                 f'CENTRAL_DEFENSE_POINT layer defended={str(defendedTile)} distance={distance} count={len(layerTiles)} visible={visible} contiguous={contiguous} tiles=\r\n  '
                 + '\r\n  '.join(self._defensive_choke_tile_to_string(tile) for tile in layerTiles))
 
-    def rebuild_intergeneral_analysis(self, opponentGeneral: Tile, possibleSpawns: typing.List[MapMatrixSet] | None = None, cities_in_play: typing.Set[Tile] | None = None):
-        self.intergeneral_analysis = ArmyAnalyzer(self.map, self.general, opponentGeneral)
+    def rebuild_intergeneral_analysis(self, opponentGeneral: Tile, possibleSpawns: typing.List[MapMatrixSet] | None = None, cities_in_play: typing.Set[Tile] | None = None, prebuiltAnalysis: ArmyAnalyzer | None = None):
+        """
+        @param prebuiltAnalysis: an ArmyAnalyzer between self.general and opponentGeneral built ahead of time (idle precompute) on a map with identical passability. Used instead of building a new one.
+        """
+        if prebuiltAnalysis is not None:
+            self.intergeneral_analysis = prebuiltAnalysis
+        else:
+            self.intergeneral_analysis = ArmyAnalyzer(self.map, self.general, opponentGeneral)
 
         self.enemy_wall_breach_scores = MapMatrix(self.map, None)
         self.friendly_wall_breach_scores = MapMatrix(self.map, None)
@@ -99,13 +99,16 @@ class BotHostBase(object):
 
         if not self.eklipz_bot.isInitialized:
             self.eklipz_bot.initialize_from_map_for_first_time(currentMap)
+            if not self.eklipz_bot.no_file_logging and not (self.noLog and DebugHelper.IS_RUNNING_UNIT_TESTS):
+                timer.profile_export_path = f'{self.eklipz_bot.logDirectory}//perf_profile.jsonl'
         # self.eklipz_bot._map = currentMap
 
         with timer.begin_move(currentMap.turn) as moveTimer:
             gap = timer.get_elapsed_since_update(currentMap.turn)
             quickTurn = gap > 0.05
             move: Move | None = None
-            if gap > 0.15:
+            # with the deadline scheduler the bot cuts its own move selection short, so a late move is still better than none.
+            if gap > 0.15 and not self.eklipz_bot.use_move_deadline_scheduler:
                 with moveTimer.begin_event(f'LAG GAP Init turn {currentMap.turn} - no move chance / dropped move'):
                     self.eklipz_bot.init_turn()
                     self.eklipz_bot.viewInfo.add_info_line(f'LAG GAP OF {gap:.4f}, SKIPPING MOVE :(')
@@ -160,6 +163,8 @@ class BotHostBase(object):
             ArmyAnalyzer.reset_times()
             self.eklipz_bot._map.distance_mapper.dump_times()
             self.eklipz_bot._map.distance_mapper.reset_times()
+            if self.eklipz_bot.idle_precompute_worker is not None:
+                self.eklipz_bot.idle_precompute_worker.dump_times()
 
             with moveTimer.begin_event(f'Main thread check for pygame exit'):
                 if self.is_viewer_closed_by_user():
@@ -309,7 +314,8 @@ class BotHostLiveServer(BotHostBase):
             userId=userId,
             gameType=self._game_type,
             privateRoomID=roomId,
-            public_server=isPublic)
+            public_server=isPublic,
+            idleMethod=self.eklipz_bot.run_idle_precompute_slice)
 
         self.eklipz_bot.clear_moves_func = self.bot_client.send_clear_moves
         self.eklipz_bot.surrender_func = self.bot_client.send_surrender
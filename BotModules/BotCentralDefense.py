@@ -6,6 +6,7 @@ import logbook
 
 import DebugHelper
 import SearchUtils
+from IdlePrecomputeWorker import get_passability_fingerprint
 from Interfaces import MapMatrixInterface
 from MapMatrix import MapMatrix
 from ViewInfo import TargetStyle
@@ -19,10 +20,15 @@ class BotCentralDefense:
     @staticmethod
     def rebuild_intergeneral_analysis_for_central_defense(bot: EklipZBot):
         citiesInPlay = BotCentralDefense._get_central_defense_cities_in_play(bot)
+        prebuiltAnalysis = None
+        if bot.idle_precompute_worker is not None:
+            fingerprint = (get_passability_fingerprint(bot._map), bot.general.tile_index, bot.targetPlayerExpectedGeneralLocation.tile_index)
+            prebuiltAnalysis = bot.idle_precompute_worker.adopt('intergeneral_analysis', fingerprint)
         bot.board_analysis.rebuild_intergeneral_analysis(
             bot.targetPlayerExpectedGeneralLocation,
             bot.armyTracker.valid_general_positions_by_player,
-            citiesInPlay)
+            citiesInPlay,
+            prebuiltAnalysis=prebuiltAnalysis)
 
     @staticmethod
     def calculate_central_defense_point_if_needed(bot: EklipZBot, force: bool = False):
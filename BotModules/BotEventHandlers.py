@@ -32,7 +32,7 @@ class BotEventHandlers:
 
             if tile.delta.oldOwner == -1 or tile.delta.newOwner == -1:
                 bot.board_analysis.should_rescan = True
-                bot._map.distance_mapper.recalculate()
+                bot._map.distance_mapper.repair_passability_changes([tile])
                 bot.cityAnalyzer.reset_reachability()
                 if tile.delta.newOwner == -1:
                     return
@@ -98,9 +98,9 @@ class BotEventHandlers:
         bot.territories.needToUpdateAroundTiles.add(tile)
         if tile.isCity and tile.player != -1:
             bot.board_analysis.should_rescan = True
-            bot._map.distance_mapper.recalculate()
+            bot._map.distance_mapper.repair_passability_changes([tile])
         if tile.isCity and tile.player == -1 and tile.delta.oldOwner != -1:
-            bot._map.distance_mapper.recalculate()
+            bot._map.distance_mapper.repair_passability_changes([tile])
 
         if tile.player >= 0:
             player = bot._map.players[tile.player]
@@ -127,7 +127,7 @@ class BotEventHandlers:
                 bot.curPath = None
 
             if tile.delta.oldOwner == -1 or tile.player == -1:
-                bot._map.distance_mapper.recalculate()
+                bot._map.distance_mapper.repair_passability_changes([tile])
 
         if tile.delta.gainedSight and tile.player >= 0:
             bot.opponent_tracker.notify_player_tile_revealed(tile)
@@ -0,0 +1,202 @@
+import time
+import typing
+
+import logbook
+import numpy as np
+
+from DistanceMapperImpl import MAX_INCREMENTAL_REPAIR_TILES, UNREACHABLE, repair_distance_row
+from Interfaces import MapMatrixInterface
+from MapMatrix import MapMatrix
+from base.client.map import DistanceMapper, MapBase, Tile
+
+
+class DistanceMapperDenseImpl(DistanceMapper):
+    """
+    All-pairs distance mapper backed by one contiguous int16 N x N numpy array (N = map.cols * map.rows).
+
+    Unlike DistanceMapperImpl which lazily builds one MapMatrix per source tile the first time it is asked for
+    (landing that BFS cost in the middle of whatever turn first touches the tile), this eagerly fills every row
+    with a batched multi-source BFS whenever recalculate() runs, so lookups are pure indexing with no per-call
+    perf_counter bookkeeping.
+
+    get_tile_dist_matrix returns a MapMatrix whose .raw is a plain python int list converted from the int16 row the first
+    time that row is asked for, so callers can add, scale and store sentinels in copies without wrapping around int16.
+    Repairs and recalculates refresh the handed out lists in place. Do not modify the returned matrix in place, same as
+    with DistanceMapperImpl (copy() it first).
+
+    THIS IS NOT THREAD SAFE
+    """
+
+    def __init__(self, map: MapBase):
+        self.map: MapBase = map
+        self.num_tiles: int = map.cols * map.rows
+        self._dists: np.ndarray = np.full((self.num_tiles, self.num_tiles), UNREACHABLE, dtype=np.int16)
+        self._row_matrices: typing.List[MapMatrixInterface[int] | None] = [None] * self.num_tiles
+        self.time_total: float = 0.0
+        self.time_building_distmaps: float = 0.0
+        self.resets_total: int = 0
+        self.repairs_total: int = 0
+        self._was_expandable: typing.List[bool] = []
+
+        self._build_all_rows()
+
+    def get_distance_between_or_none(self, tileA: Tile, tileB: Tile) -> int | None:
+        dist = int(self._dists[tileA.tile_index, tileB.tile_index])
+        if dist >= UNREACHABLE:
+            # TODO this is a debug assert setup, same as DistanceMapperImpl...
+            if tileB in self.map.reachable_tiles and tileA in self.map.reachable_tiles:
+                logbook.error(f'tileA {str(tileA)} and tileB {str(tileB)} both in reachable, but had bad distance. Force recalculating all distances...')
+                self.recalculate()
+                dist = int(self._dists[tileA.tile_index, tileB.tile_index])
+                if dist < UNREACHABLE:
+                    return dist
+            return None
+
+        return dist
+
+    def get_distance_between_or_none_dual_cache(self, tileA: Tile, tileB: Tile) -> int | None:
+        """Every row is always populated, so the dual cache lookup is the same as the regular lookup."""
+        return self.get_distance_between_or_none(tileA, tileB)
+
+    def get_distance_between(self, tileA: Tile, tileB: Tile) -> int:
+        return int(self._dists[tileA.tile_index, tileB.tile_index])
+
+    def get_distance_between_dual_cache(self, tileA: Tile, tileB: Tile) -> int:
+        return int(self._dists[tileA.tile_index, tileB.tile_index])
+
+    def get_tile_dist_matrix(self, tile: Tile) -> MapMatrixInterface[int]:
+        matrix = self._row_matrices[tile.tile_index]
+        if matrix is None:
+            matrix = MapMatrix(None)
+            matrix.map = self.map
+            matrix.empty_val = UNREACHABLE
+            matrix.raw = self._dists[tile.tile_index].tolist()
+            self._row_matrices[tile.tile_index] = matrix
+
+        return matrix
+
+    def recalculate(self):
+        logbook.info(f'RECALCULATING ALL DISTANCES IN DistanceMapperDenseImpl')
+        self.resets_total += 1
+        self._build_all_rows()
+
+    def repair_passability_changes(self, tiles: typing.Iterable[Tile]):
+        """Only the rows that actually reached one of the changed tiles are repaired. Rows are written back in place so existing row matrices stay valid."""
+        changedTiles = list(set(tiles))
+        if not changedTiles:
+            return
+        if len(changedTiles) > MAX_INCREMENTAL_REPAIR_TILES:
+            self.recalculate()
+            return
+
+        start = time.perf_counter()
+        self.repairs_total += 1
+        changedIdxs = np.array([t.tile_index for t in changedTiles], dtype=np.intp)
+        rowsToRepair = np.nonzero((self._dists[:, changedIdxs] < UNREACHABLE).any(axis=1))[0]
+        tilesByIndex = self.map.tiles_by_index
+        for idx in rowsToRepair.tolist():
+            # python list element access is several times cheaper than numpy scalar access for the scattered reads the repair does.
+            row = self._dists[idx].tolist()
+            if repair_distance_row(row, tilesByIndex[idx], changedTiles, self._was_expandable):
+                self._dists[idx] = row
+                matrix = self._row_matrices[idx]
+                if matrix is not None:
+                    matrix.raw[:] = row
+
+        for tile in changedTiles:
+            self._was_expandable[tile.tile_index] = not tile.isObstacle
+
+        self.time_total += time.perf_counter() - start
+
+    def _build_all_rows(self):
+        """
+        Batched multi-source BFS. Every source is expanded in lockstep, one BFS layer at a time, with the per-tile
+        frontier / visited state stored as bitsets over the sources ((N+1) x ceil(N/64) uint64), so each layer is a
+        handful of vectorized gathers / ors, and distances are only written for the (source, tile) bits newly reached.
+        Semantics match DistanceMapperImpl._build_distance_map_matrix_fast exactly:
+        tiles reached via tile.movable get a distance, obstacles get a distance but do not expand further, the source
+        always expands (even when it is itself an obstacle).
+        """
+        start = time.perf_counter()
+        n = self.num_tiles
+        inbound, expandable = self._build_inbound_table()
+
+        numWords = (n + 63) >> 6
+        allIdx = np.arange(n)
+
+        # row n is the padding sentinel that is never in the frontier.
+        frontier = np.zeros((n + 1, numWords), dtype='<u8')
+        frontier[allIdx, allIdx >> 6] = np.left_shift(np.uint64(1), (allIdx & 63).astype(np.uint64))
+        visited = frontier[:n].copy()
+        expandMask = np.where(expandable, np.uint64(0xFFFFFFFFFFFFFFFF), np.uint64(0)).astype('<u8')[:, None]
+
+        dists = self._dists
+        dists.fill(UNREACHABLE)
+        dists[allIdx, allIdx] = 0
+
+        dist = 0
+        while True:
+            dist += 1
+            reached = frontier[inbound[:, 0]]
+            for k in range(1, inbound.shape[1]):
+                reached |= frontier[inbound[:, k]]
+            reached &= ~visited
+
+            tileIdxs, wordIdxs = np.nonzero(reached)
+            if len(tileIdxs) == 0:
+                break
+
+            visited |= reached
+
+            bits = np.unpackbits(reached[tileIdxs, wordIdxs].view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+            pairIdxs, bitIdxs = np.nonzero(bits)
+            dists[(wordIdxs[pairIdxs] << 6) + bitIdxs, tileIdxs[pairIdxs]] = dist
+
+            np.bitwise_and(reached, expandMask, out=frontier[:n])
+
+        for idx, matrix in enumerate(self._row_matrices):
+            if matrix is not None:
+                matrix.raw[:] = dists[idx].tolist()
+        self._was_expandable = expandable.tolist()
+        self.time_building_distmaps += time.perf_counter() - start
+
+    def _build_inbound_table(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (inbound, expandable).
+        inbound is an (N x maxDegree) table of tile indexes that can move INTO each tile (padded with N).
+        tile.movable is not necessarily symmetric (discovered mountains are removed from their neighbors movable lists) so this is
+        built by transposing the forward CSR adjacency from map.get_movable_adjacency().
+        expandable is whether each tile is allowed to continue the BFS (not an obstacle).
+        """
+        n = self.num_tiles
+        indptr, indices = self.map.get_movable_adjacency()
+        expandable = np.fromiter((not t.isObstacle for t in self.map.tiles_by_index), dtype=bool, count=n)
+
+        sources = np.repeat(np.arange(n, dtype=np.intp), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        targets = indices[order]
+        sources = sources[order]
+
+        inDegrees = np.bincount(targets, minlength=n)
+        maxDegree = max(1, int(inDegrees.max(initial=0)))
+        inboundStarts = np.zeros(n, dtype=np.intp)
+        np.cumsum(inDegrees[:-1], out=inboundStarts[1:])
+        slots = np.arange(len(targets)) - inboundStarts[targets]
+
+        inbound = np.full((n, maxDegree), n, dtype=np.intp)
+        inbound[targets, slots] = sources
+
+        return inbound, expandable
+
+    def dump_times(self):
+        logbook.info(f'OVERALL TIME SPENT IN DENSE DISTANCE MAPPER:\r\n'
+                     f'         Distmaps: {self.time_building_distmaps:.5f}s\r\n'
+                     f'         Time total: {self.time_total:.5f}s\r\n'
+                     f'         Num resets: {self.resets_total}\r\n'
+                     f'         Num repairs: {self.repairs_total}\r\n')
+
+    def reset_times(self):
+        self.time_total = 0.0
+        self.time_building_distmaps = 0.0
+        self.resets_total = 0
+        self.repairs_total = 0
@@ -1,3 +1,4 @@
+import heapq
 import time
 import typing
 from collections import deque
@@ -13,6 +14,140 @@ from base.client.map import DistanceMapper, MapBase, Tile
 UNREACHABLE = 1000
 """The placeholder distance value for unreachable land"""
 
+MAX_INCREMENTAL_REPAIR_TILES = 25
+"""Past this many simultaneously changed tiles, a full recalculate is cheaper than repairing every cached row."""
+
+
+def repair_distance_row(
+        row: typing.MutableSequence[int],
+        sourceTile: Tile,
+        changedTiles: typing.List[Tile],
+        wasExpandable: typing.List[bool],
+) -> bool:
+    """
+    Dynamic-BFS repair of a single source's distance row after changedTiles flipped obstacle-ness and/or lost inbound
+    movable edges, without re-running the BFS for the whole row. Matches the semantics of
+    DistanceMapperImpl._build_distance_map_matrix_fast (obstacles get a distance but do not expand, the source always expands).
+
+    Increase pass: in old-distance order, any tile that no longer has an unaffected expandable predecessor at exactly
+    dist - 1 is affected; only affected tiles are then re-settled from their unaffected neighbors.
+    Decrease pass: tiles that became expandable relax outward, only touching tiles whose distance actually drops.
+
+    Movable edges being ADDED is not handled (the map never re-adds them).
+
+    @param row: the distance row, indexed by tile_index. Mutated in place. Can be a list or a numpy row.
+    @param sourceTile: the tile the row is distances from.
+    @param changedTiles: the tiles whose passability changed since the row was built.
+    @param wasExpandable: by tile_index, whether each tile was NOT an obstacle at the time the row was built. Only read for changedTiles.
+    @return: True if any distance in the row was modified.
+    """
+    sourceIdx = sourceTile.tile_index
+    anyReached = False
+    for t in changedTiles:
+        if t.tile_index != sourceIdx and row[t.tile_index] < UNREACHABLE:
+            anyReached = True
+            break
+    if not anyReached:
+        # none of the changed tiles were reached (or the only one reached is the source, which always expands), nothing in this row depended on them.
+        return False
+
+    changedIdxs = {t.tile_index for t in changedTiles}
+
+    def expandable_mid(tile: Tile) -> bool:
+        """Expandability with the lost-expansions applied but the gained-expansions not yet applied."""
+        idx = tile.tile_index
+        if idx == sourceIdx:
+            return True
+        if idx in changedIdxs and not wasExpandable[idx]:
+            return False
+        return not tile.isObstacle
+
+    # increase pass
+    candidates = []
+    for t in changedTiles:
+        tIdx = t.tile_index
+        if tIdx == sourceIdx:
+            continue
+        tDist = int(row[tIdx])
+        if tDist >= UNREACHABLE:
+            continue
+        heapq.heappush(candidates, (tDist, tIdx, t))
+        if wasExpandable[tIdx] and t.isObstacle:
+            for w in t.movable:
+                if row[w.tile_index] == tDist + 1:
+                    heapq.heappush(candidates, (tDist + 1, w.tile_index, w))
+
+    modified = False
+    affected: typing.Dict[int, Tile] = {}
+    checked: typing.Set[int] = set()
+    while candidates:
+        dist, idx, tile = heapq.heappop(candidates)
+        if idx in checked or idx == sourceIdx:
+            continue
+        checked.add(idx)
+
+        supported = dist == 1 and tile in sourceTile.movable
+        if not supported:
+            for u in tile.movable:
+                if row[u.tile_index] == dist - 1 and u.tile_index not in affected and tile in u.movable and expandable_mid(u):
+                    supported = True
+                    break
+        if supported:
+            continue
+
+        affected[idx] = tile
+        if expandable_mid(tile):
+            for w in tile.movable:
+                if row[w.tile_index] == dist + 1:
+                    heapq.heappush(candidates, (dist + 1, w.tile_index, w))
+
+    if affected:
+        modified = True
+        settle = []
+        for idx, tile in affected.items():
+            best = 1 if tile in sourceTile.movable else UNREACHABLE
+            for u in tile.movable:
+                uIdx = u.tile_index
+                if uIdx not in affected and tile in u.movable and expandable_mid(u):
+                    newDist = int(row[uIdx]) + 1
+                    if newDist < best:
+                        best = newDist
+            row[idx] = best
+            if best < UNREACHABLE:
+                heapq.heappush(settle, (best, idx, tile))
+
+        while settle:
+            dist, idx, tile = heapq.heappop(settle)
+            if dist != row[idx] or not expandable_mid(tile):
+                continue
+            newDist = dist + 1
+            for w in tile.movable:
+                wIdx = w.tile_index
+                if wIdx in affected and newDist < row[wIdx]:
+                    row[wIdx] = newDist
+                    heapq.heappush(settle, (newDist, wIdx, w))
+
+    # decrease pass
+    relax = []
+    for t in changedTiles:
+        tIdx = t.tile_index
+        if tIdx != sourceIdx and not wasExpandable[tIdx] and not t.isObstacle and row[tIdx] < UNREACHABLE:
+            heapq.heappush(relax, (int(row[tIdx]), tIdx, t))
+
+    while relax:
+        dist, idx, tile = heapq.heappop(relax)
+        if dist != row[idx] or (tile.isObstacle and idx != sourceIdx):
+            continue
+        newDist = dist + 1
+        for w in tile.movable:
+            wIdx = w.tile_index
+            if newDist < row[wIdx]:
+                row[wIdx] = newDist
+                modified = True
+                heapq.heappush(relax, (newDist, wIdx, w))
+
+    return modified
+
 
 class DistanceMapperImpl(DistanceMapper):
     # THIS IS NOT THREAD SAFE
@@ -26,6 +161,8 @@ class DistanceMapperImpl(DistanceMapper):
         self.time_total: float = 0.0
         self.time_building_distmaps: float = 0.0
         self.resets_total: int = 0
+        self.repairs_total: int = 0
+        self._was_expandable: typing.List[bool] = [not t.isObstacle for t in map.tiles_by_index]
 
     def get_distance_between_or_none(self, tileA: Tile, tileB: Tile) -> int | None:
         """Performs worse than the dual cache version."""
@@ -133,14 +270,38 @@ class DistanceMapperImpl(DistanceMapper):
         # for tile in self.map.get_all_tiles():
         #     self._dists.raw[tile.tile_index] = None
         self._dists = MapMatrix(self.map, None)
+        self._was_expandable = [not t.isObstacle for t in self.map.tiles_by_index]
+
+    def repair_passability_changes(self, tiles: typing.Iterable[Tile]):
+        """Repairs only the cached rows (and only the regions within them) that depended on the changed tiles, instead of wiping every row."""
+        changedTiles = list(set(tiles))
+        if not changedTiles:
+            return
+        if len(changedTiles) > MAX_INCREMENTAL_REPAIR_TILES:
+            self.recalculate()
+            return
+
+        start = time.perf_counter()
+        self.repairs_total += 1
+        tilesByIndex = self.map.tiles_by_index
+        for idx, tileDists in enumerate(self._dists.raw):
+            if tileDists is not None:
+                repair_distance_row(tileDists.raw, tilesByIndex[idx], changedTiles, self._was_expandable)
+
+        for tile in changedTiles:
+            self._was_expandable[tile.tile_index] = not tile.isObstacle
+
+        self.time_total += time.perf_counter() - start
 
     def dump_times(self):
         logbook.info(f'OVERALL TIME SPENT IN DISTANCE MAPPER:\r\n'
                      f'         Distmaps: {self.time_building_distmaps:.5f}s\r\n'
                      f'         Time total: {self.time_total:.5f}s\r\n'
-                     f'         Num resets: {self.resets_total}\r\n')
+                     f'         Num resets: {self.resets_total}\r\n'
+                     f'         Num repairs: {self.repairs_total}\r\n')
 
     def reset_times(self):
         self.time_total = 0.0
         self.time_building_distmaps = 0.0
         self.resets_total = 0
+        self.repairs_total = 0
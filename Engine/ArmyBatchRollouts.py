@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import random
+import typing
+
+import numpy as np
+
+from Engine.ArmyEngineModels import ArmySimState, ArmySimEvaluationParams
+from base.client.map import MapBase
+
+if typing.TYPE_CHECKING:
+    from ArmyEngine import ArmyEngine
+
+
+class ArmyBatchRolloutEngine(object):
+    """
+    Plays batch_size random rollouts from the same ArmySimState in lockstep, with the board of every rollout (lane) held as
+    rows of numpy arrays indexed by tile index, so each ply costs a fixed handful of numpy ops for all lanes instead of the
+    per-move python of ArmyEngine.get_next_board_state.
+
+    Mirrors ArmyEngine.execute / check_army_positions / the city and cycle bonuses, and ArmyEngine._generate_random_move move
+    picking (uniform living army, then uniform allowed dest or no-op). Does NOT do:
+     - detect_repetition; the repetition count / can_force_repetition flags don't feed calculate_value_int or Trial.over.
+     - move_half moves or biased (pick_best_move_heuristic) moves; every rollout ply is a random move.
+
+    The move filters (ArmyEngine._friendly_move_filter / _enemy_move_filter) are evaluated once per (tile, dest) when the
+    engine is built, so they must not depend on the board state passed to them (the force_ matrix filters don't).
+    """
+
+    def __init__(self, engine: ArmyEngine, batchSize: int, seed: int | None = None):
+        self.engine: ArmyEngine = engine
+        self.batch_size: int = batchSize
+        self.eval_params: ArmySimEvaluationParams = engine.eval_params
+        self.friendly_player: int = engine.friendly_player
+        self.enemy_player: int = engine.enemy_player
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        map = engine.map
+        tiles = map.tiles_by_index
+        numTiles = len(tiles)
+        self.num_tiles: int = numTiles
+
+        self.base_army: np.ndarray = np.array([t.army for t in tiles], dtype=np.int64)
+        self.base_owner: np.ndarray = np.array([t.player for t in tiles], dtype=np.int64)
+        self.is_city: np.ndarray = np.array([t.isCity for t in tiles], dtype=bool)
+        self.is_general: np.ndarray = np.array([t.isGeneral for t in tiles], dtype=bool)
+        self.is_city_or_general: np.ndarray = self.is_city | self.is_general
+
+        # -1 means no team, so it never matches a players team.
+        teams = map.team_ids_by_player_index
+        self.team_of: np.ndarray = np.array(list(teams) + [-1], dtype=np.int64)
+        """team_of[player], with team_of[-1] (neutral) == -1."""
+
+        self.friendly_dests, self.friendly_dest_counts = self._build_allowed_dests(tiles, engine._friendly_move_filter)
+        self.enemy_dests, self.enemy_dest_counts = self._build_allowed_dests(tiles, engine._enemy_move_filter)
+
+        self._dist_to_friendly_general: np.ndarray | None = None
+        self._dist_to_enemy_general: np.ndarray | None = None
+
+        k = batchSize
+        self.lanes: np.ndarray = np.arange(k)
+        self.army: np.ndarray = np.zeros((k, numTiles), dtype=np.int64)
+        self.owner: np.ndarray = np.zeros((k, numTiles), dtype=np.int64)
+        self.in_sim: np.ndarray = np.zeros((k, numTiles), dtype=bool)
+        self.incrementing: np.ndarray = np.zeros((k, numTiles), dtype=bool)
+        self.friendly_armies: np.ndarray = np.full((k, 1), -1, dtype=np.int64)
+        """
+        Per lane, the tile indexes of the living friendly armies (-1 for empty slots). A player never gains living armies
+        during a scrim (moves carry an army from its source to its dest), so the slots sized by load never run out.
+        """
+        self.enemy_armies: np.ndarray = np.full((k, 1), -1, dtype=np.int64)
+
+        self.depth: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.tile_differential: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.city_differential: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.controlled_city_turn_differential: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.friendly_skipped_move_count: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.enemy_skipped_move_count: np.ndarray = np.zeros(k, dtype=np.int64)
+        self.captures_enemy: np.ndarray = np.zeros(k, dtype=bool)
+        self.captured_by_enemy: np.ndarray = np.zeros(k, dtype=bool)
+        self.kills_all_friendly_armies: np.ndarray = np.zeros(k, dtype=bool)
+        self.kills_all_enemy_armies: np.ndarray = np.zeros(k, dtype=bool)
+
+        self.turn: int = 0
+        self.initial_differential: int = 0
+        self.plies_played: int = 0
+        """Lane plies played since load, summed over lanes."""
+
+    @staticmethod
+    def _build_allowed_dests(tiles, moveFilter) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Per source tile index, the allowed dest tile indexes packed to the front of the row (-1 padded), and their count."""
+        allowed = []
+        for tile in tiles:
+            dests = []
+            for dest in tile.movable:
+                if dest.isObstacle:
+                    continue
+                if moveFilter is not None and moveFilter(tile, dest, None):
+                    continue
+                dests.append(dest.tile_index)
+            allowed.append(dests)
+
+        width = max(1, max(len(d) for d in allowed))
+        packed = np.full((len(tiles), width), -1, dtype=np.int64)
+        for i, dests in enumerate(allowed):
+            packed[i, :len(dests)] = dests
+        return packed, np.array([len(d) for d in allowed], dtype=np.int64)
+
+    def load(self, boardState: ArmySimState):
+        """Resets every lane to boardState."""
+        self.army[:] = self.base_army
+        self.owner[:] = self.base_owner
+        self.in_sim[:] = False
+        self.incrementing[:] = False
+        self.friendly_armies = self._build_army_slots(boardState.friendly_living_armies)
+        self.enemy_armies = self._build_army_slots(boardState.enemy_living_armies)
+
+        for tileIdx, simTile in boardState.sim_tiles.items():
+            self.army[:, tileIdx] = simTile.army
+            self.owner[:, tileIdx] = simTile.player
+            self.in_sim[:, tileIdx] = True
+        for tile in boardState.incrementing:
+            self.incrementing[:, tile.tile_index] = True
+
+        self.depth[:] = boardState.depth
+        self.tile_differential[:] = boardState.tile_differential
+        self.city_differential[:] = boardState.city_differential
+        self.controlled_city_turn_differential[:] = boardState.controlled_city_turn_differential
+        self.friendly_skipped_move_count[:] = boardState.friendly_skipped_move_count
+        self.enemy_skipped_move_count[:] = boardState.enemy_skipped_move_count
+        self.captures_enemy[:] = boardState.captures_enemy
+        self.captured_by_enemy[:] = boardState.captured_by_enemy
+        self.kills_all_friendly_armies[:] = boardState.kills_all_friendly_armies
+        self.kills_all_enemy_armies[:] = boardState.kills_all_enemy_armies
+
+        self.turn = boardState.turn
+        self.initial_differential = boardState.initial_differential
+        self.plies_played = 0
+
+    def _build_army_slots(self, livingArmies: typing.Dict[int, typing.Any]) -> np.ndarray:
+        slots = np.full((self.batch_size, max(1, len(livingArmies))), -1, dtype=np.int64)
+        slots[:, :len(livingArmies)] = list(livingArmies.keys())
+        return slots
+
+    def get_living_armies(self, lane: int, friendly: bool) -> typing.Set[int]:
+        """The tile indexes of the living armies of a lane."""
+        slots = self.friendly_armies[lane] if friendly else self.enemy_armies[lane]
+        return set(int(tileIdx) for tileIdx in slots if tileIdx >= 0)
+
+    def get_over(self) -> np.ndarray:
+        """Trial.over() per lane."""
+        return (self.kills_all_friendly_armies & self.kills_all_enemy_armies) | self.captures_enemy | self.captured_by_enemy
+
+    def rollout(self, boardState: ArmySimState, maxPlies: int, positionalWinDetection: bool = False) -> np.ndarray:
+        """Plays batch_size random rollouts of up to maxPlies from boardState, returns each lanes calculate_value_int."""
+        self.load(boardState)
+        for _ in range(maxPlies):
+            active = ~self.get_over()
+            if not active.any():
+                break
+            frSrc, frDest = self.pick_random_moves(self.friendly_armies, active, self.friendly_dests, self.friendly_dest_counts, self.engine.allow_friendly_no_op)
+            enSrc, enDest = self.pick_random_moves(self.enemy_armies, active, self.enemy_dests, self.enemy_dest_counts, self.engine.allow_enemy_no_op)
+            self.step(active, frSrc, frDest, enSrc, enDest, positionalWinDetection)
+
+        return self.calculate_value_int()
+
+    def pick_random_moves(
+            self,
+            armySlots: np.ndarray,
+            active: np.ndarray,
+            allowedDests: np.ndarray,
+            allowedDestCounts: np.ndarray,
+            allowNoOp: bool
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Returns (source, dest) tile indexes per lane, dest -1 for no move."""
+        k = self.batch_size
+        dest = np.full(k, -1, dtype=np.int64)
+
+        # uniform living army per lane; the highest random key among the used slots.
+        used = armySlots >= 0
+        keys = np.where(used, self.rng.random(armySlots.shape), -1.0)
+        picked = keys.argmax(axis=1)
+        src = armySlots[self.lanes, picked]
+        hasArmy = active & used[self.lanes, picked]
+        src[~hasArmy] = 0
+
+        destCounts = allowedDestCounts[src]
+        options = destCounts + (1 if allowNoOp else 0)
+        choice = (self.rng.random(k) * options).astype(np.int64)
+        moves = hasArmy & (choice < destCounts)
+        dest[moves] = allowedDests[src[moves], choice[moves]]
+        return src, dest
+
+    def step(
+            self,
+            active: np.ndarray,
+            frSrc: np.ndarray,
+            frDest: np.ndarray,
+            enSrc: np.ndarray,
+            enDest: np.ndarray,
+            positionalWinDetection: bool = False
+    ):
+        """ArmyEngine.get_next_board_state for every active lane, dest -1 meaning no move."""
+        self.turn += 1
+        self.depth += active
+        self.plies_played += int(active.sum())
+        turn = self.turn
+        depth = int(self.depth[active][0]) if active.any() else 0
+
+        if MapBase.player_had_priority_over_other(self.friendly_player, self.enemy_player, turn):
+            self._execute(active, frSrc, frDest, self.friendly_player, self.enemy_player, depth)
+            self._execute(active & ~self.captures_enemy, enSrc, enDest, self.enemy_player, self.friendly_player, depth)
+        else:
+            self._execute(active, enSrc, enDest, self.enemy_player, self.friendly_player, depth)
+            self._execute(active & ~self.captured_by_enemy, frSrc, frDest, self.friendly_player, self.enemy_player, depth)
+
+        self.friendly_skipped_move_count += active & (frDest < 0)
+        self.enemy_skipped_move_count += active & (enDest < 0)
+
+        if positionalWinDetection:
+            self._check_army_positions(active)
+
+        self.kills_all_friendly_armies |= active & (self.friendly_armies < 0).all(axis=1)
+        self.kills_all_enemy_armies |= active & (self.enemy_armies < 0).all(axis=1)
+
+        engine = self.engine
+        if turn == engine.next_cycle_turn:
+            self.controlled_city_turn_differential += np.where(active, self.city_differential - engine.base_city_differential, 0)
+            bonus = self.in_sim & (self.owner >= 0) & active[:, None]
+            self.army += bonus
+            self.army += bonus & self.is_city_or_general
+        elif turn & 1 == 0:
+            self.controlled_city_turn_differential += np.where(active, self.city_differential - engine.base_city_differential, 0)
+            self.army += self.incrementing & active[:, None]
+
+    def _execute(self, active: np.ndarray, src: np.ndarray, dest: np.ndarray, movingPlayer: int, otherPlayer: int, depth: int):
+        lanes = np.flatnonzero(active & (dest >= 0))
+        if len(lanes) == 0:
+            return
+        s = src[lanes]
+        d = dest[lanes]
+        sourceArmy = self.army[lanes, s]
+        movingArmy = sourceArmy - 1
+        valid = (self.owner[lanes, s] == movingPlayer) & (movingArmy > 0)
+        if not valid.all():
+            # source was captured by the other player before the move was executed
+            lanes = lanes[valid]
+            s = s[valid]
+            d = d[valid]
+            sourceArmy = sourceArmy[valid]
+            movingArmy = movingArmy[valid]
+            if len(lanes) == 0:
+                return
+
+        destInSim = self.in_sim[lanes, d]
+        destArmy = np.where(destInSim, self.army[lanes, d], self.base_army[d])
+        destOwner = np.where(destInSim, self.owner[lanes, d], self.base_owner[d])
+        fresh = ~destInSim & self.is_city_or_general[d]
+        if fresh.any():
+            freshOwned = fresh & (self.base_owner[d] >= 0)
+            destArmy = destArmy + np.where(freshOwned, (depth - ((self.turn - 1) & 1)) // 2, 0)
+            startsIncrementing = freshOwned | (fresh & (self.base_owner[d] < 0) & (self.base_army[d] < movingArmy))
+            self.incrementing[lanes[startsIncrementing], d[startsIncrementing]] = True
+
+        movingTeam = self.team_of[movingPlayer]
+        destTeam = self.team_of[destOwner]
+        sameTeam = (destOwner == movingPlayer) | (destTeam == movingTeam)
+        otherTeam = (destOwner == otherPlayer) | (destTeam == self.team_of[otherPlayer])
+
+        remaining = destArmy - movingArmy
+        captured = ~sameTeam & (remaining < 0)
+        resultArmy = np.where(sameTeam, destArmy + movingArmy, np.abs(remaining))
+        resultOwner = np.where(sameTeam | captured, movingPlayer, destOwner)
+        # on the same team the tile becomes ours UNLESS its the allied general.
+        resultOwner = np.where(sameTeam & self.is_general[d], self.base_owner[d], resultOwner)
+
+        capturedOther = captured & otherTeam
+        tileDif = np.where(captured, np.where(capturedOther, 2, 1), 0)
+        cityDif = np.where(captured & self.is_city[d], np.where(capturedOther, 2, 1), 0)
+        capsGeneral = capturedOther & self.is_general[d] & (movingTeam != self.team_of[otherPlayer])
+
+        self.army[lanes, s] = sourceArmy - movingArmy
+        self.owner[lanes, s] = movingPlayer
+        self.in_sim[lanes, s] = True
+        self.army[lanes, d] = resultArmy
+        self.owner[lanes, d] = resultOwner
+        self.in_sim[lanes, d] = True
+
+        isFriendly = movingPlayer == self.friendly_player
+        if isFriendly:
+            movingArmies = self.friendly_armies
+            otherArmies = self.enemy_armies
+            self.tile_differential[lanes] += tileDif
+            self.city_differential[lanes] += cityDif
+        else:
+            movingArmies = self.enemy_armies
+            otherArmies = self.friendly_armies
+            self.tile_differential[lanes] -= tileDif
+            self.city_differential[lanes] -= cityDif
+
+        if capsGeneral.any():
+            for i in np.flatnonzero(capsGeneral):
+                capturedPlayer = self.base_owner[d[i]]
+                lane = lanes[i]
+                if capturedPlayer == (self.enemy_player if isFriendly else self.friendly_player):
+                    if isFriendly:
+                        self.captures_enemy[lane] = True
+                    else:
+                        self.captured_by_enemy[lane] = True
+                else:
+                    self._execute_player_capture(lane, capturedPlayer, movingPlayer, friendly=not isFriendly)
+
+        stillArmy = resultArmy > 1
+        capped = resultOwner == movingPlayer
+
+        # the moving army slot follows the army to dest, unless it died or merged into an army already living on dest.
+        laneMovingArmies = movingArmies[lanes]
+        movedOntoArmy = (laneMovingArmies == d[:, None]).any(axis=1)
+        followsTo = np.where(capped & stillArmy & ~movedOntoArmy, d, -1)
+        movingArmies[lanes] = np.where(laneMovingArmies == s[:, None], followsTo[:, None], laneMovingArmies)
+
+        laneOtherArmies = otherArmies[lanes]
+        survives = ~capped & stillArmy
+        otherArmies[lanes] = np.where((laneOtherArmies == d[:, None]) & ~survives[:, None], -1, laneOtherArmies)
+
+    def _execute_player_capture(self, lane: int, player: int, byPlayer: int, friendly: bool):
+        captured = self.in_sim[lane] & (self.owner[lane] == player) & ~self.is_general
+        armyGained = self.army[lane, captured] - self.army[lane, captured] // 2
+        self.army[lane, captured] = armyGained
+        self.owner[lane, captured] = byPlayer
+        econDelta = int(armyGained.sum()) + len(armyGained)
+        if friendly:
+            self.tile_differential[lane] -= econDelta
+        else:
+            self.tile_differential[lane] += econDelta
+
+    def _check_army_positions(self, active: np.ndarray):
+        engine = self.engine
+        if not engine.enemy_has_kill_threat and not engine.friendly_has_kill_threat:
+            return
+        if self._dist_to_friendly_general is None:
+            analysis = engine.board_analysis.intergeneral_analysis
+            self._dist_to_friendly_general = np.array(analysis.aMap.raw, dtype=np.int64)
+            self._dist_to_enemy_general = np.array(analysis.bMap.raw, dtype=np.int64)
+        analysis = engine.board_analysis.intergeneral_analysis
+        toGen = self._dist_to_friendly_general
+        toEnemy = self._dist_to_enemy_general
+
+        check = active & ~self.captured_by_enemy & ~self.captures_enemy
+        frArmies = self.friendly_armies
+        frAlive = frArmies >= 0
+        frArmy = self.army[self.lanes[:, None], frArmies]
+        enArmies = self.enemy_armies
+        enAlive = enArmies >= 0
+        enArmy = self.army[self.lanes[:, None], enArmies]
+        closestFrSave = np.where(frAlive, toGen[frArmies], 100).min(axis=1, initial=100)
+        closestFrThreat = np.where(frAlive & (frArmy > analysis.tileB.army + toEnemy[frArmies] * 2), toEnemy[frArmies], 100).min(axis=1, initial=100)
+        closestEnSave = np.where(enAlive, toEnemy[enArmies], 100).min(axis=1, initial=100)
+        closestEnThreat = np.where(enAlive & (enArmy > analysis.tileA.army + toGen[enArmies] * 2), toGen[enArmies], 100).min(axis=1, initial=100)
+
+        capturedByEnemy = np.zeros(self.batch_size, dtype=bool)
+        capturesEnemy = np.zeros(self.batch_size, dtype=bool)
+        if engine.enemy_has_kill_threat:
+            capturedByEnemy = (closestFrSave > closestEnThreat + 1) & (not engine.friendly_has_kill_threat or (closestFrThreat >= closestEnThreat))
+        if engine.friendly_has_kill_threat:
+            capturesEnemy = (closestEnSave > closestFrThreat + 1) & (not engine.enemy_has_kill_threat or (closestEnThreat >= closestFrThreat))
+
+        both = capturedByEnemy & capturesEnemy
+        if both.any():
+            # see who wins the race
+            for lane in np.flatnonzero(both):
+                if MapBase.player_had_priority_over_other(self.friendly_player, self.enemy_player, self.turn + int(closestFrThreat[lane])):
+                    capturedByEnemy[lane] = False
+                else:
+                    capturesEnemy[lane] = False
+
+        self.captured_by_enemy |= check & capturedByEnemy
+        self.captures_enemy |= check & capturesEnemy
+
+    def get_econ_value(self) -> np.ndarray:
+        """ArmySimState.get_econ_value per lane."""
+        return self.tile_differential + 25 * self.city_differential + self.controlled_city_turn_differential
+
+    def calculate_value_int(self) -> np.ndarray:
+        """ArmySimState.calculate_value_int per lane."""
+        params = self.eval_params
+        depth = self.depth
+        econDiff = 10 * self.get_econ_value()
+        captureValue = 100000 // (depth + 20)
+        econDiff += np.where(self.captures_enemy, captureValue, 0)
+        econDiff -= np.where(self.captured_by_enemy, captureValue, 0)
+        econDiff -= (depth - self.friendly_skipped_move_count) * params.friendly_move_penalty_10_fraction
+        econDiff -= (depth - self.enemy_skipped_move_count) * params.enemy_move_penalty_10_fraction
+
+        econDiff += np.where(self.kills_all_enemy_armies, params.kills_enemy_armies_10_fraction, 0)
+        enemyNoOps = self.enemy_skipped_move_count * params.enemy_move_no_op_scale_10_fraction
+        if not params.always_reward_dead_army_no_ops:
+            enemyNoOps = np.where(self.kills_all_enemy_armies, 0, enemyNoOps)
+        econDiff += enemyNoOps
+
+        econDiff += np.where(self.kills_all_friendly_armies, params.kills_friendly_armies_10_fraction, 0)
+        friendlyNoOps = self.friendly_skipped_move_count * params.friendly_move_no_op_scale_10_fraction
+        if not params.always_reward_dead_army_no_ops:
+            friendlyNoOps = np.where(self.kills_all_friendly_armies, 0, friendlyNoOps)
+        econDiff += friendlyNoOps
+
+        return econDiff
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import random
 import typing
 from collections import deque
 
@@ -199,6 +200,21 @@ class ArmySimState(object):
         self.initial_differential: int = 0
         """ The players existing econ differential so that the engine can evaluate just the positives/negatives from the starting point relative to game state rather than a massive global diff. """
 
+        self.undo_log: ArmySimUndoLog | None = None
+        """
+        The open undo log (begin_undo_log) while plies are made in place. ArmyEngine journals every sim tile into it right
+        before replacing it, and every tile it adds to incrementing. Never carried over by clone().
+        """
+
+        self.zobrist_keys: ArmySimZobristKeys | None = None
+        """The keys zobrist_board_hash is valid for. None until get_zobrist_hash first runs, or after a ply that changed arbitrary sim tiles."""
+
+        self.zobrist_board_hash: int = 0
+        """
+        The per tile part of get_zobrist_hash (sim tiles, living armies, incrementing), XOR'd forward a ply at a time by
+        ArmyEngine.get_next_board_state instead of being rebuilt over every sim tile.
+        """
+
     def get_child_board(self) -> ArmySimState:
         copy = self.clone(noKeys=True)
         copy.friendly_move = None
@@ -251,9 +267,171 @@ class ArmySimState(object):
         copy.depth = self.depth
         copy.incrementing = self.incrementing.copy()
         copy.parent_board = self.parent_board
+        copy.zobrist_keys = self.zobrist_keys
+        copy.zobrist_board_hash = self.zobrist_board_hash
 
         return copy
 
+    def begin_undo_log(self) -> ArmySimUndoLog:
+        """
+        Starts recording in-place changes (ArmyEngine.make_moves) so that ArmyEngine.unmake_moves can put this state back
+        exactly how it is now. The engine appends each sim tile it replaces to a flat journal at the point it replaces it, so a
+        whole rollout costs little more than the tiles it touches. An undo log can only be unmade once, and only one can be open.
+        """
+        undoLog = ArmySimUndoLog()
+        self.undo_log = undoLog
+        undoLog.scalars = (
+            self.turn,
+            self.depth,
+            self.tile_differential,
+            self.city_differential,
+            self.captures_enemy,
+            self.captured_by_enemy,
+            self.can_force_repetition,
+            self.can_enemy_force_repetition,
+            self.kills_all_friendly_armies,
+            self.kills_all_enemy_armies,
+            self.controlled_city_turn_differential,
+            self.friendly_skipped_move_count,
+            self.enemy_skipped_move_count,
+            self.friendly_move,
+            self.enemy_move,
+            self.prev_friendly_move,
+            self.prev_enemy_move,
+            self.repetition_count,
+            self.friendly_living_armies_l,
+            self.enemy_living_armies_l,
+            self.zobrist_keys,
+            self.zobrist_board_hash,
+        )
+        # these hold a handful of armies, copying them also keeps their iteration (move generation) order stable.
+        undoLog.friendly_living_armies = self.friendly_living_armies.copy()
+        undoLog.enemy_living_armies = self.enemy_living_armies.copy()
+
+        return undoLog
+
+    @staticmethod
+    def _unwind_sim_tile_journal(simTiles: typing.Dict[int, SimTile], journal: typing.List[int | SimTile | None]):
+        # newest first, so a tile touched by several plies ends on the value from before the first of them.
+        for i in range(len(journal) - 2, -1, -2):
+            simTile = journal[i + 1]
+            if simTile is None:
+                simTiles.pop(journal[i], None)
+            else:
+                simTiles[journal[i]] = simTile
+
+    def unmake_undo_log(self, undoLog: ArmySimUndoLog):
+        """Reverts this state to exactly how it was when begin_undo_log produced undoLog."""
+        (
+            self.turn,
+            self.depth,
+            self.tile_differential,
+            self.city_differential,
+            self.captures_enemy,
+            self.captured_by_enemy,
+            self.can_force_repetition,
+            self.can_enemy_force_repetition,
+            self.kills_all_friendly_armies,
+            self.kills_all_enemy_armies,
+            self.controlled_city_turn_differential,
+            self.friendly_skipped_move_count,
+            self.enemy_skipped_move_count,
+            self.friendly_move,
+            self.enemy_move,
+            self.prev_friendly_move,
+            self.prev_enemy_move,
+            self.repetition_count,
+            self.friendly_living_armies_l,
+            self.enemy_living_armies_l,
+            self.zobrist_keys,
+            self.zobrist_board_hash,
+        ) = undoLog.scalars
+        self.friendly_living_armies = undoLog.friendly_living_armies
+        self.enemy_living_armies = undoLog.enemy_living_armies
+        self._unwind_sim_tile_journal(self.sim_tiles, undoLog.sim_tile_journal)
+        for tile in undoLog.incrementing_added:
+            self.incrementing.discard(tile)
+        self.undo_log = None
+
+    def get_zobrist_hash(self, keys: ArmySimZobristKeys) -> int:
+        """
+        XOR of the keys for every sim tiles (owner, army), living army and incrementing tile, plus the turn / depth, the
+        accumulated differentials and flags that score the state, and the repetition counter with the dests of the last moves
+        (all that detect_repetition looks at besides the move before last). Equal hashes mean the same position reached by a
+        different move order.
+
+        The move before last (prev_friendly_move / prev_enemy_move) is deliberately left out; it only decides whether the next
+        ply counts as a repetition, and keying on it leaves next to no transpositions to share.
+
+        The per tile part is only built in full the first time (or after a ply that changed arbitrary sim tiles), after that it
+        is kept in zobrist_board_hash one ply at a time, see xor_zobrist_tiles.
+        """
+        if self.zobrist_keys is not keys:
+            self.zobrist_board_hash = self._build_zobrist_board_hash(keys)
+            self.zobrist_keys = keys
+
+        return self.zobrist_board_hash ^ hash((
+            self.turn,
+            self.depth,
+            self.tile_differential,
+            self.city_differential,
+            self.controlled_city_turn_differential,
+            self.captures_enemy,
+            self.captured_by_enemy,
+            self.can_force_repetition,
+            self.can_enemy_force_repetition,
+            self.kills_all_friendly_armies,
+            self.kills_all_enemy_armies,
+            self.friendly_skipped_move_count,
+            self.enemy_skipped_move_count,
+            self.repetition_count,
+            -1 if self.friendly_move is None else self.friendly_move.dest.tile_index,
+            -1 if self.enemy_move is None else self.enemy_move.dest.tile_index,
+        ))
+
+    def _build_zobrist_board_hash(self, keys: ArmySimZobristKeys) -> int:
+        h = 0
+        tileKeys = keys.tile_keys
+        for tileIdx, simTile in self.sim_tiles.items():
+            h ^= hash((tileKeys[tileIdx], simTile.player, simTile.army))
+        friendlyArmyKeys = keys.friendly_army_keys
+        for tileIdx in self.friendly_living_armies:
+            h ^= friendlyArmyKeys[tileIdx]
+        enemyArmyKeys = keys.enemy_army_keys
+        for tileIdx in self.enemy_living_armies:
+            h ^= enemyArmyKeys[tileIdx]
+        incrementingKeys = keys.incrementing_keys
+        for tile in self.incrementing:
+            h ^= incrementingKeys[tile.tile_index]
+
+        return h
+
+    def xor_zobrist_tiles(self, tileIdxs: typing.Iterable[int]):
+        """
+        XORs the current sim tile / living army / incrementing keys of just these tiles in or out of zobrist_board_hash. Called
+        on the same tiles before and after a ply changes them, that swaps their old keys for their new ones. No-op until
+        get_zobrist_hash has built the hash once.
+        """
+        keys = self.zobrist_keys
+        if keys is None:
+            return
+        h = self.zobrist_board_hash
+        simTiles = self.sim_tiles
+        friendlyArmies = self.friendly_living_armies
+        enemyArmies = self.enemy_living_armies
+        for tileIdx in tileIdxs:
+            simTile = simTiles.get(tileIdx, None)
+            if simTile is None:
+                continue
+            h ^= hash((keys.tile_keys[tileIdx], simTile.player, simTile.army))
+            if tileIdx in friendlyArmies:
+                h ^= keys.friendly_army_keys[tileIdx]
+            if tileIdx in enemyArmies:
+                h ^= keys.enemy_army_keys[tileIdx]
+            if simTile.source_tile in self.incrementing:
+                h ^= keys.incrementing_keys[tileIdx]
+        self.zobrist_board_hash = h
+
     def get_moves_string(self):
         frMoves = deque()
         enMoves = deque()
@@ -386,6 +564,44 @@ class ArmySimState(object):
         return self.enemy_random_move_generator(self)
 
 
+class ArmySimUndoLog(object):
+    """
+    The original values of everything on an ArmySimState that in-place plies changed since ArmySimState.begin_undo_log.
+    SimTiles are never mutated in place (the engine always replaces them), so holding the original SimTile references is
+    enough to restore the board.
+    """
+    __slots__ = ('scalars', 'friendly_living_armies', 'enemy_living_armies', 'sim_tile_journal', 'incrementing_added', 'plies')
+
+    def __init__(self):
+        self.scalars: tuple = ()
+        self.friendly_living_armies: typing.Dict[int, SimTile] | None = None
+        self.enemy_living_armies: typing.Dict[int, SimTile] | None = None
+
+        self.sim_tile_journal: typing.List[int | SimTile | None] = []
+        """
+        Flat (tile index, replaced SimTile) pairs in the order the engine replaced them, without checking whether the tile was
+        journaled already; unmaking walks it backwards. None means the tile was not in sim_tiles yet.
+        """
+
+        self.incrementing_added: typing.List[Tile] = []
+
+        self.plies: int = 0
+        """How many plies were made under this undo log."""
+
+
+class ArmySimZobristKeys(object):
+    """Random 64 bit keys per tile index for ArmySimState.get_zobrist_hash. Hashes are only comparable under the same keys."""
+    __slots__ = ('tile_keys', 'friendly_army_keys', 'enemy_army_keys', 'incrementing_keys')
+
+    def __init__(self, numTiles: int, seed: int = 0):
+        # own Random so that building keys doesn't shift the global random that MCTS rollouts are seeded from.
+        rand = random.Random(seed)
+        self.tile_keys: typing.List[int] = [rand.getrandbits(64) for _ in range(numTiles)]
+        self.friendly_army_keys: typing.List[int] = [rand.getrandbits(64) for _ in range(numTiles)]
+        self.enemy_army_keys: typing.List[int] = [rand.getrandbits(64) for _ in range(numTiles)]
+        self.incrementing_keys: typing.List[int] = [rand.getrandbits(64) for _ in range(numTiles)]
+
+
 class ArmySimResult(object):
     def __init__(self, resultState: ArmySimState | None = None):
         self.best_result_state: ArmySimState = resultState
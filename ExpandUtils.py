@@ -21,6 +21,8 @@ from base.client.map import Tile, MapBase
 
 USE_DEBUG_LOGGING = False
 ENEMY_TILE_CAP_VALUE = 2.05
+_EXPANSION_PRIORITY_KEY = SearchUtils.build_priority_key_packer(1)
+"""default_priority_func_basic priorities lead with the int distSoFar, the rest are floats / sets. Used when SearchUtils.USE_PACKED_PRIORITY_KEYS."""
 
 
 def _format_plan_first_move_for_log(plan: TilePlanInterface | None) -> str:
@@ -1403,6 +1405,7 @@ def _include_optimal_expansion_options(
             negativeTiles=negativeTiles,
             searchingPlayer=searchingPlayer,
             priorityFunc=priorityFunc,
+            priorityKeyFunc=_EXPANSION_PRIORITY_KEY if SearchUtils.USE_PACKED_PRIORITY_KEYS else None,
             useGlobalVisitedSet=useGlobalVisited,
             skipFunc=skipFunc,
             logResultValues=logStuff,
@@ -3161,7 +3164,11 @@ def expansion_knapsack_gather_iteration(
                     logbook.info(f"{i}:  group[{groups[i]}] value {values[i]} length {weights[i]} path {str(path)}")
 
             with perfTimer.begin_move_event(f'MCKP {len(paths)} paths, {turns}t, {groupIdx} groups.'):
-                totalValue, maxKnapsackedPaths = KnapsackUtils.solve_multiple_choice_knapsack(
+                # path counts grow with the map, so very long expansion plans can get a table big enough to be worth the low memory DP.
+                solver = KnapsackUtils.solve_multiple_choice_knapsack
+                if KnapsackUtils.is_multiple_choice_knapsack_memory_bound(len(paths), turns):
+                    solver = KnapsackUtils.solve_multiple_choice_knapsack_low_memory
+                totalValue, maxKnapsackedPaths = solver(
                     paths,
                     turns,
                     weights,
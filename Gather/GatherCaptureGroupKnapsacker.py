@@ -136,19 +136,32 @@ def _describe_grouped_knapsack_external_flag(input_data: GroupedKnapsackInput, i
     return 'flow'
 
 
+def _get_prune_sort_key(input_data: GroupedKnapsackInput, index: int) -> tuple[float, float, int, int]:
+    return (
+        -_get_option_value_per_turn(input_data, index),
+        -input_data.econ_values[index],
+        input_data.weights[index],
+        index)
+
+
 def prune_and_get_groups_for_knapsack(input_data: GroupedKnapsackInput, noLog: bool = True) -> GroupedKnapsackPrunedGrouping:
-    sorted_indices = sorted(
-        range(len(input_data.weights)),
-        key=lambda idx: (
-            -_get_option_value_per_turn(input_data, idx),
-            -input_data.econ_values[idx],
-            input_data.weights[idx],
-            idx))
+    sorted_indices = sorted(range(len(input_data.weights)), key=lambda idx: _get_prune_sort_key(input_data, idx))
+    active_indices, option_indices_by_root, maybe_options = _prune_sorted_options(input_data, sorted_indices, noLog=noLog)
+    return _get_compact_grouping(input_data, active_indices, option_indices_by_root, maybe_options, noLog=noLog)
+
 
+def _prune_sorted_options(
+        input_data: GroupedKnapsackInput,
+        sorted_indices: list[int],
+        noLog: bool = True
+) -> tuple[list[int], dict[int, list[int]], list[GroupedKnapsackMaybeOption]]:
+    """
+    The greedy prune over sorted_indices (in prune sort order). Returns the active indices, the active option indices by
+    their group root tile id, and the maybes with would_merge_groups still as root tile ids.
+    """
     disjoint_set = FastDisjointSet()
     group_state_by_root: dict[int, GroupedKnapsackGroupState] = {}
     active_indices: list[int] = []
-    groups_by_index: dict[int, int] = {}
     maybe_options: list[GroupedKnapsackMaybeOption] = []
 
     for index in sorted_indices:
@@ -243,13 +256,29 @@ def prune_and_get_groups_for_knapsack(input_data: GroupedKnapsackInput, noLog: b
         _add_to_frontier(input_data, group.frontier_by_input_group[input_group], index)
         active_indices.append(index)
 
+    option_indices_by_root = {
+        root: group.option_indices
+        for root, group in group_state_by_root.items()
+    }
+    return active_indices, option_indices_by_root, maybe_options
+
+
+def _get_compact_grouping(
+        input_data: GroupedKnapsackInput,
+        active_indices: list[int],
+        option_indices_by_root: dict[int, list[int]],
+        maybe_options: list[GroupedKnapsackMaybeOption],
+        noLog: bool = True
+) -> GroupedKnapsackPrunedGrouping:
+    """Renumbers the group roots from _prune_sorted_options into compact group ids, in root order."""
+    groups_by_index: dict[int, int] = {}
     compact_group_by_root = {
         root: group_id
-        for group_id, root in enumerate(sorted(group_state_by_root.keys()))
+        for group_id, root in enumerate(sorted(option_indices_by_root.keys()))
     }
-    for root, group in group_state_by_root.items():
+    for root, option_indices in option_indices_by_root.items():
         group_id = compact_group_by_root[root]
-        for index in group.option_indices:
+        for index in option_indices:
             groups_by_index[index] = group_id
 
     maybe_options = [
@@ -292,12 +321,21 @@ def solve_grouped_knapsack_input(
         input_data: GroupedKnapsackInput,
         noLog: bool = True,
         perfTimer: PerformanceTimer | None = None
+) -> GroupedKnapsackResult:
+    grouping = prune_and_get_groups_for_knapsack(input_data, noLog=noLog)
+    return _solve_grouped_knapsack_with_grouping(input_data, grouping, noLog=noLog, perfTimer=perfTimer)
+
+
+def _solve_grouped_knapsack_with_grouping(
+        input_data: GroupedKnapsackInput,
+        grouping: GroupedKnapsackPrunedGrouping,
+        noLog: bool = True,
+        perfTimer: PerformanceTimer | None = None
 ) -> GroupedKnapsackResult:
     turn_budget = input_data.turn_budget
     weights = input_data.weights
     values = input_data.values
     item_descriptions = input_data.item_descriptions
-    grouping = prune_and_get_groups_for_knapsack(input_data, noLog=noLog)
 
     active_idx = sorted(grouping.active_indices, key=lambda i: (grouping.groups_by_index[i], i))
     a_groups = [grouping.groups_by_index[i] for i in active_idx]
@@ -548,6 +586,136 @@ def solve_grouped_knapsack_input(
     )
 
 
+@dataclass(slots=True)
+class _PrunedOverlapComponent:
+    """One overlap component's prune result, by position in the components prune sorted options."""
+    active_positions: list[int]
+    root_by_active_position: list[int]
+    maybe_positions: list[tuple[int, tuple[int, ...]]]
+
+
+class GroupedKnapsackWarmStartSolver:
+    """
+    Stateful solve_grouped_knapsack_input for callers that re-solve a slowly changing grouped knapsack every turn. Results are
+    identical to solve_grouped_knapsack_input.
+
+    The prune only ever relates options that share tiles, so the options are split into tile overlap components, and each
+    components prune result is cached under a signature of its options (turns, econ value, tiles, which input group). Only
+    the components whose options changed since the previous solve get re-pruned. The MCKP and repair scans always rerun, the
+    native MCKP over the pruned options is a small fraction of the solve.
+    """
+
+    def __init__(self):
+        self._component_cache: dict[tuple, _PrunedOverlapComponent] = {}
+        self.components_reused: int = 0
+        """How many overlap components the last solve took from the cache."""
+        self.components_pruned: int = 0
+        """How many overlap components the last solve had to prune."""
+
+    def reset(self):
+        self._component_cache = {}
+
+    def solve(
+            self,
+            input_data: GroupedKnapsackInput,
+            noLog: bool = True,
+            perfTimer: PerformanceTimer | None = None
+    ) -> GroupedKnapsackResult:
+        grouping = self.prune_and_get_groups(input_data, noLog=noLog)
+        return _solve_grouped_knapsack_with_grouping(input_data, grouping, noLog=noLog, perfTimer=perfTimer)
+
+    def prune_and_get_groups(self, input_data: GroupedKnapsackInput, noLog: bool = True) -> GroupedKnapsackPrunedGrouping:
+        sorted_indices = sorted(range(len(input_data.weights)), key=lambda idx: _get_prune_sort_key(input_data, idx))
+        rank_by_index = {index: rank for rank, index in enumerate(sorted_indices)}
+
+        # union find over the options themselves (there are far fewer options than tile references), linked by a shared tile.
+        parent_by_index: dict[int, int] = {}
+        owner_by_tile_id: dict[int, int] = {}
+        for index in sorted_indices:
+            parent_by_index[index] = index
+            root = index
+            for tile_id in input_data.item_tile_sets[index]:
+                owner = owner_by_tile_id.get(tile_id, None)
+                if owner is None:
+                    owner_by_tile_id[tile_id] = root
+                    continue
+                while parent_by_index[owner] != owner:
+                    parent_by_index[owner] = parent_by_index[parent_by_index[owner]]
+                    owner = parent_by_index[owner]
+                if owner != root:
+                    parent_by_index[root] = owner
+                    root = owner
+
+        component_indices_by_root: dict[int, list[int]] = {}
+        for index in sorted_indices:
+            root = index
+            while parent_by_index[root] != root:
+                root = parent_by_index[root]
+            parent_by_index[index] = root
+            component_indices_by_root.setdefault(root, []).append(index)
+
+        component_cache: dict[tuple, _PrunedOverlapComponent] = {}
+        active_indices: list[int] = []
+        option_indices_by_root: dict[int, list[int]] = {}
+        maybe_options: list[GroupedKnapsackMaybeOption] = []
+        self.components_reused = 0
+        self.components_pruned = 0
+        for component_indices in component_indices_by_root.values():
+            signature = self._get_component_signature(input_data, component_indices)
+            component = self._component_cache.get(signature, None)
+            if component is None:
+                component = component_cache.get(signature, None)
+            if component is None:
+                component = self._prune_component(input_data, component_indices, noLog=noLog)
+                self.components_pruned += 1
+            else:
+                self.components_reused += 1
+            component_cache[signature] = component
+
+            for position, root in zip(component.active_positions, component.root_by_active_position):
+                index = component_indices[position]
+                active_indices.append(index)
+                option_indices_by_root.setdefault(root, []).append(index)
+            for position, roots in component.maybe_positions:
+                maybe_options.append(GroupedKnapsackMaybeOption(option_index=component_indices[position], would_merge_groups=roots))
+
+        # only the previous solves components are kept, the options rarely come back after changing.
+        self._component_cache = component_cache
+        active_indices.sort(key=lambda idx: rank_by_index[idx])
+        if not noLog:
+            logbook.info(f'Grouped knapsack warm start prune: reused {self.components_reused} components, pruned {self.components_pruned}')
+
+        return _get_compact_grouping(input_data, active_indices, option_indices_by_root, maybe_options, noLog=noLog)
+
+    @staticmethod
+    def _get_component_signature(input_data: GroupedKnapsackInput, component_indices: list[int]) -> tuple:
+        # input group ids are only compared for equality by the prune, so they are relabelled by first appearance.
+        input_group_labels: dict[int, int] = {}
+        signature = []
+        for index in component_indices:
+            input_group = input_data.groups[index]
+            label = input_group_labels.get(input_group, None)
+            if label is None:
+                label = len(input_group_labels)
+                input_group_labels[input_group] = label
+            signature.append((input_data.weights[index], input_data.econ_values[index], tuple(input_data.item_tile_sets[index]), label))
+        return tuple(signature)
+
+    @staticmethod
+    def _prune_component(input_data: GroupedKnapsackInput, component_indices: list[int], noLog: bool = True) -> _PrunedOverlapComponent:
+        active, option_indices_by_root, maybes = _prune_sorted_options(input_data, component_indices, noLog=noLog)
+        position_by_index = {index: position for position, index in enumerate(component_indices)}
+        root_by_index = {
+            index: root
+            for root, option_indices in option_indices_by_root.items()
+            for index in option_indices
+        }
+        return _PrunedOverlapComponent(
+            active_positions=[position_by_index[index] for index in active],
+            root_by_active_position=[root_by_index[index] for index in active],
+            maybe_positions=[(position_by_index[maybe.option_index], maybe.would_merge_groups) for maybe in maybes])
+
+
 # Old repair-loop implementation reference:
 # def solve_grouped_knapsack_input(
 #         input_data: GroupedKnapsackInput,
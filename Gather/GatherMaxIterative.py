@@ -1,3 +1,4 @@
+import array
 import time
 import typing
 
@@ -32,10 +33,11 @@ def _knapsack_max_gather_iteration(
 
     # build knapsack weights and values
     groupedPaths = [group for group in valuePerTurnPathPerTile.values()]
-    groups = []
+    # int32 buffers the native knapsack reads in place, rather than lists it has to convert element by element.
+    groups = array.array('i')
     paths = []
-    values = []
-    weights = []
+    values = array.array('i')
+    weights = array.array('i')
     groupIdx = 0
     for pathGroup in groupedPaths:
         if len(pathGroup) > 0:
@@ -54,7 +56,8 @@ def _knapsack_max_gather_iteration(
             logList.append(
                 f"{i}:  group[{str(path.start.tile)}] value {path.value} length {path.length} path {path.toString()}")
 
-    totalValue, maxKnapsackedPaths = KnapsackUtils.solve_multiple_choice_knapsack(paths, turns, weights, values, groups, noLog=logList is None)
+    totalValue, chosenIndexes = KnapsackUtils.solve_multiple_choice_knapsack_buffers(turns, weights, values, groups, noLog=logList is None)
+    maxKnapsackedPaths = [paths[i] for i in chosenIndexes]
     if logList:
         logList.append(f"maxKnapsackedPaths value {totalValue} length {len(maxKnapsackedPaths)},")
 
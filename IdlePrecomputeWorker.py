@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+import traceback
+import typing
+from collections import deque
+
+import logbook
+
+from base.client.map import MapBase
+
+
+def get_passability_fingerprint(map: MapBase) -> bytes:
+    """
+    Identifies everything that distances and ArmyAnalyzer pathways / chokes depend on: the obstacle / mountain / neutral city /
+    fog city flags of every tile and the movable adjacency. Army and ownership changes elsewhere do not change it.
+    """
+    indptr, indices = map.get_movable_adjacency()
+    flags = bytes(
+        t.isObstacle
+        | (t.isMountain << 1)
+        | (t.isUndiscoveredObstacle << 2)
+        | ((t.isCity and t.isNeutral) << 3)
+        | ((t.isTempFogPrediction and t.isCity and not t.discovered) << 4)
+        for t in map.tiles_by_index
+    )
+    return flags + indices.tobytes()
+
+
+class _PrecomputeTask(object):
+    __slots__ = ('name', 'fingerprint', 'steps', 'generation')
+
+    def __init__(self, name: str, fingerprint: typing.Hashable, steps: typing.Iterator[typing.Any], generation: int):
+        self.name: str = name
+        self.fingerprint: typing.Hashable = fingerprint
+        self.steps: typing.Iterator[typing.Any] = steps
+        self.generation: int = generation
+
+
+class IdlePrecomputeWorker(object):
+    """
+    Uses the idle window between sending a move and receiving the next server update to speculatively precompute next turns
+    expensive, mostly-stable artifacts.
+
+    Work runs in short slices ON THE MOVES THREAD (the host calls run_idle_slice while it waits for the next update, checking for
+    a pending update between slices), so it never races the map update or the bot. Tasks are generators; every yield is a point
+    where the slice may stop, and the value returned by the generator (StopIteration.value) is the result.
+
+    Each result is stored with the fingerprint it was computed under. The bot adopts a result next turn only if the fingerprint
+    it computes then still matches (get_passability_fingerprint for anything distance based), otherwise the result is discarded.
+    Scheduling a task with a name that is already pending / completed replaces it. Pending tasks are dropped unfinished if the
+    map generation moves on before they complete, since their fingerprint no longer describes the map they would finish on.
+
+    NOT THREAD SAFE; all calls must come from the moves thread.
+    """
+
+    def __init__(self, map: MapBase, sliceBudget: float = 0.005):
+        self.map: MapBase = map
+        self.slice_budget: float = sliceBudget
+        self._pending: typing.Deque[_PrecomputeTask] = deque()
+        self._results: typing.Dict[str, typing.Tuple[typing.Hashable, typing.Any]] = {}
+
+        self.time_total: float = 0.0
+        self.adopted_total: int = 0
+        self.discarded_total: int = 0
+
+    def schedule(self, name: str, fingerprint: typing.Hashable, steps: typing.Iterator[typing.Any]):
+        self._results.pop(name, None)
+        for task in self._pending:
+            if task.name == name:
+                self._pending.remove(task)
+                break
+        self._pending.append(_PrecomputeTask(name, fingerprint, steps, self.map.generation))
+
+    def cancel_all(self):
+        self._pending.clear()
+        self._results.clear()
+
+    def has_pending_work(self) -> bool:
+        return len(self._pending) > 0
+
+    def run_idle_slice(self) -> bool:
+        """Runs pending task steps for up to slice_budget seconds. Returns whether there is still pending work afterwards."""
+        start = time.perf_counter()
+        cutoff = start + self.slice_budget
+        while self._pending and time.perf_counter() < cutoff:
+            task = self._pending[0]
+            if task.generation != self.map.generation:
+                self._pending.popleft()
+                self.discarded_total += 1
+                continue
+            try:
+                next(task.steps)
+            except StopIteration as done:
+                self._pending.popleft()
+                self._results[task.name] = (task.fingerprint, done.value)
+            except Exception:
+                self._pending.popleft()
+                logbook.error(f'IdlePrecomputeWorker task {task.name} failed, dropping it:\n{traceback.format_exc()}')
+
+        self.time_total += time.perf_counter() - start
+        return len(self._pending) > 0
+
+    def adopt(self, name: str, fingerprint: typing.Hashable) -> typing.Any | None:
+        """Takes the finished result for name if it was computed under an equal fingerprint. Returns None (and drops the result) otherwise."""
+        entry = self._results.pop(name, None)
+        if entry is None:
+            return None
+
+        resultFingerprint, result = entry
+        if resultFingerprint != fingerprint:
+            self.discarded_total += 1
+            return None
+
+        self.adopted_total += 1
+        return result
+
+    def dump_times(self):
+        logbook.info(f'IdlePrecomputeWorker: {self.time_total:.4f}s idle work, adopted {self.adopted_total}, discarded {self.discarded_total}, pending {[t.name for t in self._pending]}')
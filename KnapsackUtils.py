@@ -6,7 +6,7 @@ import sys
 import time
 import typing
 
-from KnapsackUtilsPy import solve_multiple_choice_knapsack_purepy
+from KnapsackUtilsPy import solve_multiple_choice_knapsack_purepy, solve_multiple_choice_knapsack_low_memory_purepy
 
 
 # This does not prevent the pyd locking, apparently the pyd is a python module itself and is then locked by the python runtime, I guess.
@@ -15,7 +15,7 @@ from KnapsackUtilsPy import solve_multiple_choice_knapsack_purepy
 _MODULE_NAME = 'KnapsackUtilsCpp'
 _MODULE_DIR = pathlib.Path(__file__).resolve().parent
 _MODULE_ARTIFACT_GLOB = f'{_MODULE_NAME}*.pyd'
-_SOURCE_FILE_PATTERNS = ('setup.py', 'KnapsackUtilsCython.pyx', 'KnapsackUtilsCpp.cpp')
+_SOURCE_FILE_PATTERNS = ('setup.py', 'KnapsackUtilsCython.pyx', 'SearchUtilsCython.pyx', 'KnapsackUtilsCpp.cpp')
 _PYTHON_ABI_TAG = f'cp{sys.version_info.major}{sys.version_info.minor}'
 _IS_PYPY = sys.implementation.name == 'pypy'
 
@@ -91,6 +91,21 @@ if not _IS_PYPY:
             ) from build_ex
 
 
+LOW_MEMORY_MIN_TABLE_CELLS: int = 4_000_000
+"""
+Full (items + 1) * (capacity + 1) table sizes at or above this are memory bound (tens of MB of table). Callers that can
+build inputs that big opt in to solve_multiple_choice_knapsack_low_memory for them, see is_multiple_choice_knapsack_memory_bound.
+"""
+
+
+def is_multiple_choice_knapsack_memory_bound(itemCount: int, capacity: int) -> bool:
+    """
+    Whether solve_multiple_choice_knapsack's full table for this many items at this capacity is big enough to be worth solving
+    with solve_multiple_choice_knapsack_low_memory instead (same value, but ties between equally valued item sets may pick different items).
+    """
+    return (itemCount + 1) * (capacity + 1) >= LOW_MEMORY_MIN_TABLE_CELLS
+
+
 def solve_multiple_choice_knapsack(
         items: typing.List[typing.Any],
         capacity: int,
@@ -123,6 +138,51 @@ def solve_multiple_choice_knapsack(
         return solve_multiple_choice_knapsack_purepy(items, capacity, weights, values, groups, noLog, longRuntimeThreshold)
     return KnapsackUtilsCpp.solve_multiple_choice_knapsack(items, capacity, weights, values, groups, noLog, longRuntimeThreshold)
 
+
+def solve_multiple_choice_knapsack_buffers(
+        capacity: int,
+        weights: typing.Any,
+        values: typing.Any,
+        groups: typing.Any,
+        noLog: bool = True,
+        longRuntimeThreshold = 0.005
+) -> typing.Tuple[int, typing.List[int]]:
+    """
+    solve_multiple_choice_knapsack without marshaling python lists: weights / values / groups are contiguous int32 or int64
+    buffers (array.array('i') / array.array('q'), numpy int32 / int64 arrays), all of the same int size, that the native
+    solver reads in place. Uses the same full table as solve_multiple_choice_knapsack, and returns the max value and the chosen
+    items indexes, highest index first, so the same items (ties included) that solve_multiple_choice_knapsack returns for the same inputs.
+    """
+    if _IS_PYPY:
+        return solve_multiple_choice_knapsack_purepy(list(range(len(weights))), capacity, weights, values, groups, noLog, longRuntimeThreshold)
+    return KnapsackUtilsCpp.solve_multiple_choice_knapsack_buffers(capacity, weights, values, groups, noLog, longRuntimeThreshold)
+
+
+def solve_multiple_choice_knapsack_low_memory(
+        items: typing.List[typing.Any],
+        capacity: int,
+        weights: typing.List[int],
+        values: typing.List[int],
+        groups: typing.List[int],
+        noLog: bool = True,
+        longRuntimeThreshold = 0.005,
+        approximationEpsilon: float = 0.0
+) -> typing.Tuple[int, typing.List[typing.Any]]:
+    """
+    Drop in for solve_multiple_choice_knapsack for large inputs (hundreds of items at 100+ capacity). Runs the DP group by
+    group, holding one row of values plus a byte per group per capacity to reconstruct the chosen items, instead of the full
+    (items + 1) * (capacity + 1) int table. Same optimal value, though ties between equally valued item sets may resolve to
+    different items.
+
+    @param approximationEpsilon: if > 0, uses the value scaling FPTAS instead, returning items worth at least
+     (1 - approximationEpsilon) of the optimal value, in time that scales with items * groups / approximationEpsilon rather
+     than with capacity. Only faster when capacity is large relative to groups / approximationEpsilon.
+    @return: returns a tuple of the value of the chosen items, along with the list of chosen items.
+    """
+    if _IS_PYPY:
+        return solve_multiple_choice_knapsack_low_memory_purepy(items, capacity, weights, values, groups, noLog, longRuntimeThreshold, approximationEpsilon)
+    return KnapsackUtilsCpp.solve_multiple_choice_knapsack_low_memory(items, capacity, weights, values, groups, noLog, longRuntimeThreshold, approximationEpsilon)
+
 def solve_knapsack(
         items: typing.List[typing.Any],
         capacity: int,
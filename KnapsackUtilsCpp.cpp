@@ -24,6 +24,9 @@ setup_pybind11(cfg)
 #include <cmath>
 #include <chrono>
 #include <unordered_set>
+#include <cstdint>
+#include <limits>
+#include <algorithm>
 #include <pybind11/embed.h>
 
 #define FMTARG(x) py::arg(#x) = (x)
@@ -49,46 +52,18 @@ static double estimateRuntime(
     return estTime;
 }
 
-/**
- *  Solves knapsack where you need to knapsack a bunch of things, but must pick at most one thing from each group of things
- *  #Example
- *  items = ['a', 'b', 'c']
- *  values = [60, 100, 120]
- *  weights = [10, 20, 30]
- *  groups = [0, 1, 1]
- *  capacity = 50
- *  maxValue, itemList = solve_multiple_choice_knapsack(items, capacity, weights, values, groups)
- *
- *  Extensively optimized by Travis Drake / EklipZgit by an order of magnitude, original implementation cloned from: https://gist.github.com/USM-F/1287f512de4ffb2fb852e98be1ac271d
- * \param items list of the items to be maximized in the knapsack. Can be a list of literally anything, just used to return the chosen items back as output.
- * \param capacity the capacity of weights that can be taken.
- * \param weights list of the items weights, in same order as items.
- * \param values list of the items values, in same order as items.
- * \param groups list of the items group id number, in same order as items. MUST start with 0, and cannot skip group numbers.
- * \return returns a tuple of the maximum value that was found to fit in the knapsack, along with the list of optimal items that reached that max value.
- */
-std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
-    const std::vector<py::object>& items,
-    int capacity,
-    const std::vector<int>& weights,
-    const std::vector<int>& values,
-    const std::vector<int>& groups,
-    bool noLog = true,
-    double longRuntimeThreshold = 0.005)
+template <typename T>
+static std::vector<std::pair<int, int>> getGroupStartEnds(const T* groups, size_t n, int& maxGroupSize)
 {
-    py::object logbook_info = py::module_::import("logbook").attr("info");
-
-    using namespace std::chrono;
-    auto timeStart = high_resolution_clock::now();
-
-    if (groups.empty() || groups[0] != 0) {
+    if (n == 0 || groups[0] != 0) {
         raiseAssertionError("Groups must start with 0 and increment by one for each new group. Items should be ordered by group.");
     }
 
     std::vector<std::pair<int, int>> groupStartEnds;
-    int lastGroup = -1, lastGroupIndex = 0, maxGroupSize = 0, curGroupSize = 0;
-    for (size_t i = 0; i < groups.size(); ++i) {
-        int group = groups[i];
+    int lastGroup = -1, lastGroupIndex = 0, curGroupSize = 0;
+    maxGroupSize = 0;
+    for (size_t i = 0; i < n; ++i) {
+        int group = static_cast<int>(groups[i]);
         if (group > lastGroup) {
             if (curGroupSize > maxGroupSize) maxGroupSize = curGroupSize;
             if (lastGroup > -1) groupStartEnds.emplace_back(lastGroupIndex, i);
@@ -99,11 +74,44 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
         }
         curGroupSize++;
     }
-    groupStartEnds.emplace_back(lastGroupIndex, groups.size());
+    groupStartEnds.emplace_back(lastGroupIndex, n);
     if (curGroupSize > maxGroupSize) maxGroupSize = curGroupSize;
+    return groupStartEnds;
+}
 
-    int n = values.size();
-    std::vector<std::vector<int>> K(n + 1, std::vector<int>(capacity + 1, 0));
+static std::vector<std::pair<int, int>> getGroupStartEnds(const std::vector<int>& groups, int& maxGroupSize)
+{
+    return getGroupStartEnds(groups.data(), groups.size(), maxGroupSize);
+}
+
+/**
+ * The multiple choice knapsack DP over n items in raw weights / values / groups arrays, see solve_multiple_choice_knapsack.
+ * Returns the max value, filling chosenIndexes with the indexes of the chosen items, highest index first.
+ */
+template <typename T>
+static T solveMultipleChoiceKnapsackIndexes(
+    int capacity,
+    const T* weights,
+    const T* values,
+    const T* groups,
+    int n,
+    bool noLog,
+    double longRuntimeThreshold,
+    std::vector<int>& chosenIndexes)
+{
+    // only looked up when logging, it is a measurable part of small solves.
+    py::object logbook_info;
+    if (!noLog) {
+        logbook_info = py::module_::import("logbook").attr("info");
+    }
+
+    using namespace std::chrono;
+    auto timeStart = high_resolution_clock::now();
+
+    int maxGroupSize = 0;
+    auto groupStartEnds = getGroupStartEnds(groups, n, maxGroupSize);
+
+    std::vector<std::vector<T>> K(n + 1, std::vector<T>(capacity + 1, 0));
 
     double estTime = estimateRuntime(n, capacity, maxGroupSize);
 
@@ -124,9 +132,9 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
             //     K[i][curCapacity] = 0;
             // } else
             if (weights[i] <= curCapacity) {
-                int sub_max = 0;
-                int prev_group = groups[i] - 1;
-                int subKRow = curCapacity - weights[i];
+                T sub_max = 0;
+                int prev_group = static_cast<int>(groups[i]) - 1;
+                int subKRow = curCapacity - static_cast<int>(weights[i]);
                 if (prev_group >= 0) {
                     auto [prevGroupStart, prevGroupEnd] = groupStartEnds[prev_group];
                     for (int j = prevGroupStart + 1; j < prevGroupEnd + 1; ++j) {
@@ -135,21 +143,20 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
                         }
                     }
                 }
-                K[i + 1][curCapacity] = std::max(sub_max + values[i], K[i][curCapacity]);
+                K[i + 1][curCapacity] = std::max<T>(sub_max + values[i], K[i][curCapacity]);
             } else {
                 K[i + 1][curCapacity] = K[i][curCapacity];
             }
         }
     }
 
-    int res = K[n][capacity];
+    T res = K[n][capacity];
 
     if (!noLog) {
         auto timeTaken = high_resolution_clock::now() - timeStart;
         logbook_info("Value Found {res} in {timeTaken}"_s.format(**py::dict("res"_a=res, "timeTaken"_a=timeTaken)));
     }
 
-    std::vector<py::object> includedItems;
     std::vector<int> includedGroups;
     int w = capacity, lastTakenGroup = -1;
     for (int i = n; i > 0 && res > 0; --i) {
@@ -166,11 +173,11 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
         // THIS IS WHY VALUE MUST BE INTS
         if (res == K[i - 1][w]) continue;
 
-        int group = groups[i - 1];
+        int group = static_cast<int>(groups[i - 1]);
         if (group == lastTakenGroup) continue;
         includedGroups.push_back(group);
         lastTakenGroup = group;
-        includedItems.push_back(items[i - 1]);
+        chosenIndexes.push_back(i - 1);
         if (!noLog) {
             logbook_info("item at index {idx} with value {val} and weight {wt} was included... adding it to output. (Res {res})"_s.format(**py::dict("idx"_a=(i-1), "val"_a=values[i-1], "wt"_a=weights[i-1], FMTARG(res))));
         }
@@ -178,7 +185,7 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
         // Since this weight is included
         // its value is deducted
         res -= values[i - 1];
-        w -= weights[i - 1];
+        w -= static_cast<int>(weights[i - 1]);
     }
 
     if (!noLog) {
@@ -198,7 +205,318 @@ std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
         logbook_info(std::move(msg.cast<std::string>()));
     }
 
-    return {K[n][capacity], includedItems};
+    return K[n][capacity];
+}
+
+
+/**
+ *  Solves knapsack where you need to knapsack a bunch of things, but must pick at most one thing from each group of things
+ *  #Example
+ *  items = ['a', 'b', 'c']
+ *  values = [60, 100, 120]
+ *  weights = [10, 20, 30]
+ *  groups = [0, 1, 1]
+ *  capacity = 50
+ *  maxValue, itemList = solve_multiple_choice_knapsack(items, capacity, weights, values, groups)
+ *
+ *  Extensively optimized by Travis Drake / EklipZgit by an order of magnitude, original implementation cloned from: https://gist.github.com/USM-F/1287f512de4ffb2fb852e98be1ac271d
+ * \param items list of the items to be maximized in the knapsack. Can be a list of literally anything, just used to return the chosen items back as output.
+ * \param capacity the capacity of weights that can be taken.
+ * \param weights list of the items weights, in same order as items.
+ * \param values list of the items values, in same order as items.
+ * \param groups list of the items group id number, in same order as items. MUST start with 0, and cannot skip group numbers.
+ * \return returns a tuple of the maximum value that was found to fit in the knapsack, along with the list of optimal items that reached that max value.
+ */
+std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack(
+    const std::vector<py::object>& items,
+    int capacity,
+    const std::vector<int>& weights,
+    const std::vector<int>& values,
+    const std::vector<int>& groups,
+    bool noLog = true,
+    double longRuntimeThreshold = 0.005)
+{
+    std::vector<int> chosenIndexes;
+    int res = solveMultipleChoiceKnapsackIndexes<int>(
+        capacity, weights.data(), values.data(), groups.data(), static_cast<int>(values.size()), noLog, longRuntimeThreshold, chosenIndexes);
+
+    std::vector<py::object> includedItems;
+    includedItems.reserve(chosenIndexes.size());
+    for (int idx : chosenIndexes) {
+        includedItems.push_back(items[idx]);
+    }
+    return {res, includedItems};
+}
+
+static py::buffer_info requestIntBuffer(const py::buffer& buffer, const char* name)
+{
+    py::buffer_info info = buffer.request();
+    char typeChar = info.format.empty() ? '\0' : info.format.back();
+    bool isSignedInt = typeChar == 'i' || typeChar == 'l' || typeChar == 'q';
+    if (info.ndim != 1 || !isSignedInt || (info.itemsize != 4 && info.itemsize != 8) || (info.shape[0] > 1 && info.strides[0] != info.itemsize)) {
+        throw py::value_error(
+            std::string(name) + " must be a contiguous 1d int32 or int64 buffer, got format '" + info.format +
+            "' itemsize " + std::to_string(info.itemsize) + " ndim " + std::to_string(info.ndim));
+    }
+    return info;
+}
+
+/**
+ * solve_multiple_choice_knapsack straight off of weights / values / groups buffers (array.array('i' or 'q'), numpy int32 /
+ * int64 arrays...), all of the same int size, which are read in place instead of being converted element by element.
+ * Returns the max value and the chosen items indexes (highest index first) rather than items.
+ */
+std::tuple<int64_t, std::vector<int>> solve_multiple_choice_knapsack_buffers(
+    int capacity,
+    const py::buffer& weights,
+    const py::buffer& values,
+    const py::buffer& groups,
+    bool noLog = true,
+    double longRuntimeThreshold = 0.005)
+{
+    py::buffer_info weightsInfo = requestIntBuffer(weights, "weights");
+    py::buffer_info valuesInfo = requestIntBuffer(values, "values");
+    py::buffer_info groupsInfo = requestIntBuffer(groups, "groups");
+    if (weightsInfo.shape[0] != valuesInfo.shape[0] || weightsInfo.shape[0] != groupsInfo.shape[0]) {
+        throw py::value_error("weights, values and groups must all be the same length");
+    }
+    if (weightsInfo.itemsize != valuesInfo.itemsize || weightsInfo.itemsize != groupsInfo.itemsize) {
+        throw py::value_error("weights, values and groups must all be int32 or all be int64");
+    }
+
+    int n = static_cast<int>(weightsInfo.shape[0]);
+    std::vector<int> chosenIndexes;
+    if (weightsInfo.itemsize == 4) {
+        int32_t res = solveMultipleChoiceKnapsackIndexes<int32_t>(
+            capacity,
+            static_cast<const int32_t*>(weightsInfo.ptr),
+            static_cast<const int32_t*>(valuesInfo.ptr),
+            static_cast<const int32_t*>(groupsInfo.ptr),
+            n, noLog, longRuntimeThreshold, chosenIndexes);
+        return {res, chosenIndexes};
+    }
+
+    int64_t res = solveMultipleChoiceKnapsackIndexes<int64_t>(
+        capacity,
+        static_cast<const int64_t*>(weightsInfo.ptr),
+        static_cast<const int64_t*>(valuesInfo.ptr),
+        static_cast<const int64_t*>(groupsInfo.ptr),
+        n, noLog, longRuntimeThreshold, chosenIndexes);
+    return {res, chosenIndexes};
+}
+
+/**
+ * Group by group DP over capacity with a single row of best values. Each groups choice at each capacity (0 for none, else
+ * 1 + the items offset in its group) is kept in the narrowest TChoice that fits the largest group, so the table is
+ * groups * (capacity + 1) bytes instead of (items + 1) * (capacity + 1) ints.
+ */
+template <typename TChoice>
+static int solveByCapacity(
+    int capacity,
+    const std::vector<int>& weights,
+    const std::vector<int>& values,
+    const std::vector<std::pair<int, int>>& groupStartEnds,
+    std::vector<int>& chosenIndexes)
+{
+    size_t rowSize = capacity + 1;
+    std::vector<int> best(rowSize, 0), next(rowSize, 0);
+    std::vector<TChoice> choices(groupStartEnds.size() * rowSize, 0);
+
+    for (size_t g = 0; g < groupStartEnds.size(); ++g) {
+        auto [groupStart, groupEnd] = groupStartEnds[g];
+        TChoice* groupChoices = &choices[g * rowSize];
+        for (int curCapacity = 0; curCapacity <= capacity; ++curCapacity) {
+            int bestVal = best[curCapacity];
+            TChoice bestChoice = 0;
+            for (int i = groupStart; i < groupEnd; ++i) {
+                if (weights[i] <= curCapacity) {
+                    int val = best[curCapacity - weights[i]] + values[i];
+                    if (val > bestVal) {
+                        bestVal = val;
+                        bestChoice = static_cast<TChoice>(i - groupStart + 1);
+                    }
+                }
+            }
+            next[curCapacity] = bestVal;
+            groupChoices[curCapacity] = bestChoice;
+        }
+        std::swap(best, next);
+    }
+
+    int w = capacity;
+    for (int g = static_cast<int>(groupStartEnds.size()) - 1; g >= 0; --g) {
+        TChoice choice = choices[g * rowSize + w];
+        if (choice == 0) continue;
+        int i = groupStartEnds[g].first + choice - 1;
+        chosenIndexes.push_back(i);
+        w -= weights[i];
+    }
+
+    return best[capacity];
+}
+
+/**
+ * The value scaling FPTAS: values are scaled down by epsilon * (best single item value) / groups and the DP runs over scaled
+ * value, tracking the min weight to reach each. Always within (1 - epsilon) of optimal, and the runtime no longer depends
+ * on capacity at all (items * groups / epsilon instead).
+ */
+template <typename TChoice>
+static int solveByScaledValue(
+    int capacity,
+    const std::vector<int>& weights,
+    const std::vector<int>& values,
+    const std::vector<std::pair<int, int>>& groupStartEnds,
+    const std::vector<int>& scaledValues,
+    int scaledValueSum,
+    std::vector<int>& chosenIndexes)
+{
+    const int unreachable = std::numeric_limits<int>::max();
+    size_t rowSize = scaledValueSum + 1;
+    std::vector<int> minWeight(rowSize, unreachable), next(rowSize, unreachable);
+    minWeight[0] = 0;
+    std::vector<TChoice> choices(groupStartEnds.size() * rowSize, 0);
+
+    for (size_t g = 0; g < groupStartEnds.size(); ++g) {
+        auto [groupStart, groupEnd] = groupStartEnds[g];
+        TChoice* groupChoices = &choices[g * rowSize];
+        for (int scaledValue = 0; scaledValue <= scaledValueSum; ++scaledValue) {
+            int bestWeight = minWeight[scaledValue];
+            TChoice bestChoice = 0;
+            for (int i = groupStart; i < groupEnd; ++i) {
+                int itemScaled = scaledValues[i];
+                if (itemScaled <= 0 || itemScaled > scaledValue || weights[i] > capacity) continue;
+                int prevWeight = minWeight[scaledValue - itemScaled];
+                if (prevWeight == unreachable) continue;
+                int weight = prevWeight + weights[i];
+                if (weight < bestWeight) {
+                    bestWeight = weight;
+                    bestChoice = static_cast<TChoice>(i - groupStart + 1);
+                }
+            }
+            next[scaledValue] = bestWeight;
+            groupChoices[scaledValue] = bestChoice;
+        }
+        std::swap(minWeight, next);
+    }
+
+    int scaledValue = scaledValueSum;
+    while (scaledValue > 0 && minWeight[scaledValue] > capacity) --scaledValue;
+
+    int value = 0;
+    for (int g = static_cast<int>(groupStartEnds.size()) - 1; g >= 0; --g) {
+        TChoice choice = choices[g * rowSize + scaledValue];
+        if (choice == 0) continue;
+        int i = groupStartEnds[g].first + choice - 1;
+        chosenIndexes.push_back(i);
+        scaledValue -= scaledValues[i];
+        value += values[i];
+    }
+
+    return value;
+}
+
+/**
+ * Same inputs / outputs as solve_multiple_choice_knapsack, but only ever holds one row of DP values plus a byte (or two,
+ * for groups of 256+ items) per group per capacity to reconstruct the chosen items, instead of the full item * capacity int
+ * table. Picks equally valued solutions differently than solve_multiple_choice_knapsack does.
+ *
+ * \param approximationEpsilon if > 0, solves with the value scaling FPTAS instead (see solveByScaledValue), returning a
+ * solution worth at least (1 - approximationEpsilon) of the optimal one. Only worth it when capacity is large compared to
+ * groups / approximationEpsilon.
+ */
+std::tuple<int, std::vector<py::object>> solve_multiple_choice_knapsack_low_memory(
+    const std::vector<py::object>& items,
+    int capacity,
+    const std::vector<int>& weights,
+    const std::vector<int>& values,
+    const std::vector<int>& groups,
+    bool noLog = true,
+    double longRuntimeThreshold = 0.005,
+    double approximationEpsilon = 0.0)
+{
+    py::object logbook_info = py::module_::import("logbook").attr("info");
+
+    using namespace std::chrono;
+    auto timeStart = high_resolution_clock::now();
+
+    int maxGroupSize = 0;
+    auto groupStartEnds = getGroupStartEnds(groups, maxGroupSize);
+    int n = values.size();
+    int groupCount = groupStartEnds.size();
+
+    std::vector<int> chosenIndexes;
+    int res = 0;
+    if (approximationEpsilon > 0.0) {
+        int maxItemValue = 0;
+        for (int i = 0; i < n; ++i) {
+            if (weights[i] <= capacity && values[i] > maxItemValue) maxItemValue = values[i];
+        }
+
+        double scale = std::max(1.0, approximationEpsilon * maxItemValue / groupCount);
+        std::vector<int> scaledValues(n, 0);
+        int scaledValueSum = 0;
+        for (auto [groupStart, groupEnd] : groupStartEnds) {
+            int groupMax = 0;
+            for (int i = groupStart; i < groupEnd; ++i) {
+                scaledValues[i] = values[i] > 0 ? static_cast<int>(values[i] / scale) : 0;
+                if (weights[i] <= capacity && scaledValues[i] > groupMax) groupMax = scaledValues[i];
+            }
+            scaledValueSum += groupMax;
+        }
+
+        double estTime = n * (double)(scaledValueSum + 1) * 0.00000004;
+        if (estTime > longRuntimeThreshold) {
+            raiseAssertionError("Knapsack FPTAS potential long run est {estTime:.3f}: the inputs (n {n} * scaled value sum {scaledValueSum}) are going to result in a substantial runtime, maybe try a larger approximationEpsilon"_s.format(**py::dict(
+                FMTARG(n), FMTARG(scaledValueSum), FMTARG(estTime)
+            )).cast<std::string>());
+        }
+
+        if (maxGroupSize < 256) {
+            res = solveByScaledValue<uint8_t>(capacity, weights, values, groupStartEnds, scaledValues, scaledValueSum, chosenIndexes);
+        } else if (maxGroupSize < 65536) {
+            res = solveByScaledValue<uint16_t>(capacity, weights, values, groupStartEnds, scaledValues, scaledValueSum, chosenIndexes);
+        } else {
+            res = solveByScaledValue<uint32_t>(capacity, weights, values, groupStartEnds, scaledValues, scaledValueSum, chosenIndexes);
+        }
+    } else {
+        double estTime = estimateRuntime(n, capacity, maxGroupSize);
+        if (estTime > longRuntimeThreshold) {
+            raiseAssertionError("Knapsack potential long run est {estTime:.3f}: the inputs (n {n} * capacity {capacity} * math.sqrt(maxGroupSize {maxGroupSize}) {maxGrSq}) are going to result in a substantial runtime, maybe try a different algorithm"_s.format(**py::dict(
+                FMTARG(n), FMTARG(capacity), FMTARG(maxGroupSize), "maxGrSq"_a = std::sqrt(maxGroupSize), FMTARG(estTime)
+            )).cast<std::string>());
+        }
+
+        if (maxGroupSize < 256) {
+            res = solveByCapacity<uint8_t>(capacity, weights, values, groupStartEnds, chosenIndexes);
+        } else if (maxGroupSize < 65536) {
+            res = solveByCapacity<uint16_t>(capacity, weights, values, groupStartEnds, chosenIndexes);
+        } else {
+            res = solveByCapacity<uint32_t>(capacity, weights, values, groupStartEnds, chosenIndexes);
+        }
+    }
+
+    std::vector<py::object> includedItems;
+    includedItems.reserve(chosenIndexes.size());
+    for (int i : chosenIndexes) {
+        includedItems.push_back(items[i]);
+    }
+
+    if (!noLog) {
+        auto msg =
+            "low memory multiple choice knapsack (epsilon {approximationEpsilon}) completed on {n} items in {groupCount} groups for capacity {capacity} finding value {res} in Duration {timeDiff}"_s.format(
+                **py::dict(
+                    FMTARG(approximationEpsilon),
+                    FMTARG(n),
+                    FMTARG(groupCount),
+                    FMTARG(capacity),
+                    FMTARG(res),
+                    "timeDiff"_a = high_resolution_clock::now() - timeStart
+                )
+            );
+        logbook_info(std::move(msg.cast<std::string>()));
+    }
+
+    return {res, includedItems};
 }
 
 PYBIND11_MODULE(KnapsackUtilsCpp, m) {
@@ -209,4 +527,16 @@ PYBIND11_MODULE(KnapsackUtilsCpp, m) {
         "values"_a, "groups"_a, "noLog"_a,
         "longRuntimeThreshold"_a
     );
+
+    m.def("solve_multiple_choice_knapsack_buffers", &solve_multiple_choice_knapsack_buffers,
+        "capacity"_a, "weights"_a, "values"_a,
+        "groups"_a, "noLog"_a = true,
+        "longRuntimeThreshold"_a = 0.005
+    );
+
+    m.def("solve_multiple_choice_knapsack_low_memory", &solve_multiple_choice_knapsack_low_memory,
+        "items"_a, "capacity"_a, "weights"_a,
+        "values"_a, "groups"_a, "noLog"_a = true,
+        "longRuntimeThreshold"_a = 0.005, "approximationEpsilon"_a = 0.0
+    );
 }
\ No newline at end of file
@@ -1,4 +1,5 @@
 # import cppimport.import_hook
+import array
 import logbook
 import math
 import time
@@ -147,4 +148,150 @@ def solve_multiple_choice_knapsack_purepy(
         logbook.info(
             f"multiple choice knapsack completed on {n} items for capacity {capacity} finding value {K[n][capacity]} in Duration {time.perf_counter() - timeStart:.3f}")
 
-    return K[n][capacity], includedItems
\ No newline at end of file
+    return K[n][capacity], includedItems
+
+def _get_group_start_ends(groups: typing.List[int]) -> typing.Tuple[typing.List[typing.Tuple[int, int]], int]:
+    if not groups or groups[0] != 0:
+        raise AssertionError('Groups must start with 0 and increment by one for each new group. Items should be ordered by group.')
+
+    groupStartEnds: typing.List[typing.Tuple[int, int]] = []
+    lastGroup = -1
+    lastGroupIndex = 0
+    maxGroupSize = 0
+    for i, group in enumerate(groups):
+        if group > lastGroup:
+            if group > lastGroup + 1:
+                raise AssertionError('Groups must have no gaps. if you have group 0, and 2, group 1 must be included between them.')
+            if lastGroup > -1:
+                groupStartEnds.append((lastGroupIndex, i))
+                maxGroupSize = max(maxGroupSize, i - lastGroupIndex)
+            lastGroupIndex = i
+            lastGroup = group
+
+    groupStartEnds.append((lastGroupIndex, len(groups)))
+    maxGroupSize = max(maxGroupSize, len(groups) - lastGroupIndex)
+    return groupStartEnds, maxGroupSize
+
+
+def _get_choice_typecode(maxGroupSize: int) -> str:
+    if maxGroupSize < 256:
+        return 'B'
+    if maxGroupSize < 65536:
+        return 'H'
+    return 'L'
+
+
+def solve_multiple_choice_knapsack_low_memory_purepy(
+        items: typing.List[typing.Any],
+        capacity: int,
+        weights: typing.List[int],
+        values: typing.List[int],
+        groups: typing.List[int],
+        noLog: bool = True,
+        longRuntimeThreshold = 0.005,
+        approximationEpsilon: float = 0.0
+) -> typing.Tuple[int, typing.List[typing.Any]]:
+    """
+    Same inputs / outputs as solve_multiple_choice_knapsack_purepy, but runs the DP group by group keeping only one row of
+    values, plus one compact array per group of which item (if any) that group took at each capacity, instead of the full
+    item * capacity table. Picks equally valued solutions differently than solve_multiple_choice_knapsack_purepy does.
+
+    @param approximationEpsilon: if > 0, solves with the value scaling FPTAS instead: values are scaled down by
+     approximationEpsilon * (best single item value) / groups, and the DP runs over scaled value tracking the min weight to
+     reach each. The result is worth at least (1 - approximationEpsilon) of the optimal one, and the runtime no longer depends
+     on capacity (items * groups / approximationEpsilon instead), so it only pays off when capacity is large.
+    """
+    timeStart = time.perf_counter()
+    groupStartEnds, maxGroupSize = _get_group_start_ends(groups)
+
+    if len(values) > 0:
+        if not isinstance(values[0], int):
+            raise AssertionError('values are all required to be ints or this algo will not function')
+
+    n = len(values)
+    choiceTypecode = _get_choice_typecode(maxGroupSize)
+    chosenIndexes = []
+
+    if approximationEpsilon > 0.0:
+        maxItemValue = max([v for v, w in zip(values, weights) if w <= capacity], default=0)
+        scale = max(1.0, approximationEpsilon * maxItemValue / len(groupStartEnds))
+        scaledValues = [int(v / scale) if v > 0 else 0 for v in values]
+        scaledValueSum = 0
+        for groupStart, groupEnd in groupStartEnds:
+            scaledValueSum += max([scaledValues[i] for i in range(groupStart, groupEnd) if weights[i] <= capacity], default=0)
+
+        estTime = n * (scaledValueSum + 1) * 0.00000022
+        if estTime > longRuntimeThreshold:
+            raise AssertionError(f"Knapsack FPTAS potential long run est {estTime:.3f}: the inputs (n {n} * scaled value sum {scaledValueSum}) are going to result in a substantial runtime, maybe try a larger approximationEpsilon")
+
+        unreachable = capacity + 1
+        minWeights = [0] + [unreachable] * scaledValueSum
+        choicesByGroup = []
+        for groupStart, groupEnd in groupStartEnds:
+            nextWeights = minWeights[:]
+            choices = array.array(choiceTypecode, bytes(array.array(choiceTypecode).itemsize * (scaledValueSum + 1)))
+            for i in range(groupStart, groupEnd):
+                itemScaled = scaledValues[i]
+                weight = weights[i]
+                if itemScaled <= 0 or weight > capacity:
+                    continue
+                choice = i - groupStart + 1
+                for scaledValue in range(itemScaled, scaledValueSum + 1):
+                    newWeight = minWeights[scaledValue - itemScaled] + weight
+                    if newWeight < nextWeights[scaledValue]:
+                        nextWeights[scaledValue] = newWeight
+                        choices[scaledValue] = choice
+            minWeights = nextWeights
+            choicesByGroup.append(choices)
+
+        scaledValue = scaledValueSum
+        while scaledValue > 0 and minWeights[scaledValue] > capacity:
+            scaledValue -= 1
+
+        maxValue = 0
+        for g in range(len(groupStartEnds) - 1, -1, -1):
+            choice = choicesByGroup[g][scaledValue]
+            if choice == 0:
+                continue
+            i = groupStartEnds[g][0] + choice - 1
+            chosenIndexes.append(i)
+            scaledValue -= scaledValues[i]
+            maxValue += values[i]
+    else:
+        estTime = n * capacity * math.sqrt(maxGroupSize) * 0.00000022
+        if maxGroupSize == n:
+            estTime = n * capacity * 0.00000022
+        if estTime > longRuntimeThreshold:
+            raise AssertionError(f"Knapsack potential long run est {estTime:.3f}: the inputs (n {n} * capacity {capacity} * math.sqrt(maxGroupSize {maxGroupSize}) {math.sqrt(maxGroupSize)}) are going to result in a substantial runtime, maybe try a different algorithm")
+
+        best = [0] * (capacity + 1)
+        choicesByGroup = []
+        for groupStart, groupEnd in groupStartEnds:
+            nextBest = best[:]
+            choices = array.array(choiceTypecode, bytes(array.array(choiceTypecode).itemsize * (capacity + 1)))
+            for i in range(groupStart, groupEnd):
+                weight = weights[i]
+                value = values[i]
+                choice = i - groupStart + 1
+                for curCapacity in range(weight, capacity + 1):
+                    newValue = best[curCapacity - weight] + value
+                    if newValue > nextBest[curCapacity]:
+                        nextBest[curCapacity] = newValue
+                        choices[curCapacity] = choice
+            best = nextBest
+            choicesByGroup.append(choices)
+
+        maxValue = best[capacity]
+        w = capacity
+        for g in range(len(groupStartEnds) - 1, -1, -1):
+            choice = choicesByGroup[g][w]
+            if choice == 0:
+                continue
+            i = groupStartEnds[g][0] + choice - 1
+            chosenIndexes.append(i)
+            w -= weights[i]
+
+    if not noLog:
+        logbook.info(f'low memory multiple choice knapsack (epsilon {approximationEpsilon}) completed on {n} items in {len(groupStartEnds)} groups for capacity {capacity} finding value {maxValue} in Duration {time.perf_counter() - timeStart:.3f}')
+
+    return maxValue, [items[i] for i in chosenIndexes]
@@ -18,7 +18,8 @@ import numpy
 from scipy.special import expit
 
 from Models import Move, MoveBase
-from Engine.ArmyEngineModels import ArmySimState, ArmySimEvaluationParams
+from Engine.ArmyBatchRollouts import ArmyBatchRolloutEngine
+from Engine.ArmyEngineModels import ArmySimState, ArmySimEvaluationParams, ArmySimUndoLog, ArmySimZobristKeys
 from PerformanceTelemetry import PerformanceTelemetry
 from PerformanceTimer import PerformanceTimer
 
@@ -117,6 +118,41 @@ class MctsDUCT(object):
         self.final_playout_estimation_depth: int = 0
         self.pre_expansion_minimum_forced_expansions: int = 3
 
+        self.use_undo_log_rollouts: bool = False
+        """
+        Opt in. If True, rollouts play directly on the expanded nodes board state through an undo log (the engine journals every
+        sim tile it replaces) and are unmade after the utilities are calculated, instead of cloning the board state for every
+        rollout. test_mcts_undo_log_rollouts__match_cloned_rollouts pins both paths to the same search tree, but on scrim sized
+        boards the two are only about even in rollouts per second (test_benchmark_mcts__undo_log_rollouts_vs_cloned_rollouts),
+        so callers turn it on where the per rollout board allocation matters.
+        """
+
+        self.use_transposition_table: bool = False
+        """
+        If True, expanding a joint move whose resulting board state (ArmySimState.get_zobrist_hash) was already reached through
+        a different move order this search reuses that node, so transpositions share their visit counts / score sums.
+        """
+
+        self.transposition_table_capacity: int = 100000
+        """Max nodes the transposition table keeps, least recently used get evicted (and start fresh if reached again)."""
+
+        self._transposition_table: MctsTranspositionTable | None = None
+        self._iterations_to_convergence: int = 0
+
+        self.rollout_batch_size: int = 0
+        """
+        If > 0, every MCTS iteration plays this many random rollouts from the expanded node at once on an
+        ArmyBatchRolloutEngine (numpy lanes) instead of one Game.playout, and backpropagates them as that many visits.
+        Batched rollouts are all random moves (no biased_playouts_allowed_per_trial heuristic moves).
+        """
+
+        self.root_parallel_workers: int = 0
+        """
+        If > 0, ArmyEngine.execute_scan_MCTS runs this many extra independent DUCT searches of the same root (different seeds) in
+        worker processes (MctsRootParallel) alongside its own, and merges their root visit counts / score sums into its root before
+        picking moves. Only the root stats are shared; the expected line below the root still comes from this processes tree.
+        """
+
         self.exploit_factor: float = 1.0
         self.explore_factor: float = 0.55  # 1.05 was old, 2.0 was the original from the code I copied lol
         self.utility_compression_ratio: float = 0.0005
@@ -130,6 +166,13 @@ class MctsDUCT(object):
 
         self._node_selection_function: typing.Callable[[MctsNode], typing.Tuple[float, BoardMoves]] = self._get_selection_func_from_enum(nodeSelectionFunction)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the last summary holds the entire previous tree, which root parallel workers have no use for.
+        state['last_summary'] = None
+        state['_transposition_table'] = None
+        return state
+
     def reset(self):
         self._iterations: int = 0
         self._trials_performed: int = 0
@@ -146,8 +189,50 @@ class MctsDUCT(object):
             maxTime: float,
             maxIterations: int,
             forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None = None,
+            rootStatsProvider: typing.Callable[[], typing.List[MctsRootStats]] | None = None,
             # maxDepth: int,  # he didn't use this
     ) -> MctsEngineSummary:
+        """
+        @param rootStatsProvider: for root parallel search (see MctsRootParallel), called once this processes own search is done,
+         returns the root stats of the other processes searches of the same root to merge into this root before picking moves.
+        """
+        root, duration = self.search_tree(game, context, maxTime, maxIterations, forcedPreExpansions)
+
+        workerIterations = [self._iterations]
+        if rootStatsProvider is not None:
+            with self.performance_telemetry.monitor_telemetry('root parallel merge'):
+                for rootStats in rootStatsProvider():
+                    rootStats.merge_into(root)
+                    workerIterations.append(rootStats.iterations)
+
+        # Return the move we wish to play
+        summary = self.get_best_moves(root)
+        summary.duration = duration
+        summary.iterations = sum(workerIterations)
+        summary.worker_iterations = workerIterations
+        summary.iterations_to_convergence = self._iterations_to_convergence
+        if self._transposition_table is not None:
+            summary.transposition_hits = self._transposition_table.hits
+            summary.transposition_evictions = self._transposition_table.evictions
+        summary.trials_performed = self._trials_performed
+        summary.backprop_iter = self._backprop_iter
+        summary.nodes_explored = self._nodes_explored
+        summary.rollout_expansions = root.context.game._rollout_expansions
+        summary.biased_rollout_expansions = root.context.game._biased_rollout_expansions
+
+        self.last_summary = summary
+
+        return summary
+
+    def search_tree(
+            self,
+            game: Game,
+            context: Context,
+            maxTime: float,
+            maxIterations: int,
+            forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None = None,
+    ) -> typing.Tuple[MctsNode, float]:
+        """Runs the DUCT iterations from a new root for context, returns the root node and the duration of the search."""
         # Start out by creating a new root node (no tree reuse in this example)
         root: MctsNode = MctsNode(None, context)
 
@@ -173,6 +258,19 @@ class MctsDUCT(object):
             maxIts = 1000000000
 
         numIterations: int = 0
+        lastMostVisitedRootMoves: typing.Tuple[int, ...] = ()
+        self._iterations_to_convergence = 0
+
+        batchRollouts: ArmyBatchRolloutEngine | None = None
+        if self.rollout_batch_size > 0:
+            batchRollouts = ArmyBatchRolloutEngine(context.engine, self.rollout_batch_size)
+
+        if self.use_transposition_table:
+            if self._transposition_table is None or self._transposition_table.capacity != self.transposition_table_capacity:
+                self._transposition_table = MctsTranspositionTable(self.transposition_table_capacity)
+            self._transposition_table.reset(len(context.engine.map.tiles_by_index))
+        else:
+            self._transposition_table = None
 
         # Our main loop through MCTS iterations
         while (
@@ -182,6 +280,8 @@ class MctsDUCT(object):
         ):
             # Start in root node
             currentNode: MctsNode = root
+            # with transpositions a node can have several parents, so backprop follows the path actually taken instead of .parent
+            path: typing.List[MctsNode] = [root]
 
             with self.performance_telemetry.monitor_telemetry('root start pre-expand setup'):
                 forcedMoves = None
@@ -234,6 +334,7 @@ class MctsDUCT(object):
                     key = 'select_or_expand + force'
                 with self.performance_telemetry.monitor_telemetry(key):
                     currentNode = self.select_or_expand_child_node(currentNode, forcingPlayer, forcedMove)
+                path.append(currentNode)
                 if self.logAll and forcedMove is not None:
                     logbook.info(f'forced p{forcingPlayer} turn {currentNode.context.turn} move {str(forcedMove)} (actual moves {str(prevNode.legalMovesPerPlayer[0][prevNode.lastSelectedMovesPerPlayer[0]])} / {str(prevNode.legalMovesPerPlayer[1][prevNode.lastSelectedMovesPerPlayer[1]])})')
 
@@ -243,10 +344,24 @@ class MctsDUCT(object):
 
             contextEnd: Context = currentNode.context
 
-            if not contextEnd.trial.over():
-                with self.performance_telemetry.monitor_telemetry('contextEnd clone'):
-                    # Run a playout if we don't already have a terminal game state in node
-                    contextEnd = Context(contextEnd)  # clone the context
+            undoLog: ArmySimUndoLog | None = None
+            visitWeight: int = 1
+            if batchRollouts is not None:
+                visitWeight = batchRollouts.batch_size
+                with self.performance_telemetry.monitor_telemetry('batch playout'):
+                    utilities: typing.List[float] = self._batch_playout(batchRollouts, contextEnd)
+            elif not contextEnd.trial.over():
+                nodeLog = None
+                if self.logAll:
+                    nodeLog = f't{currentNode.context.turn} {str(currentNode.context.board_state)}'
+
+                if self.use_undo_log_rollouts:
+                    # the rollout plays directly on the nodes board state and gets unmade after the utilities below.
+                    undoLog = contextEnd.board_state.begin_undo_log()
+                else:
+                    with self.performance_telemetry.monitor_telemetry('contextEnd clone'):
+                        # Run a playout if we don't already have a terminal game state in node
+                        contextEnd = Context(contextEnd)  # clone the context
 
                 with self.performance_telemetry.monitor_telemetry('playout'):
                     # trial contains the moves played.
@@ -256,23 +371,29 @@ class MctsDUCT(object):
                         biasedMoveRatio=self.biased_move_ratio_while_available,
                         # maxNumPlayoutActions=-1,  # -1 forces it to run until an actual game end state, infinite depth...?
                         maxNumPlayoutActions=self.rollout_depth,  # -1 forces it to run until an actual game end state, infinite depth...?
-                        minRandomInitialMoves=self.min_random_playout_moves_initial
+                        minRandomInitialMoves=self.min_random_playout_moves_initial,
+                        undoLog=undoLog,
                     )
                 if self.logAll:
-                    logbook.info(f'  trial for node t{currentNode.context.turn} {str(currentNode.context.board_state)} resulted in \r\n    ctxEnd t{contextEnd.turn} {str(contextEnd.board_state)} \r\n    (trial t{trial.context.turn} {str(trial.context.board_state)})')
+                    logbook.info(f'  trial for node {nodeLog} resulted in \r\n    ctxEnd t{contextEnd.turn} {str(contextEnd.board_state)} \r\n    (trial t{trial.context.turn} {str(trial.context.board_state)})')
 
                 self._trials_performed += 1
 
-            # This computes utilities for all players at the of the playout,
-            # which will all be values in [-1.0, 1.0]
-            with self.performance_telemetry.monitor_telemetry('utilities calc'):
-                utilities: typing.List[float] = self.get_player_utilities_n1_1(contextEnd.board_state)
+            if batchRollouts is None:
+                # This computes utilities for all players at the of the playout,
+                # which will all be values in [-1.0, 1.0]
+                with self.performance_telemetry.monitor_telemetry('utilities calc'):
+                    utilities: typing.List[float] = self.get_player_utilities_n1_1(contextEnd.board_state)
             if self.logAll:
                 logbook.info(f'boardState {str(contextEnd.board_state)} compressed to {", ".join([f"{compressed:.4f}" for compressed in utilities])}')
 
+            if undoLog is not None:
+                with self.performance_telemetry.monitor_telemetry('playout unmake'):
+                    game.unmake_playout(contextEnd, undoLog)
+
             # Backpropagate utilities through the tree
             with self.performance_telemetry.monitor_telemetry('backprop all inclusive'):
-                while currentNode is not None:
+                for currentNode in reversed(path):
                     if currentNode.totalVisitCount > 0:  # -1...?
                         # This node was not newly expanded in this iteration
                         for p, lastSelMove in enumerate(currentNode.lastSelectedMovesPerPlayer):
@@ -283,7 +404,7 @@ class MctsDUCT(object):
                                         currentNode.visitCounts[p].append(0)
                                         currentNode.scoreSums[p].append(0.0)
 
-                                    currentNode.visitCounts[p][lastSelMove] += 1
+                                    currentNode.visitCounts[p][lastSelMove] += visitWeight
                                     currentNode.scoreSums[p][lastSelMove] += utilities[p]
 
                                 curMove = currentNode.legalMovesPerPlayer[p][lastSelMove]
@@ -291,33 +412,26 @@ class MctsDUCT(object):
                                     with self.performance_telemetry.monitor_telemetry('backprop killer move'):
                                         moveVisits, moveScoreSum = self.killer_move_cache[p].get(curMove, NO_KILLER_VALUE_TUPLE)
                                         moveScoreSum += utilities[p]
-                                        moveVisits += 1
+                                        moveVisits += visitWeight
 
                                         self.killer_move_cache[p][curMove] = (moveVisits, moveScoreSum)
 
                     self._backprop_iter += 1
-                    currentNode.totalVisitCount += 1
-                    currentNode = currentNode.parent
+                    currentNode.totalVisitCount += visitWeight
 
             # Increment iteration count
             numIterations += 1
 
+            if (numIterations & 15) == 0:
+                mostVisitedRootMoves = tuple(max(range(len(counts)), key=counts.__getitem__) if counts else -1 for counts in root.visitCounts)
+                if mostVisitedRootMoves != lastMostVisitedRootMoves:
+                    lastMostVisitedRootMoves = mostVisitedRootMoves
+                    self._iterations_to_convergence = numIterations
+
         duration = time.perf_counter() - startTime
         self._iterations = numIterations
 
-        # Return the move we wish to play
-        summary = self.get_best_moves(root)
-        summary.duration = duration
-        summary.iterations = self._iterations
-        summary.trials_performed = self._trials_performed
-        summary.backprop_iter = self._backprop_iter
-        summary.nodes_explored = self._nodes_explored
-        summary.rollout_expansions = root.context.game._rollout_expansions
-        summary.biased_rollout_expansions = root.context.game._biased_rollout_expansions
-
-        self.last_summary = summary
-
-        return summary
+        return root, duration
 
     def bench_random_stuff(self):
         # for i in range(-100, 100, 10):
@@ -497,9 +611,23 @@ class MctsDUCT(object):
             context: Context = Context(current.context)  # clone
             context.game.apply(context, combinedMove, noClone=True)  # this board state is already cloned by the context ctor above.
 
+            transpositionTable = self._transposition_table
+            stateHash = 0
+            if transpositionTable is not None:
+                with self.performance_telemetry.monitor_telemetry('transposition lookup'):
+                    stateHash = context.board_state.get_zobrist_hash(transpositionTable.keys)
+                    transposedNode = transpositionTable.get(stateHash)
+                if transposedNode is not None:
+                    if self.logAll:
+                        logbook.info(f'transposed child node t{context.turn} board move {str(combinedMove)} (node {str(transposedNode.context)})')
+                    current.children[combinedMove] = transposedNode
+                    return transposedNode
+
             newNode: MctsNode = MctsNode(current, context)
             current.children[combinedMove] = newNode
             self._nodes_explored += 1
+            if transpositionTable is not None:
+                transpositionTable.put(stateHash, newNode)
 
             if self.logAll:
                 logbook.info(f'expanding new child node t{context.turn} board move {str(combinedMove)} state {str(context.board_state)}')
@@ -729,6 +857,23 @@ class MctsDUCT(object):
     def two_parent_log_explore(twoParentLog: float, childVisitCount: int) -> float:
         return math.sqrt(twoParentLog / max(1, childVisitCount))
 
+    def _batch_playout(self, batchRollouts: ArmyBatchRolloutEngine, contextEnd: Context) -> typing.List[float]:
+        """Returns the per player SUMS of the utilities of batch_size rollouts from contextEnd (or of its terminal state batch_size times)."""
+        game = contextEnd.game
+        if contextEnd.trial.over():
+            return [utility * batchRollouts.batch_size for utility in self.get_player_utilities_n1_1(contextEnd.board_state)]
+
+        values = batchRollouts.rollout(contextEnd.board_state, self.rollout_depth, positionalWinDetection=not game._disablePositionalWinDetectionInRollouts)
+        self._trials_performed += batchRollouts.batch_size
+        game._rollout_expansions += batchRollouts.plies_played
+
+        netDifferential = values
+        if self.offset_initial_differential:
+            netDifferential = values - contextEnd.board_state.initial_differential * 10
+        x = netDifferential * self.utility_compression_ratio
+        compressedSum = float((x / (1.0 + numpy.abs(x))).sum())
+        return [compressedSum, 0 - compressedSum]
+
     def get_player_utilities_n1_1(self, boardState: ArmySimState) -> typing.List[float]:
         """
         Returns a list of floats (per player) between 1.0 and -1.0 where winning player is 1.0 and losing player is -1.0 and all players in between are in the range.
@@ -884,6 +1029,13 @@ class MctsEngineSummary(object):
 
         self.duration: float = 0.0
         self.iterations: int = 0
+        """Total iterations across all of the searches whose root stats were merged, see worker_iterations."""
+        self.worker_iterations: typing.List[int] = []
+        """Iterations per search, this processes own search first followed by each root parallel workers search."""
+        self.iterations_to_convergence: int = 0
+        """The iteration (checked every 16) after which the most visited root move of each player stopped changing in this processes search."""
+        self.transposition_hits: int = 0
+        self.transposition_evictions: int = 0
         self.trials_performed: int = 0
         self.backprop_iter: int = 0
         self.nodes_explored: int = 0
@@ -901,6 +1053,85 @@ class MctsEngineSummary(object):
 NO_MOVE_FOUND = 10000
 
 
+class MctsTranspositionTable(object):
+    """
+    Zobrist hash -> MctsNode for the current search, so that joint moves reaching the same position through a different move
+    order share one node. Holds at most capacity nodes, evicting the least recently used; nodes stay in the tree when evicted,
+    they just can't be transposed into anymore.
+    """
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.keys: ArmySimZobristKeys | None = None
+        self.hits: int = 0
+        self.evictions: int = 0
+        self._nodes: typing.Dict[int, MctsNode] = {}
+        """Dicts keep insertion order, so re-inserting on every hit keeps the least recently used node first."""
+
+    def reset(self, numTiles: int):
+        if self.keys is None or len(self.keys.tile_keys) != numTiles:
+            self.keys = ArmySimZobristKeys(numTiles)
+        self._nodes.clear()
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, stateHash: int) -> MctsNode | None:
+        node = self._nodes.pop(stateHash, None)
+        if node is not None:
+            self._nodes[stateHash] = node
+            self.hits += 1
+        return node
+
+    def put(self, stateHash: int, node: MctsNode):
+        self._nodes[stateHash] = node
+        if len(self._nodes) > self.capacity:
+            del self._nodes[next(iter(self._nodes))]
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+
+class MctsRootStats(object):
+    """
+    The root move stats of one independent search, with the moves keyed by (source tile index, dest tile index, move half) so
+    they can cross process boundaries without dragging the map along, and be merged into another search of the same root.
+    """
+    __slots__ = ('iterations', 'total_visit_count', 'move_keys_per_player', 'visit_counts', 'score_sums')
+
+    def __init__(self, rootNode: MctsNode, iterations: int):
+        self.iterations: int = iterations
+        self.total_visit_count: int = rootNode.totalVisitCount
+        self.move_keys_per_player: typing.List[typing.List[typing.Tuple[int, int, bool] | None]] = [
+            [MctsRootStats.get_move_key(move) for move in playerMoves] for playerMoves in rootNode.legalMovesPerPlayer
+        ]
+        self.visit_counts: typing.List[typing.List[int]] = [list(counts) for counts in rootNode.visitCounts]
+        self.score_sums: typing.List[typing.List[float]] = [list(sums) for sums in rootNode.scoreSums]
+
+    @staticmethod
+    def get_move_key(move: MoveBase | None) -> typing.Tuple[int, int, bool] | None:
+        if move is None:
+            return None
+        return move.source.tile_index, move.dest.tile_index, move.move_half
+
+    def merge_into(self, rootNode: MctsNode):
+        """Adds these visit counts and score sums onto the matching moves of rootNode. Moves rootNode doesn't have are dropped."""
+        for p, playerMoves in enumerate(rootNode.legalMovesPerPlayer):
+            indexByKey = {MctsRootStats.get_move_key(move): i for i, move in enumerate(playerMoves)}
+            visitCounts = rootNode.visitCounts[p]
+            scoreSums = rootNode.scoreSums[p]
+            for key, visits, scoreSum in zip(self.move_keys_per_player[p], self.visit_counts[p], self.score_sums[p]):
+                i = indexByKey.get(key, None)
+                if i is None:
+                    continue
+                while len(visitCounts) <= i:
+                    visitCounts.append(0)
+                    scoreSums.append(0.0)
+                visitCounts[i] += visits
+                scoreSums[i] += scoreSum
+
+        rootNode.totalVisitCount += self.total_visit_count
+
+
 class MctsNode(object):
     def __init__(
             self,
@@ -1055,7 +1286,8 @@ class Game(object):
         maxNumBiasedActions: int,
         maxNumPlayoutActions: int,
         biasedMoveRatio: float,
-        minRandomInitialMoves: int
+        minRandomInitialMoves: int,
+        undoLog: ArmySimUndoLog | None = None,
     ) -> Trial:
         """
         TD: Run a rollout....?
@@ -1068,6 +1300,7 @@ class Game(object):
         @param maxNumBiasedActions:
         @param maxNumPlayoutActions: limits the depth of the rollout from THIS point, regardless of how deep we already are...?
         @param biasedMoveRatio: the ratio at which to play biased moves, if available.
+        @param undoLog: if provided, every move is made through ArmyEngine.make_moves under this undo log, see unmake_playout.
         @return:
         """
 
@@ -1104,12 +1337,12 @@ class Game(object):
                 with self.telemetry.monitor_telemetry('playout move including bias/nonbias switch'):
                     if iter >= minRandomInitialMoves and numAllowedBiasedActions > 0 and (alwaysBiased or random.random() <= biasedMoveRatio):
                         with self.telemetry.monitor_telemetry('move playout biased'):
-                            self.playout_biased_move(trial)
+                            self.playout_biased_move(trial, undoLog)
                             # self.playout_biased_move__comparison_engine_slow(trial)
                             numAllowedBiasedActions -= 1
                     else:
                         with self.telemetry.monitor_telemetry('move playout random'):
-                            self.playout_random_move(trial)
+                            self.playout_random_move(trial, undoLog)
                 iter += 1
                 if iter > maxNumPlayoutActions + 1:
                     logbook.info(f'inf looping? {str(trial.context.board_state)}')
@@ -1125,15 +1358,21 @@ class Game(object):
 
         return trial
 
-    def apply(self, context: Context, combinedMove: BoardMoves, noClone: bool = False):
+    def apply(self, context: Context, combinedMove: BoardMoves, noClone: bool = False, undoLog: ArmySimUndoLog | None = None):
         """
         Applies moves to a context, updating its turn and current board state.
         @param context:
         @param combinedMove:
         @param noClone: if True, the moves will modify the board directly instead of cloning it and returning a new board.
+        @param undoLog: if provided, the moves modify the board directly, recording what they changed into undoLog.
         @return:
         """
         with self.telemetry.monitor_telemetry('playout apply move'):
+            if undoLog is not None:
+                # the engine journals into the board states open undo log itself, this is just ArmyEngine.make_moves inlined.
+                undoLog.plies += 1
+                noClone = True
+
             # nextTurn = context.turn + 1
             context.board_state = context.engine.get_next_board_state(
                 context.turn + 1,
@@ -1144,7 +1383,14 @@ class Game(object):
                 perfTelemetry=self.telemetry)
             context.turn += 1
 
-    def playout_random_move(self, trial: Trial):
+    def unmake_playout(self, context: Context, undoLog: ArmySimUndoLog):
+        """Reverts every move a playout made under undoLog, restoring the contexts board state, turn, and trial moves."""
+        context.engine.unmake_moves(context.board_state, undoLog)
+        context.turn -= undoLog.plies
+        moves = context.trial.moves
+        del moves[len(moves) - undoLog.plies:]
+
+    def playout_random_move(self, trial: Trial, undoLog: ArmySimUndoLog | None = None):
         bs = trial.context.board_state
 
         with self.telemetry.monitor_telemetry('random move gen'):
@@ -1171,7 +1417,7 @@ class Game(object):
         #     chosenEn = random.choice(enMoves) if len(enMoves) > 0 else None
 
         chosen = BoardMoves([frMove, enMove])
-        self.apply(trial.context, chosen, noClone=True)
+        self.apply(trial.context, chosen, noClone=True, undoLog=undoLog)
         trial.moves.append(chosen)
 
     def playout_biased_move__comparison_engine_slow(
@@ -1207,7 +1453,8 @@ class Game(object):
 
     def playout_biased_move(
             self,
-            trial: Trial
+            trial: Trial,
+            undoLog: ArmySimUndoLog | None = None,
     ):
         c = trial.context
         bs = c.board_state
@@ -1230,7 +1477,7 @@ class Game(object):
         #     raise AssertionError("?")
 
         chosen = BoardMoves([bestFrMove, bestEnMove])
-        self.apply(trial.context, chosen, noClone=True)
+        self.apply(trial.context, chosen, noClone=True, undoLog=undoLog)
         trial.moves.append(chosen)
 
         self._biased_rollout_expansions += 1
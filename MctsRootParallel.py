@@ -0,0 +1,120 @@
+"""
+Root parallel MCTS: independent DUCT searches of the same root in worker processes, with different seeds, whose root visit
+counts / score sums get merged into the root of the search running in this process (MctsRootStats.merge_into) before
+MctsDUCT picks moves. Enabled per MctsDUCT via root_parallel_workers.
+
+Workers are spawned (same as BotHost) and kept alive across scans in one lazily created pool, since spawning a worker means
+re-importing the bot. A scan whose workers run late terminates that pool, so their searches can't delay the next scan. Each scan pickles the ArmyEngine (map, board analysis, mcts runner settings) and base board state once
+and ships those bytes to every worker.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import random
+import time
+import traceback
+import typing
+
+import logbook
+
+from MctsLudii import MctsRootStats
+
+if typing.TYPE_CHECKING:
+    from ArmyEngine import ArmyEngine
+    from Engine.ArmyEngineModels import ArmySimState
+
+RESULT_GRACE_PERIOD: float = 0.05
+"""How much longer than the searches time limit to wait on a worker before dropping its root stats."""
+
+_pool: multiprocessing.pool.Pool | None = None
+_pool_workers: int = 0
+
+
+def _init_worker():
+    # the worker processes have no log queue to write to, and the parent logs the merged results anyway.
+    logbook.NullHandler().push_application()
+    import ArmyEngine  # noqa: F401 pre-import the engine so the first scan doesn't pay for it.
+
+
+def get_pool(workers: int) -> multiprocessing.pool.Pool:
+    """Returns the shared worker pool, (re)creating it if it doesn't have workers processes. Call early to warm it up."""
+    global _pool
+    global _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        ctx = multiprocessing.get_context('spawn')
+        _pool = ctx.Pool(processes=workers, initializer=_init_worker)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    global _pool_workers
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    _pool = None
+    _pool_workers = 0
+
+
+def run_root_search(payload: bytes, seed: int, maxTime: float, maxIterations: int) -> MctsRootStats:
+    """Runs inside a worker process. The time spent unpickling the payload counts against maxTime."""
+    start = time.perf_counter()
+    engine, baseBoardState = pickle.loads(payload)
+    engine.mcts_runner.root_parallel_workers = 0
+    engine.mcts_runner.reset()
+    engine._build_move_filters()
+    random.seed(seed)
+
+    if maxTime > 0.0:
+        maxTime = max(0.001, maxTime - (time.perf_counter() - start))
+
+    ctx = engine.create_mcts_context(baseBoardState)
+    root, duration = engine.mcts_runner.search_tree(ctx.game, ctx, maxTime, maxIterations, forcedPreExpansions=engine.forced_pre_expansions)
+    return MctsRootStats(root, engine.mcts_runner._iterations)
+
+
+def start_root_searches(
+        engine: ArmyEngine,
+        baseBoardState: ArmySimState,
+        workers: int,
+        maxTime: float,
+        maxIterations: int
+) -> typing.Callable[[], typing.List[MctsRootStats]]:
+    """
+    Starts workers root searches of baseBoardState and returns the callable that waits for (up to maxTime plus the grace
+    period from now) and returns their root stats. Workers that fail or run late are logged and left out, and late workers
+    get the pool shut down (see shutdown_pool).
+    """
+    start = time.perf_counter()
+    payload = pickle.dumps((engine, baseBoardState), protocol=pickle.HIGHEST_PROTOCOL)
+    pool = get_pool(workers)
+    asyncResults = [pool.apply_async(run_root_search, (payload, random.randrange(1 << 31), maxTime, maxIterations)) for _ in range(workers)]
+    logbook.info(f'root parallel MCTS started {workers} workers with a {len(payload)} byte payload in {time.perf_counter() - start:.4f}s')
+
+    def collect() -> typing.List[MctsRootStats]:
+        deadline = start + maxTime + RESULT_GRACE_PERIOD
+        rootStats = []
+        timedOut = 0
+        for i, asyncResult in enumerate(asyncResults):
+            try:
+                if maxTime > 0.0:
+                    rootStats.append(asyncResult.get(timeout=max(0.0, deadline - time.perf_counter())))
+                else:
+                    rootStats.append(asyncResult.get())
+            except multiprocessing.TimeoutError:
+                timedOut += 1
+                logbook.info(f'root parallel MCTS worker {i} ran past {maxTime:.3f}s + grace, dropping its root stats.')
+            except Exception:
+                logbook.error(f'root parallel MCTS worker {i} failed, dropping its root stats:\n{traceback.format_exc()}')
+
+        if timedOut > 0 and _pool is pool:
+            # the late searches keep running in their workers, and the next scans tasks would queue up behind them. Kill them
+            # with the pool instead, the next scan spawns a fresh one.
+            logbook.info(f'root parallel MCTS recycling the worker pool after {timedOut} late workers.')
+            shutdown_pool()
+        return rootStats
+
+    return collect
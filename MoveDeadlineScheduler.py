@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import typing
+from enum import IntEnum
+
+import logbook
+
+import DebugHelper
+from Models import Move
+
+if typing.TYPE_CHECKING:
+    from PerformanceTimer import PerformanceTimer
+
+
+class MovePhasePriority(IntEnum):
+    """Lower value = more important. Critical phases (king kills, threat defense) are never cut off."""
+    Critical = 0
+    High = 1
+    Normal = 2
+    Low = 3
+
+
+DEFAULT_PHASE_CUTOFFS: typing.Dict[MovePhasePriority, float] = {
+    MovePhasePriority.Critical: 1000.0,
+    MovePhasePriority.High: 0.40,
+    MovePhasePriority.Normal: 0.32,
+    MovePhasePriority.Low: 0.25,
+}
+"""Seconds since the turns update was received after which phases of that priority are no longer started. The server tick is 0.5s."""
+
+
+class MoveDeadlineScheduler(object):
+    """
+    Anytime move selection for one turn. The bot registers each phase of move selection with a priority before running it
+    (should_run), and offers cheap fallback moves as soon as it has them (offer). Once the turn deadline for a phases priority
+    has passed, should_run returns False and the bot returns get_best_move() instead of starting the phase, so a slow / lagged
+    turn still sends the best legal move found so far instead of nothing.
+    """
+
+    def __init__(self, perfTimer: PerformanceTimer, turn: int, player: int, phaseCutoffs: typing.Dict[MovePhasePriority, float] | None = None):
+        self.perf_timer: PerformanceTimer = perfTimer
+        self.turn: int = turn
+        self.player: int = player
+        self.phase_cutoffs: typing.Dict[MovePhasePriority, float] = phaseCutoffs if phaseCutoffs is not None else DEFAULT_PHASE_CUTOFFS
+
+        self.best_move: Move | None = None
+        self.best_move_priority: MovePhasePriority | None = None
+        self.best_move_source: str = ''
+
+        self.skipped_phases: typing.List[str] = []
+        """The phase names that were cut off by the deadline this turn, in the order they were asked about."""
+
+    def get_elapsed(self) -> float:
+        return self.perf_timer.get_elapsed_since_update(self.turn)
+
+    def should_run(self, phaseName: str, priority: MovePhasePriority) -> bool:
+        """Whether phaseName still fits before the deadline for its priority. Records the phase as skipped if not."""
+        if DebugHelper.IS_DEBUGGING:
+            return True
+
+        elapsed = self.get_elapsed()
+        if elapsed < self.phase_cutoffs[priority]:
+            return True
+
+        logbook.info(f'MoveDeadlineScheduler cutting off {priority.name} phase {phaseName} at {elapsed:.4f}s')
+        self.skipped_phases.append(phaseName)
+        return False
+
+    def is_legal(self, move: Move | None) -> bool:
+        if move is None:
+            return False
+        source = move.source
+        dest = move.dest
+        if source.player != self.player or source.army <= 1:
+            return False
+        if dest not in source.movable or dest.isNotPathable:
+            return False
+        return True
+
+    def offer(self, move: Move | None, source: str, priority: MovePhasePriority) -> bool:
+        """
+        Offers a fallback move. It is kept if it is legal and strictly more important than the current best move (the first
+        offer wins ties). Returns whether it became the best move.
+        """
+        if not self.is_legal(move):
+            return False
+        if self.best_move_priority is not None and self.best_move_priority <= priority:
+            return False
+
+        self.best_move = move
+        self.best_move_priority = priority
+        self.best_move_source = source
+        return True
+
+    def get_best_move(self) -> Move | None:
+        return self.best_move
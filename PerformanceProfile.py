@@ -0,0 +1,191 @@
+"""
+Converts the per-move event trees that PerformanceTimer appends to a JSONL file (PerformanceTimer.profile_export_path, one
+MoveTimer.to_profile_record per line) into Chrome trace (chrome://tracing, perfetto) or speedscope files, and reports the turns
+that blew the latency budget.
+
+python PerformanceProfile.py budget  path/to/perf_profile.jsonl [--budget 0.2]
+python PerformanceProfile.py chrome  path/to/perf_profile.jsonl out.trace.json
+python PerformanceProfile.py speedscope path/to/perf_profile.jsonl out.speedscope.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import typing
+
+
+def load_profile_records(filePath: str) -> typing.List[typing.Dict[str, typing.Any]]:
+    records = []
+    with open(filePath, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # the last line of a game that was killed mid-write.
+                continue
+    return records
+
+
+def _get_children_by_parent(record: typing.Dict[str, typing.Any]) -> typing.Dict[int | None, typing.List[int]]:
+    childrenByParent: typing.Dict[int | None, typing.List[int]] = {}
+    for i, event in enumerate(record['events']):
+        childrenByParent.setdefault(event['parent'], []).append(i)
+    for children in childrenByParent.values():
+        children.sort(key=lambda i: record['events'][i]['start'])
+    return childrenByParent
+
+
+def to_chrome_trace(records: typing.List[typing.Dict[str, typing.Any]]) -> typing.Dict[str, typing.Any]:
+    """Complete ('X') events on one thread, on a real time line (microseconds since the first move), plus one event per move."""
+    traceEvents = []
+    if not records:
+        return {'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}
+
+    origin = min(r['time'] + min([0.0] + [e['start'] for e in r['events']]) for r in records)
+    for record in records:
+        moveStart = record['time'] - origin
+        traceEvents.append({
+            'name': f'turn {record["turn"]}',
+            'cat': 'move',
+            'ph': 'X',
+            'ts': moveStart * 1_000_000,
+            'dur': record['dur'] * 1_000_000,
+            'pid': 1,
+            'tid': 1,
+            'args': {'turn': record['turn']},
+        })
+        for event in record['events']:
+            args = {'turn': record['turn']}
+            if 'counters' in event:
+                args.update(event['counters'])
+            traceEvents.append({
+                'name': event['name'],
+                'cat': 'event',
+                'ph': 'X',
+                'ts': (moveStart + event['start']) * 1_000_000,
+                'dur': event['dur'] * 1_000_000,
+                'pid': 1,
+                'tid': 1,
+                'args': args,
+            })
+
+    return {'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}
+
+
+def to_speedscope(records: typing.List[typing.Dict[str, typing.Any]], name: str = 'generals bot moves') -> typing.Dict[str, typing.Any]:
+    """
+    One evented profile with a 'turn N' frame per move wrapping that moves event tree. Each moves events are laid end to end
+    (no idle gaps between moves), and child times are clamped into their parents so speedscopes strict nesting holds.
+    """
+    frames: typing.List[typing.Dict[str, str]] = []
+    frameIndexByName: typing.Dict[str, int] = {}
+    events: typing.List[typing.Dict[str, typing.Any]] = []
+
+    def frame(frameName: str) -> int:
+        idx = frameIndexByName.get(frameName, None)
+        if idx is None:
+            idx = len(frames)
+            frameIndexByName[frameName] = idx
+            frames.append({'name': frameName})
+        return idx
+
+    at = 0.0
+
+    def emit(frameIdx: int, start: float, end: float, recordEvents: list, childIdxs: typing.List[int], childrenByParent: dict, offset: float):
+        nonlocal at
+        start = max(start, at)
+        end = max(end, start)
+        events.append({'type': 'O', 'frame': frameIdx, 'at': start})
+        at = start
+        for childIdx in childIdxs:
+            child = recordEvents[childIdx]
+            childStart = min(offset + child['start'], end)
+            childEnd = min(childStart + child['dur'], end)
+            emit(frame(child['name']), childStart, childEnd, recordEvents, childrenByParent.get(childIdx, []), childrenByParent, offset)
+        events.append({'type': 'C', 'frame': frameIdx, 'at': end})
+        at = end
+
+    for record in records:
+        recordEvents = record['events']
+        childrenByParent = _get_children_by_parent(record)
+        moveStart = at
+        # the move start gap event begins before the move itself does.
+        offset = moveStart - min([0.0] + [e['start'] for e in recordEvents])
+        moveEnd = max([offset + record['dur']] + [offset + e['start'] + e['dur'] for e in recordEvents if e['parent'] is None])
+        emit(frame(f'turn {record["turn"]}'), moveStart, moveEnd, recordEvents, childrenByParent.get(None, []), childrenByParent, offset)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'evented',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0.0,
+            'endValue': at,
+            'events': events,
+        }],
+    }
+
+
+def get_turns_over_budget(records: typing.List[typing.Dict[str, typing.Any]], budget: float = 0.2, topEvents: int = 5) -> typing.List[typing.Tuple[int, float, typing.List[typing.Tuple[str, float]]]]:
+    """
+    Returns (turn, moveDuration, [(eventName, eventDuration)...]) for every move whose duration since the update was received
+    exceeded budget, slowest moves first, each with its topEvents slowest leaf-most events (events none of whose children took
+    most of their time).
+    """
+    overBudget = []
+    for record in records:
+        sinceUpdate = record['dur'] - min([0.0] + [e['start'] for e in record['events']])
+        if sinceUpdate <= budget:
+            continue
+
+        childrenByParent = _get_children_by_parent(record)
+        recordEvents = record['events']
+        culprits = []
+        for i, event in enumerate(recordEvents):
+            children = childrenByParent.get(i, [])
+            if any(recordEvents[c]['dur'] > event['dur'] / 2 for c in children):
+                # one of its children is the real culprit, report that instead.
+                continue
+            culprits.append((event['name'], event['dur']))
+        culprits.sort(key=lambda c: c[1], reverse=True)
+        overBudget.append((record['turn'], sinceUpdate, culprits[:topEvents]))
+
+    overBudget.sort(key=lambda o: o[1], reverse=True)
+    return overBudget
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert / summarize PerformanceTimer JSONL profiles.')
+    parser.add_argument('mode', choices=['budget', 'chrome', 'speedscope'])
+    parser.add_argument('profile')
+    parser.add_argument('output', nargs='?', default=None)
+    parser.add_argument('--budget', type=float, default=0.2)
+    args = parser.parse_args()
+
+    records = load_profile_records(args.profile)
+    if args.mode == 'budget':
+        overBudget = get_turns_over_budget(records, args.budget)
+        print(f'{len(overBudget)} of {len(records)} moves took longer than {args.budget:.3f}s')
+        for turn, dur, culprits in overBudget:
+            print(f'turn {turn}: {dur:.4f}s')
+            for eventName, eventDur in culprits:
+                print(f'    {eventDur:.4f} {eventName}')
+        return 0
+
+    if args.output is None:
+        parser.error(f'{args.mode} requires an output path')
+
+    converted = to_chrome_trace(records) if args.mode == 'chrome' else to_speedscope(records)
+    with open(args.output, 'w') as file:
+        json.dump(converted, file)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
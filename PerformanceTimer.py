@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import json
 import logbook
 import queue
 import time
+import traceback
 import typing
 
 
@@ -16,6 +18,8 @@ class MoveEvent(object):
         self.event_end_time: float | None = None
         self.parent: MoveEvent | None = parent
         self.turn: int = turn
+        self.counters: typing.Dict[str, int] = {}
+        """Arbitrary named counts (cache hits etc) to show alongside the event timing. Events with counters are always included in the dumped event tree."""
 
     def __enter__(self):
         return self
@@ -32,11 +36,13 @@ class MoveEvent(object):
 
 
 class MoveTimer(object):
-    def __init__(self, turn: int):
+    def __init__(self, turn: int, profileExportPath: str | None = None):
         self.turn: int = turn
         self.move_beginning_time: float = time.perf_counter()
         self.event_list: typing.List[MoveEvent] = []
         self.move_sent_time: float | None = None
+        self.profile_export_path: str | None = profileExportPath
+        """If set, the whole event tree is appended to this file as one JSONL line when the move completes. See to_profile_record."""
         self._event_stack: "queue.LifoQueue[MoveEvent | None]" = queue.LifoQueue()
         self._event_stack.put(None)
 
@@ -46,6 +52,44 @@ class MoveTimer(object):
     def __exit__(self, *args, **kwargs):
         self.move_sent_time = time.perf_counter()
         logbook.info(f'\nMOVE Complete: {self.turn} ({self.move_sent_time - self.move_beginning_time:.4f} in, at game {self.move_sent_time:.4f})\n^^^~~~~~~~~~~~~~~^^^')
+        if self.profile_export_path is not None:
+            self.append_profile_record(self.profile_export_path)
+
+    def to_profile_record(self) -> typing.Dict[str, typing.Any]:
+        """
+        The full event tree for this move as plain json-able data. time is the perf_counter move_beginning_time, event times are seconds relative to it
+        (the UPDATE - MOVE START GAP event starts before 0, at the time the update was received). parent is the index of the
+        parent event in events, or None for top level events.
+        """
+        indexByEvent = {event: i for i, event in enumerate(self.event_list)}
+        events = []
+        for event in self.event_list:
+            record = {
+                'name': event.event_name,
+                'parent': indexByEvent.get(event.parent, None),
+                'start': event.event_start_time - self.move_beginning_time,
+                'dur': event.get_duration(),
+            }
+            if event.counters:
+                record['counters'] = event.counters
+            events.append(record)
+
+        moveDuration = (self.move_sent_time if self.move_sent_time is not None else time.perf_counter()) - self.move_beginning_time
+        return {
+            'turn': self.turn,
+            'time': self.move_beginning_time,
+            'dur': moveDuration,
+            'events': events,
+        }
+
+    def append_profile_record(self, filePath: str):
+        try:
+            line = json.dumps(self.to_profile_record(), separators=(',', ':'))
+            with open(filePath, 'a') as file:
+                file.write(line)
+                file.write('\n')
+        except:
+            logbook.error(f'failed to append turn {self.turn} perf profile to {filePath}:\n{traceback.format_exc()}')
 
     def begin_event(self, event_description: str) -> MoveEvent:
         parent: MoveEvent | None = None
@@ -64,6 +108,7 @@ class MoveTimer(object):
 
     def get_events_organized_longest_to_shortest(self, limit: int = 15, indentSize: int = 3) -> typing.List[str]:
         largestN = list(sorted(self.event_list, key=lambda e: e.get_duration(), reverse=True))[0:limit]
+        largestN.extend(e for e in self.event_list if e.counters and e not in largestN)
 
         byParent: typing.Dict[MoveEvent | None, typing.List[MoveEvent]] = {}
 
@@ -96,6 +141,8 @@ class MoveTimer(object):
         for event in eventLookupByParent[parentEvent]:
             dur = f'{event.get_duration():.4f}'.lstrip('0')
             output.append(f'{curIndentation}{dur} {event.event_name}')
+            if event.counters:
+                output.append(f'{nextIndentation}' + ', '.join(f'{name} {count}' for name, count in event.counters.items()))
             output.extend(self._dump_events_recurse(event, eventLookupByParent, nextIndentation, indentSize))
 
         return output
@@ -111,6 +158,9 @@ class PerformanceTimer(object):
 
         self.last_move_sent_time: float = time.perf_counter()
 
+        self.profile_export_path: str | None = None
+        """If set, every move's event tree is appended to this JSONL file. Convert with PerformanceProfile.py."""
+
     def record_update(self, turn: int, timeOfUpdate: float):
         """timeOfUpdate needs to be  time.time_ns() / NS_CONVERTER  NOT  time.perf_counter()"""
         if self.current_move is not None:
@@ -130,7 +180,7 @@ class PerformanceTimer(object):
         self.update_received_history[turn] = perfCounterUpdate
 
     def begin_move(self, turn: int) -> MoveTimer:
-        newMove = MoveTimer(turn)
+        newMove = MoveTimer(turn, self.profile_export_path)
         sinceLast = 0.0
         if self.current_move is not None:
             if newMove.turn != self.current_move.turn + 1:
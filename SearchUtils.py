@@ -4,7 +4,9 @@
     Generals.io Automated Client - https://github.com/harrischristiansen/generals-bot
     EklipZ bot - Tries to play generals lol
 """
+import functools
 import heapq
+import operator
 import types
 from argparse import ArgumentError
 from heapq import heappush, heappop
@@ -27,8 +29,203 @@ from base.client.tile import Tile
 from base.client.map import MapBase
 from MapMatrix import MapMatrix, MapMatrixSet
 
+try:
+    import SearchUtilsCython
+except ImportError:
+    SearchUtilsCython = None
+
 BYPASS_TIMEOUTS_FOR_DEBUGGING = False
 
+USE_COMPILED_BFS_KERNELS: bool = SearchUtilsCython is not None
+"""
+When the SearchUtilsCython extension is built (setup.py build_ext --inplace), the hottest plain BFS functions run over
+MapBase.get_movable_adjacency() in compiled loops instead. Visitation order / results are identical to the python versions.
+Set False to force the python implementations (debugging, profiling python callbacks).
+"""
+
+USE_PACKED_PRIORITY_KEYS: bool = False
+"""
+Opt in for the breadth_first_dynamic_max callers that have a priority key packer for their priority objects (see
+build_priority_key_packer), currently the ArmyTracker fog source / expected path / bisect searches and the ExpandUtils
+expansion search. The packed keys only change how fast the heap compares, the search order is identical. Off by default,
+the per push pack call measured slower than plain tuples in test_benchmark_dynamic_max_variants__nodes_per_second.
+"""
+
+_KERNEL_MAX_DEPTH = 1_000_000
+"""maxDepth values are clamped to this before handing them to the compiled kernels, which take a C int."""
+
+
+def _kernel_max_depth(maxDepth) -> int:
+    # dist > 2.5 is the same as dist > 2 for integer dists.
+    return math.floor(min(maxDepth, _KERNEL_MAX_DEPTH))
+
+
+def _kernel_skip_mask(map: MapBase, skipTiles) -> typing.Sequence[bool]:
+    if isinstance(skipTiles, MapMatrixSet):
+        return skipTiles.raw
+    if isinstance(skipTiles, MapMatrix):
+        emptyVal = skipTiles.empty_val
+        return [v != emptyVal for v in skipTiles.raw]
+
+    mask = bytearray(map.cols * map.rows)
+    for t in skipTiles:
+        mask[t.tile_index] = 1
+    return mask
+
+
+class _UncacheableArgument(Exception):
+    pass
+
+
+class TurnSearchCache(object):
+    """
+    Turn scoped memoization of search results. Many modules within one find_move ask for identical searches (same start tiles,
+    skip sets, depth), so results are stored by a structural key of the arguments. Entries are only valid for the
+    map.generation they were computed under, and are dropped automatically the first time a lookup sees a different generation.
+
+    Results are copied on the way in and out, so callers are free to mutate what they get back.
+    Calls with arguments that have no structural key (callables, arbitrary objects) are run uncached and counted as bypasses.
+    Searches that stop early on their time limit call report_search_time_limit_hit, and their (possibly worse) result is
+    returned but not stored, so an identical call later in the turn searches again. Those are counted as timeouts.
+
+    The cache lives on its map (map.turn_search_cache), so searches over other maps (sim / lookahead copies, other bots in
+    the same process) never see it. It is not locked; it assumes the map is only searched from one thread while it is active
+    (the bot only keeps it active inside select_move, the idle precompute worker runs between turns).
+    """
+
+    def __init__(self, map: MapBase):
+        self.map: MapBase = map
+        self.generation: int = map.generation
+        self.entries: typing.Dict[tuple, typing.Any] = {}
+        self.hits: typing.Dict[str, int] = {}
+        self.misses: typing.Dict[str, int] = {}
+        self.bypasses: typing.Dict[str, int] = {}
+        self.timeouts: typing.Dict[str, int] = {}
+        self.time_limit_hit: bool = False
+        """Set by report_search_time_limit_hit while a cached search is running."""
+        self._running_depth: int = 0
+
+    def get_counters(self) -> typing.Dict[str, int]:
+        counters = {}
+        for funcName in sorted(set(self.hits.keys()) | set(self.misses.keys()) | set(self.bypasses.keys())):
+            counters[f'{funcName} hit'] = self.hits.get(funcName, 0)
+            counters[f'{funcName} miss'] = self.misses.get(funcName, 0)
+            bypasses = self.bypasses.get(funcName, 0)
+            if bypasses:
+                counters[f'{funcName} bypass'] = bypasses
+            timeouts = self.timeouts.get(funcName, 0)
+            if timeouts:
+                counters[f'{funcName} timeout'] = timeouts
+        return counters
+
+    def call(self, func: typing.Callable, map: MapBase, args: tuple, kwargs: dict):
+        funcName = func.__name__
+        if map is not self.map:
+            self.bypasses[funcName] = self.bypasses.get(funcName, 0) + 1
+            return func(map, *args, **kwargs)
+
+        try:
+            key = (funcName, _cache_key(args), _cache_key(kwargs))
+        except _UncacheableArgument:
+            self.bypasses[funcName] = self.bypasses.get(funcName, 0) + 1
+            return func(map, *args, **kwargs)
+
+        if map.generation != self.generation:
+            self.entries.clear()
+            self.generation = map.generation
+
+        if key in self.entries:
+            self.hits[funcName] = self.hits.get(funcName, 0) + 1
+            return _copy_cached_result(self.entries[key])
+
+        self.misses[funcName] = self.misses.get(funcName, 0) + 1
+        outerTimeLimitHit = self.time_limit_hit
+        self.time_limit_hit = False
+        self._running_depth += 1
+        try:
+            result = func(map, *args, **kwargs)
+        finally:
+            self._running_depth -= 1
+            timeLimitHit = self.time_limit_hit
+            # a cached search nested inside another one cutting short makes the outer result partial too.
+            self.time_limit_hit = self._running_depth > 0 and (outerTimeLimitHit or timeLimitHit)
+        if timeLimitHit:
+            self.timeouts[funcName] = self.timeouts.get(funcName, 0) + 1
+            return result
+
+        # the search itself may have bumped the generation (it shouldn't, but then the result describes the new state anyway).
+        self.generation = map.generation
+        self.entries[key] = _copy_cached_result(result)
+        return result
+
+
+def begin_turn_search_cache(map: MapBase) -> TurnSearchCache:
+    """Starts a fresh turn scoped search cache for map, discarding any previous one. See TurnSearchCache."""
+    map.turn_search_cache = TurnSearchCache(map)
+    return map.turn_search_cache
+
+
+def end_turn_search_cache(map: MapBase) -> typing.Dict[str, int]:
+    """Stops caching for map and returns the hit / miss / bypass counters of the cache that was active (empty if none was)."""
+    cache = map.turn_search_cache
+    map.turn_search_cache = None
+    if cache is None:
+        return {}
+    return cache.get_counters()
+
+
+def report_search_time_limit_hit(map: MapBase):
+    """
+    Called by turn cached searches that stopped early because they ran out of time, so the active turn search cache (if any)
+    hands the result back without storing it. None of the currently cached searches enforce their maxTime, any that starts
+    to must call this when it bails out.
+    """
+    cache = map.turn_search_cache
+    if cache is not None:
+        cache.time_limit_hit = True
+
+
+def _cache_key(arg) -> typing.Hashable:
+    if arg is None or isinstance(arg, (int, float, str)):
+        return arg
+    if isinstance(arg, Tile):
+        return 't', arg.tile_index
+    if isinstance(arg, (set, frozenset)):
+        return 's', frozenset(_cache_key(a) for a in arg)
+    if isinstance(arg, dict):
+        return 'd', frozenset((_cache_key(k), _cache_key(v)) for k, v in arg.items())
+    if isinstance(arg, (list, tuple, deque)):
+        return 'l', tuple(_cache_key(a) for a in arg)
+    if isinstance(arg, MapMatrixSet):
+        return 'ms', tuple(arg.raw)
+    if isinstance(arg, MapMatrix):
+        return 'm', arg.empty_val, tuple(arg.raw)
+
+    raise _UncacheableArgument()
+
+
+def _copy_cached_result(result):
+    if result is None:
+        return None
+    if isinstance(result, MapMatrix):
+        return result.copy()
+    if isinstance(result, Path):
+        return result.clone()
+    return result
+
+
+def _turn_cached(func: typing.Callable) -> typing.Callable:
+    """Routes calls through the maps active TurnSearchCache when there is one. The first positional argument must be the map."""
+
+    @functools.wraps(func)
+    def wrapper(map, *args, **kwargs):
+        cache = map.turn_search_cache
+        if cache is None:
+            return func(map, *args, **kwargs)
+        return cache.call(func, map, args, kwargs)
+
+    return wrapper
+
 
 T = typing.TypeVar('T')
 
@@ -145,6 +342,7 @@ def count(enumerable: typing.Iterable[T], filter_func: typing.Callable[[T], bool
     return countMatch
 
 
+@_turn_cached
 def dest_breadth_first_target(
         map: MapBase,
         goalList: typing.Dict[Tile, typing.Tuple[int, int, float]] | typing.Iterable[Tile],
@@ -393,6 +591,7 @@ def _shortestPathHeurTile(goal, cur) -> int:
     return abs(goal.x - cur.x) + abs(goal.y - cur.y)
 
 
+@_turn_cached
 def a_star_kill(
         map,
         startTiles,
@@ -1148,6 +1347,48 @@ def breadth_first_dynamic(
     return pathObject
 
 
+def build_priority_key_packer(fieldCount: int, bitsPerField: int = 32, validate: bool = False) -> typing.Callable[[typing.Sequence], int]:
+    """
+    Builds a priorityKeyFunc for the breadth_first_dynamic_max family. The first fieldCount fields of the priority objects
+    must be ints (or bools) that fit in a signed bitsPerField bit int. They get packed into one int that orders exactly like
+    that prefix of the tuple, so most heap sifts compare a single int instead of walking the tuples field by field. The
+    fields after the prefix (floats, tiles, ...) can be anything; the heap falls back to comparing the full priority objects
+    when two keys are equal, so the search order stays exactly the same as without a key.
+
+    @param fieldCount: how many leading priority object fields to pack.
+    @param bitsPerField:
+    @param validate: raise if a packed field is not an int or does not fit. For tests, costs a check per push.
+    @return:
+    """
+    offset = 1 << (bitsPerField - 1)
+    totalOffset = 0
+    for i in range(fieldCount):
+        totalOffset = (totalOffset << bitsPerField) + offset
+
+    if fieldCount == 1 and not validate:
+        # a single int already orders like itself.
+        return operator.itemgetter(0)
+
+    def pack(priorityObject) -> int:
+        # adding the offsets once at the end is the same as offsetting each (possibly negative) field before shifting it in.
+        key = 0
+        for i in range(fieldCount):
+            key = (key << bitsPerField) + priorityObject[i]
+        return key + totalOffset
+
+    if not validate:
+        return pack
+
+    def pack_validated(priorityObject) -> int:
+        for i in range(fieldCount):
+            value = priorityObject[i]
+            if not isinstance(value, int) or not -offset <= value < offset:
+                raise AssertionError(f'priority field {i} = {value!r} of {priorityObject} does not pack into a signed {bitsPerField} bit int')
+        return pack(priorityObject)
+
+    return pack_validated
+
+
 def breadth_first_dynamic_max(
         map,
         startTiles: typing.Union[typing.List[Tile], typing.Dict[Tile, typing.Tuple[object, int]]],
@@ -1180,7 +1421,8 @@ def breadth_first_dynamic_max(
         includePath=False,
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
-        forceOld: bool = False
+        forceOld: bool = False,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
 ) -> Path | None:
     """
     @param map:
@@ -1193,6 +1435,7 @@ def breadth_first_dynamic_max(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -1321,7 +1564,10 @@ def breadth_first_dynamic_max(
             startVal = startPriorityObject
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, distance, tile, None, startList))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, distance, tile, None, startList))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, distance, tile, None, startList))
     else:
         for tile in startTiles:
             if nonDefaultPrioFunc:
@@ -1350,7 +1596,10 @@ def breadth_first_dynamic_max(
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, dist, tile, None, startList))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, dist, tile, None, startList))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, dist, tile, None, startList))
 
     start = time.perf_counter()
     iter = 0
@@ -1374,7 +1623,10 @@ def breadth_first_dynamic_max(
             logbook.info(f"BFS-DYNAMIC-MAX BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
             break
 
-        (prioVals, dist, current, parent, nodeList) = frontier.get()
+        if priorityKeyFunc is None:
+            (prioVals, dist, current, parent, nodeList) = heappop(qq)
+        else:
+            (prioKey, prioVals, dist, current, parent, nodeList) = heappop(qq)
         # if dist not in visited[current.x][current.y] or visited[current.x][current.y][dist][0] > prioVals:
         # if current in globalVisitedSet or (skipTiles != None and current in skipTiles):
         if useGlobalVisitedSet:
@@ -1407,7 +1659,7 @@ def breadth_first_dynamic_max(
             continue
         dist += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             if (next.isMountain
                     or (noNeutralCities and next.isCostlyNeutral)
@@ -1428,7 +1680,10 @@ def breadth_first_dynamic_max(
                         continue
                 newNodeList = nodeList.copy()
                 newNodeList.append((next, nextVal))
-                frontier.put((nextVal, dist, next, current, newNodeList))
+                if priorityKeyFunc is None:
+                    heappush(qq, (nextVal, dist, next, current, newNodeList))
+                else:
+                    heappush(qq, (priorityKeyFunc(nextVal), nextVal, dist, next, current, newNodeList))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -1524,7 +1779,8 @@ def breadth_first_dynamic_max_per_tile(
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
         useGlobalVisitedSet: bool = True,
-        forceOld: bool = False
+        forceOld: bool = False,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
 ) -> typing.Dict[Tile, Path]:
     """
     Keeps the max path from each of the start tiles as output. Since we force use a global visited set, the paths returned will never overlap each other.
@@ -1539,6 +1795,7 @@ def breadth_first_dynamic_max_per_tile(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -1647,7 +1904,10 @@ def breadth_first_dynamic_max_per_tile(
             startVal = startPriorityObject
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, distance, tile, None, startList, tile))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, distance, tile, None, startList, tile))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, distance, tile, None, startList, tile))
     else:
         for tile in startTiles:
             if priorityFunc != default_priority_func:
@@ -1676,7 +1936,10 @@ def breadth_first_dynamic_max_per_tile(
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, dist, tile, None, startList, tile))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, dist, tile, None, startList, tile))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, dist, tile, None, startList, tile))
 
     start = time.perf_counter()
     iter = 0
@@ -1694,7 +1957,10 @@ def breadth_first_dynamic_max_per_tile(
             logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
             break
 
-        (prioVals, dist, current, parent, nodeList, startTile) = frontier.get()
+        if priorityKeyFunc is None:
+            (prioVals, dist, current, parent, nodeList, startTile) = heappop(qq)
+        else:
+            (prioKey, prioVals, dist, current, parent, nodeList, startTile) = heappop(qq)
         # if dist not in visited[current.x][current.y] or visited[current.x][current.y][dist][0] > prioVals:
         # if current in globalVisitedSet or (skipTiles != None and current in skipTiles):
         if useGlobalVisitedSet:
@@ -1734,7 +2000,7 @@ def breadth_first_dynamic_max_per_tile(
             continue
         dist += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             if (next.isMountain
                     or (noNeutralCities and next.isCostlyNeutral)
@@ -1761,7 +2027,10 @@ def breadth_first_dynamic_max_per_tile(
                         continue
                 newNodeList = list(nodeList)
                 newNodeList.append((next, nextPrio))
-                frontier.put((nextPrio, dist, next, current, newNodeList, startTile))
+                if priorityKeyFunc is None:
+                    heappush(qq, (nextPrio, dist, next, current, newNodeList, startTile))
+                else:
+                    heappush(qq, (priorityKeyFunc(nextPrio), nextPrio, dist, next, current, newNodeList, startTile))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -1849,7 +2118,8 @@ def breadth_first_dynamic_max_per_tile_per_distance(
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
         useGlobalVisitedSet: bool = True,
-        forceOld: bool = False
+        forceOld: bool = False,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
 ) -> typing.Dict[Tile, typing.List[Path]]:
     """
     Keeps the max path from each of the start tiles as output. Since we force use a global visited set, the paths returned will never overlap each other.
@@ -1866,6 +2136,7 @@ def breadth_first_dynamic_max_per_tile_per_distance(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -1972,7 +2243,10 @@ def breadth_first_dynamic_max_per_tile_per_distance(
             startVal = startPriorityObject
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, distance, tile, None, startList, tile))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, distance, tile, None, startList, tile))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, distance, tile, None, startList, tile))
     else:
         for tile in startTiles:
             if priorityFunc != default_priority_func:
@@ -2001,7 +2275,10 @@ def breadth_first_dynamic_max_per_tile_per_distance(
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
             startList = list()
             startList.append((tile, startVal))
-            frontier.put((startVal, dist, tile, None, startList, tile))
+            if priorityKeyFunc is None:
+                frontier.put((startVal, dist, tile, None, startList, tile))
+            else:
+                frontier.put((priorityKeyFunc(startVal), startVal, dist, tile, None, startList, tile))
 
     start = time.perf_counter()
     iter = 0
@@ -2029,7 +2306,10 @@ def breadth_first_dynamic_max_per_tile_per_distance(
                 logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE-PER-DIST BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
                 break
 
-        (prioVals, dist, current, parent, nodeList, startTile) = frontier.get()
+        if priorityKeyFunc is None:
+            (prioVals, dist, current, parent, nodeList, startTile) = heappop(qq)
+        else:
+            (prioKey, prioVals, dist, current, parent, nodeList, startTile) = heappop(qq)
         # if dist not in visited[current.x][current.y] or visited[current.x][current.y][dist][0] > prioVals:
         # if current in globalVisitedSet or (skipTiles != None and current in skipTiles):
         if useGlobalVisitedSet:
@@ -2075,7 +2355,7 @@ def breadth_first_dynamic_max_per_tile_per_distance(
             continue
         dist += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             if (next.isMountain
                     or (noNeutralCities and next.isCostlyNeutral)
@@ -2105,7 +2385,10 @@ def breadth_first_dynamic_max_per_tile_per_distance(
                         continue
                 newNodeList = list(nodeList)
                 newNodeList.append((next, nextPrio))
-                frontier.put((nextPrio, dist, next, current, newNodeList, startTile))
+                if priorityKeyFunc is None:
+                    heappush(qq, (nextPrio, dist, next, current, newNodeList, startTile))
+                else:
+                    heappush(qq, (priorityKeyFunc(nextPrio), nextPrio, dist, next, current, newNodeList, startTile))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -2205,6 +2488,7 @@ def breadth_first_dynamic_max_global_visited(
         includePath=False,
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
         **kwargs  # swallows the garbage from the non-global-visited parameters
 ) -> Path | None:
     """
@@ -2218,6 +2502,7 @@ def breadth_first_dynamic_max_global_visited(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -2337,7 +2622,10 @@ def breadth_first_dynamic_max_global_visited(
             (startPriorityObject, distance) = startTiles[tile]
 
             startVal = startPriorityObject
-            heapq.heappush(frontier, (startVal, distance, 0, tile, None))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, distance, 0, tile, None))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, distance, 0, tile, None))
     else:
         for tile in startTiles:
             if nonDefaultPrioFunc:
@@ -2364,7 +2652,10 @@ def breadth_first_dynamic_max_global_visited(
                         goalIncrement *= -1
 
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
-            heapq.heappush(frontier, (startVal, dist, 0, tile, None))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, dist, 0, tile, None))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, dist, 0, tile, None))
 
     start = time.perf_counter()
     iter = 0
@@ -2386,7 +2677,10 @@ def breadth_first_dynamic_max_global_visited(
             logbook.info(f"BFS-DYNAMIC-MAX BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
             break
 
-        (prioVals, dist, curTurns, current, parent) = heapq.heappop(frontier)
+        if priorityKeyFunc is None:
+            (prioVals, dist, curTurns, current, parent) = heappop(frontier)
+        else:
+            (prioKey, prioVals, dist, curTurns, current, parent) = heappop(frontier)
         # if dist not in visited[current.x][current.y] or visited[current.x][current.y][dist][0] > prioVals:
         # if current in globalVisitedSet or (skipTiles != None and current in skipTiles):
 
@@ -2425,7 +2719,7 @@ def breadth_first_dynamic_max_global_visited(
         dist += 1
         curTurns += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             if (next.isMountain
                     or (noNeutralCities and next.isCostlyNeutral)
@@ -2443,7 +2737,10 @@ def breadth_first_dynamic_max_global_visited(
                     shouldSkip = skipFunc(next, nextVal)
                     if shouldSkip:
                         continue
-                heapq.heappush(frontier, (nextVal, dist, curTurns, next, current))
+                if priorityKeyFunc is None:
+                    heappush(frontier, (nextVal, dist, curTurns, next, current))
+                else:
+                    heappush(frontier, (priorityKeyFunc(nextVal), nextVal, dist, curTurns, next, current))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -2546,6 +2843,7 @@ def breadth_first_dynamic_max_per_tile_global_visited(
         priorityMatrixSkipEnd: bool = False,
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
         **kwargs
 ) -> typing.Dict[Tile, Path]:
     """
@@ -2561,6 +2859,7 @@ def breadth_first_dynamic_max_per_tile_global_visited(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -2664,7 +2963,10 @@ def breadth_first_dynamic_max_per_tile_global_visited(
             (startPriorityObject, distance) = startTiles[tile]
 
             startVal = startPriorityObject
-            heapq.heappush(frontier, (startVal, distance, 0, tile, None, tile))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, distance, 0, tile, None, tile))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, distance, 0, tile, None, tile))
     else:
         for tile in startTiles:
             if priorityFunc != default_priority_func:
@@ -2691,7 +2993,10 @@ def breadth_first_dynamic_max_per_tile_global_visited(
                         goalIncrement *= -1
 
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
-            heapq.heappush(frontier, (startVal, dist, 0, tile, None, tile))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, dist, 0, tile, None, tile))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, dist, 0, tile, None, tile))
 
     start = time.perf_counter()
     iter = 0
@@ -2707,7 +3012,10 @@ def breadth_first_dynamic_max_per_tile_global_visited(
             logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
             break
 
-        (prioVals, dist, curTurns, current, parent, startTile) = heapq.heappop(frontier)
+        if priorityKeyFunc is None:
+            (prioVals, dist, curTurns, current, parent, startTile) = heappop(frontier)
+        else:
+            (prioKey, prioVals, dist, curTurns, current, parent, startTile) = heappop(frontier)
         # if dist not in visited[current.x][current.y] or visited[current.x][current.y][dist][0] > prioVals:
         # if current in globalVisitedSet or (skipTiles != None and current in skipTiles):
 
@@ -2745,7 +3053,7 @@ def breadth_first_dynamic_max_per_tile_global_visited(
         dist += 1
         curTurns += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             if (next.isMountain
                     or (noNeutralCities and next.isCostlyNeutral)
@@ -2767,7 +3075,10 @@ def breadth_first_dynamic_max_per_tile_global_visited(
                     shouldSkip = skipFunc(next, nextPrio)
                     if shouldSkip:
                         continue
-                heapq.heappush(frontier, (nextPrio, dist, curTurns, next, current, startTile))
+                if priorityKeyFunc is None:
+                    heappush(frontier, (nextPrio, dist, curTurns, next, current, startTile))
+                else:
+                    heappush(frontier, (priorityKeyFunc(nextPrio), nextPrio, dist, curTurns, next, current, startTile))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -2870,6 +3181,7 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
         priorityMatrixSkipEnd: bool = False,
         ignoreNonPlayerArmy: bool = False,
         ignoreIncrement: bool = True,
+        priorityKeyFunc: typing.Callable[[typing.Any], int] | None = None,
         **kwargs
 ) -> typing.Dict[Tile, typing.List[Path]]:
     """
@@ -2888,6 +3200,7 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
     @param skipTiles:
     @param searchingPlayer:
     @param priorityFunc: priorityFunc is (nextTile, currentPriorityObject) -> nextPriorityObject
+    @param priorityKeyFunc: opt in, see build_priority_key_packer. (priorityObject) -> int that orders the same as the priority objects leading fields, the heap compares those ints first and only falls back to the priority tuples on ties.
     @param skipFunc:
     @param ignoreStartTile:
     @param incrementBackward:
@@ -2984,7 +3297,10 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
             startVal = startPriorityObject
             startDict = {}
             maxValuesDict[tile] = startDict
-            heapq.heappush(frontier, (startVal, distance, 0, tile, None, startDict))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, distance, 0, tile, None, startDict))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, distance, 0, tile, None, startDict))
     else:
         for tile in startTiles:
             # visited.add(tile.tile_index)
@@ -3012,7 +3328,10 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
             maxValuesDict[tile] = startDict
 
             startVal = (dist, negCityCount, negEnemyTileCount, negArmySum, tile.x, tile.y, goalIncrement)
-            heapq.heappush(frontier, (startVal, dist, 0, tile, None, startDict))
+            if priorityKeyFunc is None:
+                heapq.heappush(frontier, (startVal, dist, 0, tile, None, startDict))
+            else:
+                heapq.heappush(frontier, (priorityKeyFunc(startVal), startVal, dist, 0, tile, None, startDict))
 
     start = time.perf_counter()
     iter = 0
@@ -3035,7 +3354,10 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
                 logbook.info(f"BFS-DYNAMIC-MAX-PER-TILE-PER-DIST BREAKING EARLY @ {time.perf_counter() - start:.3f} iter {iter}")
                 break
 
-        (prioVals, dist, curTurns, current, parent, maxDict) = heapq.heappop(frontier)
+        if priorityKeyFunc is None:
+            (prioVals, dist, curTurns, current, parent, maxDict) = heappop(frontier)
+        else:
+            (prioKey, prioVals, dist, curTurns, current, parent, maxDict) = heappop(frontier)
         # diagTile = (
         #         current.x,
         #         current.y
@@ -3087,7 +3409,7 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
         dist += 1
         curTurns += 1
         for next in current.movable:  # new spots to try
-            if next == parent:
+            if next is parent:
                 continue
             # if next.tile_index in visited:
             #     continue
@@ -3112,7 +3434,10 @@ def breadth_first_dynamic_max_per_tile_per_distance_global_visited(
                         continue
 
                 # visited.add(next.tile_index)
-                heapq.heappush(frontier, (nextPrio, dist, curTurns, next, current, maxDict))
+                if priorityKeyFunc is None:
+                    heappush(frontier, (nextPrio, dist, curTurns, next, current, maxDict))
+                else:
+                    heappush(frontier, (priorityKeyFunc(nextPrio), nextPrio, dist, curTurns, next, current, maxDict))
     if not noLog:
         logbook.info(f"BFS-DYNAMIC-MAX ITERATIONS {iter}, DURATION: {time.perf_counter() - start:.4f}, DEPTH: {depthEvaluated}")
     if foundDist >= 1000:
@@ -3707,6 +4032,11 @@ def breadth_first_foreach_dist_fast_incl_neut_cities(
     if len(startTiles) == 0:
         return
 
+    if USE_COMPILED_BFS_KERNELS:
+        indptr, indices = map.get_movable_adjacency()
+        SearchUtilsCython.foreach_dist_incl_neut_cities(map.tiles_by_index, indptr, indices, [t.tile_index for t in startTiles], _kernel_max_depth(maxDepth), foreachFunc)
+        return
+
     frontier: typing.Deque[typing.Tuple[Tile, int]] = deque()
 
     globalVisited = set()
@@ -3796,6 +4126,11 @@ def breadth_first_foreach_dist_fast_no_neut_cities(
     if len(startTiles) == 0:
         return
 
+    if USE_COMPILED_BFS_KERNELS:
+        indptr, indices = map.get_movable_adjacency()
+        SearchUtilsCython.foreach_dist_no_neut_cities(map.tiles_by_index, indptr, indices, [t.tile_index for t in startTiles], _kernel_max_depth(maxDepth), foreachFunc)
+        return
+
     frontier: typing.Deque[typing.Tuple[Tile, int]] = deque()
 
     globalVisited = set()
@@ -3844,6 +4179,11 @@ def breadth_first_foreach_dist_fast_no_default_skip(
     if len(startTiles) == 0:
         return
 
+    if USE_COMPILED_BFS_KERNELS:
+        indptr, indices = map.get_movable_adjacency()
+        SearchUtilsCython.foreach_dist_no_default_skip(map.tiles_by_index, indptr, indices, [t.tile_index for t in startTiles], _kernel_max_depth(maxDepth), foreachFunc)
+        return
+
     frontier: typing.Deque[typing.Tuple[Tile, int]] = deque()
 
     globalVisited = set()
@@ -4033,7 +4373,19 @@ def breadth_first_foreach_dist_revisit_callback(
             f"Completed breadth_first_foreach_dist_revisit_callback. startTiles[0] {startTiles[0].x},{startTiles[0].y}: ITERATIONS {iter}, DURATION {time.perf_counter() - start:.3f}, DEPTH {dist}")
 
 
+def _build_distance_map_matrix_compiled(map: MapBase, startTiles: typing.Iterable[Tile], maxDepth: int, skipMask: typing.Sequence[bool] | None = None) -> MapMatrixInterface[int]:
+    indptr, indices = map.get_movable_adjacency()
+    distanceMap = MapMatrix(None)
+    distanceMap.map = map
+    distanceMap.empty_val = 1000
+    distanceMap.raw = SearchUtilsCython.build_distance_map_raw(map.tiles_by_index, indptr, indices, [t.tile_index for t in startTiles], maxDepth, skipMask)
+    return distanceMap
+
+
 def build_distance_map_matrix(map: MapBase, startTiles: typing.Iterable[Tile]) -> MapMatrixInterface[int]:
+    if USE_COMPILED_BFS_KERNELS:
+        return _build_distance_map_matrix_compiled(map, startTiles, _KERNEL_MAX_DEPTH)
+
     distanceMap = MapMatrix(map, 1000)
 
     frontier = deque()
@@ -4062,6 +4414,9 @@ def build_distance_map_matrix(map: MapBase, startTiles: typing.Iterable[Tile]) -
 
 
 def build_distance_map_matrix_with_max_depth(map: MapBase, startTiles: typing.Iterable[Tile], maxDepth: int) -> MapMatrixInterface[int]:
+    if USE_COMPILED_BFS_KERNELS:
+        return _build_distance_map_matrix_compiled(map, startTiles, _kernel_max_depth(maxDepth))
+
     distanceMap = MapMatrix(map, 1000)
 
     frontier = deque()
@@ -4091,6 +4446,7 @@ def build_distance_map_matrix_with_max_depth(map: MapBase, startTiles: typing.It
     return distanceMap
 
 
+@_turn_cached
 def build_distance_map_matrix_with_skip(map, startTiles, skipTiles=None, maxDepth: int = 1000) -> MapMatrixInterface[int]:
     """
     Builds a distance map to all reachable tiles (including neutral cities). Does not put distances in for mountains / undiscovered obstacles.
@@ -4107,6 +4463,9 @@ def build_distance_map_matrix_with_skip(map, startTiles, skipTiles=None, maxDept
     if not isinstance(skipTiles, set) and not isinstance(skipTiles, MapMatrix) and not isinstance(skipTiles, MapMatrixSet):
         skipTiles = {t for t in skipTiles}
 
+    if USE_COMPILED_BFS_KERNELS:
+        return _build_distance_map_matrix_compiled(map, startTiles, _kernel_max_depth(maxDepth), _kernel_skip_mask(map, skipTiles))
+
     distanceMap = MapMatrix(map, 1000)
 
     frontier = deque()
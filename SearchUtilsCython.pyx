@@ -0,0 +1,262 @@
+# cython: boundscheck=False, wraparound=False, initializedcheck=False
+"""
+Compiled kernels for the hottest SearchUtils BFS traversals.
+
+These walk the flat CSR movable adjacency exported by MapBase.get_movable_adjacency() (indptr / indices int32 arrays
+keyed by tile_index, in the same neighbor order as tile.movable) with C queues / visited arrays instead of python
+deques / sets of tile indexes. Python is only called back into for the foreach function (which is also the skip func)
+and for the per-tile obstacle flags.
+
+Each function here must visit tiles in EXACTLY the same order, with exactly the same skip semantics, as the pure python
+SearchUtils function it replaces, because the foreach callbacks are order sensitive. See Tests/test_SearchUtils.py parity tests.
+"""
+import cython
+from libc.stdlib cimport malloc, calloc, free
+
+cdef int UNREACHABLE = 1000
+
+
+def foreach_dist_incl_neut_cities(
+        list tilesByIndex,
+        const int[::1] indptr,
+        const int[::1] indices,
+        list startIdxs,
+        int maxDepth,
+        object foreachFunc):
+    """Kernel for SearchUtils.breadth_first_foreach_dist_fast_incl_neut_cities."""
+    cdef int n = len(tilesByIndex)
+    cdef int cap = n + len(startIdxs)
+    cdef int* queueIdx = <int*>malloc(cap * sizeof(int))
+    cdef int* queueDist = <int*>malloc(cap * sizeof(int))
+    cdef unsigned char* visited = <unsigned char*>calloc(n, sizeof(unsigned char))
+    cdef int head = 0
+    cdef int tail = 0
+    cdef int cur, dist, newDist, j, nxt, startIdx
+
+    if queueIdx == NULL or queueDist == NULL or visited == NULL:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+        raise MemoryError()
+
+    try:
+        for startIdx in startIdxs:
+            queueIdx[tail] = startIdx
+            queueDist[tail] = 0
+            tail += 1
+            visited[startIdx] = 1
+
+        while head < tail:
+            cur = queueIdx[head]
+            dist = queueDist[head]
+            head += 1
+
+            tile = tilesByIndex[cur]
+            if tile.isNotPathable:
+                continue
+            if dist > maxDepth:
+                break
+
+            if foreachFunc(tile, dist):
+                continue
+
+            newDist = dist + 1
+            for j in range(indptr[cur], indptr[cur + 1]):
+                nxt = indices[j]
+                if visited[nxt]:
+                    continue
+                visited[nxt] = 1
+                queueIdx[tail] = nxt
+                queueDist[tail] = newDist
+                tail += 1
+    finally:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+
+
+def foreach_dist_no_neut_cities(
+        list tilesByIndex,
+        const int[::1] indptr,
+        const int[::1] indices,
+        list startIdxs,
+        int maxDepth,
+        object foreachFunc):
+    """Kernel for SearchUtils.breadth_first_foreach_dist_fast_no_neut_cities."""
+    cdef int n = len(tilesByIndex)
+    cdef int cap = n + len(startIdxs)
+    cdef int* queueIdx = <int*>malloc(cap * sizeof(int))
+    cdef int* queueDist = <int*>malloc(cap * sizeof(int))
+    cdef unsigned char* visited = <unsigned char*>calloc(n, sizeof(unsigned char))
+    cdef int head = 0
+    cdef int tail = 0
+    cdef int cur, dist, newDist, j, nxt, startIdx
+
+    if queueIdx == NULL or queueDist == NULL or visited == NULL:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+        raise MemoryError()
+
+    try:
+        for startIdx in startIdxs:
+            if tilesByIndex[startIdx].isMountain:
+                continue
+            queueIdx[tail] = startIdx
+            queueDist[tail] = 0
+            tail += 1
+            visited[startIdx] = 1
+
+        while head < tail:
+            cur = queueIdx[head]
+            dist = queueDist[head]
+            head += 1
+
+            if foreachFunc(tilesByIndex[cur], dist):
+                continue
+
+            newDist = dist + 1
+            if newDist > maxDepth:
+                continue
+            for j in range(indptr[cur], indptr[cur + 1]):
+                nxt = indices[j]
+                if visited[nxt]:
+                    continue
+                visited[nxt] = 1
+                if tilesByIndex[nxt].isObstacle:
+                    continue
+                queueIdx[tail] = nxt
+                queueDist[tail] = newDist
+                tail += 1
+    finally:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+
+
+def foreach_dist_no_default_skip(
+        list tilesByIndex,
+        const int[::1] indptr,
+        const int[::1] indices,
+        list startIdxs,
+        int maxDepth,
+        object foreachFunc):
+    """Kernel for SearchUtils.breadth_first_foreach_dist_fast_no_default_skip."""
+    cdef int n = len(tilesByIndex)
+    cdef int cap = n + len(startIdxs)
+    cdef int* queueIdx = <int*>malloc(cap * sizeof(int))
+    cdef int* queueDist = <int*>malloc(cap * sizeof(int))
+    cdef unsigned char* visited = <unsigned char*>calloc(n, sizeof(unsigned char))
+    cdef int head = 0
+    cdef int tail = 0
+    cdef int cur, dist, newDist, j, nxt, startIdx
+
+    if queueIdx == NULL or queueDist == NULL or visited == NULL:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+        raise MemoryError()
+
+    try:
+        for startIdx in startIdxs:
+            queueIdx[tail] = startIdx
+            queueDist[tail] = 0
+            tail += 1
+            visited[startIdx] = 1
+
+        while head < tail:
+            cur = queueIdx[head]
+            dist = queueDist[head]
+            head += 1
+
+            if foreachFunc(tilesByIndex[cur], dist):
+                continue
+
+            newDist = dist + 1
+            if newDist > maxDepth:
+                continue
+            for j in range(indptr[cur], indptr[cur + 1]):
+                nxt = indices[j]
+                if visited[nxt]:
+                    continue
+                visited[nxt] = 1
+                queueIdx[tail] = nxt
+                queueDist[tail] = newDist
+                tail += 1
+    finally:
+        free(queueIdx)
+        free(queueDist)
+        free(visited)
+
+
+def build_distance_map_raw(
+        list tilesByIndex,
+        const int[::1] indptr,
+        const int[::1] indices,
+        list startIdxs,
+        int maxDepth,
+        object skipMask = None) -> list:
+    """
+    Kernel for SearchUtils.build_distance_map_matrix / _with_max_depth / _with_skip. No python callbacks at all.
+    Returns the raw distance list (UNREACHABLE = 1000 for tiles never reached) to be used as a MapMatrix.raw.
+
+    @param skipMask: optional sequence of truthy values by tile_index; skipped tiles get a distance but are not expanded through (same as obstacles).
+    """
+    cdef int n = len(tilesByIndex)
+    cdef int cap = n + len(startIdxs)
+    cdef int* queueIdx = <int*>malloc(cap * sizeof(int))
+    cdef int* queueDist = <int*>malloc(cap * sizeof(int))
+    cdef int* raw = <int*>malloc(n * sizeof(int))
+    cdef unsigned char* blocked = <unsigned char*>calloc(n, sizeof(unsigned char))
+    cdef int head = 0
+    cdef int tail = 0
+    cdef int cur, dist, newDist, j, nxt, startIdx, i
+
+    if queueIdx == NULL or queueDist == NULL or raw == NULL or blocked == NULL:
+        free(queueIdx)
+        free(queueDist)
+        free(raw)
+        free(blocked)
+        raise MemoryError()
+
+    try:
+        for i in range(n):
+            raw[i] = UNREACHABLE
+            if tilesByIndex[i].isObstacle:
+                blocked[i] = 1
+        if skipMask is not None:
+            for i in range(n):
+                if skipMask[i]:
+                    blocked[i] = 1
+
+        for startIdx in startIdxs:
+            raw[startIdx] = 0
+            queueIdx[tail] = startIdx
+            queueDist[tail] = 0
+            tail += 1
+
+        while head < tail:
+            cur = queueIdx[head]
+            dist = queueDist[head]
+            head += 1
+
+            newDist = dist + 1
+            if newDist > maxDepth:
+                break
+            for j in range(indptr[cur], indptr[cur + 1]):
+                nxt = indices[j]
+                if raw[nxt] != UNREACHABLE:
+                    continue
+                raw[nxt] = newDist
+                if blocked[nxt]:
+                    continue
+                queueIdx[tail] = nxt
+                queueDist[tail] = newDist
+                tail += 1
+
+        return [raw[i] for i in range(n)]
+    finally:
+        free(queueIdx)
+        free(queueDist)
+        free(raw)
+        free(blocked)
@@ -107,6 +107,12 @@ class GamePlayer(object):
         self.tiles_lost_this_turn: typing.Set[Tile] = set()
         self.dead: bool = map_raw.players[player_index].dead
         self.captured_by: int = -1
+        self.tile_updates: typing.List[typing.Tuple[int, int, bool, bool]] | None = None
+        """
+        By tile index, the (tile, army, isCity, isGeneral) the simulated server last sent this player. Like the real clients
+        patched map grid, only the entries for tiles that changed or whose vision changed get rewritten each turn, and then all of
+        it gets replayed into the players map.
+        """
 
     def set_captured(self, captured_by_player: int):
         self.dead = True
@@ -203,8 +209,26 @@ class GameSimulator(object):
         self.moves_history: typing.List[typing.List[typing.Union[None, Move]]] = []
         """moves_history[-1] is the most recent set of moves, and moves_history[-1][0] would be player 0's selected move."""
         self.tiles_updated_this_cycle: typing.Set[Tile] = set()
+        self.tiles_updated_last_cycle: typing.Set[Tile] | None = None
+        """The tiles whose sim_map deltas need resetting at the start of the next turn. None until the first turn resets all of them."""
         self.ignore_illegal_moves = ignore_illegal_moves
 
+        self._vision_watchers: typing.List[typing.List[Tile]] = [[] for _ in map_raw.tiles_by_index]
+        """By tile index, the tiles that the tile grants vision of (itself, plus every tile that has it as an adjacent)."""
+        for tile in map_raw.tiles_by_index:
+            self._vision_watchers[tile.tile_index].append(tile)
+            for adj in tile.adjacents:
+                if adj is not tile:
+                    self._vision_watchers[adj.tile_index].append(tile)
+
+        self._team_vision_counts: typing.Dict[int, typing.List[int]] | None = None
+        """By team, by tile index, how many tiles that grant vision of the tile the team owns. The team sees the tile when non-zero."""
+        self._vision_owners: typing.List[int] = []
+        """By tile index, the owner each tile had when _team_vision_counts last counted it."""
+        self._bonus_tiles: typing.List[Tile] | None = None
+        """Generals, cities and swamps, the only tiles whose army changes on the city bonus turns."""
+        self._scores: typing.List[Score] | None = None
+
         # Initialize move resolver with the map
         self.move_resolver = MoveResolver(map_raw)
 
@@ -220,8 +244,13 @@ class GameSimulator(object):
         move_list = [pair for pair in enumerate(self.moves)]
 
         logbook.info(f'SIM MAP TURN {self.turn + 1}')
-        self.sim_map.update_turn(self.turn + 1)
-        for tile in self.sim_map.get_all_tiles():
+        # only the tiles that changed last turn have deltas to reset, every other tiles delta still says it didn't change.
+        self.sim_map.turn = self.turn + 1
+        tilesToReset = self.tiles_updated_last_cycle
+        if tilesToReset is None:
+            tilesToReset = self.sim_map.tiles_by_index
+        for tile in tilesToReset:
+            tile.delta = TileDelta()
             tile.delta.oldArmy = tile.army
             tile.delta.oldOwner = tile.player
             tile.delta.newOwner = tile.player
@@ -251,6 +280,7 @@ class GameSimulator(object):
         logbook.info(f'END SIM MAP TURN {self.turn}, UPDATING PLAYER MAPS')
 
         self.send_update_to_player_maps()
+        self.tiles_updated_last_cycle = self.tiles_updated_this_cycle
         self.tiles_updated_this_cycle = set()
 
     def is_game_over(self) -> bool:
@@ -369,17 +399,26 @@ class GameSimulator(object):
 
         isCityBonus = self.turn & 1 == 0
         isArmyBonus = self.turn % 50 == 0
-        for mapTile in self.sim_map.tiles_by_index:
+        if not isCityBonus:
+            return
+
+        if isArmyBonus:
+            tiles = self.sim_map.tiles_by_index
+        else:
+            if self._bonus_tiles is None:
+                self._bonus_tiles = [t for t in self.sim_map.tiles_by_index if t.isGeneral or t.isCity or t.isSwamp]
+            tiles = self._bonus_tiles
+
+        for mapTile in tiles:
             updated = False
-            if isCityBonus:
-                if mapTile.isGeneral or (mapTile.isCity and not mapTile.isNeutral):
-                    mapTile.army += 1
-                    updated = True
-                if mapTile.isSwamp and mapTile.player >= 0:
-                    mapTile.army -= 1
-                    if mapTile.army == 0:
-                        mapTile.player = -1
-                    updated = True
+            if mapTile.isGeneral or (mapTile.isCity and not mapTile.isNeutral):
+                mapTile.army += 1
+                updated = True
+            if mapTile.isSwamp and mapTile.player >= 0:
+                mapTile.army -= 1
+                if mapTile.army == 0:
+                    mapTile.player = -1
+                updated = True
 
             if isArmyBonus and mapTile.player >= 0 and not mapTile.isDesert:
                 mapTile.army += 1
@@ -389,18 +428,29 @@ class GameSimulator(object):
                 self.tiles_updated_this_cycle.add(mapTile)
 
     def _update_scores(self):
-        scores = [Score(player.index, 0, 0, player.dead) for player in self.players]
-
-        for row in self.sim_map.grid:
-            for mapTile in row:
+        if self._scores is None:
+            self._scores = [Score(player.index, 0, 0, player.dead) for player in self.players]
+            for mapTile in self.sim_map.tiles_by_index:
                 if mapTile.isNeutral or mapTile.isMountain:
                     continue
 
-                tilePlayerScore = scores[mapTile.player]
+                tilePlayerScore = self._scores[mapTile.player]
 
                 tilePlayerScore.tiles += 1
                 tilePlayerScore.total += mapTile.army
-
+        else:
+            # every owner / army change this turn is in tiles_updated_this_cycle, and their deltas still have the values from the start of the turn.
+            for mapTile in self.tiles_updated_this_cycle:
+                if mapTile.delta.oldOwner >= 0:
+                    oldScore = self._scores[mapTile.delta.oldOwner]
+                    oldScore.tiles -= 1
+                    oldScore.total -= mapTile.delta.oldArmy
+                if mapTile.player >= 0:
+                    newScore = self._scores[mapTile.player]
+                    newScore.tiles += 1
+                    newScore.total += mapTile.army
+
+        scores = [Score(player.index, score.total, score.tiles, player.dead) for player, score in zip(self.players, self._scores)]
         self.sim_map.update_scores(scores)
 
     def _send_updates_to_player_maps(self, noDeltas=False):
@@ -410,6 +460,12 @@ class GameSimulator(object):
         # tile data
         # call update
 
+        if noDeltas or self._team_vision_counts is None:
+            self._recount_vision()
+            visionChangesByTeam = None
+        else:
+            visionChangesByTeam = self._update_vision_counts()
+
         for player in self.players:
             if player.map is None:
                 continue
@@ -422,16 +478,20 @@ class GameSimulator(object):
             playerScoreClone = [Score(score.player, score.total, score.tiles, score.dead) for score in self.sim_map.scores]
             player.map.update_scores(playerScoreClone)
 
-            # send updates for tiles they lost vision of
-            # send updates for tiles they can see
-            for tile in self.sim_map.get_all_tiles():
-                # the way the game client works, it always 'updates' every tile on the players map even if it didn't get a server update, that's why the deltas were ghosting in the sim
-                # if tile in self.tiles_updated_this_cycle:
-                playerHasVision = (not tile.isNeutral and self.teams[tile.player] == self.teams[player.index]) or any(filter(lambda adj: not adj.isNeutral and self.teams[adj.player] == self.teams[player.index], tile.adjacents))
-                if playerHasVision:
-                    player.map.update_visible_tile(tile.x, tile.y, tile.tile, tile.army, tile.isCity, tile.isGeneral)
-                else:
-                    self._send_player_lost_vision_of_tile(player, tile)
+            # like the real server, only diff the tiles that changed or that the player gained / lost vision of...
+            visionCounts = self._team_vision_counts[self.teams[player.index]]
+            if visionChangesByTeam is None or player.tile_updates is None:
+                player.tile_updates = [self._get_tile_update(tile, visionCounts[tile.tile_index] > 0) for tile in self.sim_map.tiles_by_index]
+            else:
+                tileUpdates = player.tile_updates
+                for tile in self.tiles_updated_this_cycle:
+                    tileUpdates[tile.tile_index] = self._get_tile_update(tile, visionCounts[tile.tile_index] > 0)
+                for tile in visionChangesByTeam.get(self.teams[player.index], ()):
+                    tileUpdates[tile.tile_index] = self._get_tile_update(tile, visionCounts[tile.tile_index] > 0)
+
+            # ...but the way the game client works, it always 'updates' every tile on the players map even if it didn't get a server update, that's why the deltas were ghosting in the sim
+            for tile, (tileType, army, isCity, isGeneral) in zip(self.sim_map.tiles_by_index, player.tile_updates):
+                player.map.update_visible_tile(tile.x, tile.y, tileType, army, isCity, isGeneral)
 
             player.map.update(bypassDeltas=noDeltas)
             player.tiles_lost_this_turn = set()
@@ -441,12 +501,55 @@ class GameSimulator(object):
                     tile.turn_captured = 0
         logbook.info(f'END SIM PLAYER MAP UPDATES FOR TURN {self.turn}')
 
-    def _send_player_lost_vision_of_tile(self, player: GamePlayer, tile: Tile):
+    def _get_tile_update(self, tile: Tile, playerHasVision: bool) -> typing.Tuple[int, int, bool, bool]:
+        if playerHasVision:
+            return tile.tile, tile.army, tile.isCity, tile.isGeneral
+
+        # pretend we're the game server
         tileVal = TILE_FOG
         if (tile.isMountain or tile.isCity) and not tile.isGeneral:
             tileVal = TILE_OBSTACLE
-        # pretend we're the game server
-        player.map.update_visible_tile(tile.x, tile.y, tileVal, tile_army=0, is_city=False, is_general=False)
+        return tileVal, 0, False, False
+
+    def _recount_vision(self):
+        self._team_vision_counts = {team: [0] * len(self.sim_map.tiles_by_index) for team in set(self.teams)}
+        self._vision_owners = [tile.player for tile in self.sim_map.tiles_by_index]
+        for tile in self.sim_map.tiles_by_index:
+            if tile.player < 0:
+                continue
+            visionCounts = self._team_vision_counts[self.teams[tile.player]]
+            for watched in self._vision_watchers[tile.tile_index]:
+                visionCounts[watched.tile_index] += 1
+
+    def _update_vision_counts(self) -> typing.Dict[int, typing.Set[Tile]]:
+        """Recounts vision around the tiles whose owner changed this turn, returning by team the tiles that team gained or lost vision of."""
+        visionChangesByTeam: typing.Dict[int, typing.Set[Tile]] = {}
+        for tile in self.tiles_updated_this_cycle:
+            oldOwner = self._vision_owners[tile.tile_index]
+            if oldOwner == tile.player:
+                continue
+            self._vision_owners[tile.tile_index] = tile.player
+
+            oldTeam = self.teams[oldOwner] if oldOwner >= 0 else None
+            newTeam = self.teams[tile.player] if tile.player >= 0 else None
+            if oldTeam == newTeam:
+                continue
+
+            watchers = self._vision_watchers[tile.tile_index]
+            if oldTeam is not None:
+                visionCounts = self._team_vision_counts[oldTeam]
+                for watched in watchers:
+                    visionCounts[watched.tile_index] -= 1
+                    if visionCounts[watched.tile_index] == 0:
+                        visionChangesByTeam.setdefault(oldTeam, set()).add(watched)
+            if newTeam is not None:
+                visionCounts = self._team_vision_counts[newTeam]
+                for watched in watchers:
+                    visionCounts[watched.tile_index] += 1
+                    if visionCounts[watched.tile_index] == 1:
+                        visionChangesByTeam.setdefault(newTeam, set()).add(watched)
+
+        return visionChangesByTeam
 
     def end_game(self):
         for player in self.players:
@@ -545,6 +648,8 @@ class GameSimulatorHost(object):
 
         self.bot_hosts: typing.List[BotHostBase | None] = [None for player in self.sim.players]
         self.dropped_move_counts_by_player: typing.List[int] = [0 for player in self.sim.players]
+        self.move_durations_by_player: typing.List[typing.List[float]] = [[] for player in self.sim.players]
+        """How long each players bot took to move, every turn of the last run_sim."""
 
         self.player_move_cutoff_time: float = 0.35
         """If a player takes longer to move than this, and a debugger is not attached, then the players move will be discarded and an error logged. Does not include the first 12 turns."""
@@ -644,6 +749,7 @@ class GameSimulatorHost(object):
         """
         self.give_players_perfect_initial_city_information()
         self.dropped_move_counts_by_player = [0 for player in self.sim.players]
+        self.move_durations_by_player = [[] for player in self.sim.players]
 
         botHost: BotHostBase
         for playerIndex, botHost in enumerate(self.bot_hosts):
@@ -912,6 +1018,7 @@ class GameSimulatorHost(object):
                     raise AssertionError(f'{traceback.format_exc()}\r\n\r\nIMPORT TEST FILES FOR TURN {self.sim.turn} FROM @ {botHost.eklipz_bot.logDirectory}')
 
                 moveTimeTook = time.perf_counter() - moveStart
+                self.move_durations_by_player[playerIndex].append(moveTimeTook)
                 logbook.info(f'SimHost: turn {self.sim.sim_map.turn}: player {playerIndex} {self.sim.sim_map.usernames[playerIndex]} took {moveTimeTook:.4f} to move')
                 if self.respect_turn_time_limit and moveTimeTook > self.player_move_cutoff_time and not DebugHelper.IS_DEBUGGING:  # and self.sim.sim_map.turn > 20
                     # then we dropped this move.
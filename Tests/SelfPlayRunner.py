@@ -0,0 +1,312 @@
+"""
+Headless A / B self-play: runs many bot vs bot games in parallel worker processes, from the same mirrored turn 16 starts
+that TestBase.a_b_test plays, with logging, viewers and the per-turn txtmap / perf profile dumps off. Every finished game is
+appended to a JSONL results file as one compact record (winner, turns, dropped moves, per-turn move latency percentiles per
+side), so a long run that dies part way still leaves everything it finished.
+
+Bot configs are 'attr=value' overrides of EklipZBot attributes (values parsed as python literals), so that they can be sent to
+spawned workers.
+
+python SelfPlayRunner.py run --games 200 --workers 8 --a engine_use_mcts=True --b engine_use_mcts=False --out ab.jsonl
+python SelfPlayRunner.py summary ab.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import math
+import multiprocessing
+import os
+import pathlib
+import random
+import sys
+import time
+import traceback
+import typing
+
+if __name__ == '__main__':
+    # run as a script; the bot modules live in the repo root, the TestBase map helpers next to this file.
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+    sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+import logbook
+
+import BotHost
+import base
+from Sim.GameSimulator import GameSimulatorHost
+from TestBase import TestBase
+
+DEFAULT_MAP_FILES: typing.List[str] = [
+    'SymmetricTestMaps/even_playground_map_small__left_right.txtmap',
+    'SymmetricTestMaps/even_playground_map_small__top_left_bot_right.txtmap',
+    'SymmetricTestMaps/even_playground_map_small__top_right_bot_left.txtmap',
+]
+
+LATENCY_PERCENTILES: typing.Tuple[int, ...] = (50, 90, 99)
+
+
+class SelfPlayGameSpec(object):
+    def __init__(
+            self,
+            gameIndex: int,
+            mapFile: str,
+            aPlayer: int,
+            noCities: bool,
+            seed: int,
+            aConfig: typing.Dict[str, typing.Any],
+            bConfig: typing.Dict[str, typing.Any],
+            maxTurns: int = 700,
+    ):
+        self.game_index: int = gameIndex
+        self.map_file: str = mapFile
+        self.a_player: int = aPlayer
+        """Which general A plays. Games come in mirrored pairs where A and B swap spawns."""
+        self.no_cities: bool = noCities
+        self.seed: int = seed
+        self.a_config: typing.Dict[str, typing.Any] = aConfig
+        self.b_config: typing.Dict[str, typing.Any] = bConfig
+        self.max_turns: int = maxTurns
+
+
+def build_game_specs(
+        numGames: int,
+        aConfig: typing.Dict[str, typing.Any],
+        bConfig: typing.Dict[str, typing.Any],
+        mapFiles: typing.List[str] | None = None,
+        noCities: bool | None = None,
+        seed: int = 0,
+        maxTurns: int = 700,
+) -> typing.List[SelfPlayGameSpec]:
+    """Mirrored pairs of games like a_b_test: each pair shares a map and (if noCities is None) a random cities / no cities coin flip."""
+    if mapFiles is None:
+        mapFiles = DEFAULT_MAP_FILES
+
+    rand = random.Random(seed)
+    specs = []
+    mapFile = mapFiles[0]
+    pairNoCities = noCities
+    for i in range(numGames):
+        aPlayer = i % 2
+        if aPlayer == 0:
+            mapFile = rand.choice(mapFiles)
+            pairNoCities = noCities if noCities is not None else rand.choice([True, False])
+        specs.append(SelfPlayGameSpec(i, mapFile, aPlayer, pairNoCities, rand.randrange(1 << 31), aConfig, bConfig, maxTurns))
+    return specs
+
+
+def get_latency_percentiles(durations: typing.List[float]) -> typing.Dict[str, float]:
+    """Nearest rank percentiles (plus the max and the number of moves) of the per-turn move durations, in milliseconds."""
+    if not durations:
+        return {'moves': 0}
+
+    ordered = sorted(durations)
+    latency: typing.Dict[str, float] = {'moves': len(ordered)}
+    for percentile in LATENCY_PERCENTILES:
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        latency[f'p{percentile}'] = round(ordered[rank - 1] * 1000, 2)
+    latency['max'] = round(ordered[-1] * 1000, 2)
+    return latency
+
+
+class _SelfPlayMapLoader(TestBase):
+    """Just for TestBase's map loading / resetting, so games start exactly like a_b_test games do."""
+    def runTest(self):
+        pass
+
+
+def _init_worker():
+    logbook.NullHandler().push_application()
+
+
+def _configure_bot(bot, config: typing.Dict[str, typing.Any]):
+    for attr, value in config.items():
+        if not hasattr(bot, attr):
+            raise ValueError(f'EklipZBot has no attribute {attr} to configure')
+        setattr(bot, attr, value)
+
+
+def run_self_play_game(spec: SelfPlayGameSpec) -> typing.Dict[str, typing.Any]:
+    """Plays one headless game and returns its result record. Errors are recorded in the record rather than raised."""
+    start = time.perf_counter()
+    a = spec.a_player
+    b = (a + 1) % 2
+    record: typing.Dict[str, typing.Any] = {
+        'game': spec.game_index,
+        'map': spec.map_file,
+        'noCities': spec.no_cities,
+        'seed': spec.seed,
+        'aPlayer': a,
+        'winner': None,
+        'turns': 0,
+    }
+
+    try:
+        random.seed(spec.seed)
+        loader = _SelfPlayMapLoader('runTest')
+        map, general, enemyGen = loader.load_map_and_generals(spec.map_file, 1, fill_out_tiles=False)
+        map.usernames[a] = 'a'
+        map.usernames[b] = 'b'
+        loader.reset_map_to_just_generals(map)
+        if spec.no_cities:
+            for tile in map.get_all_tiles():
+                if tile.isCity:
+                    map.convert_tile_to_mountain(tile)
+
+        loader.enable_search_time_limits_and_disable_debug_asserts()
+        BotHost.FORCE_NO_VIEWER = True
+
+        simHost = GameSimulatorHost(map, player_with_viewer=-1, respectTurnTimeLimitToDropMoves=True)
+        aBot = simHost.get_bot(a)
+        bBot = simHost.get_bot(b)
+        aBot.no_file_logging = True
+        bBot.no_file_logging = True
+        _configure_bot(aBot, spec.a_config)
+        _configure_bot(bBot, spec.b_config)
+
+        simHost.sim.ignore_illegal_moves = True
+        base.client.map.ENABLE_DEBUG_ASSERTS = False
+        winner = simHost.run_sim(run_real_time=False, turns=spec.max_turns)
+
+        record['winner'] = 'a' if winner == a else 'b' if winner == b else None
+        record['turns'] = simHost.sim.turn
+        record['dropped'] = {'a': simHost.dropped_move_counts_by_player[a], 'b': simHost.dropped_move_counts_by_player[b]}
+        record['latencyMs'] = {
+            'a': get_latency_percentiles(simHost.move_durations_by_player[a]),
+            'b': get_latency_percentiles(simHost.move_durations_by_player[b]),
+        }
+    except Exception:
+        record['error'] = traceback.format_exc()
+
+    record['duration'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_self_play(
+        specs: typing.List[SelfPlayGameSpec],
+        workers: int,
+        outputPath: str | None = None,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Plays every spec across workers spawned processes (in this process if workers is 0), appending each result record to
+    outputPath as soon as its game finishes. Returns the records in completion order.
+    """
+    records = []
+    outFile = open(outputPath, 'a') if outputPath is not None else None
+    try:
+        def on_record(record: typing.Dict[str, typing.Any]):
+            records.append(record)
+            if outFile is not None:
+                outFile.write(json.dumps(record) + '\n')
+                outFile.flush()
+            logbook.info(f'game {record["game"]} ({len(records)}/{len(specs)}): winner {record["winner"]} turn {record["turns"]} in {record["duration"]:.1f}s{" ERRORED" if "error" in record else ""}')
+
+        if workers <= 0:
+            for spec in specs:
+                on_record(run_self_play_game(spec))
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(processes=workers, initializer=_init_worker, maxtasksperchild=20) as pool:
+                for record in pool.imap_unordered(run_self_play_game, specs):
+                    on_record(record)
+    finally:
+        if outFile is not None:
+            outFile.close()
+
+    return records
+
+
+def load_results(filePath: str) -> typing.List[typing.Dict[str, typing.Any]]:
+    records = []
+    with open(filePath, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # the last line of a run that was killed mid-write.
+                continue
+    return records
+
+
+def summarize(records: typing.List[typing.Dict[str, typing.Any]]) -> typing.Dict[str, typing.Any]:
+    """
+    Win counts, A's win rate among decided games with a 95% (normal approximation) interval, the mean game length, and per side
+    the mean per-game latency percentiles plus the worst single move.
+    """
+    decided = [r for r in records if r.get('winner') in ('a', 'b')]
+    aWins = sum(1 for r in decided if r['winner'] == 'a')
+    summary: typing.Dict[str, typing.Any] = {
+        'games': len(records),
+        'aWins': aWins,
+        'bWins': len(decided) - aWins,
+        'undecided': sum(1 for r in records if r.get('winner') is None and 'error' not in r),
+        'errors': sum(1 for r in records if 'error' in r),
+    }
+    if decided:
+        winRate = aWins / len(decided)
+        margin = 1.96 * math.sqrt(winRate * (1 - winRate) / len(decided))
+        summary['aWinRate'] = round(winRate, 4)
+        summary['aWinRate95'] = [round(max(0.0, winRate - margin), 4), round(min(1.0, winRate + margin), 4)]
+        summary['meanTurns'] = round(sum(r['turns'] for r in decided) / len(decided), 1)
+
+    for side in ('a', 'b'):
+        latencies = [r['latencyMs'][side] for r in records if 'latencyMs' in r and r['latencyMs'][side]['moves'] > 0]
+        if not latencies:
+            continue
+        sideLatency = {f'p{p}': round(sum(l[f'p{p}'] for l in latencies) / len(latencies), 2) for p in LATENCY_PERCENTILES}
+        sideLatency['max'] = max(l['max'] for l in latencies)
+        summary[f'{side}LatencyMs'] = sideLatency
+
+    return summary
+
+
+def parse_config(overrides: typing.List[str] | None) -> typing.Dict[str, typing.Any]:
+    """['engine_use_mcts=True', 'engine_army_nearby_tiles_range=6'] -> {'engine_use_mcts': True, ...}. Unparseable values stay strings."""
+    config = {}
+    for override in overrides or []:
+        attr, _, rawValue = override.partition('=')
+        try:
+            value = ast.literal_eval(rawValue)
+        except (ValueError, SyntaxError):
+            value = rawValue
+        config[attr.strip()] = value
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless parallel bot vs bot self-play.')
+    subParsers = parser.add_subparsers(dest='mode', required=True)
+
+    runParser = subParsers.add_parser('run')
+    runParser.add_argument('--games', type=int, default=100)
+    runParser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    runParser.add_argument('--maps', nargs='*', default=None, help='txtmap paths relative to the Tests folder')
+    runParser.add_argument('--a', nargs='*', default=None, help='attr=value EklipZBot overrides for A')
+    runParser.add_argument('--b', nargs='*', default=None, help='attr=value EklipZBot overrides for B')
+    runParser.add_argument('--no-cities', choices=['random', 'true', 'false'], default='random')
+    runParser.add_argument('--max-turns', type=int, default=700)
+    runParser.add_argument('--seed', type=int, default=0)
+    runParser.add_argument('--out', default='self_play_results.jsonl')
+
+    summaryParser = subParsers.add_parser('summary')
+    summaryParser.add_argument('results')
+
+    args = parser.parse_args()
+    logbook.StreamHandler(sys.stdout, level=logbook.INFO).push_application()
+
+    if args.mode == 'run':
+        noCities = None if args.no_cities == 'random' else args.no_cities == 'true'
+        specs = build_game_specs(args.games, parse_config(args.a), parse_config(args.b), args.maps, noCities, args.seed, args.max_turns)
+        records = run_self_play(specs, args.workers, args.out)
+    else:
+        records = load_results(args.results)
+
+    print(json.dumps(summarize(records), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
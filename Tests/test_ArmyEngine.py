@@ -1,4 +1,6 @@
 import logbook
+import numpy
+import pickle
 import random
 import time
 import traceback
@@ -10,8 +12,9 @@ from ArmyEngine import ArmyEngine, ArmySimResult
 from ArmyTracker import Army
 from BoardAnalyzer import BoardAnalyzer
 from Models import Move
-from Engine.ArmyEngineModels import calc_value_int, calc_econ_value, ArmySimState
-from MctsLudii import MctsDUCT, MoveSelectionFunction
+from Engine.ArmyBatchRollouts import ArmyBatchRolloutEngine
+from Engine.ArmyEngineModels import calc_value_int, calc_econ_value, ArmySimState, ArmySimZobristKeys
+from MctsLudii import MctsDUCT, MoveSelectionFunction, MctsRootStats
 from Path import Path
 from Sim.GameSimulator import GameSimulatorHost, GameSimulator
 from TestBase import TestBase
@@ -2920,3 +2923,381 @@ bTiles=20
                                 #
                                 # winner = simHost.run_sim(run_real_time=debugMode and not self.GLOBAL_BYPASS_RENDERING, turn_time=2.5, turns=13)
                                 # self.assertIsNone(winner)
+
+    def test_make_moves__unmake_moves_restores_board_exactly(self):
+        for turn in [102, 149]:
+            with self.subTest(turn=turn):
+                map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, turn)
+                frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+                enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+                boardAnalysis = BoardAnalyzer(map, general)
+                boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+                armyEngine.friendly_has_kill_threat = True
+                armyEngine.enemy_has_kill_threat = True
+                armyEngine.allow_enemy_no_op = True
+                baseBoardState = armyEngine.get_base_board_state()
+
+                def get_board_snapshot(boardState: ArmySimState):
+                    return (
+                        str(boardState),
+                        boardState.turn,
+                        boardState.friendly_move,
+                        boardState.enemy_move,
+                        boardState.prev_friendly_move,
+                        boardState.prev_enemy_move,
+                        boardState.repetition_count,
+                        boardState.friendly_skipped_move_count,
+                        boardState.enemy_skipped_move_count,
+                        list(boardState.friendly_living_armies_l),
+                        list(boardState.enemy_living_armies_l),
+                        [(idx, st.army, st.player) for idx, st in boardState.sim_tiles.items()],
+                        [(idx, st.army, st.player) for idx, st in boardState.friendly_living_armies.items()],
+                        [(idx, st.army, st.player) for idx, st in boardState.enemy_living_armies.items()],
+                        sorted(t.tile_index for t in boardState.incrementing),
+                    )
+
+                random.seed(turn)
+                for i in range(200):
+                    boardState = baseBoardState.clone()
+                    inPlaceBoardState = boardState.clone()
+                    startSnapshot = get_board_snapshot(boardState)
+                    undoLog = boardState.begin_undo_log()
+                    for ply in range(random.randint(1, 60)):
+                        frMove = boardState.generate_random_friendly_move()
+                        enMove = boardState.generate_random_enemy_move()
+                        armyEngine.make_moves(boardState, frMove, enMove, undoLog)
+                        armyEngine.get_next_board_state(inPlaceBoardState.turn + 1, inPlaceBoardState, frMove, enMove, noClone=True)
+                        self.assertEqual(get_board_snapshot(inPlaceBoardState), get_board_snapshot(boardState))
+                        if boardState.captures_enemy or boardState.captured_by_enemy:
+                            break
+
+                    armyEngine.unmake_moves(boardState, undoLog)
+                    self.assertEqual(startSnapshot, get_board_snapshot(boardState))
+
+    def test_zobrist_hash__incremental_matches_full_rebuild(self):
+        def get_rebuilt_hash(boardState: ArmySimState, keys: ArmySimZobristKeys) -> int:
+            rebuilt = boardState.clone()
+            rebuilt.zobrist_keys = None
+            return rebuilt.get_zobrist_hash(keys)
+
+        # 102 never hits the army bonus, 147 / 149 play through it at turn 150.
+        for turn in [102, 147, 149]:
+            with self.subTest(turn=turn):
+                map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, turn)
+                frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+                enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+                boardAnalysis = BoardAnalyzer(map, general)
+                boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+                armyEngine.friendly_has_kill_threat = True
+                armyEngine.enemy_has_kill_threat = True
+                armyEngine.allow_enemy_no_op = True
+                baseBoardState = armyEngine.get_base_board_state()
+                keys = ArmySimZobristKeys(len(map.tiles_by_index))
+                baseHash = baseBoardState.get_zobrist_hash(keys)
+
+                random.seed(turn)
+                incrementalPlies = 0
+                for i in range(100):
+                    boardState = baseBoardState
+                    inPlaceBoardState = baseBoardState.clone()
+                    undoLog = inPlaceBoardState.begin_undo_log()
+                    for ply in range(random.randint(1, 40)):
+                        frMove = boardState.generate_random_friendly_move()
+                        enMove = boardState.generate_random_enemy_move()
+                        boardState = armyEngine.get_next_board_state(boardState.turn + 1, boardState, frMove, enMove)
+                        armyEngine.make_moves(inPlaceBoardState, frMove, enMove, undoLog)
+                        if boardState.zobrist_keys is keys:
+                            incrementalPlies += 1
+                        # in place plies count repetitions against the state itself, so only compare each path to its own rebuild.
+                        self.assertEqual(get_rebuilt_hash(boardState, keys), boardState.get_zobrist_hash(keys), f'ply {ply} {boardState.get_moves_string()}')
+                        self.assertEqual(get_rebuilt_hash(inPlaceBoardState, keys), inPlaceBoardState.get_zobrist_hash(keys), f'ply {ply} {boardState.get_moves_string()}')
+                        if boardState.captures_enemy or boardState.captured_by_enemy:
+                            break
+
+                    armyEngine.unmake_moves(inPlaceBoardState, undoLog)
+                    self.assertEqual(baseHash, inPlaceBoardState.get_zobrist_hash(keys))
+
+                self.assertGreater(incrementalPlies, 0)
+
+    def test_mcts_undo_log_rollouts__match_cloned_rollouts(self):
+        # both searches need the same move order to consume the seeded random the same way.
+        MapBase.DO_NOT_RANDOMIZE = True
+        for turn in [102, 147, 149]:
+            with self.subTest(turn=turn):
+                roots = []
+                for useUndoLog in [False, True]:
+                    map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, turn)
+                    frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+                    enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+                    boardAnalysis = BoardAnalyzer(map, general)
+                    boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                    mcts = MctsDUCT()
+                    mcts.use_undo_log_rollouts = useUndoLog
+                    armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=mcts)
+                    armyEngine.friendly_has_kill_threat = True
+                    armyEngine.enemy_has_kill_threat = True
+                    baseBoardState = armyEngine.get_base_board_state()
+
+                    random.seed(turn)
+                    ctx = armyEngine.create_mcts_context(baseBoardState)
+                    root, duration = mcts.search_tree(ctx.game, ctx, 0.0, 300)
+                    self.assertEqual(300, root.totalVisitCount)
+
+                    # the node boards the rollouts played on must be back to how expansion left them.
+                    for node in self.iterate_mcts_nodes(root):
+                        self.assertIsNone(node.context.board_state.undo_log)
+                        self.assertEqual(node.context.turn, node.context.board_state.turn)
+
+                    roots.append(root)
+
+                cloneRoot, undoRoot = roots
+                self.assertEqual([[str(m) for m in moves] for moves in cloneRoot.legalMovesPerPlayer], [[str(m) for m in moves] for moves in undoRoot.legalMovesPerPlayer])
+                self.assertEqual(cloneRoot.visitCounts, undoRoot.visitCounts)
+                self.assertEqual(cloneRoot.scoreSums, undoRoot.scoreSums)
+                self.assertEqual(
+                    sorted(str(n.context.board_state) for n in self.iterate_mcts_nodes(cloneRoot)),
+                    sorted(str(n.context.board_state) for n in self.iterate_mcts_nodes(undoRoot)))
+
+    def iterate_mcts_nodes(self, root):
+        seen = set()
+        toVisit = [root]
+        while toVisit:
+            node = toVisit.pop()
+            yield node
+            for child in node.children.values():
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    toVisit.append(child)
+
+    def test_root_stats__merge_matches_searching_the_root_longer(self):
+        # a pickled engine searching the same root in 'another process' merges back onto our own root by move identity.
+        map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, 102)
+        frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+        enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+        armyEngine.friendly_has_kill_threat = True
+        armyEngine.enemy_has_kill_threat = True
+        armyEngine.force_enemy_towards = SearchUtils.build_distance_map_matrix(map, [general])
+        armyEngine._build_move_filters()
+        baseBoardState = armyEngine.get_base_board_state()
+
+        random.seed(1)
+        ctx = armyEngine.create_mcts_context(baseBoardState)
+        root, duration = armyEngine.mcts_runner.search_tree(ctx.game, ctx, 0.0, 100)
+
+        workerEngine, workerBoardState = pickle.loads(pickle.dumps((armyEngine, baseBoardState)))
+        self.assertIsNone(workerEngine._enemy_move_filter)
+        workerEngine._build_move_filters()
+        workerCtx = workerEngine.create_mcts_context(workerBoardState)
+        workerRoot, duration = workerEngine.mcts_runner.search_tree(workerCtx.game, workerCtx, 0.0, 60)
+        rootStats = MctsRootStats(workerRoot, workerEngine.mcts_runner._iterations)
+        self.assertEqual(60, rootStats.iterations)
+
+        expectedVisits = [list(c) for c in root.visitCounts]
+        for p, playerMoves in enumerate(workerRoot.legalMovesPerPlayer):
+            self.assertEqual(root.legalMovesPerPlayer[p], playerMoves, 'the workers move generation should match ours exactly')
+            for i, visits in enumerate(workerRoot.visitCounts[p]):
+                expectedVisits[p][i] += visits
+
+        rootStats = pickle.loads(pickle.dumps(rootStats))
+        rootStats.merge_into(root)
+
+        self.assertEqual(160, root.totalVisitCount)
+        self.assertEqual(expectedVisits, root.visitCounts)
+
+    def test_transposition_table__shares_nodes_between_move_orders_and_stays_bounded(self):
+        for capacity in [100000, 10]:
+            with self.subTest(capacity=capacity):
+                map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, 102)
+                frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+                enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+                boardAnalysis = BoardAnalyzer(map, general)
+                boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                mcts = MctsDUCT()
+                mcts.use_transposition_table = True
+                mcts.transposition_table_capacity = capacity
+                armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=mcts)
+                armyEngine.friendly_has_kill_threat = True
+                armyEngine.enemy_has_kill_threat = True
+                baseBoardState = armyEngine.get_base_board_state()
+
+                random.seed(2)
+                ctx = armyEngine.create_mcts_context(baseBoardState)
+                root, duration = mcts.search_tree(ctx.game, ctx, 0.0, 300)
+                table = mcts._transposition_table
+
+                self.assertEqual(300, root.totalVisitCount)
+                self.assertLessEqual(len(table), capacity)
+                if capacity < 300:
+                    self.assertGreater(table.evictions, 0)
+                    continue
+
+                parentCountByNode = {}
+                seen = set()
+                toVisit = [root]
+                while toVisit:
+                    node = toVisit.pop()
+                    for child in node.children.values():
+                        parentCountByNode[id(child)] = parentCountByNode.get(id(child), 0) + 1
+                        if id(child) not in seen:
+                            seen.add(id(child))
+                            toVisit.append(child)
+                            rebuilt = child.context.board_state.clone()
+                            rebuilt.zobrist_keys = None
+                            self.assertEqual(
+                                child.context.board_state.get_zobrist_hash(table.keys),
+                                rebuilt.get_zobrist_hash(table.keys))
+
+                # every hit links an existing node under one more joint move (nothing was evicted at this capacity).
+                self.assertEqual(table.hits, sum(parentCount - 1 for parentCount in parentCountByNode.values()))
+
+                # this board branches too widely for a few hundred iterations to reliably reach a transposition, so build one:
+                # the friendly and enemy armies each moving within their own territory, in either order, land on the same hash.
+                frMove = next(
+                    m for m in baseBoardState.generate_friendly_moves()
+                    if m is not None and not m.source.isCity and not m.source.isGeneral and m.dest.player == general.player)
+                enMove = next(
+                    m for m in baseBoardState.generate_enemy_moves()
+                    if m is not None and not m.source.isCity and not m.source.isGeneral and m.dest.player == enemyGen.player
+                    and {m.source, m.dest}.isdisjoint({frMove.source, frMove.dest}))
+                frFirst = armyEngine.get_next_board_state(baseBoardState.turn + 1, baseBoardState, frMove, None)
+                frFirst = armyEngine.get_next_board_state(frFirst.turn + 1, frFirst, None, enMove)
+                enFirst = armyEngine.get_next_board_state(baseBoardState.turn + 1, baseBoardState, None, enMove)
+                enFirst = armyEngine.get_next_board_state(enFirst.turn + 1, enFirst, frMove, None)
+                frFirstEnd = armyEngine.get_next_board_state(frFirst.turn + 1, frFirst, None, None)
+                enFirstEnd = armyEngine.get_next_board_state(enFirst.turn + 1, enFirst, None, None)
+                self.assertNotEqual(frFirst.get_zobrist_hash(table.keys), enFirst.get_zobrist_hash(table.keys), 'the last joint move differs')
+                self.assertEqual(frFirstEnd.get_zobrist_hash(table.keys), enFirstEnd.get_zobrist_hash(table.keys))
+
+    def test_batch_rollouts__lanes_match_get_next_board_state(self):
+        batchSize = 12
+        for turn in [102, 147, 149]:
+            for positionalWinDetection in [False, True]:
+                with self.subTest(turn=turn, positionalWinDetection=positionalWinDetection):
+                    map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, turn)
+                    frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1]
+                    enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1]
+
+                    boardAnalysis = BoardAnalyzer(map, general)
+                    boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                    armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+                    armyEngine.friendly_has_kill_threat = positionalWinDetection
+                    armyEngine.enemy_has_kill_threat = positionalWinDetection
+                    armyEngine.allow_enemy_no_op = True
+                    baseBoardState = armyEngine.get_base_board_state()
+
+                    random.seed(turn)
+                    batch = ArmyBatchRolloutEngine(armyEngine, batchSize, seed=turn)
+                    batch.load(baseBoardState)
+                    boardStates = [baseBoardState.clone() for _ in range(batchSize)]
+
+                    for ply in range(80):
+                        active = ~batch.get_over()
+                        self.assertEqual([not (b.captures_enemy or b.captured_by_enemy or (b.kills_all_enemy_armies and b.kills_all_friendly_armies)) for b in boardStates], list(active))
+                        if not active.any():
+                            break
+
+                        frSrc = numpy.zeros(batchSize, dtype=numpy.int64)
+                        frDest = numpy.full(batchSize, -1, dtype=numpy.int64)
+                        enSrc = frSrc.copy()
+                        enDest = frDest.copy()
+                        for lane, boardState in enumerate(boardStates):
+                            if not active[lane]:
+                                continue
+                            frMove = boardState.generate_random_friendly_move()
+                            enMove = boardState.generate_random_enemy_move()
+                            if frMove is not None:
+                                frSrc[lane] = frMove.source.tile_index
+                                frDest[lane] = frMove.dest.tile_index
+                            if enMove is not None:
+                                enSrc[lane] = enMove.source.tile_index
+                                enDest[lane] = enMove.dest.tile_index
+                            armyEngine.get_next_board_state(boardState.turn + 1, boardState, frMove, enMove, noClone=True)
+
+                        batch.step(active, frSrc, frDest, enSrc, enDest, positionalWinDetection)
+
+                        values = batch.calculate_value_int()
+                        for lane, boardState in enumerate(boardStates):
+                            self.assertEqual(boardState.calculate_value_int(), values[lane], f'ply {ply} lane {lane}')
+                            self.assertEqual(set(boardState.friendly_living_armies), batch.get_living_armies(lane, friendly=True))
+                            self.assertEqual(set(boardState.enemy_living_armies), batch.get_living_armies(lane, friendly=False))
+                            self.assertEqual({t.tile_index for t in boardState.incrementing}, set(numpy.flatnonzero(batch.incrementing[lane])))
+                            self.assertEqual(len(boardState.sim_tiles), batch.in_sim[lane].sum())
+                            for tileIdx, simTile in boardState.sim_tiles.items():
+                                self.assertEqual((simTile.army, simTile.player), (batch.army[lane, tileIdx], batch.owner[lane, tileIdx]))
+
+    def test_brute_force_pruning__matches_the_full_payoff_matrices(self):
+        # how much pruning saves depends on the move order, which otherwise follows the randomized tile.movable order.
+        MapBase.DO_NOT_RANDOMIZE = True
+        for turn in [102, 147, 149]:
+            for killThreat in [False, True]:
+                with self.subTest(turn=turn, killThreat=killThreat):
+                    results = []
+                    iterations = []
+                    for pruning in [False, True]:
+                        map, general, enemyGen = self.load_map_and_generals_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, turn)
+                        frArmies = [Army(t) for t in map.get_all_tiles() if t.player == general.player and t.army > 1][:2]
+                        enArmies = [Army(t) for t in map.get_all_tiles() if t.player == enemyGen.player and t.army > 1][:2]
+
+                        boardAnalysis = BoardAnalyzer(map, general)
+                        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                        armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, timeCap=1000.0)
+                        armyEngine.friendly_has_kill_threat = killThreat
+                        armyEngine.enemy_has_kill_threat = killThreat
+                        armyEngine.brute_force_pruning = pruning
+                        result = armyEngine.scan(3, noThrow=True)
+
+                        # the moves themselves can differ between equally valued lines, the root nash solve doesn't break ties deterministically.
+                        results.append((result.best_result_state.calculate_value_int(), result.net_economy_differential))
+                        iterations.append(armyEngine.iterations)
+
+                    self.assertEqual(results[0], results[1])
+                    self.assertLess(iterations[1], iterations[0] / 3)
+
+    def test_brute_force_iterative_deepening__searches_deeper_within_the_time_limit(self):
+        mapFile = 'GameContinuationEntries/scrim_playground_benchmarker_holding_enemy_city.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 204, fill_out_tiles=True)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGeneral)
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, timeCap=1000.0)
+        armyEngine.friendly_has_kill_threat = True
+        armyEngine.enemy_has_kill_threat = True
+        fullResult = armyEngine.scan(3, noThrow=True)
+
+        armyEngine.brute_force_iterative_deepening = True
+        deepenedResult = armyEngine.scan(3, noThrow=True)
+        self.assertEqual(3, armyEngine.brute_force_depth_reached)
+        self.assertFalse(armyEngine.brute_force_timed_out)
+        self.assertEqual(fullResult.best_result_state.calculate_value_int(), deepenedResult.best_result_state.calculate_value_int())
+
+        # an already expired time limit still completes depth 1, then stops deepening.
+        armyEngine.time_limit = 0.0
+        result = armyEngine.scan(20, noThrow=True)
+        self.assertTrue(armyEngine.brute_force_timed_out)
+        self.assertEqual(1, armyEngine.brute_force_depth_reached)
+        self.assertEqual(1, result.best_result_state_depth)
+
+        armyEngine.time_limit = 0.1
+        result = armyEngine.scan(20, noThrow=True)
+        self.assertTrue(armyEngine.brute_force_timed_out)
+        self.assertGreaterEqual(armyEngine.brute_force_depth_reached, 1)
+        self.assertLess(armyEngine.brute_force_depth_reached, 20)
+        self.assertEqual(armyEngine.brute_force_depth_reached, result.best_result_state_depth)
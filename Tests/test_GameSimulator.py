@@ -1,3 +1,5 @@
+import random
+
 from Models import Move
 from Sim.GameSimulator import GameSimulator, GameSimulatorHost
 from TestBase import TestBase
@@ -506,3 +508,36 @@ aG7
                     self.assertFalse(sim.is_game_over())
                     self.assertFalse(pMap.players[genPlayer].dead)
                     self.assertFalse(sim.players[genPlayer].dead)
+
+    def test_game_simulator__incremental_vision_and_scores_match_a_full_recount(self):
+        map, general, enemyGen = self.load_map_and_generals('Defense/FailedToFindPlannedDefensePathForNoReason_Turn243/243.txtmap', 243, fill_out_tiles=True)
+
+        self.enable_search_time_limits_and_disable_debug_asserts()
+        sim = GameSimulator(map, ignore_illegal_moves=True)
+        sim.send_update_to_player_maps(noDeltas=True)
+        rand = random.Random(7)
+
+        for _ in range(120):
+            for player in sim.players:
+                sources = [t for t in sim.sim_map.tiles_by_index if t.player == player.index and t.army > 1]
+                if not sources:
+                    sim.set_next_move(player.index, None)
+                    continue
+                source = max(sources, key=lambda t: t.army) if rand.random() < 0.5 else rand.choice(sources)
+                dests = [t for t in source.movable if not t.isMountain]
+                sim.set_next_move(player.index, Move(source, rand.choice(dests)) if dests else None)
+            sim.execute_turn(dont_require_all_players_to_move=True)
+
+            for player in sim.players:
+                team = sim.teams[player.index]
+                for tile in sim.sim_map.tiles_by_index:
+                    hasVision = any(t.player >= 0 and sim.teams[t.player] == team for t in [tile] + tile.adjacents)
+                    playerTile = player.map.tiles_by_index[tile.tile_index]
+                    self.assertEqual(hasVision, playerTile.visible, f'turn {sim.turn} p{player.index} vision of {tile}')
+                    if hasVision:
+                        self.assertEqual(tile.army, playerTile.army, f'turn {sim.turn} p{player.index} army of {tile}')
+                        self.assertEqual(tile.player, playerTile.player, f'turn {sim.turn} p{player.index} owner of {tile}')
+
+                tiles = [t for t in sim.sim_map.tiles_by_index if t.player == player.index]
+                self.assertEqual(len(tiles), sim.sim_map.scores[player.index].tiles)
+                self.assertEqual(sum(t.army for t in tiles), sim.sim_map.scores[player.index].total)
@@ -1,3 +1,4 @@
+import array
 import inspect
 import random
 import time
@@ -322,6 +323,74 @@ class KnapsackUtils_MCKP_Tests(TestBase):
                 print(f'{simulatedGroupCount:3d}g, {groupSkew:.2f} skew: {sumTime:8.5f} - small {smallestSize:3d} <> {largestSize:3d} large, avg {averageSize:5.1f}, avg by N {averageSizeByTile:5.1f}, median {medianSize:3d} (group {medianGroup:3d}) -- {simulatedItemCount} items, {capacity} capacity, {simulatedGroupCount} groups')
         print(f'TOTAL RUNTIME {sumRuntimes:.3f}, iterations {countRuns}  (per run avg {sumRuntimes/countRuns:.5f}')
 
+    def assert_valid_knapsack_solution(self, groupItemWeightValues: typing.List[typing.Tuple[int, object, int, int]], capacity: int, maxValue: int, items: typing.List[object]):
+        byItem = {item: (group, weight, value) for group, item, weight, value in groupItemWeightValues}
+        self.assertEqual(maxValue, sum(byItem[item][2] for item in items))
+        self.assertLessEqual(sum(byItem[item][1] for item in items), capacity)
+        self.assertEqual(len(items), len({byItem[item][0] for item in items}), 'took more than one item from a group')
+
+    def test_multiple_choice_knapsack_solver__low_memory__matches_full_table_values(self):
+        for simulatedItemCount, simulatedGroupCount, maxWeightPerItem, capacity in [(10, 3, 5, 12), (200, 50, 5, 75), (400, 21, 20, 75), (300, 300, 25, 250), (600, 10, 40, 400)]:
+            for i in range(20):
+                with self.subTest(simulatedItemCount=simulatedItemCount, simulatedGroupCount=simulatedGroupCount, capacity=capacity, i=i):
+                    groupItemWeightValues = self.generate_item_test_set(simulatedItemCount, simulatedGroupCount, maxWeightPerItem, maxValuePerItem=150)
+                    expectedValue, _ = self.execute_multiple_choice_knapsack_with_tuples(groupItemWeightValues, capacity=capacity)
+
+                    groups, items, weights, values = (list(t) for t in zip(*groupItemWeightValues))
+                    maxValue, chosen = KnapsackUtils.solve_multiple_choice_knapsack_low_memory(items, capacity, weights, values, groups, longRuntimeThreshold=10.0)
+
+                    self.assertEqual(expectedValue, maxValue)
+                    self.assert_valid_knapsack_solution(groupItemWeightValues, capacity, maxValue, chosen)
+
+    def test_multiple_choice_knapsack_solver__memory_bound__only_for_huge_tables(self):
+        self.assertFalse(KnapsackUtils.is_multiple_choice_knapsack_memory_bound(400, 75))
+        self.assertFalse(KnapsackUtils.is_multiple_choice_knapsack_memory_bound(3000, 200))
+        self.assertTrue(KnapsackUtils.is_multiple_choice_knapsack_memory_bound(40000, 200))
+
+    def test_multiple_choice_knapsack_solver__fptas__within_epsilon_of_optimal(self):
+        for maxValuePerItem in [150, 100000]:
+            for epsilon in [0.05, 0.25, 0.5]:
+                for i in range(20):
+                    with self.subTest(maxValuePerItem=maxValuePerItem, epsilon=epsilon, i=i):
+                        groupItemWeightValues = self.generate_item_test_set(150, 30, maxWeightPerItem=40, maxValuePerItem=maxValuePerItem)
+                        capacity = 300
+                        groups, items, weights, values = (list(t) for t in zip(*groupItemWeightValues))
+                        optimalValue, _ = KnapsackUtils.solve_multiple_choice_knapsack_low_memory(items, capacity, weights, values, groups, longRuntimeThreshold=10.0)
+
+                        maxValue, chosen = KnapsackUtils.solve_multiple_choice_knapsack_low_memory(items, capacity, weights, values, groups, longRuntimeThreshold=10.0, approximationEpsilon=epsilon)
+
+                        self.assertGreaterEqual(maxValue, (1 - epsilon) * optimalValue)
+                        self.assertLessEqual(maxValue, optimalValue)
+                        self.assert_valid_knapsack_solution(groupItemWeightValues, capacity, maxValue, chosen)
+
+    def test_multiple_choice_knapsack_solver__low_memory__returns_desired_solutions(self):
+        for getProblem, expectedValue in [(self.getProblem2, 42), (self.getProblem3, 144), (self.getProblem4, 105)]:
+            with self.subTest(problem=getProblem.__name__):
+                capacity, values, weights, groups = getProblem()
+                items = [i for i in range(len(values))]
+                maxValue, maxItems = KnapsackUtils.solve_multiple_choice_knapsack_low_memory(items, capacity, weights, values, groups, noLog=False, longRuntimeThreshold=10.0)
+                self.assertEqual(expectedValue, maxValue)
+                self.assertEqual(expectedValue, sum(values[i] for i in maxItems))
+
+    def test_multiple_choice_knapsack_solver__buffers__match_object_api(self):
+        for simulatedItemCount, simulatedGroupCount, maxWeightPerItem, capacity in [(10, 3, 5, 12), (200, 50, 5, 75), (400, 21, 20, 75)]:
+            for typecode in ['i', 'q']:
+                for i in range(10):
+                    with self.subTest(simulatedItemCount=simulatedItemCount, typecode=typecode, i=i):
+                        groupItemWeightValues = self.generate_item_test_set(simulatedItemCount, simulatedGroupCount, maxWeightPerItem, maxValuePerItem=150)
+                        groups, items, weights, values = (list(t) for t in zip(*groupItemWeightValues))
+                        expectedValue, expectedItems = KnapsackUtils.solve_multiple_choice_knapsack(items, capacity, weights, values, groups, longRuntimeThreshold=10.0)
+
+                        maxValue, chosenIndexes = KnapsackUtils.solve_multiple_choice_knapsack_buffers(
+                            capacity, array.array(typecode, weights), array.array(typecode, values), array.array(typecode, groups), longRuntimeThreshold=10.0)
+
+                        self.assertEqual(expectedValue, maxValue)
+                        self.assertEqual(expectedItems, [items[idx] for idx in chosenIndexes])
+
+    def test_multiple_choice_knapsack_solver__buffers__rejects_mixed_int_sizes(self):
+        with self.assertRaises(ValueError):
+            KnapsackUtils.solve_multiple_choice_knapsack_buffers(5, array.array('i', [1, 2]), array.array('q', [3, 4]), array.array('i', [0, 1]))
+
     # TESTS STOLEN FROM https://github.com/tmarinkovic/multiple-choice-knapsack-problem/blob/master/test/knapsack/MultipleChoiceKnapsackProblemTest.java
     def test_shouldReturnDesiredSolution2(self):
         capacity, values, weights, groups = self.getProblem2()
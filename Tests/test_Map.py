@@ -4,7 +4,7 @@ from Models import Move
 from Sim.GameSimulator import GameSimulatorHost, GameSimulator
 from Sim.TextMapLoader import TextMapLoader
 from TestBase import TestBase
-from base.client.map import Score
+from base.client.map import MapTileArrays, Score
 from base.client.tile import TILE_FOG, TILE_OBSTACLE, TILE_MOUNTAIN
 from test_MapBaseClass import MapTestsBase
 
@@ -1161,4 +1161,60 @@ player_index=0
         simHost.run_between_turns(lambda: self.assertEqual(1, playerMap.players[enemyGeneral.player].cityCount))
         self.begin_capturing_logging()
         winner = simHost.run_sim(run_real_time=debugMode and not self.GLOBAL_BYPASS_RENDERING, turn_time=0.25, turns=7)
-        self.assertNoFriendliesKilled(map, general)
\ No newline at end of file
+        self.assertNoFriendliesKilled(map, general)
+
+    def test_tile_arrays__stay_in_sync_with_tiles_through_updates(self):
+        mapRaw = """
+|   |   |   |   |   |   |   |
+aG7 a3                      C45
+a2      M
+                    b3  b3  bG5
+|   |   |   |   |   |   |   |
+"""
+        map, general = self.load_map_and_general_from_string(mapRaw, turn=12, player_index=0)
+        map.get_tile_arrays()
+
+        def assertTileArraysMatchFreshBuild():
+            fresh = MapTileArrays(map.tiles_by_index)
+            maintained = map.get_tile_arrays()
+            for field in MapTileArrays.__slots__:
+                self.assertEqual(getattr(fresh, field).tolist(), getattr(maintained, field).tolist(), f'tile arrays {field} out of sync on turn {map.turn}')
+
+        targetTile = map.GetTile(1, 1)
+        map.update_turn(13)
+        map.update_visible_tile(targetTile.x, targetTile.y, general.player, 1, is_city=False, is_general=False)
+        map.update_visible_tile(1, 0, general.player, 1, is_city=False, is_general=False)
+        map.update()
+        assertTileArraysMatchFreshBuild()
+
+        # discovering a mountain removes the tile from its neighbors movable lists
+        newMountain = map.GetTile(2, 0)
+        map.update_turn(14)
+        map.update_visible_tile(newMountain.x, newMountain.y, TILE_MOUNTAIN, 0, is_city=False, is_general=False)
+        map.update()
+        assertTileArraysMatchFreshBuild()
+
+        indptr, indices = map.get_movable_adjacency()
+        for tile in map.get_all_tiles():
+            self.assertEqual([t.tile_index for t in tile.movable], indices[indptr[tile.tile_index]:indptr[tile.tile_index + 1]].tolist())
+            self.assertNotIn(newMountain, tile.movable)
+
+        map.convert_tile_to_mountain(targetTile)
+        assertTileArraysMatchFreshBuild()
+
+        # fog tiles only change through the bonuses / movement prediction inside MapBase.update.
+        fogTiles = [t for t in map.get_all_tiles() if t.player == 1]
+        for tile in fogTiles:
+            tile.visible = False
+        fogArmies = [t.army for t in fogTiles]
+        map.update_turn(50)
+        map.update()
+        self.assertNotEqual(fogArmies, [t.army for t in fogTiles])
+        assertTileArraysMatchFreshBuild()
+
+        # raising the walled city threshold flips neutral city obstacle flags without any Tile.update.
+        neutralCity = map.GetTile(7, 0)
+        self.assertTrue(map.get_tile_arrays().obstacle[neutralCity.tile_index])
+        map.set_walled_cities(50)
+        self.assertFalse(neutralCity.isObstacle)
+        assertTileArraysMatchFreshBuild()
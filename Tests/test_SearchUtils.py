@@ -9,13 +9,15 @@ import logbook
 
 import SearchUtils
 from Models import Move
+from DistanceMapperDenseImpl import DistanceMapperDenseImpl
 from DistanceMapperImpl import DistanceMapperImpl
+from MapMatrix import MapMatrixSet
 from Path import Path
 from SearchUtils import dest_breadth_first_target
 from Sim.GameSimulator import GameSimulatorHost, GameSimulator
 from Tests.TestBase import TestBase
 from ViewInfo import PathColorer
-from base.client.tile import Tile
+from base.client.tile import Tile, TILE_MOUNTAIN
 from base.client.map import MapBase
 from base.viewer import GeneralsViewer
 from DangerAnalyzer import DangerAnalyzer
@@ -639,3 +641,311 @@ class SearchUtilsTests(TestBase):
         # paths = [l for l in itertools.chain.from_iterable(oldPaths.values())]
         # paths.extend(itertools.chain.from_iterable(newPaths.values()))
         # self.render_paths(map, paths, 'paths are cool...?')
+
+    def test_bfs_dynamic_max_variants__packed_priority_keys__return_same(self):
+        MapBase.DO_NOT_RANDOMIZE = True
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 108, fill_out_tiles=True)
+
+        def valFunc(tile, prio):
+            dist, negVal, desiredArmy = prio
+            if dist == 0 or negVal >= 0:
+                return None
+
+            return 0 - negVal
+
+        def prioFunc(tile, lastPrio):
+            dist, negVal, desiredArmy = lastPrio
+            if negVal + desiredArmy < 0:
+                return None
+
+            if tile.player == general.player:
+                negVal -= tile.army
+            else:
+                negVal += tile.army
+
+            return dist + 1, negVal, desiredArmy
+
+        startTiles: typing.Dict[Tile, typing.Tuple[object, int]] = {
+            enemyGeneral: ((0, 0, 1000), 0),
+            map.GetTile(0, 1): ((6, 0, 1), 0),
+            map.GetTile(12, 12): ((8, 0, 1), 0),
+        }
+
+        def tile_lists(result):
+            if result is None or isinstance(result, Path):
+                return None if result is None else result.tileList
+            return {t: tile_lists(r) if not isinstance(r, list) else [p.tileList for p in r] for t, r in result.items()}
+
+        variants = [
+            (SearchUtils.breadth_first_dynamic_max, dict(useGlobalVisitedSet=True)),
+            (SearchUtils.breadth_first_dynamic_max, dict(useGlobalVisitedSet=False, maxDepth=7)),
+            (SearchUtils.breadth_first_dynamic_max_global_visited, dict()),
+            (SearchUtils.breadth_first_dynamic_max_per_tile, dict(useGlobalVisitedSet=False, maxDepth=7)),
+            (SearchUtils.breadth_first_dynamic_max_per_tile_global_visited, dict()),
+            (SearchUtils.breadth_first_dynamic_max_per_tile_per_distance, dict(useGlobalVisitedSet=False, maxDepth=7)),
+            (SearchUtils.breadth_first_dynamic_max_per_tile_per_distance_global_visited, dict()),
+        ]
+        for packedFields in [1, 2, 3]:
+            packer = SearchUtils.build_priority_key_packer(packedFields, validate=True)
+            for searchFunc, kwargs in variants:
+                with self.subTest(searchFunc=searchFunc.__name__, kwargs=kwargs, packedFields=packedFields):
+                    kwargs = dict(kwargs)
+                    kwargs.setdefault('maxDepth', 1000)
+                    tuplePaths = searchFunc(map, startTiles, valFunc, priorityFunc=prioFunc, maxTurns=10000, noNeutralCities=True, noLog=True, **kwargs)
+                    packedPaths = searchFunc(map, startTiles, valFunc, priorityFunc=prioFunc, maxTurns=10000, noNeutralCities=True, noLog=True, priorityKeyFunc=packer, **kwargs)
+
+                    self.assertIsNotNone(tuplePaths)
+                    self.assertEqual(tile_lists(tuplePaths), tile_lists(packedPaths))
+
+    def test_build_priority_key_packer__orders_like_the_packed_tuple_prefix(self):
+        packer = SearchUtils.build_priority_key_packer(3, bitsPerField=8, validate=True)
+        prios = [(a, b, c, 0.5) for a in (-128, -1, 0, 5, 127) for b in (-3, 0, 2) for c in (False, True, -128, 127)]
+        for left in prios:
+            for right in prios:
+                self.assertEqual(left[:3] < right[:3], packer(left) < packer(right), f'{left} vs {right}')
+                self.assertEqual(left[:3] == right[:3], packer(left) == packer(right), f'{left} vs {right}')
+
+        with self.assertRaises(AssertionError):
+            packer((128, 0, 0))
+        with self.assertRaises(AssertionError):
+            packer((0, 0.5, 0))
+
+    def test_distance_mapper_dense__matches_lazy_distance_mapper_for_all_pairs(self):
+        mapFiles = [
+            ('GameContinuationEntries/should_complete_danger_tile_kill___Bgk8TIUR2---0--108.txtmap', 108),
+            ('GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap', 2),
+        ]
+        for mapFile, turn in mapFiles:
+            with self.subTest(mapFile=mapFile):
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, turn, fill_out_tiles=True)
+
+                lazyMapper = DistanceMapperImpl(map)
+                denseMapper = DistanceMapperDenseImpl(map)
+
+                for tileA in map.get_all_tiles():
+                    lazyRow = lazyMapper.get_tile_dist_matrix(tileA)
+                    denseRow = denseMapper.get_tile_dist_matrix(tileA)
+                    self.assertEqual(lazyRow.raw, [int(d) for d in denseRow.raw], f'rows differed for {tileA}')
+
+                for tileA in map.pathable_tiles:
+                    for tileB in map.pathable_tiles:
+                        self.assertEqual(lazyMapper.get_distance_between_or_none(tileA, tileB), denseMapper.get_distance_between_or_none(tileA, tileB))
+
+    def test_distance_mapper_dense__tile_dist_matrix__hands_out_python_ints(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+        denseMapper = DistanceMapperDenseImpl(map)
+
+        row = denseMapper.get_tile_dist_matrix(general)
+        self.assertTrue(all(type(d) is int for d in row.raw))
+
+        # callers scale copies and store sentinels in them, none of which may wrap around int16.
+        scaled = row.copy()
+        for tile in map.get_all_tiles():
+            scaled[tile] = scaled[tile] * 1000 + 40000
+        self.assertEqual(40000, scaled[general])
+        self.assertTrue(all(d >= 40000 for d in scaled.raw))
+        self.assertEqual(0, row[general])
+
+        denseMapper.recalculate()
+        self.assertIs(row, denseMapper.get_tile_dist_matrix(general))
+        self.assertEqual(0, row[general])
+
+    def test_distance_mappers__repair_passability_changes__match_full_rebuild(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        for mapperType in [DistanceMapperImpl, DistanceMapperDenseImpl]:
+            with self.subTest(mapperType=mapperType.__name__):
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+                mapper = mapperType(map)
+                map.distance_mapper = mapper
+                for tile in map.get_all_tiles():
+                    mapper.get_tile_dist_matrix(tile)
+
+                rng = random.Random(42)
+                candidates = [t for t in map.pathable_tiles if not t.isGeneral and not t.isCity]
+                for i in range(10):
+                    toMountain = rng.choice(candidates)
+                    candidates.remove(toMountain)
+                    map.convert_tile_to_mountain(toMountain)
+
+                    fresh = DistanceMapperImpl(map)
+                    for tile in map.get_all_tiles():
+                        self.assertEqual(fresh.get_tile_dist_matrix(tile).raw, [int(d) for d in mapper.get_tile_dist_matrix(tile).raw], f'{mapperType.__name__} row mismatch for {tile} after converting {toMountain} to mountain')
+
+                self.assertEqual(0, mapper.resets_total)
+                self.assertEqual(10, mapper.repairs_total)
+
+    def test_compiled_bfs_kernels__match_python_implementations(self):
+        if SearchUtils.SearchUtilsCython is None:
+            self.skipTest('SearchUtilsCython extension not built (python setup.py build_ext --inplace)')
+
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+
+        rng = random.Random(42)
+        candidates = [t for t in map.pathable_tiles if not t.isGeneral and not t.isCity]
+        for i in range(3):
+            # mountain discovery removes the tile from its neighbors movable lists, the exported adjacency must follow.
+            toMountain = rng.choice(candidates)
+            candidates.remove(toMountain)
+            toMountain.update(map, TILE_MOUNTAIN, 0)
+
+        foreachFuncs = [
+            SearchUtils.breadth_first_foreach_dist_fast_incl_neut_cities,
+            SearchUtils.breadth_first_foreach_dist_fast_no_neut_cities,
+            SearchUtils.breadth_first_foreach_dist_fast_no_default_skip,
+        ]
+
+        prevUseCompiled = SearchUtils.USE_COMPILED_BFS_KERNELS
+        try:
+            for i in range(25):
+                startTiles = rng.sample(map.tiles_by_index, rng.randint(1, 4))
+                skipTiles = set(rng.sample(map.tiles_by_index, 15))
+                maxDepth = rng.choice([2, 6.5, 15, 1000])
+
+                for foreachFunc in foreachFuncs:
+                    visitedByMode = []
+                    for useCompiled in [False, True]:
+                        SearchUtils.USE_COMPILED_BFS_KERNELS = useCompiled
+                        visited = []
+
+                        def foreach(tile: Tile, dist: int) -> bool:
+                            visited.append((tile.tile_index, dist))
+                            return tile in skipTiles
+
+                        foreachFunc(map, startTiles, maxDepth, foreach)
+                        visitedByMode.append(visited)
+                    self.assertEqual(visitedByMode[0], visitedByMode[1], f'{foreachFunc.__name__} visitation mismatch from {startTiles} maxDepth {maxDepth}')
+
+                builders = [
+                    lambda: SearchUtils.build_distance_map_matrix(map, startTiles),
+                    lambda: SearchUtils.build_distance_map_matrix_with_max_depth(map, startTiles, maxDepth),
+                    lambda: SearchUtils.build_distance_map_matrix_with_skip(map, startTiles, skipTiles, maxDepth),
+                    lambda: SearchUtils.build_distance_map_matrix_with_skip(map, startTiles, MapMatrixSet(map, skipTiles), maxDepth),
+                ]
+                for builder in builders:
+                    rawByMode = []
+                    for useCompiled in [False, True]:
+                        SearchUtils.USE_COMPILED_BFS_KERNELS = useCompiled
+                        rawByMode.append(builder().raw)
+                    self.assertEqual(rawByMode[0], rawByMode[1], f'distance map mismatch from {startTiles} maxDepth {maxDepth}')
+        finally:
+            SearchUtils.USE_COMPILED_BFS_KERNELS = prevUseCompiled
+
+    def test_turn_search_cache__hits_identical_searches_and_invalidates_on_map_change(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+        general.army = 200
+
+        cache = SearchUtils.begin_turn_search_cache(map)
+        try:
+            first = SearchUtils.build_distance_map_matrix_with_skip(map, [general], {enemyGeneral}, 15)
+            first.raw[enemyGeneral.tile_index] = -5
+            # a fresh-but-equal skip set and a fresh start list must still hit, and must not see the caller mutation above.
+            second = SearchUtils.build_distance_map_matrix_with_skip(map, [general], {enemyGeneral}, 15)
+            self.assertEqual(1, cache.hits['build_distance_map_matrix_with_skip'])
+            self.assertEqual(1, cache.misses['build_distance_map_matrix_with_skip'])
+            self.assertNotEqual(-5, second.raw[enemyGeneral.tile_index])
+
+            path = SearchUtils.a_star_kill(map, [general], {enemyGeneral}, 0.1, 50)
+            pathAgain = SearchUtils.a_star_kill(map, [general], {enemyGeneral}, 0.1, 50)
+            self.assertIsNotNone(path)
+            self.assertIsNot(path, pathAgain)
+            self.assertEqual(path.tileList, pathAgain.tileList)
+            self.assertEqual(1, cache.hits['a_star_kill'])
+
+            # the cache belongs to map, searches over any other map never touch it.
+            otherMap, otherGeneral, otherEnemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+            self.assertIsNone(otherMap.turn_search_cache)
+            SearchUtils.a_star_kill(otherMap, [otherGeneral], {otherEnemyGeneral}, 0.1, 50)
+            self.assertEqual(1, cache.hits['a_star_kill'])
+            self.assertEqual(1, cache.misses['a_star_kill'])
+            self.assertNotIn('a_star_kill', cache.bypasses)
+
+            # callables have no structural key, so these always run uncached.
+            SearchUtils.a_star_kill(map, [general], {enemyGeneral}, 0.1, 50, restrictionEvalFuncsLookup={general: lambda t: False})
+            self.assertEqual(1, cache.bypasses['a_star_kill'])
+
+            general.army += 500
+            map.bump_generation()
+            afterChange = SearchUtils.build_distance_map_matrix_with_skip(map, [general], {enemyGeneral}, 15)
+            self.assertEqual(2, cache.misses['build_distance_map_matrix_with_skip'])
+            self.assertEqual(second.raw, afterChange.raw)
+        finally:
+            counters = SearchUtils.end_turn_search_cache(map)
+
+        self.assertEqual(1, counters['a_star_kill hit'])
+        self.assertEqual({}, SearchUtils.end_turn_search_cache(map))
+
+    def test_turn_search_cache__does_not_store_searches_that_hit_their_time_limit(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+
+        calls = []
+
+        @SearchUtils._turn_cached
+        def timed_search(map, start, outOfTime):
+            calls.append(start)
+            if outOfTime:
+                SearchUtils.report_search_time_limit_hit(map)
+            return len(calls)
+
+        @SearchUtils._turn_cached
+        def outer_search(map, start, outOfTime):
+            return timed_search(map, start, outOfTime)
+
+        cache = SearchUtils.begin_turn_search_cache(map)
+        try:
+            self.assertEqual(1, timed_search(map, general, True))
+            self.assertEqual(2, timed_search(map, general, True))
+            self.assertEqual(2, cache.timeouts['timed_search'])
+            self.assertNotIn('timed_search', cache.hits)
+
+            self.assertEqual(3, timed_search(map, general, False))
+            self.assertEqual(3, timed_search(map, general, False))
+            self.assertEqual(1, cache.hits['timed_search'])
+
+            # an outer search built on a cut short inner search is partial as well.
+            self.assertEqual(4, outer_search(map, enemyGeneral, True))
+            self.assertEqual(5, outer_search(map, enemyGeneral, True))
+            self.assertEqual(2, cache.timeouts['outer_search'])
+            self.assertFalse(cache.time_limit_hit)
+        finally:
+            counters = SearchUtils.end_turn_search_cache(map)
+
+        self.assertEqual(4, counters['timed_search timeout'])
+        # without an active cache, reporting is a no-op.
+        SearchUtils.report_search_time_limit_hit(map)
+        self.assertEqual(6, timed_search(map, general, True))
+
+    def test_distance_mappers__update_reachable__repairs_obstacle_flips_inside_the_pathable_set(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        for mapperType in [DistanceMapperImpl, DistanceMapperDenseImpl]:
+            with self.subTest(mapperType=mapperType.__name__):
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+                map.update_reachable()
+                mapper = mapperType(map)
+                map.distance_mapper = mapper
+                for tile in map.get_all_tiles():
+                    mapper.get_tile_dist_matrix(tile)
+
+                rng = random.Random(7)
+                candidates = [t for t in map.pathable_tiles if t.isNeutral and not t.isCity and not t.isObstacle]
+                for i in range(5):
+                    # a neutral tile piling up army stays pathable, but becomes an obstacle to the distance maps.
+                    costly = rng.choice(candidates)
+                    candidates.remove(costly)
+                    costly.army = Tile.PATHABLE_CITY_THRESHOLD + 5
+                    Tile.recalc_all_derived([costly])
+                    pathableCount = len(map.pathable_tiles)
+                    map.update_reachable()
+                    self.assertEqual(pathableCount, len(map.pathable_tiles))
+                    self.assertTrue(costly.isObstacle)
+
+                    fresh = DistanceMapperImpl(map)
+                    for tile in map.get_all_tiles():
+                        self.assertEqual(fresh.get_tile_dist_matrix(tile).raw, [int(d) for d in mapper.get_tile_dist_matrix(tile).raw], f'{mapperType.__name__} row mismatch for {tile} after {costly} became an obstacle')
+
+                self.assertEqual(0, mapper.resets_total)
+                self.assertEqual(5, mapper.repairs_total)
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+
+import SelfPlayRunner
+from TestBase import TestBase
+
+
+class SelfPlayRunnerTests(TestBase):
+    def test_build_game_specs__mirrors_each_map_and_city_setting(self):
+        specs = SelfPlayRunner.build_game_specs(8, {'engine_use_mcts': True}, {}, seed=3)
+
+        self.assertEqual([0, 1] * 4, [s.a_player for s in specs])
+        for first, second in zip(specs[::2], specs[1::2]):
+            self.assertEqual(first.map_file, second.map_file)
+            self.assertEqual(first.no_cities, second.no_cities)
+        self.assertEqual(8, len({s.seed for s in specs}))
+        self.assertEqual([s.seed for s in specs], [s.seed for s in SelfPlayRunner.build_game_specs(8, {}, {}, seed=3)])
+
+    def test_latency_percentiles_and_summary(self):
+        latency = SelfPlayRunner.get_latency_percentiles([i / 1000 for i in range(1, 101)])
+        self.assertEqual({'moves': 100, 'p50': 50.0, 'p90': 90.0, 'p99': 99.0, 'max': 100.0}, latency)
+        self.assertEqual({'moves': 0}, SelfPlayRunner.get_latency_percentiles([]))
+
+        records = [
+            {'winner': 'a', 'turns': 300, 'latencyMs': {'a': latency, 'b': {'moves': 0}}},
+            {'winner': 'a', 'turns': 200, 'latencyMs': {'a': latency, 'b': {'moves': 0}}},
+            {'winner': 'b', 'turns': 100, 'latencyMs': {'a': latency, 'b': {'moves': 0}}},
+            {'winner': None, 'turns': 700, 'latencyMs': {'a': latency, 'b': {'moves': 0}}},
+            {'winner': None, 'turns': 0, 'error': 'Traceback...'},
+        ]
+        summary = SelfPlayRunner.summarize(records)
+        self.assertEqual(5, summary['games'])
+        self.assertEqual(2, summary['aWins'])
+        self.assertEqual(1, summary['bWins'])
+        self.assertEqual(1, summary['undecided'])
+        self.assertEqual(1, summary['errors'])
+        self.assertEqual(0.6667, summary['aWinRate'])
+        self.assertEqual(200.0, summary['meanTurns'])
+        self.assertEqual(50.0, summary['aLatencyMs']['p50'])
+        self.assertNotIn('bLatencyMs', summary)
+
+    def test_run_self_play__writes_a_record_per_game(self):
+        specs = SelfPlayRunner.build_game_specs(2, {}, {'engine_use_mcts': False}, maxTurns=60)
+        with tempfile.TemporaryDirectory() as tempDir:
+            outPath = os.path.join(tempDir, 'results.jsonl')
+            records = SelfPlayRunner.run_self_play(specs, workers=0, outputPath=outPath)
+            written = SelfPlayRunner.load_results(outPath)
+
+        self.assertEqual(2, len(records))
+        self.assertEqual(json.loads(json.dumps(records)), written)
+        for record in records:
+            self.assertNotIn('error', record, record.get('error'))
+            self.assertGreaterEqual(record['turns'], 60)
+            self.assertEqual(60, record['latencyMs']['a']['moves'])
+            self.assertGreater(record['latencyMs']['a']['p50'], 0.0)
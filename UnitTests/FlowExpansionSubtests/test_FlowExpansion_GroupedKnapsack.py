@@ -1,3 +1,5 @@
+import random
+
 import logbook
 
 from Algorithms import TileIslandBuilder
@@ -9,6 +11,9 @@ from Gather.GatherCaptureGroupKnapsacker import (
     GroupedKnapsackPreGroupInput,
     GroupedKnapsackPreGroupItem,
     GroupedKnapsackIterationSummary,
+    GroupedKnapsackWarmStartSolver,
+    prune_and_get_groups_for_knapsack,
+    solve_grouped_knapsack_input,
 )
 from Gather import GatherDebug
 from Sim.GameSimulator import GameSimulatorHost
@@ -3010,3 +3015,66 @@ aG1  a3   b1   bG1
             expected = enriched.capture_entry.turns + enriched.gather_entry.turns
             self.assertEqual(expected, enriched.combined_turn_cost,
                              f'combined_turn_cost must equal capture.turns + gather.turns for pair {bp}')
+
+    # -----------------------------------------------------------------------
+    # Warm started grouped knapsack
+    # -----------------------------------------------------------------------
+
+    def _build_random_grouped_knapsack_input(self, rand: random.Random, numGroups: int, turnBudget: int) -> GroupedKnapsackInput:
+        groups = []
+        weights = []
+        econ_values = []
+        item_tile_sets = []
+        for group in range(numGroups):
+            # each border pair gets its own little area of tiles, with a few tiles shared with the next one over.
+            groupTiles = list(range(group * 10, group * 10 + 13))
+            for _ in range(rand.randint(2, 6)):
+                groups.append(group)
+                weights.append(rand.randint(1, 12))
+                econ_values.append(rand.randint(1, 20) / 2)
+                item_tile_sets.append(sorted(rand.sample(groupTiles, rand.randint(1, 5))))
+
+        return GroupedKnapsackInput(
+            turn_budget=turnBudget,
+            groups=groups,
+            weights=weights,
+            values=[int(econ * 1000) - weight for econ, weight in zip(econ_values, weights)],
+            econ_values=econ_values,
+            friendly_island_sets=[[] for _ in weights],
+            target_island_sets=[[] for _ in weights],
+            item_tile_sets=item_tile_sets,
+            is_external_item={},
+            item_descriptions=[f'item {i}' for i in range(len(weights))],
+            max_iterations=32)
+
+    def test_grouped_knapsack__warm_start_solver_matches_cold_solve_across_turns(self):
+        rand = random.Random(19)
+        solver = GroupedKnapsackWarmStartSolver()
+        input_data = self._build_random_grouped_knapsack_input(rand, numGroups=12, turnBudget=30)
+        for turn in range(40):
+            with self.subTest(turn=turn):
+                cold = prune_and_get_groups_for_knapsack(input_data)
+                warm = solver.prune_and_get_groups(input_data)
+                self.assertEqual(cold.active_indices, warm.active_indices)
+                self.assertEqual(cold.groups_by_index, warm.groups_by_index)
+                self.assertEqual(
+                    [(m.option_index, m.would_merge_groups) for m in cold.maybe_options],
+                    [(m.option_index, m.would_merge_groups) for m in warm.maybe_options])
+
+                coldResult = solve_grouped_knapsack_input(input_data)
+                warmResult = solver.solve(input_data)
+                self.assertEqual(coldResult.chosen_indices, warmResult.chosen_indices)
+                self.assertEqual(coldResult.max_value, warmResult.max_value)
+                self.assertEqual(coldResult.groups, warmResult.groups)
+                # solving the same input again re-prunes nothing.
+                self.assertEqual(0, solver.components_pruned)
+
+            # next turn, a couple of options change and the budget shrinks / grows by a turn.
+            for _ in range(rand.randint(0, 2)):
+                i = rand.randrange(len(input_data.weights))
+                input_data.weights[i] = max(1, input_data.weights[i] + rand.choice([-1, 1]))
+                input_data.econ_values[i] += rand.choice([-0.5, 0.5])
+                input_data.values[i] = int(input_data.econ_values[i] * 1000) - input_data.weights[i]
+            input_data.turn_budget = max(1, input_data.turn_budget + rand.choice([-1, 0, 1]))
+
+        self.assertGreater(solver.components_reused, 0)
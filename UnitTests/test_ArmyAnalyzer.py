@@ -237,3 +237,20 @@ player_index=0
         canInterceptStillTile = map.GetTile(2, 9)
         self.assertEqual(2, analyzer.interceptTurns[canInterceptStillTile], 'can intercept from this tile 1 turn from now by chasing to the right for 4 moves max')
         self.assertEqual(4, analyzer.interceptDistances[canInterceptStillTile], 'can intercept from this tile by chasing to the right for 4 moves max')
+
+    def test_scan_in_slices__matches_full_scan(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+
+        analyzer = ArmyAnalyzer(map, general, enemyGeneral)
+        sliced = ArmyAnalyzer(map, general, enemyGeneral, deferScan=True)
+        self.assertEqual(0, len(sliced.pathWays))
+        slices = sum(1 for _ in sliced.scan_in_slices(tilesPerSlice=50))
+
+        self.assertGreater(slices, len(map.pathable_tiles) // 50)
+        self.assertEqual(len(analyzer.pathWays), len(sliced.pathWays))
+        self.assertEqual(analyzer.shortestPathWay.tiles, sliced.shortestPathWay.tiles)
+        self.assertEqual(analyzer.chokeWidths.raw, sliced.chokeWidths.raw)
+        self.assertEqual(analyzer.interceptChokes.raw, sliced.interceptChokes.raw)
+        self.assertEqual(analyzer.interceptTurns.raw, sliced.interceptTurns.raw)
+        self.assertEqual(analyzer.interceptDistances.raw, sliced.interceptDistances.raw)
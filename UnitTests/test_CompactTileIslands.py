@@ -0,0 +1,174 @@
+import random
+
+from Algorithms import CompactTileIslands, TileIslandBuilder
+from BehaviorAlgorithms.Flow.OrToolsFlowDirectionFinder import OrToolsFlowDirectionFinder
+from BoardAnalyzer import BoardAnalyzer
+from MapMatrix import MapMatrix
+from PerformanceTimer import PerformanceTimer
+from TestBase import TestBase
+from base.client.map import MapBase
+
+
+class CompactTileIslandsUnitTests(TestBase):
+    def __init__(self, methodName: str = ...):
+        MapBase.DO_NOT_RANDOMIZE = True
+        super().__init__(methodName)
+
+    def assertCompactMatchesBuilder(self, builder: TileIslandBuilder, compact: CompactTileIslands):
+        self.assertEqual(len(builder.all_tile_islands), compact.leaf_count)
+        for island, view in zip(builder.all_tile_islands, compact.all_tile_islands):
+            self.assertEqual(island, view)
+            self.assertEqual(hash(island), hash(view))
+            self.assertEqual(island.name, view.name)
+            self.assertEqual(island.team, view.team)
+            self.assertEqual(island.tile_count, view.tile_count)
+            self.assertEqual(island.sum_army, view.sum_army)
+            self.assertEqual(island.tile_count_all_adjacent_friendly, view.tile_count_all_adjacent_friendly)
+            self.assertEqual(island.sum_army_all_adjacent_friendly, view.sum_army_all_adjacent_friendly)
+            self.assertEqual(island.tiles_by_army, view.tiles_by_army)
+            self.assertEqual(island.tile_set, view.tile_set)
+            self.assertEqual(island.cities, view.cities)
+            self.assertEqual([b.unique_id for b in island.border_islands], [b.unique_id for b in view.border_islands])
+            self.assertEqual(island.child_islands is None, view.child_islands is None)
+            if island.full_island is None:
+                self.assertIsNone(view.full_island)
+            else:
+                self.assertEqual(island.full_island.unique_id, view.full_island.unique_id)
+                self.assertEqual(island.full_island.tile_set, view.full_island.tile_set)
+                self.assertEqual([c.unique_id for c in island.full_island.child_islands], [c.unique_id for c in view.full_island.child_islands])
+            self.assertIs(view, compact.get_island_by_unique_id(island.unique_id))
+
+        for tile in builder.map.tiles_by_index:
+            island = builder.tile_island_lookup.raw[tile.tile_index]
+            view = compact.get_island_for_tile(tile)
+            if island is None:
+                self.assertIsNone(view, f'{tile} has no island but the compact lookup had {view}')
+            else:
+                self.assertEqual(island.unique_id, view.unique_id, f'{tile}')
+
+    def test_compact_snapshot__matches_builder_across_updates(self):
+        mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136, fill_out_tiles=True)
+
+        analysis = BoardAnalyzer(map, general)
+        analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+        builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+        builder.recalculate_tile_islands(enemyGeneral)
+        self.assertCompactMatchesBuilder(builder, CompactTileIslands.from_builder(builder))
+
+        rand = random.Random(3)
+        for turn in range(6):
+            map.turn += 1
+            for tile in map.players[general.player].tiles:
+                if tile.isGeneral or tile.isCity:
+                    tile.army += 1
+            captures = [
+                adj
+                for tile in map.players[general.player].tiles if tile.army > 2
+                for adj in tile.movable if adj.player != general.player and not adj.isObstacle and not adj.isCity and adj in map.pathable_tiles
+            ]
+            if captures:
+                captured = rand.choice(captures)
+                captured.player = general.player
+                captured.tile = general.player
+                captured.army = 1
+            builder.update_tile_islands(enemyGeneral)
+
+            with self.subTest(turn=turn):
+                self.assertCompactMatchesBuilder(builder, CompactTileIslands.from_builder(builder))
+
+    def test_compact_snapshot__clone_is_independent_of_original(self):
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 250, fill_out_tiles=True)
+
+        analysis = BoardAnalyzer(map, general)
+        analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+        builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+        builder.recalculate_tile_islands(enemyGeneral)
+
+        compact = CompactTileIslands.from_builder(builder)
+        clone = compact.clone()
+        self.assertCompactMatchesBuilder(builder, clone)
+
+        generalIsland = clone.get_island_for_tile(general)
+        clone.sum_armies[generalIsland.index] += 50
+        clone.island_index_by_tile_index[general.tile_index] = -1
+        self.assertEqual(builder.tile_island_lookup.raw[general.tile_index].sum_army, compact.get_island_for_tile(general).sum_army)
+        self.assertEqual(builder.tile_island_lookup.raw[general.tile_index].sum_army + 50, generalIsland.sum_army)
+        self.assertIsNone(clone.get_island_for_tile(general))
+        self.assertIsNot(generalIsland, compact.get_island_for_tile(general))
+
+    def test_get_compact_islands__is_cached_until_the_islands_update(self):
+        mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136, fill_out_tiles=True)
+
+        analysis = BoardAnalyzer(map, general)
+        analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+        builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+        builder.recalculate_tile_islands(enemyGeneral)
+
+        compact = builder.get_compact_islands()
+        self.assertIs(compact, builder.get_compact_islands())
+        self.assertCompactMatchesBuilder(builder, compact)
+
+        armyByTileIndex = [t.army * 3 + t.tile_index % 7 for t in map.tiles_by_index]
+        sums = compact.sum_tile_values_by_island(armyByTileIndex)
+        for island in builder.all_tile_islands:
+            view = compact.get_island_by_unique_id(island.unique_id)
+            self.assertEqual(sum(armyByTileIndex[t.tile_index] for t in island.tile_set), int(sums[view.index]), f'{island}')
+
+        general.army += 20
+        builder.update_tile_islands(enemyGeneral)
+        updated = builder.get_compact_islands()
+        self.assertIsNot(compact, updated)
+        self.assertCompactMatchesBuilder(builder, updated)
+
+        builder.recalculate_tile_islands(enemyGeneral)
+        self.assertIsNot(updated, builder.get_compact_islands())
+
+    def test_compact_snapshot__reports_border_islands_the_builder_does_not_know_about(self):
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 250, fill_out_tiles=True)
+
+        analysis = BoardAnalyzer(map, general)
+        analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+        builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+        builder.recalculate_tile_islands(enemyGeneral)
+
+        generalIsland = builder.tile_island_lookup.raw[general.tile_index]
+        strayIsland = next(iter(generalIsland.border_islands)).clone()
+        generalIsland.border_islands.add(strayIsland)
+
+        builder.use_debug_asserts = True
+        with self.assertRaises(AssertionError):
+            CompactTileIslands.from_builder(builder)
+
+        builder.use_debug_asserts = False
+        compact = CompactTileIslands.from_builder(builder)
+        self.assertEqual(len(generalIsland.border_islands) - 1, len(compact.get_island_for_tile(general).border_islands))
+
+    def test_ortools_graph_build__sums_the_override_army_of_islands_missing_from_the_snapshot(self):
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 250, fill_out_tiles=True)
+
+        analysis = BoardAnalyzer(map, general)
+        analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+        builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+        builder.recalculate_tile_islands(enemyGeneral)
+
+        perfTimer = PerformanceTimer()
+        perfTimer.begin_move(map.turn)
+        finder = OrToolsFlowDirectionFinder(map, analysis.intergeneral_analysis, perfTimer, log_debug=False, use_backpressure=True, friendly_general=general, invalid_flow_renderer=None)
+        finder.army_override_matrix = MapMatrix(map, 0)
+        for tile in map.tiles_by_index:
+            finder.army_override_matrix.raw[tile.tile_index] = tile.army + tile.tile_index % 5
+        expected = finder.build_graph_data(builder, use_neutral_flow=True)
+
+        # an island the snapshot does not have a leaf entry for has to fall back to summing its own tiles.
+        stale = builder.get_compact_islands().clone()
+        stale.unique_ids[stale.get_island_for_tile(general).index] = -1
+        builder.get_compact_islands = lambda: stale
+        graphData = finder.build_graph_data(builder, use_neutral_flow=True)
+
+        self.assertEqual(expected.node_supplies.tolist(), graphData.node_supplies.tolist())
+        self.assertEqual(expected.demand_lookup, graphData.demand_lookup)
@@ -0,0 +1,54 @@
+from ArmyAnalyzer import ArmyAnalyzer
+from IdlePrecomputeWorker import IdlePrecomputeWorker, get_passability_fingerprint
+from TestBase import TestBase
+
+
+class IdlePrecomputeWorkerUnitTests(TestBase):
+    def run_until_idle(self, worker: IdlePrecomputeWorker):
+        slices = 0
+        while worker.run_idle_slice():
+            slices += 1
+            self.assertLess(slices, 10000, 'idle work never finished')
+
+    def schedule_analysis(self, worker: IdlePrecomputeWorker, map, general, enemyGeneral):
+        def build():
+            yield
+            return ArmyAnalyzer(map, general, enemyGeneral)
+
+        worker.schedule('analysis', get_passability_fingerprint(map), build())
+
+    def test_adopts_result_only_while_passability_unchanged(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+        worker = IdlePrecomputeWorker(map)
+
+        self.schedule_analysis(worker, map, general, enemyGeneral)
+        self.run_until_idle(worker)
+
+        # army changes do not invalidate distance based results.
+        general.army += 50
+        prebuilt = worker.adopt('analysis', get_passability_fingerprint(map))
+        self.assertIsNotNone(prebuilt)
+        fresh = ArmyAnalyzer(map, general, enemyGeneral)
+        self.assertEqual(fresh.aMap.raw, prebuilt.aMap.raw)
+        self.assertEqual(fresh.bMap.raw, prebuilt.bMap.raw)
+        self.assertIsNone(worker.adopt('analysis', get_passability_fingerprint(map)), 'results can only be adopted once')
+
+        self.schedule_analysis(worker, map, general, enemyGeneral)
+        self.run_until_idle(worker)
+        shortestPathTile = next(t for t in fresh.shortestPathWay.tiles if t != general and t != enemyGeneral)
+        map.convert_tile_to_mountain(shortestPathTile)
+        self.assertIsNone(worker.adopt('analysis', get_passability_fingerprint(map)))
+        self.assertEqual(1, worker.discarded_total)
+
+    def test_drops_pending_work_when_map_changes_before_it_finishes(self):
+        mapFile = 'GameContinuationEntries/large_map_test___EjibXeerX---2--2.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 2, fill_out_tiles=True)
+        worker = IdlePrecomputeWorker(map)
+
+        self.schedule_analysis(worker, map, general, enemyGeneral)
+        self.assertTrue(worker.has_pending_work())
+        map.bump_generation()
+
+        self.assertFalse(worker.run_idle_slice())
+        self.assertIsNone(worker.adopt('analysis', get_passability_fingerprint(map)))
@@ -1,4 +1,4 @@
-from MapMatrix import MapMatrixSet
+from MapMatrix import MapMatrixSet, MapMatrix, IntMapMatrix, FloatMapMatrix
 from Sim.GameSimulator import GameSimulatorHost
 from TestBase import TestBase
 from base.client.map import MapBase
@@ -36,4 +36,51 @@ class MapMatrixUnitTests(TestBase):
         tilesIn = [t for t in matrix]
         self.assertEqual(2, len(tilesIn))
         for t in tilesIn:
-            self.assertTrue(t == tileIn1 or t == tileIn2)
\ No newline at end of file
+            self.assertTrue(t == tileIn1 or t == tileIn2)
+
+    def test_numeric_map_matrix__bulk_ops_match_list_map_matrix(self):
+        mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136)
+
+        listMatrix = MapMatrix(map, 0)
+        for tile in map.get_all_tiles():
+            listMatrix.raw[tile.tile_index] = tile.tile_index % 7 - 3
+        numpyMatrix = IntMapMatrix.from_matrix(listMatrix)
+
+        self.assertEqual(listMatrix[general], numpyMatrix[general])
+        self.assertIs(int, type(numpyMatrix[general]))
+        self.assertEqual(listMatrix.keys(), numpyMatrix.keys())
+        self.assertEqual(listMatrix.values(), numpyMatrix.values())
+
+        summed = MapMatrix.get_summed([listMatrix, listMatrix])
+        numpySummed = IntMapMatrix.get_summed([numpyMatrix, listMatrix])
+        self.assertEqual(summed.raw, numpySummed.raw.tolist())
+
+        MapMatrix.add_to_matrix(summed, listMatrix)
+        IntMapMatrix.add_to_matrix(numpySummed, numpyMatrix)
+        MapMatrix.subtract_from_matrix(summed, MapMatrix.get_min_normalized_via_sum(listMatrix, normalizedMinimum=2))
+        IntMapMatrix.subtract_from_matrix(numpySummed, IntMapMatrix.get_min_normalized_via_sum(numpyMatrix, normalizedMinimum=2))
+        summed.negate_in_place()
+        numpySummed.negate_in_place()
+        self.assertEqual(summed.raw, numpySummed.raw.tolist())
+        self.assertEqual(summed.raw, numpySummed.to_map_matrix().raw)
+
+        copy = numpySummed.copy()
+        copy[general] = 1000
+        self.assertNotEqual(1000, numpySummed[general])
+
+        atOrAbove = numpyMatrix.get_tiles_at_or_above(2)
+        self.assertEqual({t for t in map.get_all_tiles() if listMatrix[t] >= 2}, set(atOrAbove))
+
+        for normalizedMinimum in [2, 2.0, 2.5, -1.25]:
+            expected = MapMatrix.get_min_normalized_via_sum(listMatrix, normalizedMinimum=normalizedMinimum, offsetDownward=True)
+            normalized = IntMapMatrix.get_min_normalized_via_sum(numpyMatrix, normalizedMinimum=normalizedMinimum, offsetDownward=True)
+            self.assertEqual(expected.raw, normalized.raw.tolist(), f'normalizedMinimum {normalizedMinimum}')
+            self.assertEqual(normalizedMinimum, normalized.raw.min())
+        self.assertEqual(listMatrix.raw, numpyMatrix.raw.tolist())
+
+        floats = FloatMapMatrix(map, 0.5)
+        floats.scale_in_place(3)
+        floats.clip_in_place(maxVal=1.0)
+        self.assertEqual(1.0, floats[enemyGeneral])
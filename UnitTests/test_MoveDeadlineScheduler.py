@@ -0,0 +1,69 @@
+import unittest
+
+from Models import Move
+from MoveDeadlineScheduler import MoveDeadlineScheduler, MovePhasePriority
+from base.client.tile import Tile
+
+
+class FakePerfTimer:
+    def __init__(self):
+        self.elapsed: float = 0.0
+
+    def get_elapsed_since_update(self, turn: int) -> float:
+        return self.elapsed
+
+
+class MoveDeadlineSchedulerTests(unittest.TestCase):
+    def build_tiles(self):
+        source = Tile(0, 0, army=10, player=0, tileIndex=0)
+        dest = Tile(1, 0, army=1, player=1, tileIndex=1)
+        other = Tile(0, 1, army=5, player=0, tileIndex=2)
+        mountain = Tile(1, 1, isMountain=True, tileIndex=3)
+        source.movable = [dest, other]
+        other.movable = [source, mountain]
+        dest.movable = [source, mountain]
+        return source, dest, other, mountain
+
+    def test_should_run__cuts_off_lower_priorities_first(self):
+        timer = FakePerfTimer()
+        scheduler = MoveDeadlineScheduler(timer, turn=50, player=0)
+
+        timer.elapsed = 0.1
+        for priority in MovePhasePriority:
+            self.assertTrue(scheduler.should_run(f'early {priority.name}', priority))
+
+        timer.elapsed = 0.3
+        self.assertTrue(scheduler.should_run('defense', MovePhasePriority.High))
+        self.assertTrue(scheduler.should_run('expansion', MovePhasePriority.Normal))
+        self.assertFalse(scheduler.should_run('gather', MovePhasePriority.Low))
+
+        timer.elapsed = 5.0
+        self.assertFalse(scheduler.should_run('flank', MovePhasePriority.High))
+        self.assertTrue(scheduler.should_run('king kill', MovePhasePriority.Critical))
+
+        self.assertEqual(['gather', 'flank'], scheduler.skipped_phases)
+
+    def test_offer__keeps_most_important_legal_move(self):
+        source, dest, other, mountain = self.build_tiles()
+        scheduler = MoveDeadlineScheduler(FakePerfTimer(), turn=50, player=0)
+
+        self.assertFalse(scheduler.offer(None, 'nothing', MovePhasePriority.Critical))
+        self.assertFalse(scheduler.offer(Move(dest, source), 'enemy source', MovePhasePriority.Critical))
+        self.assertFalse(scheduler.offer(Move(other, mountain), 'into mountain', MovePhasePriority.Critical))
+        self.assertFalse(scheduler.offer(Move(source, mountain), 'not adjacent', MovePhasePriority.Critical))
+        self.assertIsNone(scheduler.get_best_move())
+
+        lowMove = Move(other, source)
+        self.assertTrue(scheduler.offer(lowMove, 'leaf', MovePhasePriority.Low))
+        self.assertFalse(scheduler.offer(Move(source, other), 'another leaf', MovePhasePriority.Low))
+
+        normalMove = Move(source, dest)
+        self.assertTrue(scheduler.offer(normalMove, 'expansion', MovePhasePriority.Normal))
+        self.assertFalse(scheduler.offer(lowMove, 'leaf again', MovePhasePriority.Low))
+
+        self.assertIs(normalMove, scheduler.get_best_move())
+        self.assertEqual('expansion', scheduler.best_move_source)
+
+
+if __name__ == '__main__':
+    unittest.main()
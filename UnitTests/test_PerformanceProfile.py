@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+
+import PerformanceProfile
+from PerformanceTimer import PerformanceTimer, NS_CONVERTER
+
+
+class PerformanceProfileTests(unittest.TestCase):
+    def record_fake_game(self, filePath: str, turns: int):
+        timer = PerformanceTimer()
+        timer.profile_export_path = filePath
+        for turn in range(1, turns + 1):
+            timer.record_update(turn, time.time_ns() / NS_CONVERTER)
+            with timer.begin_move(turn) as moveTimer:
+                with moveTimer.begin_event('init turn'):
+                    with moveTimer.begin_event('army tracker'):
+                        time.sleep(0.005 * turn)
+                    with moveTimer.begin_event('search cache') as cacheEvent:
+                        cacheEvent.counters['hits'] = turn
+                with moveTimer.begin_event('pick move'):
+                    time.sleep(0.001)
+
+    def test_exports_one_event_tree_per_move_and_converts(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, 'perf_profile.jsonl')
+            self.record_fake_game(filePath, turns=4)
+
+            records = PerformanceProfile.load_profile_records(filePath)
+
+        self.assertEqual([1, 2, 3, 4], [r['turn'] for r in records])
+        events = records[2]['events']
+        byName = {e['name']: e for e in events}
+        self.assertEqual(['UPDATE - MOVE START GAP', 'init turn', 'army tracker', 'search cache', 'pick move'], [e['name'] for e in events])
+        self.assertIsNone(byName['init turn']['parent'])
+        self.assertEqual('init turn', events[byName['army tracker']['parent']]['name'])
+        self.assertEqual({'hits': 3}, byName['search cache']['counters'])
+        self.assertGreaterEqual(byName['army tracker']['dur'], 0.015)
+
+        chrome = PerformanceProfile.to_chrome_trace(records)
+        self.assertEqual(4 * 6, len(chrome['traceEvents']))
+
+        speedscope = PerformanceProfile.to_speedscope(records)
+        stack = []
+        lastAt = 0.0
+        for event in speedscope['profiles'][0]['events']:
+            self.assertGreaterEqual(event['at'], lastAt)
+            lastAt = event['at']
+            if event['type'] == 'O':
+                stack.append(event['frame'])
+            else:
+                self.assertEqual(stack.pop(), event['frame'], 'speedscope requires strictly nested open / close events')
+        self.assertEqual([], stack)
+
+    def build_synthetic_record(self, turn: int, updateGap: float, armyTrackerDur: float, pickMoveDur: float) -> dict:
+        """A move record in the exported JSONL shape with fixed durations, so budget checks don't depend on real sleeps."""
+        initTurnDur = armyTrackerDur + 0.001
+        return {
+            'turn': turn,
+            'dur': initTurnDur + pickMoveDur,
+            'events': [
+                {'name': 'UPDATE - MOVE START GAP', 'parent': None, 'start': -updateGap, 'dur': updateGap, 'counters': {}},
+                {'name': 'init turn', 'parent': None, 'start': 0.0, 'dur': initTurnDur, 'counters': {}},
+                {'name': 'army tracker', 'parent': 1, 'start': 0.0, 'dur': armyTrackerDur, 'counters': {}},
+                {'name': 'search cache', 'parent': 1, 'start': armyTrackerDur, 'dur': 0.001, 'counters': {'hits': turn}},
+                {'name': 'pick move', 'parent': None, 'start': initTurnDur, 'dur': pickMoveDur, 'counters': {}},
+            ],
+        }
+
+    def test_turns_over_budget__sorted_slowest_first_with_leaf_culprits(self):
+        records = [
+            self.build_synthetic_record(1, updateGap=0.001, armyTrackerDur=0.005, pickMoveDur=0.001),
+            self.build_synthetic_record(2, updateGap=0.001, armyTrackerDur=0.010, pickMoveDur=0.001),
+            self.build_synthetic_record(3, updateGap=0.001, armyTrackerDur=0.015, pickMoveDur=0.001),
+            self.build_synthetic_record(4, updateGap=0.001, armyTrackerDur=0.020, pickMoveDur=0.001),
+            # only over budget once the update gap before the move started is counted.
+            self.build_synthetic_record(5, updateGap=0.010, armyTrackerDur=0.005, pickMoveDur=0.001),
+        ]
+
+        overBudget = PerformanceProfile.get_turns_over_budget(records, budget=0.0135)
+        self.assertEqual([4, 3, 5], [turn for turn, dur, culprits in overBudget])
+        self.assertAlmostEqual(0.023, overBudget[0][1])
+        self.assertEqual('army tracker', overBudget[0][2][0][0])
+        # init turn is mostly army tracker, so it is not reported as a culprit itself.
+        self.assertNotIn('init turn', [name for name, dur in overBudget[0][2]])
+        self.assertEqual('UPDATE - MOVE START GAP', overBudget[2][2][0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import itertools
 import time
 import typing
 from collections import deque
@@ -231,6 +232,76 @@ class TileIslandBuilderUnitTests(TestBase):
                 self.assertLess(duration, maxDuration, 'should not take ages to build tile islands')
                 logbook.info(f'took {duration:.4f}')
 
+    def test_update_tile_islands__should_be_fast(self):
+        debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and False
+
+        # Counts how much work each update does instead of timing it, so this holds on any machine:
+        # the per tile / per island work has to follow the changed tiles, not the map size.
+        for mapSize in ['small', 'large']:
+            with self.subTest(mapSize=mapSize):
+                if mapSize == 'large':
+                    mapFile = 'GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap'
+                else:
+                    mapFile = 'GameContinuationEntries/should_recognize_army_collision_from_fog___BlpaDuBT2---b--136.txtmap'
+
+                map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136)
+
+                analysis = BoardAnalyzer(map, general)
+                analysis.rebuild_intergeneral_analysis(enemyGeneral, possibleSpawns=None)
+                builder = TileIslandBuilder(map, analysis.intergeneral_analysis)
+                builder.use_debug_asserts = False
+                builder.log_debug = False
+                builder.recalculate_tile_islands(enemyGeneral)
+                self.reset_tile_deltas_to_current_state(map)
+                # the first update after a rebuild checks every tile once.
+                builder.update_tile_islands(enemyGeneral)
+
+                turns = 30
+                for turn in range(turns):
+                    map.turn += 1
+                    changedTiles = []
+                    for player in (general.player, enemyGeneral.player):
+                        for tile in map.players[player].tiles:
+                            if tile.isGeneral or tile.isCity:
+                                self.mark_tile_army_incremented(tile)
+                                changedTiles.append(tile)
+                    captured = None
+                    if turn % 3 == 0:
+                        captures = [
+                            adj
+                            for tile in map.players[general.player].tiles if tile.army > 2
+                            for adj in tile.movable if adj.player == -1 and not adj.isObstacle and not adj.isCity and adj in map.pathable_tiles
+                        ]
+                        if captures:
+                            captured = captures[turn % len(captures)]
+                            self.mark_tile_captured(captured, general.player, 1)
+                            changedTiles.append(captured)
+
+                    largeIslandBuildsBefore = builder.large_island_distance_build_count
+                    builder.update_tile_islands(enemyGeneral)
+
+                    self.assertEqual(len(changedTiles), builder.last_update_candidate_tile_count, f'turn {turn}: only the changed tiles should go through the per tile update')
+                    if captured is None:
+                        # generals and cities are always solo islands, incrementing them just patches them in place.
+                        self.assertEqual(0, builder.last_update_impacted_tile_count, f'turn {turn}: army increments should not rebuild any islands')
+                        self.assertEqual(largeIslandBuildsBefore, builder.large_island_distance_build_count, f'turn {turn}: army increments should not rebuild large island distances')
+                    else:
+                        self.assertLessEqual(builder.last_update_impacted_tile_count, 4 * builder.desired_tile_island_size + 5, f'turn {turn}: a capture should only rebuild the islands next to it')
+                    self.assertLessEqual(builder.last_update_resorted_island_count, 6 * len(changedTiles), f'turn {turn}: only islands near the changed tiles should get re-sorted')
+
+                self.assertAllIslandsContiguous(builder, debugMode)
+                self.assertNoLookupMismatches(builder)
+                self.assertNoBorderIslandsStale(builder)
+                self.assertNoTilesWithNullIslands(builder, debugMode)
+                islandKeys = [i.tiles_by_army[0].tile_index for i in builder.all_tile_islands]
+                self.assertEqual(sorted(islandKeys), islandKeys, 'all_tile_islands should still be sorted after bisecting islands in and out')
+                for islands in itertools.chain(builder.tile_islands_by_player, builder.tile_islands_by_team_id):
+                    islandKeys = [i.tiles_by_army[0].tile_index for i in islands]
+                    self.assertEqual(sorted(islandKeys), islandKeys, 'island lists should still be sorted after bisecting islands in and out')
+                for island in builder.all_tile_islands:
+                    borderKeys = [b.tiles_by_army[0].tile_index for b in island.border_islands]
+                    self.assertEqual(sorted(borderKeys), borderKeys, f'border_islands of {island} should still be sorted after incremental re-sorts')
+
     def test_builds_tile_islands(self):
         debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and False
 
@@ -28,7 +28,8 @@ class GeneralsClientHost(object):
             userId=None,
             gameType="private",
             privateRoomID: str | None = None,
-            public_server=False
+            public_server=False,
+            idleMethod: typing.Callable[[], bool] | None = None
     ):
         # Save Config
 
@@ -42,6 +43,9 @@ class GeneralsClientHost(object):
 
         self._handleTilePing = handleTilePing
 
+        self._idleMethod: typing.Callable[[], bool] | None = idleMethod
+        """Called repeatedly on the moves thread while waiting for the next server update, returns whether it has more idle work to do."""
+
         self._map: Map | None = None
 
         self._server_updates_queue: "queue.Queue[typing.Tuple[str, typing.Any, float]]" = queue.Queue()
@@ -203,7 +207,7 @@ class GeneralsClientHost(object):
                 break
 
             try:
-                updateType, update, updateReceivedTime = self._server_updates_queue.get(block=True, timeout=1.0)
+                updateType, update, updateReceivedTime = self._wait_for_server_update(timeout=1.0)
                 gameUpdateReceived = False
                 botShouldMakeMove = False
                 countsForMakeMove = False
@@ -256,6 +260,20 @@ class GeneralsClientHost(object):
                 logbook.info("err")  # Log it or whatever here
                 logbook.error(''.join('!! ' + line for line in lines))  # Log it or whatever here
 
+    def _wait_for_server_update(self, timeout: float) -> typing.Tuple[str, typing.Any, float]:
+        """Blocks for up to timeout waiting for the next server update, running slices of idle work instead of sleeping while there is any."""
+        deadline = time.perf_counter() + timeout
+        if self._idleMethod is not None:
+            while time.perf_counter() < deadline:
+                try:
+                    return self._server_updates_queue.get(block=False)
+                except queue.Empty:
+                    pass
+                if not self._idleMethod():
+                    break
+
+        return self._server_updates_queue.get(block=True, timeout=max(0.0, deadline - time.perf_counter()))
+
     def _process_map_diff(self, data):
         if not self._seen_update:
             logbook.info('First update...?')
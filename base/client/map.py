@@ -12,6 +12,7 @@ from copy import deepcopy
 from base.client.tile import *
 
 import logbook
+import numpy as np
 import random
 import typing
 import uuid
@@ -19,6 +20,10 @@ from collections import deque
 
 import BotLogging
 from Interfaces import MapMatrixInterface, TileSet
+
+if typing.TYPE_CHECKING:
+    from SearchUtils import TurnSearchCache
+
 MODIFIER_LEAPFROG = 0
 MODIFIER_CITY_STATE = 1
 MODIFIER_MISTY_VEIL = 2
@@ -245,6 +250,13 @@ class DistanceMapper:
         """Wipe all cached distances."""
         raise NotImplementedError()
 
+    def repair_passability_changes(self, tiles: typing.Iterable[Tile]):
+        """
+        Notify the mapper that the given tiles flipped obstacle-ness (or were removed from their neighbors movable lists, like a discovered mountain).
+        Implementations may repair their cached distances incrementally; the default just wipes everything.
+        """
+        self.recalculate()
+
     def dump_times(self):
         raise NotImplementedError()
 
@@ -252,6 +264,74 @@ class DistanceMapper:
         raise NotImplementedError()
 
 
+class MapTileArrays(object):
+    """
+    Flat numpy mirror of the map keyed by tile_index, for array based algorithms (vectorized BFS, compiled kernels, graph builders).
+
+    Adjacency is CSR: the movable neighbors of tile t are indices[indptr[t.tile_index]:indptr[t.tile_index + 1]], in the same order as t.movable.
+    Per tile flag arrays mirror the Tile fields of the same meaning.
+
+    Maintained incrementally by MapBase: tiles are re-synced whenever Tile.update runs on them (update_visible_tile etc), MapBase.update
+    re-syncs the fog tiles it changes (bonuses as they are applied, and the tiles with deltas plus their fog neighbors after movement
+    prediction), walled city conversions re-sync, and discovered mountains remove their inbound edges.
+    Code that mutates tile army / player / obstacle-ness outside of those paths (fog predictions, simulations) must call
+    MapBase.sync_tile_arrays(tile) if it wants the arrays to reflect that.
+    Do not modify the arrays in place from outside.
+    """
+
+    __slots__ = (
+        'indptr',
+        'indices',
+        'obstacle',
+        'city',
+        'neutral_city',
+        'swamp',
+        'desert',
+        'player',
+        'army',
+    )
+
+    def __init__(self, tilesByIndex: typing.List[Tile]):
+        n = len(tilesByIndex)
+
+        degrees = np.fromiter((len(t.movable) for t in tilesByIndex), dtype=np.int32, count=n)
+        self.indptr: np.ndarray = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(degrees, out=self.indptr[1:])
+        self.indices: np.ndarray = np.fromiter((mv.tile_index for t in tilesByIndex for mv in t.movable), dtype=np.int32, count=int(self.indptr[-1]))
+
+        self.obstacle: np.ndarray = np.zeros(n, dtype=bool)
+        self.city: np.ndarray = np.zeros(n, dtype=bool)
+        self.neutral_city: np.ndarray = np.zeros(n, dtype=bool)
+        self.swamp: np.ndarray = np.zeros(n, dtype=bool)
+        self.desert: np.ndarray = np.zeros(n, dtype=bool)
+        self.player: np.ndarray = np.full(n, -1, dtype=np.int8)
+        self.army: np.ndarray = np.zeros(n, dtype=np.int32)
+
+        for tile in tilesByIndex:
+            self.update_tile(tile)
+
+    def update_tile(self, tile: Tile):
+        idx = tile.tile_index
+        self.obstacle[idx] = tile.isObstacle
+        self.city[idx] = tile.isCity
+        self.neutral_city[idx] = tile.isCity and tile.isNeutral
+        self.swamp[idx] = tile.isSwamp
+        self.desert[idx] = tile.isDesert
+        self.player[idx] = tile._player
+        self.army[idx] = tile.army
+
+    def remove_movable_edge(self, fromTile: Tile, toTile: Tile):
+        """Mirrors fromTile.movable.remove(toTile)."""
+        start = self.indptr[fromTile.tile_index]
+        end = self.indptr[fromTile.tile_index + 1]
+        hits = np.flatnonzero(self.indices[start:end] == toTile.tile_index)
+        if len(hits) == 0:
+            return
+
+        self.indices = np.delete(self.indices, start + hits[0])
+        self.indptr[fromTile.tile_index + 1:] -= 1
+
+
 class MapBase(object):
     DO_NOT_RANDOMIZE: bool = False
     """Static property to prevent randomizing the tile adjacency matrix."""
@@ -365,6 +445,21 @@ class MapBase(object):
             for tile in r:
                 self.tiles_by_index[tile.tile_index] = tile
 
+        self._tile_arrays: MapTileArrays | None = None
+        """Lazily built, incrementally maintained numpy mirror of the tiles. See get_tile_arrays."""
+
+        self._obstacle_by_tile_index: typing.List[bool] | None = None
+        """tile.isObstacle of every tile as of the last update_reachable, to find the tiles whose passability flipped since then."""
+
+        self.generation: int = 0
+        """
+        Bumped every time the tiles may have changed (update(), convert_tile_to_mountain, bump_generation).
+        Anything caching results derived from tile state across calls should key on this rather than on turn.
+        """
+
+        self.turn_search_cache: TurnSearchCache | None = None
+        """The active SearchUtils turn search cache for this map, see SearchUtils.begin_turn_search_cache. Never pickled."""
+
         self.init_grid_movable()
 
         # List of City Tiles. Need concept of hidden cities from sim..? or maintain two maps, maybe. one the sim maintains perfect knowledge of, and one for each bot with imperfect knowledge from the sim.
@@ -427,6 +522,8 @@ class MapBase(object):
         state.pop('notify_general_revealed', None)
         state.pop('notify_player_captures', None)
         oldDistMapper = state.pop('distance_mapper', None)
+        state.pop('_tile_arrays', None)
+        state.pop('turn_search_cache', None)
         state.pop('resume_data', None)
 
         if isinstance(self.pathable_tiles, set):
@@ -452,6 +549,8 @@ class MapBase(object):
         self.notify_tile_vision_changed = []
         self.notify_general_revealed = []
         self.notify_player_captures = []
+        self._tile_arrays = None
+        self.turn_search_cache = None
 
         # tiles by index is the only list of tiles included in state.
         self.grid = [[None for x in range(self.cols)] for y in range(self.rows)]
@@ -1037,6 +1136,7 @@ AttributeError: 'Map' object has no attribute 'grid'
 
         @param bypassDeltas: If passes, fog-city-and-army-increments will not be applied this turn, and tile-movement deltas will not be tracked.
         """
+        self.generation += 1
 
         for player in self.players:
             player.lastCityCount = player.cityCount
@@ -1047,7 +1147,17 @@ AttributeError: 'Map' object has no attribute 'grid'
         if self.complete and not self.result and self.remainingPlayers > 2:  # Game Over - Ignore Empty Board Updates in FFA
             return self
 
+        # tiles this update may change outside of Tile.update, which need re-syncing into the tile arrays.
+        tileArrays = self._tile_arrays
+        tileArraySyncTiles: typing.List[Tile] | None = [] if tileArrays is not None else None
+
         for curTile in self.get_all_tiles():
+            if tileArraySyncTiles is not None:
+                delta = curTile.delta
+                if delta.armyDelta != 0 or delta.oldOwner != delta.newOwner or delta.gainedSight or delta.lostSight or delta.armyMovedHere:
+                    # movement prediction only moves army between tiles with deltas and their neighbors.
+                    tileArraySyncTiles.append(curTile)
+                    tileArraySyncTiles.extend(curTile.movable)
             if curTile.isCity and curTile.delta.oldOwner != curTile.delta.newOwner and not curTile.delta.gainedSight and curTile.delta.newOwner != -1:
                 oldOwner = curTile.delta.oldOwner
                 newOwner = curTile.player
@@ -1088,16 +1198,22 @@ AttributeError: 'Map' object has no attribute 'grid'
                     if curTile.isCity or curTile.isGeneral:
                         if not curTile.visible and curTile.player >= 0:
                             curTile.army += 1
+                            if tileArraySyncTiles is not None:
+                                tileArraySyncTiles.append(curTile)
                     if curTile.isSwamp:
                         if not curTile.visible and curTile.player >= 0:
                             curTile.army -= 1
                             if curTile.army <= 0:
                                 curTile.player = -1
+                            if tileArraySyncTiles is not None:
+                                tileArraySyncTiles.append(curTile)
 
             if self.is_army_bonus_turn:
                 for curTile in self.tiles_by_index:
                     if not curTile.visible and curTile.player >= 0 and not curTile.isDesert:
                         curTile.army += 1
+                        if tileArraySyncTiles is not None:
+                            tileArraySyncTiles.append(curTile)
 
         for curTile in self.tiles_by_index:
             # if curTile.isSwamp:
@@ -1125,6 +1241,12 @@ AttributeError: 'Map' object has no attribute 'grid'
         if not bypassDeltas:
             self.detect_movement_and_populate_unexplained_diffs()
 
+        if tileArraySyncTiles is not None:
+            if self.last_player_index_submitted_move is not None:
+                tileArraySyncTiles.extend(self.last_player_index_submitted_move[0:2])
+            for curTile in tileArraySyncTiles:
+                tileArrays.update_tile(curTile)
+
         self.update_reachable()
 
         # we know our players city count + his general because we can see all our own cities
@@ -1207,8 +1329,52 @@ AttributeError: 'Map' object has no attribute 'grid'
                     random.shuffle(tile.visibleTo)
                     random.shuffle(tile.movable)
 
+        self.invalidate_tile_arrays()
         self.update_reachable()
 
+    def get_tile_arrays(self) -> MapTileArrays:
+        """
+        Returns the numpy mirror of the map (CSR movable adjacency + per tile flag arrays), building it the first time it is asked for.
+        From then on it is kept up to date incrementally as tiles update. See MapTileArrays for the exact sync points.
+
+        @return:
+        """
+        tileArrays = self._tile_arrays
+        if tileArrays is None:
+            tileArrays = MapTileArrays(self.tiles_by_index)
+            self._tile_arrays = tileArrays
+
+        return tileArrays
+
+    def get_movable_adjacency(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (indptr, indices), the int32 CSR movable adjacency keyed by tile_index.
+        The neighbors of tile t are indices[indptr[t.tile_index]:indptr[t.tile_index + 1]], in the same order as t.movable.
+        Do not modify the returned arrays.
+
+        @return:
+        """
+        tileArrays = self.get_tile_arrays()
+        return tileArrays.indptr, tileArrays.indices
+
+    def sync_tile_arrays(self, tile: Tile):
+        """Re-syncs a single tiles flags into the tile arrays (if they have been built). Cheap, call after mutating a tile outside of Tile.update."""
+        if self._tile_arrays is not None:
+            self._tile_arrays.update_tile(tile)
+
+    def remove_movable_adjacency_edge(self, fromTile: Tile, toTile: Tile):
+        """Must be called whenever toTile is removed from fromTile.movable."""
+        if self._tile_arrays is not None:
+            self._tile_arrays.remove_movable_edge(fromTile, toTile)
+
+    def bump_generation(self):
+        """Call after mutating tile army / ownership outside of update() (fog predictions, what-if sims) so generation keyed caches drop their results."""
+        self.generation += 1
+
+    def invalidate_tile_arrays(self):
+        """Drops the tile arrays so they are rebuilt from scratch next time they are requested. Call after wholesale changes to the movable lists."""
+        self._tile_arrays = None
+
     def update_reachable(self):
         pathableTiles = set()
         reachableTiles = set()
@@ -1238,6 +1404,7 @@ AttributeError: 'Map' object has no attribute 'grid'
             if self.is_walled_city_game and not tileIsPathable and not tile.discovered and not tile.isMountain:
                 tile.isCity = True
                 tile.army = self.walled_city_base_value
+                self.sync_tile_arrays(tile)
                 tileIsPathable = True
                 # tile.overridePathable = True
 
@@ -1254,9 +1421,15 @@ AttributeError: 'Map' object has no attribute 'grid'
             logbook.info(f'Setting low cost city game...? is cityState {self.has_city_state}, modifiers {[i for i, m in enumerate(self.modifiers_by_id) if m]}')
             self.is_low_cost_city_game = True
 
-        if len(pathableTiles) != len(self.pathable_tiles):
+        passabilityChangedTiles = pathableTiles.symmetric_difference(self.pathable_tiles)
+        prevObstacles = self._obstacle_by_tile_index
+        if prevObstacles is not None and len(prevObstacles) == len(self.tiles_by_index):
+            # tiles can become (or stop being) obstacles without entering / leaving the pathable set, e.g. a neutral tile piling up army past the pathable city threshold.
+            passabilityChangedTiles.update(t for t, wasObstacle in zip(self.tiles_by_index, prevObstacles) if t.isObstacle != wasObstacle)
+        self._obstacle_by_tile_index = [t.isObstacle for t in self.tiles_by_index]
+        if passabilityChangedTiles:
             try:
-                self.distance_mapper.recalculate()
+                self.distance_mapper.repair_passability_changes(passabilityChangedTiles)
             except:
                 pass
 
@@ -1397,6 +1570,13 @@ AttributeError: 'Map' object has no attribute 'grid'
         tile.isGeneral = False
         tile.player = -1
         tile.isMountain = True
+        tile._recalc_derived()
+        self.sync_tile_arrays(tile)
+        self.generation += 1
+        try:
+            self.distance_mapper.repair_passability_changes([tile])
+        except:
+            pass
 
     def set_tile_probably_moved(self, toTile: Tile, fromTile: Tile, fullFromDiffCovered = True, fullToDiffCovered = True, byPlayer = -1) -> bool:
         """
@@ -3089,6 +3269,10 @@ AttributeError: 'Map' object has no attribute 'grid'
         self.walled_city_base_value = wallCityArmy
         Tile.PATHABLE_CITY_THRESHOLD = wallCityArmy + 1
         Tile.recalc_all_derived(self.tiles_by_index)
+        if self._tile_arrays is not None:
+            # the threshold change can flip isObstacle on any neutral city.
+            for tile in self.tiles_by_index:
+                self._tile_arrays.update_tile(tile)
         if oldBaseValue is None or wallCityArmy > oldBaseValue:
             self.update_reachable()
 
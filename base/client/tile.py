@@ -647,6 +647,8 @@ class Tile(object):
                 for movableTile in self.movable:
                     if self in movableTile.movable:
                         movableTile.movable.remove(self)
+                        if map is not None:
+                            map.remove_movable_adjacency_edge(movableTile, self)
 
                 self.isMountain = True
             if tile == TILE_LOOKOUT:
@@ -730,6 +732,8 @@ class Tile(object):
         self.delta.unexplainedDelta = self.delta.armyDelta
 
         self._recalc_derived()
+        if map is not None:
+            map.sync_tile_arrays(self)
         return armyMovedHere
 
     def set_disconnected_neutral(self):
@@ -33,6 +33,7 @@ from Behavior.ArmyInterceptor import ArmyInterceptor, ArmyInterception, ThreatBl
 from BehaviorAlgorithms.IterativeExpansion import ArmyFlowExpander, FlowExpansionPlanOptionCollection
 from CityAnalyzer import CityAnalyzer, CityScoreData
 from Communication import TeammateCommunicator, TileCompressor
+from DistanceMapperDenseImpl import DistanceMapperDenseImpl
 from DistanceMapperImpl import DistanceMapperImpl
 from Gather import GatherCapturePlan
 from GatherAnalyzer import GatherAnalyzer
@@ -40,6 +41,8 @@ from Interfaces import TilePlanInterface, MapMatrixInterface
 from MapMatrix import MapMatrix, MapMatrixSet, TileSet
 # from MctsLudii import MctsDUCT
 from Path import Path, MoveListPath
+from IdlePrecomputeWorker import IdlePrecomputeWorker, get_passability_fingerprint
+from MoveDeadlineScheduler import MoveDeadlineScheduler, MovePhasePriority
 from PerformanceTimer import PerformanceTimer
 from BoardAnalyzer import BoardAnalyzer
 from BotModules.BotCityCaptureControl import BotCityCaptureControl
@@ -108,6 +111,22 @@ class EklipZBot(object):
         self.clear_moves_func: typing.Union[None, typing.Callable] = None
         self.surrender_func: typing.Union[None, typing.Callable] = None
         self._map: MapBase = None
+        self.use_dense_distance_mapper: bool = False
+        """If True, the map gets a DistanceMapperDenseImpl (eager all-pairs numpy distances) instead of the lazy per-tile DistanceMapperImpl. Must be set before the first map update."""
+        self.use_turn_search_cache: bool = False
+        """If True, identical SearchUtils searches within one find_move (after init_turn) are memoized, see SearchUtils.TurnSearchCache. Hit / miss counts land in the perf event tree."""
+        self.use_move_deadline_scheduler: bool = False
+        """
+        If True, pick_move_after_prep stops starting lower priority phases as the turn deadline approaches and returns the best
+        fallback move found so far (see MoveDeadlineScheduler), and the host runs find_move on lag turns instead of dropping the move.
+        """
+        self.move_scheduler: MoveDeadlineScheduler | None = None
+        self.use_idle_precompute: bool = False
+        """
+        If True, after each move the bot schedules speculative precomputation of next turns intergeneral ArmyAnalyzer and
+        likely-needed distance rows, which the host runs in the idle window before the next update (see IdlePrecomputeWorker).
+        """
+        self.idle_precompute_worker: IdlePrecomputeWorker | None = None
         self.curPath: Path | None = None
         self.last_move: Move | None = None
         self.curPathPrio = -1
@@ -462,7 +481,56 @@ class EklipZBot(object):
 
     # STEP2: Stay in EklipZBotV2.py. Lifecycle stub with no body today; preserve on the shell for compatibility with existing callers.
     def spawnWorkerThreads(self):
-        return
+        if self.use_idle_precompute and self.idle_precompute_worker is None:
+            self.idle_precompute_worker = IdlePrecomputeWorker(self._map)
+
+    def run_idle_precompute_slice(self) -> bool:
+        """Called by the host while waiting for the next server update. Returns whether there is more idle work to do."""
+        if self.idle_precompute_worker is None:
+            return False
+        return self.idle_precompute_worker.run_idle_slice()
+
+    def _schedule_idle_precompute(self):
+        worker = self.idle_precompute_worker
+        opponentGeneral = self.targetPlayerExpectedGeneralLocation
+        if opponentGeneral is not None and self.general is not None:
+            fingerprint = (get_passability_fingerprint(self._map), self.general.tile_index, opponentGeneral.tile_index)
+            worker.schedule('intergeneral_analysis', fingerprint, self._precompute_intergeneral_analysis(self.general, opponentGeneral))
+
+        # distance rows stay valid across turns (the mapper repairs them on passability changes), so they need no adoption.
+        worker.schedule('distance rows', None, self._precompute_distance_rows())
+
+    def _precompute_intergeneral_analysis(self, general: Tile, opponentGeneral: Tile) -> typing.Generator[None, None, ArmyAnalyzer]:
+        # one distance row BFS per slice, the analyzer then reads both rows back out of the distance mapper cache.
+        self._map.distance_mapper.get_tile_dist_matrix(general)
+        yield
+        self._map.distance_mapper.get_tile_dist_matrix(opponentGeneral)
+        yield
+        analysis = ArmyAnalyzer(self._map, general, opponentGeneral, deferScan=True)
+        yield
+        yield from analysis.scan_in_slices()
+        return analysis
+
+    def _precompute_distance_rows(self, maxRows: int = 250) -> typing.Generator[None, None, None]:
+        if isinstance(self._map.distance_mapper, DistanceMapperDenseImpl):
+            return
+
+        # our big tiles and our frontier are what next turns gathers / expansions / interceptions ask for distances from.
+        candidates = sorted(self.player.tiles, key=lambda t: t.army, reverse=True)
+        for tile in self.player.tiles:
+            for adj in tile.movable:
+                if not adj.isObstacle and adj.player != self.general.player:
+                    candidates.append(adj)
+
+        seen = set()
+        for tile in candidates:
+            if tile in seen:
+                continue
+            seen.add(tile)
+            self._map.distance_mapper.get_tile_dist_matrix(tile)
+            if len(seen) >= maxRows:
+                return
+            yield
 
     # STEP2: Stay in EklipZBotV2.py. Top-level move orchestration/error handling/history/render prep spanning many modules; keep on shell and have it call extracted helpers.
     def find_move(self, is_lag_move=False) -> Move | None:
@@ -539,26 +607,53 @@ class EklipZBot(object):
             #         self.info(f'overrode unsafe move with threat gather depth {gatherDepth} after no threat kill found')
             #         move = self.gather_to_threat_path(self.threat)
 
-            BotPathingUtils.check_cur_path(self)
+            try:
+                BotPathingUtils.check_cur_path(self)
+
+                if move is not None and self.curPath is not None:
+                    curPathMove = self.curPath.get_first_move()
+                    if curPathMove is None:
+                        self.info("Returned a move while curPath had no next move. Resetting path...")
+                        self.curPath = None
+                        self.curPathPrio = -1
+                    elif curPathMove.source == move.source and curPathMove.dest != move.dest:
+                        self.info("Returned a move using the tile that was curPath, but wasn't the next path move. Resetting path...")
+                        self.curPath = None
+                        self.curPathPrio = -1
+
+                if self._map.turn not in self.history.move_history:
+                    self.history.move_history[self._map.turn] = []
+                self.history.move_history[self._map.turn].append(move)
+
+                BotRendering.prep_view_info_for_render(self, move)
+            finally:
+                if self.use_turn_search_cache:
+                    # also on the error path, so the idle precompute worker and other out of turn searches never see this turn's cache.
+                    with self.perf_timer.begin_move_event('Turn search cache') as cacheEvent:
+                        cacheEvent.counters.update(SearchUtils.end_turn_search_cache(self._map))
+
+            if self.idle_precompute_worker is not None:
+                self._schedule_idle_precompute()
 
-            if move is not None and self.curPath is not None:
-                curPathMove = self.curPath.get_first_move()
-                if curPathMove is None:
-                    self.info("Returned a move while curPath had no next move. Resetting path...")
-                    self.curPath = None
-                    self.curPathPrio = -1
-                elif curPathMove.source == move.source and curPathMove.dest != move.dest:
-                    self.info("Returned a move using the tile that was curPath, but wasn't the next path move. Resetting path...")
-                    self.curPath = None
-                    self.curPathPrio = -1
+        return move
 
-            if self._map.turn not in self.history.move_history:
-                self.history.move_history[self._map.turn] = []
-            self.history.move_history[self._map.turn].append(move)
+    def _offer_deadline_fallback_moves(self):
+        """Cheap moves offered to the move scheduler before any expensive phase runs, so a cut off turn still has something to play."""
+        if self.curPath is not None:
+            self.move_scheduler.offer(self.curPath.get_first_move(), 'curPath', MovePhasePriority.Normal)
+        if self.expansion_plan is not None and self.expansion_plan.selected_option is not None:
+            # last turns plan, only used if nothing fresher is offered.
+            self.move_scheduler.offer(self.expansion_plan.selected_option.get_first_move(), 'previous expansion plan', MovePhasePriority.Low)
+        if self.captureLeafMoves:
+            self.move_scheduler.offer(max(self.captureLeafMoves, key=lambda m: m.source.army - m.dest.army), 'capture leaf', MovePhasePriority.Low)
 
-            BotRendering.prep_view_info_for_render(self, move)
+    def _is_cut_off_by_deadline(self, phaseName: str, priority: MovePhasePriority) -> bool:
+        return self.move_scheduler is not None and not self.move_scheduler.should_run(phaseName, priority)
 
-        return move
+    def _get_deadline_fallback_move(self) -> Move | None:
+        scheduler = self.move_scheduler
+        self.info(f'DEADLINE {scheduler.get_elapsed():.3f}s cut {scheduler.skipped_phases[-1]}, playing {scheduler.best_move_source} {scheduler.get_best_move()}')
+        return scheduler.get_best_move()
 
     # STEP2: Stay in EklipZBotV2.py. Tiny shell utility used broadly for perf/log timing display; keep local on the bot.
     def get_elapsed(self):
@@ -752,8 +847,9 @@ class EklipZBot(object):
                 self._should_recalc_tile_islands = False
         else:
             # EXPANSION RELIES ON TILE ISLANDS BEING ACCURATE OR ELSE IT WILL DIVE INTO CORNERS WHERE IT ALREADY CUT OFF ITS RECAPTURE PATH BECAUSE IT THINKS IT CAN RECAPTURE USING THE TILES ITS COMING FROM
-            with self.perf_timer.begin_move_event('TileIsland update'):
+            with self.perf_timer.begin_move_event('TileIsland update') as islandUpdateEvent:
                 self.tileIslandBuilder.update_tile_islands(self.targetPlayerExpectedGeneralLocation)
+                islandUpdateEvent.counters.update(self.tileIslandBuilder.get_last_update_counters())
 
         self.armyTracker.verify_player_tile_and_army_counts_valid()
 
@@ -887,6 +983,7 @@ class EklipZBot(object):
                 if self.targetPlayerObj.general is not None and not self.targetPlayerObj.general.visible:
                     self.targetPlayerObj.general.army = 3
                     BotEventHandlers.clear_fog_armies_around(self, self.targetPlayerObj.general)
+                    self._map.bump_generation()
 
                 if not is_lag_move:
                     with self.perf_timer.begin_move_event('all in change recalculate_player_paths'):
@@ -960,6 +1057,14 @@ class EklipZBot(object):
     def select_move(self, is_lag_move=False) -> Move | None:
         self.init_turn()
 
+        if self.use_turn_search_cache:
+            # init_turn's fog predictions mutate tiles without an update(), so only start caching after it.
+            SearchUtils.begin_turn_search_cache(self._map)
+
+        self.move_scheduler = None
+        if self.use_move_deadline_scheduler:
+            self.move_scheduler = MoveDeadlineScheduler(self.perf_timer, self._map.turn, self.general.player)
+
         self.tiles_pinged_by_teammate_this_turn = set()
         while self._tiles_pinged_by_teammate.qsize() > 0:
             tile = self._tiles_pinged_by_teammate.get()
@@ -1031,6 +1136,9 @@ class EklipZBot(object):
                         return Move(self.general, t)
         BotPathingUtils.clean_up_path_before_evaluating(self)
 
+        if self.move_scheduler is not None:
+            self._offer_deadline_fallback_moves()
+
         if self.curPathPrio >= 0:
             logbook.info(f"curPathPrio: {str(self.curPathPrio)}")
 
@@ -1078,6 +1186,9 @@ class EklipZBot(object):
         # if not self.isAllIn() and (threat.turns > -1 and self.dangerAnalyzer.anyThreat):
         #    armyAmount = (self.general_min_army_allowable() + enemyNearGen) * 1.1 if threat is None else threat.threatValue + general.army + 1
 
+        if self._is_cut_off_by_deadline('ENEMY Expansion quick check', MovePhasePriority.Low):
+            return self._get_deadline_fallback_move()
+
         if not BotStateQueries.is_all_in(self) and (not is_lag_move and not self.is_lag_massive_map or self._map.turn < 3 or (self._map.turn + 2) % 5 == 0):
             with self.perf_timer.begin_move_event('ENEMY Expansion quick check'):
                 self.enemy_expansion_plan = BotExpansionOps.build_enemy_expansion_plan(self, timeLimit=0.007, pathColor=(255, 150, 130))
@@ -1086,6 +1197,9 @@ class EklipZBot(object):
         for i, interceptPlan in enumerate(self.intercept_plans.values()):
             BotRendering.render_intercept_plan(self, interceptPlan, colorIndex=i)
 
+        if self._is_cut_off_by_deadline('Expansion quick check', MovePhasePriority.Normal):
+            return self._get_deadline_fallback_move()
+
         if not BotStateQueries.is_all_in(self) and not is_lag_move:
             with self.perf_timer.begin_move_event('Expansion quick check'):
                 redoTimings = False
@@ -1112,6 +1226,9 @@ class EklipZBot(object):
                 if redoTimings:
                     self.timings = BotTimings.get_timings(self)
 
+                if self.move_scheduler is not None and self.expansion_plan is not None and self.expansion_plan.selected_option is not None:
+                    self.move_scheduler.offer(self.expansion_plan.selected_option.get_first_move(), 'expansion plan', MovePhasePriority.Normal)
+
         defenseSavePath: Path | None = None
         if not self.is_all_in_losing and threat is not None and threat.threatType != ThreatType.Vision:
             with self.perf_timer.begin_move_event(f'THREAT DEFENSE {threat.turns} {str(threat.path.start.tile)}'):
@@ -1159,6 +1276,9 @@ class EklipZBot(object):
             else:
                 self.info(f'Byp f25 bc weird_custom {self.is_weird_custom} (walled_city {self._map.is_walled_city_game} or low_cost_city {self._map.is_low_cost_city_game}) or cityState {self._map.modifiers_by_id[MODIFIER_CITY_STATE]}')
 
+        if self._is_cut_off_by_deadline('Ffa Turtle Move', MovePhasePriority.Normal):
+            return self._get_deadline_fallback_move()
+
         if self._map.turn < 250 and self._map.remainingPlayers > 3:
             with self.perf_timer.begin_move_event('Ffa Turtle Move'):
                 move = BotExpansionOps.look_for_ffa_turtle_move(self)
@@ -1185,6 +1305,9 @@ class EklipZBot(object):
 
         # Note: defensive spanning trees are now calculated early in init_turn() for win condition analysis
         # This later calculation incorporates defenseCriticalTileSet and expansion plan blocking tiles
+        if self._is_cut_off_by_deadline('defensive spanning trees', MovePhasePriority.High):
+            return self._get_deadline_fallback_move()
+
         if self._map.is_army_bonus_turn or self.defensive_spanning_tree is None:
             with self.perf_timer.begin_move_event('defensive spanning trees with defense critical'):
                 # Main spanning tree using cities_in_play (centralized defense)
@@ -1246,6 +1369,9 @@ class EklipZBot(object):
             if dangerTileKillMove is not None:
                 return dangerTileKillMove  # already logged to info
 
+        if self._is_cut_off_by_deadline('Flank defense high pri', MovePhasePriority.High):
+            return self._get_deadline_fallback_move()
+
         with self.perf_timer.begin_move_event('Flank defense / Vision expansion HIGH PRI'):
             flankDefMove = BotExplorationOps.find_flank_defense_move(self, defenseCriticalTileSet, highPriority=True)
             if flankDefMove:
@@ -1272,6 +1398,9 @@ class EklipZBot(object):
         #         if not BotRepetition.detect_repetition(self, move):
         #             return move
 
+        if self._is_cut_off_by_deadline('FORCE_FAR_GATHERS', MovePhasePriority.Normal):
+            return self._get_deadline_fallback_move()
+
         if self.force_far_gathers and self.force_far_gathers_turns > 0:
             with self.perf_timer.begin_move_event(f'FORCE_FAR_GATHERS {self.force_far_gathers_turns}'):
                 roughTurns = self.force_far_gathers_turns
@@ -1390,6 +1519,9 @@ class EklipZBot(object):
 
         self.approximate_greedy_turns_avail = BotTimings._get_approximate_greedy_turns_available(self)
 
+        if self._is_cut_off_by_deadline('city preemptive defense', MovePhasePriority.High):
+            return self._get_deadline_fallback_move()
+
         if WinCondition.DefendContestedFriendlyCity in self.win_condition_analyzer.viable_win_conditions:
             with self.perf_timer.begin_move_event(f'Getting city preemptive defense {str(self.win_condition_analyzer.defend_cities)}'):
                 cityDefenseMove = BotCityOps.get_city_preemptive_defense_move(self, defenseCriticalTileSet)
@@ -1436,6 +1568,9 @@ class EklipZBot(object):
                 self.info(f'Pass thru EXP int! {move} {self.expansion_plan.selected_option}')
                 return move
 
+        if self._is_cut_off_by_deadline('enemy territory exploration continuation', MovePhasePriority.Normal):
+            return self._get_deadline_fallback_move()
+
         with self.perf_timer.begin_move_event('try_get_enemy_territory_exploration_continuation_move'):
             expNegs = set(defenseCriticalTileSet)
             logbook.info(f'DEFENSE_NEG_COPY context=enemy_territory_exploration_continuation source=defenseCriticalTileSet copiedTiles={[str(t) for t in expNegs]}')
@@ -1464,6 +1599,9 @@ class EklipZBot(object):
             if foundMove:
                 return move  # already logged
 
+        if self._is_cut_off_by_deadline('exploration', MovePhasePriority.Low):
+            return self._get_deadline_fallback_move()
+
         exploreMove = BotExplorationOps.try_find_exploration_move(self, defenseCriticalTileSet)
         if exploreMove is not None:
             return exploreMove  # already logged
@@ -1516,6 +1654,9 @@ class EklipZBot(object):
                     f"NeedToKillTiles for turns {earlyRetakeTurns} ({actualGatherTurns}) in quickExpand. Move {move}")
                 return move
 
+        if self._is_cut_off_by_deadline('Flank defense low pri', MovePhasePriority.Low):
+            return self._get_deadline_fallback_move()
+
         with self.perf_timer.begin_move_event('Flank defense / Vision expansion low pri'):
             flankDefMove = BotExplorationOps.find_flank_defense_move(self, defenseCriticalTileSet, highPriority=False)
             if flankDefMove:
@@ -1550,6 +1691,9 @@ class EklipZBot(object):
             self.info(f"quickCap move {expMove}")
             return expMove
 
+        if self._is_cut_off_by_deadline('main gather', MovePhasePriority.Low):
+            return self._get_deadline_fallback_move()
+
         with self.perf_timer.begin_move_event(f'MAIN GATHER OUTER, negs {[str(t) for t in defenseCriticalTileSet]}'):
             gathMove = BotGatherOps.try_find_gather_move(self, threat, defenseCriticalTileSet, self.leafMoves, needToKillTiles)
 
@@ -1892,7 +2036,10 @@ class EklipZBot(object):
     # STEP2: Stay in EklipZBotV2.py. Core one-time lifecycle/bootstrap wiring for all analyzers, trackers, callbacks, and bot state; keep on outer shell.
     def initialize_from_map_for_first_time(self, map: MapBase):
         self._map = map
-        self._map.distance_mapper = DistanceMapperImpl(map)
+        if self.use_dense_distance_mapper:
+            self._map.distance_mapper = DistanceMapperDenseImpl(map)
+        else:
+            self._map.distance_mapper = DistanceMapperImpl(map)
         self.viewInfo = ViewInfo(2, self._map)
         self.is_lag_massive_map = self._map.rows * self._map.cols > 1000
 
@@ -1958,6 +2105,8 @@ class EklipZBot(object):
         if self._map.cols < 13 or self._map.rows < 13:
             self.is_weird_custom = True
 
+        self.spawnWorkerThreads()
+
         # minCity = None
         # for tile in self._map.get_all_tiles():
         #     if tile.isCity and tile.isNeutral and (minCity is None or minCity.army > tile.army):